@@ -0,0 +1,35 @@
+"""Add findings.dedupe_key (hashed canonical key) with per-job unique constraint for bulk ingest.
+
+Revision ID: 20250302000000
+Revises: 20250301000000
+Create Date: 2025-03-02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20250302000000"
+down_revision: Union[str, None] = "20250301000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable: rows ingested before this revision were deduped in memory and keep NULL
+    # (NULLs never conflict, so the unique constraint only applies to new uploads).
+    op.add_column(
+        "findings",
+        sa.Column("dedupe_key", sa.String(length=64), nullable=True),
+    )
+    op.create_unique_constraint(
+        "uq_findings_job_dedupe_key",
+        "findings",
+        ["upload_job_id", "dedupe_key"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_findings_job_dedupe_key", "findings", type_="unique")
+    op.drop_column("findings", "dedupe_key")
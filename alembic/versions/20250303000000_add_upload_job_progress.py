@@ -0,0 +1,37 @@
+"""Add progress counters and error detail to upload_jobs for background ingest.
+
+Revision ID: 20250303000000
+Revises: 20250302000000
+Create Date: 2025-03-03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20250303000000"
+down_revision: Union[str, None] = "20250302000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "upload_jobs",
+        sa.Column("processed_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "upload_jobs",
+        sa.Column("accepted_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "upload_jobs",
+        sa.Column("error_detail", sa.Text(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("upload_jobs", "error_detail")
+    op.drop_column("upload_jobs", "accepted_count")
+    op.drop_column("upload_jobs", "processed_count")
@@ -0,0 +1,66 @@
+"""Add finding_rules (per-job shared rule metadata) and findings.rule_key.
+
+Revision ID: 20250304000000
+Revises: 20250303000000
+Create Date: 2025-03-04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "20250304000000"
+down_revision: Union[str, None] = "20250303000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "finding_rules",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("upload_job_id", sa.Integer(), nullable=False),
+        sa.Column("rule_key", sa.String(length=64), nullable=False),
+        sa.Column("rule_payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.ForeignKeyConstraint(["upload_job_id"], ["upload_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("upload_job_id", "rule_key", name="uq_finding_rules_job_rule_key"),
+    )
+    op.create_index(
+        op.f("ix_finding_rules_upload_job_id"), "finding_rules", ["upload_job_id"], unique=False
+    )
+    # Nullable: existing rows keep their full raw_payload and no rule reference.
+    op.add_column(
+        "findings",
+        sa.Column("rule_key", sa.String(length=64), nullable=True),
+    )
+    op.create_foreign_key(
+        "fk_findings_job_rule_key",
+        "findings",
+        "finding_rules",
+        ["upload_job_id", "rule_key"],
+        ["upload_job_id", "rule_key"],
+    )
+
+
+def downgrade() -> None:
+    # Fold shared rule metadata back into each finding's raw_payload before dropping it.
+    op.execute(
+        """
+        UPDATE findings AS f
+        SET raw_payload = CASE
+            WHEN r.rule_payload ? 'extra' THEN jsonb_set(
+                f.raw_payload, '{extra,metadata}', r.rule_payload -> 'extra' -> 'metadata'
+            )
+            ELSE r.rule_payload || f.raw_payload
+        END
+        FROM finding_rules AS r
+        WHERE r.upload_job_id = f.upload_job_id AND r.rule_key = f.rule_key
+        """
+    )
+    op.drop_constraint("fk_findings_job_rule_key", "findings", type_="foreignkey")
+    op.drop_column("findings", "rule_key")
+    op.drop_index(op.f("ix_finding_rules_upload_job_id"), table_name="finding_rules")
+    op.drop_table("finding_rules")
@@ -0,0 +1,46 @@
+"""Add content_hash and idempotency_key to upload_jobs for idempotent uploads.
+
+Revision ID: 20250305000000
+Revises: 20250304000000
+Create Date: 2025-03-05
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20250305000000"
+down_revision: Union[str, None] = "20250304000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "upload_jobs",
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "upload_jobs",
+        sa.Column("idempotency_key", sa.String(length=255), nullable=True),
+    )
+    op.create_index(
+        "ix_upload_jobs_user_content_hash",
+        "upload_jobs",
+        ["user_id", "content_hash"],
+        unique=False,
+    )
+    op.create_index(
+        "uq_upload_jobs_user_idempotency_key",
+        "upload_jobs",
+        ["user_id", "idempotency_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_upload_jobs_user_idempotency_key", table_name="upload_jobs")
+    op.drop_index("ix_upload_jobs_user_content_hash", table_name="upload_jobs")
+    op.drop_column("upload_jobs", "idempotency_key")
+    op.drop_column("upload_jobs", "content_hash")
@@ -0,0 +1,63 @@
+"""Add job_finding_refs and upload_jobs repos/unchanged/resolved counts for delta ingest.
+
+Revision ID: 20250306000000
+Revises: 20250305000000
+Create Date: 2025-03-06
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "20250306000000"
+down_revision: Union[str, None] = "20250305000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_finding_refs",
+        sa.Column("upload_job_id", sa.Integer(), nullable=False),
+        sa.Column("finding_id", sa.Integer(), nullable=False),
+        sa.Column("state", sa.String(length=16), nullable=False),
+        sa.ForeignKeyConstraint(["upload_job_id"], ["upload_jobs.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["finding_id"], ["findings.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("upload_job_id", "finding_id"),
+    )
+    op.create_index(
+        op.f("ix_job_finding_refs_finding_id"),
+        "job_finding_refs",
+        ["finding_id"],
+        unique=False,
+    )
+    op.add_column(
+        "upload_jobs",
+        sa.Column("repos", postgresql.ARRAY(sa.String(length=1024)), nullable=True),
+    )
+    op.add_column(
+        "upload_jobs",
+        sa.Column("unchanged_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "upload_jobs",
+        sa.Column("resolved_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_upload_jobs_repos",
+        "upload_jobs",
+        ["repos"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_upload_jobs_repos", table_name="upload_jobs")
+    op.drop_column("upload_jobs", "resolved_count")
+    op.drop_column("upload_jobs", "unchanged_count")
+    op.drop_column("upload_jobs", "repos")
+    op.drop_index(op.f("ix_job_finding_refs_finding_id"), table_name="job_finding_refs")
+    op.drop_table("job_finding_refs")
@@ -0,0 +1,33 @@
+"""Add findings.signature (Layer A cluster key digest) for SQL-side clustering.
+
+Existing rows stay NULL until `python -m app.backfill_signatures` fills them.
+
+Revision ID: 20250308000000
+Revises: 20250306000000
+Create Date: 2025-03-08
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20250308000000"
+down_revision: Union[str, None] = "20250306000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("findings", sa.Column("signature", sa.String(length=64), nullable=True))
+    op.create_index(
+        "ix_findings_job_signature",
+        "findings",
+        ["upload_job_id", "signature"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_findings_job_signature", table_name="findings")
+    op.drop_column("findings", "signature")
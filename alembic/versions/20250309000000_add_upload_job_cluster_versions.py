@@ -0,0 +1,29 @@
+"""Add upload_jobs.findings_version and clusters_version for cached cluster materialization.
+
+Revision ID: 20250309000000
+Revises: 20250308000000
+Create Date: 2025-03-09
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20250309000000"
+down_revision: Union[str, None] = "20250308000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "upload_jobs",
+        sa.Column("findings_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("upload_jobs", sa.Column("clusters_version", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("upload_jobs", "clusters_version")
+    op.drop_column("upload_jobs", "findings_version")
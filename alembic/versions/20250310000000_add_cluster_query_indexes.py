@@ -0,0 +1,64 @@
+"""Add clusters.severity_rank and indexes for filtering and keyset pagination of the clusters API.
+
+Revision ID: 20250310000000
+Revises: 20250309000000
+Create Date: 2025-03-10
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20250310000000"
+down_revision: Union[str, None] = "20250309000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "clusters",
+        sa.Column("severity_rank", sa.SmallInteger(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE clusters SET severity_rank = CASE severity
+            WHEN 'low' THEN 1 WHEN 'medium' THEN 2 WHEN 'high' THEN 3 WHEN 'critical' THEN 4
+            ELSE 0 END
+        """
+    )
+    op.create_index("ix_clusters_job_id", "clusters", ["upload_job_id", "id"], unique=False)
+    op.create_index(
+        "ix_clusters_job_severity",
+        "clusters",
+        ["upload_job_id", sa.text("severity_rank DESC"), sa.text("cvss_score DESC"), "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_clusters_job_cvss",
+        "clusters",
+        ["upload_job_id", sa.text("cvss_score DESC"), "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_clusters_job_vulnerability_id",
+        "clusters",
+        ["upload_job_id", "vulnerability_id"],
+        unique=False,
+        postgresql_ops={"vulnerability_id": "varchar_pattern_ops"},
+    )
+    op.create_index("ix_clusters_job_repo", "clusters", ["upload_job_id", "repo"], unique=False)
+    op.create_index(
+        "ix_clusters_job_dependency", "clusters", ["upload_job_id", "dependency"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_clusters_job_dependency", table_name="clusters")
+    op.drop_index("ix_clusters_job_repo", table_name="clusters")
+    op.drop_index("ix_clusters_job_vulnerability_id", table_name="clusters")
+    op.drop_index("ix_clusters_job_cvss", table_name="clusters")
+    op.drop_index("ix_clusters_job_severity", table_name="clusters")
+    op.drop_index("ix_clusters_job_id", table_name="clusters")
+    op.drop_column("clusters", "severity_rank")
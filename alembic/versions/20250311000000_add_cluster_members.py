@@ -0,0 +1,73 @@
+"""Add cluster_members (cluster_id, finding_id) replacing clusters.finding_ids.
+
+Existing memberships are copied from the JSONB arrays; ids of findings that no longer exist
+are dropped.
+
+Revision ID: 20250311000000
+Revises: 20250310000000
+Create Date: 2025-03-11
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "20250311000000"
+down_revision: Union[str, None] = "20250310000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cluster_members",
+        sa.Column("cluster_id", sa.Integer(), nullable=False),
+        sa.Column("finding_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["cluster_id"], ["clusters.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["finding_id"], ["findings.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("cluster_id", "finding_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO cluster_members (cluster_id, finding_id)
+        SELECT DISTINCT c.id, f.id
+        FROM clusters c
+        CROSS JOIN LATERAL jsonb_array_elements_text(c.finding_ids) AS m(finding_id)
+        JOIN findings f
+            ON f.id = CASE WHEN m.finding_id ~ '^[0-9]{1,9}$' THEN m.finding_id::integer END
+        """
+    )
+    op.create_index(
+        "ix_cluster_members_finding",
+        "cluster_members",
+        ["finding_id", "cluster_id"],
+        unique=False,
+    )
+    op.drop_column("clusters", "finding_ids")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "clusters",
+        sa.Column(
+            "finding_ids",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default="[]",
+        ),
+    )
+    op.execute(
+        """
+        UPDATE clusters c SET finding_ids = m.ids
+        FROM (
+            SELECT cluster_id, jsonb_agg(finding_id::text ORDER BY finding_id) AS ids
+            FROM cluster_members GROUP BY cluster_id
+        ) m
+        WHERE m.cluster_id = c.id
+        """
+    )
+    op.alter_column("clusters", "finding_ids", server_default=None)
+    op.drop_index("ix_cluster_members_finding", table_name="cluster_members")
+    op.drop_table("cluster_members")
@@ -0,0 +1,44 @@
+"""Add upload_jobs.updated_at, delta and spool_ref for recovering interrupted background jobs.
+
+updated_at is the worker heartbeat of pending/processing jobs; spool_ref lists a queued
+job's spooled reports and delta its ingest mode, so a job whose worker died can be re-queued.
+
+Revision ID: 20250312000000
+Revises: 20250311000000
+Create Date: 2025-03-12
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20250312000000"
+down_revision: Union[str, None] = "20250311000000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "upload_jobs",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.add_column(
+        "upload_jobs",
+        sa.Column("delta", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.add_column("upload_jobs", sa.Column("spool_ref", sa.Text(), nullable=True))
+    op.create_index("ix_upload_jobs_status_updated_at", "upload_jobs", ["status", "updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_upload_jobs_status_updated_at", table_name="upload_jobs")
+    op.drop_column("upload_jobs", "spool_ref")
+    op.drop_column("upload_jobs", "delta")
+    op.drop_column("upload_jobs", "updated_at")
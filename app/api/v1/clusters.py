@@ -1,27 +1,94 @@
 """Clusters endpoint: return findings grouped by CVE (SCA) or rule + path (SAST)."""
 
+from collections.abc import Iterator
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.v1.auth import get_current_user
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.schemas.auth import CurrentUser
-from app.schemas.findings import ClustersResponse, CompressionMetrics
-from app.services.cluster_persistence import get_or_build_clusters_for_job
-from app.services.job_findings import get_user_upload_job_count, summarize_rules
+from app.schemas.findings import ClustersResponse, CompressionMetrics, SeverityLevel
+from app.services.cluster_persistence import (
+    cluster_totals,
+    get_clusters_etag,
+    materialize_clusters_for_job,
+)
+from app.services.cluster_query import (
+    ClusterFilter,
+    ClusterSort,
+    InvalidCursorError,
+    iter_clusters,
+    query_clusters,
+)
+from app.services.job_findings import get_user_upload_job_count, summarize_job_rules
 
 router = APIRouter()
 
+# Clients may reuse a response only after revalidating it with If-None-Match.
+_CACHE_CONTROL = "private, no-cache"
 
-@router.get("", response_model=ClustersResponse)
+# Upper bound for ?limit.
+MAX_CLUSTERS_PAGE_SIZE = 1000
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison, "*" matches any)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _cluster_filter(
+    severity: Annotated[list[SeverityLevel] | None, Query(description="Repeatable.")] = None,
+    repo: str | None = None,
+    dependency: str | None = None,
+    vulnerability_id_prefix: str | None = None,
+    min_cvss: Annotated[float | None, Query(ge=0, le=10)] = None,
+) -> ClusterFilter:
+    """Filter query parameters shared by the clusters endpoints."""
+    return ClusterFilter(
+        severities=tuple(severity or ()),
+        repo=repo,
+        dependency=dependency,
+        vulnerability_id_prefix=vulnerability_id_prefix,
+        min_cvss=min_cvss,
+    )
+
+
+def _require_job_scope(db: Session, user_id: int, job_id: int | None) -> None:
+    """422 when job_id is omitted but the user has more than one upload job."""
+    if job_id is None and get_user_upload_job_count(db, user_id) > 1:
+        raise HTTPException(
+            status_code=422,
+            detail="Multiple upload jobs exist; specify job_id to scope clusters (e.g. ?job_id=123).",
+        )
+
+
+@router.get(
+    "",
+    response_model=ClustersResponse,
+    responses={304: {"description": "Clusters unchanged since the ETag sent in If-None-Match."}},
+)
 def get_clusters(
+    request: Request,
+    response: Response,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    filters: Annotated[ClusterFilter, Depends(_cluster_filter)],
     job_id: int | None = None,
-) -> ClustersResponse:
+    sort: ClusterSort = "default",
+    limit: Annotated[int | None, Query(ge=1, le=MAX_CLUSTERS_PAGE_SIZE)] = None,
+    cursor: str | None = None,
+    include_finding_ids: bool = True,
+) -> ClustersResponse | Response:
     """
     Return distinct vulnerability clusters plus compression metrics.
 
@@ -30,17 +97,44 @@ def get_clusters(
     upload job, job_id is required; if omitted, returns 422. When the user
     has 0 or 1 job, job_id may be omitted (uses that one job or empty).
     SCA grouped by CVE ID, SAST by rule ID + file path pattern.
+
+    Clusters can be filtered (severity, repo, dependency, vulnerability_id_prefix, min_cvss),
+    sorted (default: build order; severity: worst severity then CVSS first; cvss), paged with
+    limit and the returned next_cursor, and returned without finding_ids
+    (include_finding_ids=false). Metrics cover the whole job.
+
+    Completed jobs are clustered once per findings version and clustering config; the
+    response then carries an ETag, and If-None-Match with that ETag returns 304.
     """
-    if job_id is None and get_user_upload_job_count(db, current_user.id) > 1:
-        raise HTTPException(
-            status_code=422,
-            detail="Multiple upload jobs exist; specify job_id to scope clusters (e.g. ?job_id=123).",
-        )
-    settings = get_settings()
-    clusters, raw_finding_count, findings = get_or_build_clusters_for_job(
-        db, current_user.id, job_id, use_semantic=settings.CLUSTER_USE_SEMANTIC
+    _require_job_scope(db, current_user.id, job_id)
+    use_semantic = get_settings().CLUSTER_USE_SEMANTIC
+    etag = get_clusters_etag(db, current_user.id, job_id, use_semantic=use_semantic)
+    if etag is not None:
+        headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+    upload_job_id = materialize_clusters_for_job(
+        db, current_user.id, job_id, use_semantic=use_semantic
     )
-    cluster_count = len(clusters)
+    if upload_job_id is None:
+        return ClustersResponse(
+            clusters=[],
+            metrics=CompressionMetrics(raw_finding_count=0, cluster_count=0, compression_ratio=0.0),
+        )
+    try:
+        clusters, next_cursor = query_clusters(
+            db,
+            upload_job_id,
+            filters,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+            include_finding_ids=include_finding_ids,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    cluster_count, raw_finding_count = cluster_totals(db, upload_job_id)
     compression_ratio = (
         raw_finding_count / cluster_count if cluster_count else 0.0
     )
@@ -49,9 +143,46 @@ def get_clusters(
         cluster_count=cluster_count,
         compression_ratio=compression_ratio,
     )
-    rule_summary = summarize_rules(findings) if findings else None
+    rule_summary = (
+        summarize_job_rules(db, current_user.id, upload_job_id) if cluster_count else None
+    )
     return ClustersResponse(
         clusters=clusters,
         metrics=metrics,
         rule_summary=rule_summary,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+def stream_clusters(
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    filters: Annotated[ClusterFilter, Depends(_cluster_filter)],
+    job_id: int | None = None,
+    sort: ClusterSort = "default",
+    include_finding_ids: bool = True,
+) -> StreamingResponse:
+    """
+    Stream all matching clusters as NDJSON (one cluster object per line) for exports.
+    Takes the same job_id, filter, sort and include_finding_ids parameters as GET /clusters;
+    rows are read in batches while the response is written.
+    """
+    _require_job_scope(db, current_user.id, job_id)
+    upload_job_id = materialize_clusters_for_job(
+        db, current_user.id, job_id, use_semantic=get_settings().CLUSTER_USE_SEMANTIC
     )
+
+    def lines() -> Iterator[str]:
+        if upload_job_id is None:
+            return
+        for cluster in iter_clusters(
+            upload_job_id, filters, sort=sort, include_finding_ids=include_finding_ids
+        ):
+            yield cluster.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -25,6 +25,7 @@ from app.services.ticket_generator import (
     clusters_to_ticket_payloads,
     enrichment_to_cluster_note,
     resolve_affected_services,
+    resolve_job_affected_services,
 )
 
 logger = logging.getLogger(__name__)
@@ -82,7 +83,7 @@ async def post_jira_export(
     """
     upload_job_id: int | None = None
     if body.use_db:
-        from app.services.job_findings import get_user_upload_job_count
+        from app.services.job_findings import get_user_upload_job_count, resolve_user_job_id
 
         if body.job_id is None and get_user_upload_job_count(db, current_user.id) > 1:
             raise HTTPException(
@@ -91,8 +92,10 @@ async def post_jira_export(
             )
         clusters, upload_job_id = load_clusters_for_job(db, current_user.id, body.job_id)
         if not clusters:
-            clusters, _, findings = get_or_build_clusters_for_job(db, current_user.id, body.job_id)
-            upload_job_id = findings[0].upload_job_id if findings else None
+            clusters, _, _ = get_or_build_clusters_for_job(db, current_user.id, body.job_id)
+            upload_job_id = (
+                resolve_user_job_id(db, current_user.id, body.job_id) if clusters else None
+            )
     else:
         clusters = body.clusters
 
@@ -162,11 +165,14 @@ async def post_jira_export(
                 enrichment_by_key[key],
             )
 
-    for cluster in clusters:
-        if cluster.repo == "multiple":
-            repos = resolve_affected_services(db, cluster.finding_ids)
-            if repos:
-                affected_services_by_id[cluster.vulnerability_id] = repos
+    if body.use_db and upload_job_id is not None:
+        affected_services_by_id.update(resolve_job_affected_services(db, upload_job_id, clusters))
+    else:
+        for cluster in clusters:
+            if cluster.repo == "multiple":
+                repos = resolve_affected_services(db, cluster.finding_ids)
+                if repos:
+                    affected_services_by_id[cluster.vulnerability_id] = repos
 
     tickets = clusters_to_ticket_payloads(
         clusters,
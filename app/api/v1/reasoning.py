@@ -77,7 +77,7 @@ async def post_reasoning(
     if body.use_db:
         clusters, _ = load_clusters_for_job(db, current_user.id, body.job_id)
         if not clusters:
-            clusters, _, findings = get_or_build_clusters_for_job(db, current_user.id, body.job_id)
+            clusters, _, _ = get_or_build_clusters_for_job(db, current_user.id, body.job_id)
         if len(clusters) > body.max_clusters:
             clusters = sort_clusters_by_severity_cvss(clusters)[: body.max_clusters]
             reasoning_limited_note = f"Reasoning limited to top {body.max_clusters} clusters by severity."
@@ -1,27 +1,90 @@
 """Upload endpoint: accept SAST/SCA JSON (body or file), validate, normalize, persist."""
 
+import hashlib
+import io
 import json
-from typing import Annotated
+import tarfile
+import tempfile
+import zipfile
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Annotated, Any, BinaryIO
 
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
-from pydantic import ValidationError
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.api.v1.auth import get_current_user
+from app.core.config import get_settings
 from app.core.database import get_db
 from app.models import Finding, UploadJob
 from app.schemas.auth import CurrentUser
-from app.schemas.findings import RawFinding
-from app.schemas.upload import UploadResponse
-from app.services.normalize import deduplicate_finding_pairs, normalize_finding
+from app.schemas.upload import (
+    UploadAcceptedResponse,
+    UploadChunkResponse,
+    UploadResponse,
+    UploadSessionCreateRequest,
+    UploadSessionFinalizeRequest,
+    UploadSessionResponse,
+)
+from app.services.blob_store import archive_report_files, archive_report_stream
+from app.services.ingest import (
+    FindingPair,
+    IngestValidationError,
+    ReportFile,
+    iter_batch_findings,
+    iter_normalized_findings,
+    iter_report_findings,
+    persist_findings,
+)
+from app.services.ingest_worker import (
+    new_spool_path,
+    submit_batch_ingest_job,
+    submit_ingest_job,
+)
+from app.services.job_findings import job_findings_filter
+from app.services.report_stream import flatten_osv_package, flatten_trivy_result
 from app.services.sarif_parser import sarif_to_rawfindings
-from app.services.scanner_mappers import normalize_shape_to_rawfinding
+from app.services.upload_dedupe import (
+    MAX_IDEMPOTENCY_KEY_LEN,
+    combine_content_hashes,
+    find_job_by_content_hash,
+    find_job_by_idempotency_key,
+)
+from app.services.upload_sessions import (
+    UploadSession,
+    UploadSessionError,
+    UploadSessionNotFoundError,
+    assemble_report,
+    create_session,
+    delete_session,
+    load_session,
+    write_chunk,
+)
 
 router = APIRouter()
 
+# Applies to uncompressed JSON request bodies only; file uploads and compressed bodies are
+# streamed (see UPLOAD_MAX_FILE_BYTES / UPLOAD_MAX_DECOMPRESSED_BYTES).
 MAX_FINDINGS_PER_REQUEST = 10_000
-MAX_UPLOAD_FILE_BYTES = 50 * 1024 * 1024  # 50 MB
 ALLOWED_JSON_EXTENSIONS = frozenset({".json", ".sarif"})
+# Compressed report file suffix -> content coding.
+COMPRESSED_EXTENSIONS: dict[str, str] = {
+    ".json.gz": "gzip",
+    ".sarif.gz": "gzip",
+    ".zst": "zstd",
+}
+# Archive suffixes accepted by POST /upload/batch; report members are ingested, others skipped.
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+# Content-Encoding request header value -> content coding.
+_CONTENT_ENCODINGS: dict[str, str] = {"gzip": "gzip", "x-gzip": "gzip", "zstd": "zstd"}
+_SPOOL_COPY_BYTES = 1024 * 1024
+# Compressed JSON bodies are spooled to disk above this size before streaming decompression.
+_BODY_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
 
 
 def _is_upload_file(obj: object) -> bool:
@@ -65,39 +128,44 @@ def _flatten_osv_scanner_results(data: dict) -> list[dict]:
     for result in data.get("results") or []:
         if not isinstance(result, dict):
             continue
-        source = result.get("source") or {}
         for pkg in result.get("packages") or []:
-            if not isinstance(pkg, dict):
-                continue
-            package = pkg.get("package") or {}
-            for vuln in pkg.get("vulnerabilities") or []:
-                if not isinstance(vuln, dict):
-                    continue
-                flat: dict = {
-                    "id": vuln.get("id"),
-                    "aliases": vuln.get("aliases", []),
-                    "package": package,
-                    "source": source,
-                }
-                if vuln.get("summary") is not None:
-                    flat["summary"] = vuln.get("summary")
-                if vuln.get("details") is not None:
-                    flat["details"] = vuln.get("details")
-                if vuln.get("severity") is not None:
-                    flat["severity"] = vuln.get("severity")
-                if vuln.get("database_specific") is not None:
-                    flat["database_specific"] = vuln.get("database_specific")
-                items.append(flat)
+            items.extend(flatten_osv_package(result.get("source"), pkg))
     return items
 
 
-def _parse_and_validate_findings(data: list | dict) -> list[RawFinding]:
-    """Parse JSON structure into list of RawFinding; accept single object or array."""
+def _is_semgrep_report(data: dict) -> bool:
+    """True if data looks like Semgrep JSON output (top-level 'results' of check_id objects)."""
+    results = data.get("results")
+    if not isinstance(results, list) or not results:
+        return False
+    first = results[0]
+    return isinstance(first, dict) and "check_id" in first
+
+
+def _is_trivy_report(data: dict) -> bool:
+    """True if data looks like Trivy native JSON (top-level 'Results' array)."""
+    return isinstance(data.get("Results"), list)
+
+
+def _flatten_trivy_results(data: dict) -> list[dict]:
+    """Flatten Trivy { Results: [ { Target, Vulnerabilities[] } ] } to one dict per vulnerability."""
+    items: list[dict] = []
+    for result in data.get("Results") or []:
+        items.extend(flatten_trivy_result(result))
+    return items
+
+
+def _parse_and_validate_findings(data: list | dict) -> list[FindingPair]:
+    """Parse JSON structure into validated (raw, normalized) pairs; accept single object or array."""
     if isinstance(data, dict):
         if _is_sarif_root(data):
-            items = sarif_to_rawfindings(data)
+            items = list(sarif_to_rawfindings(data))
         elif _is_osv_scanner_wrapper(data):
             items = _flatten_osv_scanner_results(data)
+        elif _is_semgrep_report(data):
+            items = [r for r in data["results"] if isinstance(r, dict)]
+        elif _is_trivy_report(data):
+            items = _flatten_trivy_results(data)
         else:
             items = [data]
     elif isinstance(data, list):
@@ -112,129 +180,769 @@ def _parse_and_validate_findings(data: list | dict) -> list[RawFinding]:
             status_code=422,
             detail=f"At most {MAX_FINDINGS_PER_REQUEST} findings per request.",
         )
-    findings: list[RawFinding] = []
-    for i, raw_item in enumerate(items):
-        if not isinstance(raw_item, dict):
-            raise HTTPException(
-                status_code=422,
-                detail=f"Finding at index {i} must be an object.",
-            )
-        try:
-            shaped = normalize_shape_to_rawfinding(raw_item)
-            findings.append(RawFinding.model_validate(shaped))
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=e.errors()) from e
-    return findings
+    try:
+        return list(iter_normalized_findings(items))
+    except IngestValidationError as e:
+        raise HTTPException(status_code=422, detail=e.detail) from e
 
 
-async def _get_findings_from_request(request: Request) -> list[RawFinding]:
-    """Read request body or uploaded file and return validated list of RawFinding."""
-    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
-    if content_type == "application/json":
-        try:
-            body = await request.json()
-        except json.JSONDecodeError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid JSON: {e!s}") from e
-        return _parse_and_validate_findings(body)
-    if content_type == "multipart/form-data":
-        form = await request.form()
-        file = form.get("file")
-        if file is None or not _is_upload_file(file):
-            file = next(
-                (v for v in form.values() if _is_upload_file(v)),
-                None,
-            )
-        if file is None or not _is_upload_file(file):
-            raise HTTPException(
-                status_code=422,
-                detail="Multipart request must include a 'file' field with a JSON or SARIF file.",
-            )
-        filename = getattr(file, "filename", None) or ""
-        if not filename.lower().endswith((".json", ".sarif")):
-            raise HTTPException(
-                status_code=422,
-                detail="Uploaded file must have a .json or .sarif extension.",
-            )
-        content = await file.read()
-        if len(content) > MAX_UPLOAD_FILE_BYTES:
-            raise HTTPException(
-                status_code=422,
-                detail=f"File size must not exceed {MAX_UPLOAD_FILE_BYTES // (1024*1024)} MB.",
-            )
-        try:
-            data = json.loads(content.decode("utf-8"))
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            raise HTTPException(
-                status_code=422, detail=f"Invalid JSON in file: {e!s}"
-            ) from e
-        return _parse_and_validate_findings(data)
-    raise HTTPException(
+def _is_report_filename(filename: str) -> bool:
+    """True if filename has a report extension (.json, .sarif or a compressed variant)."""
+    return filename.lower().endswith(tuple(ALLOWED_JSON_EXTENSIONS | COMPRESSED_EXTENSIONS.keys()))
+
+
+async def _get_upload_file(request: Request) -> Any:
+    """Return the uploaded report file from a multipart form (field 'file' or first file)."""
+    form = await request.form()
+    file = form.get("file")
+    if file is None or not _is_upload_file(file):
+        file = next(
+            (v for v in form.values() if _is_upload_file(v)),
+            None,
+        )
+    if file is None or not _is_upload_file(file):
+        raise HTTPException(
+            status_code=422,
+            detail="Multipart request must include a 'file' field with a JSON or SARIF file.",
+        )
+    if not _is_report_filename(getattr(file, "filename", None) or ""):
+        raise HTTPException(
+            status_code=422,
+            detail="Uploaded file must have a .json, .sarif, .json.gz, .sarif.gz or .zst extension.",
+        )
+    return file
+
+
+def _upload_file_encoding(file: Any) -> str | None:
+    """Content coding implied by the uploaded file name ('gzip', 'zstd' or None)."""
+    return _filename_encoding(getattr(file, "filename", None) or "")
+
+
+def _filename_encoding(filename: str) -> str | None:
+    """Content coding implied by a report file name ('gzip', 'zstd' or None)."""
+    filename = filename.lower()
+    for suffix, encoding in COMPRESSED_EXTENSIONS.items():
+        if filename.endswith(suffix):
+            return encoding
+    return None
+
+
+def _request_body_encoding(request: Request) -> str | None:
+    """Content coding of the request body from Content-Encoding ('gzip', 'zstd' or None)."""
+    value = (request.headers.get("content-encoding") or "").strip().lower()
+    if not value or value == "identity":
+        return None
+    encoding = _CONTENT_ENCODINGS.get(value)
+    if encoding is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Content-Encoding must be gzip, zstd or identity.",
+        )
+    return encoding
+
+
+def _request_content_type(request: Request) -> str:
+    """Media type of the request without parameters, lowercased."""
+    return (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+
+
+def _unsupported_content_type() -> HTTPException:
+    return HTTPException(
         status_code=415,
         detail="Content-Type must be application/json or multipart/form-data.",
     )
 
 
+@dataclass
+class _ReceivedReport:
+    """A report from the JSON body or an uploaded file: hashed as received, not yet parsed."""
+
+    content_hash: str
+    body: bytes | None = None  # uncompressed JSON body
+    fp: BinaryIO | None = None  # uploaded file or spooled compressed body
+    encoding: str | None = None
+
+    def findings(self) -> Iterable[FindingPair]:
+        """
+        Validated, normalized findings. JSON bodies are parsed whole (bounded by
+        MAX_FINDINGS_PER_REQUEST); uploaded files and compressed bodies are streamed: the
+        returned iterator decompresses, parses and validates lazily as it is consumed.
+        """
+        if self.body is not None:
+            try:
+                data = json.loads(self.body)
+            except json.JSONDecodeError as e:
+                raise HTTPException(status_code=422, detail=f"Invalid JSON: {e!s}") from e
+            return _parse_and_validate_findings(data)
+        return iter_report_findings(self.fp, encoding=self.encoding)
+
+    def archive(self) -> str | None:
+        """Store the report as received in the blob store (RAW_BLOB_DIR); returns its ref."""
+        if self.body is not None:
+            return archive_report_stream(io.BytesIO(self.body), None)
+        self.fp.seek(0)
+        return archive_report_stream(self.fp, self.encoding)
+
+    def close(self) -> None:
+        if self.fp is not None:
+            self.fp.close()
+
+
+def _hash_file(fp: BinaryIO) -> str:
+    """SHA-256 of a seekable file's contents; leaves the file positioned at the start."""
+    hasher = hashlib.sha256()
+    while chunk := fp.read(_SPOOL_COPY_BYTES):
+        hasher.update(chunk)
+    fp.seek(0)
+    return hasher.hexdigest()
+
+
+async def _receive_report(request: Request) -> _ReceivedReport:
+    """Read the report from the request body or uploaded file and hash it (bytes as received)."""
+    content_type = _request_content_type(request)
+    if content_type == "application/json":
+        encoding = _request_body_encoding(request)
+        if encoding is not None:
+            spool = tempfile.SpooledTemporaryFile(max_size=_BODY_SPOOL_MEMORY_BYTES)
+            hasher = hashlib.sha256()
+            try:
+                await _copy_report(request, None, spool, hasher)
+            except BaseException:
+                spool.close()
+                raise
+            spool.seek(0)
+            return _ReceivedReport(hasher.hexdigest(), fp=spool, encoding=encoding)
+        body = await request.body()
+        return _ReceivedReport(hashlib.sha256(body).hexdigest(), body=body)
+    if content_type == "multipart/form-data":
+        file = await _get_upload_file(request)
+        # Starlette spools the multipart part to a temporary file; hash it, then read it incrementally.
+        return _ReceivedReport(
+            await run_in_threadpool(_hash_file, file.file),
+            fp=file.file,
+            encoding=_upload_file_encoding(file),
+        )
+    raise _unsupported_content_type()
+
+
 def _upload_source_from_content_type(request: Request) -> str:
     """Return 'file' for multipart/form-data, 'api' for JSON."""
-    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
-    return "file" if content_type == "multipart/form-data" else "api"
+    return "file" if _request_content_type(request) == "multipart/form-data" else "api"
+
+
+def _file_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail=f"File size must not exceed {max_bytes // (1024*1024)} MB.",
+    )
+
+
+def _copy_file(src: BinaryIO, out: BinaryIO, hasher: Any = None) -> None:
+    """
+    Copy a report file to out in blocks, enforcing UPLOAD_MAX_FILE_BYTES while copying.
+    hasher (hashlib object), if given, is updated with the copied bytes.
+    """
+    max_bytes = get_settings().UPLOAD_MAX_FILE_BYTES
+    written = 0
+    while chunk := src.read(_SPOOL_COPY_BYTES):
+        written += len(chunk)
+        if max_bytes and written > max_bytes:
+            raise _file_too_large(max_bytes)
+        if hasher is not None:
+            hasher.update(chunk)
+        out.write(chunk)
+
+
+async def _copy_report(request: Request, file: Any, out: BinaryIO, hasher: Any = None) -> None:
+    """
+    Copy the raw report bytes (uploaded file, else request body) to out as received,
+    enforcing UPLOAD_MAX_FILE_BYTES while copying and updating hasher if given.
+    """
+    if file is not None:
+        await run_in_threadpool(_copy_file, file.file, out, hasher)
+        return
+    max_bytes = get_settings().UPLOAD_MAX_FILE_BYTES
+    written = 0
+    async for chunk in request.stream():
+        written += len(chunk)
+        if max_bytes and written > max_bytes:
+            raise _file_too_large(max_bytes)
+        if hasher is not None:
+            hasher.update(chunk)
+        out.write(chunk)
+
+
+async def _spool_request_report(request: Request) -> tuple[Path, str | None, str]:
+    """
+    Copy the raw report (JSON body or uploaded file) to the ingest spool directory as
+    received (compressed reports stay compressed). Returns the spooled path, its content
+    coding and the SHA-256 of the bytes.
+    """
+    content_type = _request_content_type(request)
+    if content_type not in ("application/json", "multipart/form-data"):
+        raise _unsupported_content_type()
+    if content_type == "multipart/form-data":
+        file = await _get_upload_file(request)
+        encoding = _upload_file_encoding(file)
+    else:
+        file = None
+        encoding = _request_body_encoding(request)
+    path = new_spool_path()
+    hasher = hashlib.sha256()
+    try:
+        with open(path, "wb") as out:
+            await _copy_report(request, file, out, hasher)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path, encoding, hasher.hexdigest()
+
+
+def _idempotency_key(request: Request) -> str | None:
+    """Client Idempotency-Key header (stripped), or None when absent or empty."""
+    key = (request.headers.get("idempotency-key") or "").strip()
+    if not key:
+        return None
+    if len(key) > MAX_IDEMPOTENCY_KEY_LEN:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Idempotency-Key must be at most {MAX_IDEMPOTENCY_KEY_LEN} characters.",
+        )
+    return key
+
+
+def _accepted_response(upload_job: UploadJob, *, duplicate: bool = False) -> JSONResponse:
+    """Job status response with status_url: 202 while pending/processing, else 200."""
+    status_url = f"{get_settings().API_V1_PREFIX}/upload-jobs/{upload_job.id}"
+    body = UploadAcceptedResponse(
+        upload_job_id=upload_job.id,
+        status=upload_job.status,
+        status_url=status_url,
+        duplicate=duplicate,
+    )
+    return JSONResponse(
+        status_code=202 if upload_job.status in ("pending", "processing") else 200,
+        content=body.model_dump(),
+        headers={"Location": status_url},
+    )
+
+
+def _existing_job_response(db: Session, upload_job: UploadJob, *, background: bool) -> JSONResponse:
+    """
+    Response for an upload matched to an earlier job (same content or Idempotency-Key):
+    its findings (200) for a completed job on a synchronous upload, else its status.
+    """
+    if background or upload_job.status != "completed":
+        return _accepted_response(upload_job, duplicate=True)
+    ids = [
+        row[0]
+        for row in db.query(Finding.id)
+        .filter(job_findings_filter(upload_job.id))
+        .order_by(Finding.id)
+        .all()
+    ]
+    body = UploadResponse(accepted=len(ids), ids=ids, upload_job_id=upload_job.id, duplicate=True)
+    return JSONResponse(status_code=200, content=body.model_dump())
+
+
+def _create_job(db: Session, upload_job: UploadJob, *, commit: bool) -> UploadJob | None:
+    """
+    Add upload_job and flush (commit for background jobs). Returns None on success, or the
+    job a concurrent request created first with the same Idempotency-Key.
+    """
+    db.add(upload_job)
+    try:
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+    except IntegrityError:
+        db.rollback()
+        if upload_job.idempotency_key is None:
+            raise
+        existing = find_job_by_idempotency_key(db, upload_job.user_id, upload_job.idempotency_key)
+        if existing is None:
+            raise
+        return existing
+    return None
+
+
+def _persist_upload(
+    db: Session,
+    upload_job: UploadJob,
+    finding_pairs: Iterable[FindingPair],
+    archive: Callable[[], str | None],
+) -> UploadResponse | JSONResponse:
+    """
+    Create upload_job, persist its findings and commit; then archive the report (archive()
+    returns the blob ref) and record the ref in a second commit, so compressing the report
+    does not keep the transaction and the new rows' locks open. Blocks for as long as the
+    report takes to ingest: handlers call it through run_in_threadpool.
+    """
+    existing = _create_job(db, upload_job, commit=False)
+    if existing is not None:
+        return _existing_job_response(db, existing, background=False)
+    try:
+        ids = persist_findings(db, upload_job, finding_pairs, delta=upload_job.delta)
+    except IngestValidationError as e:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=e.detail) from e
+    upload_job.status = "completed"
+    db.commit()
+    raw_blob_ref = archive()
+    if raw_blob_ref is not None:
+        upload_job.raw_blob_ref = raw_blob_ref
+        db.commit()
+    return UploadResponse(accepted=len(ids), ids=ids, upload_job_id=upload_job.id)
+
+
+def _ingest_received_report(
+    db: Session,
+    upload_job: UploadJob,
+    received: _ReceivedReport,
+) -> UploadResponse | JSONResponse:
+    """Synchronous part of POST /upload: duplicate check, parse, persist and archive."""
+    existing = find_job_by_content_hash(
+        db, upload_job.user_id, upload_job.content_hash, upload_job.delta
+    )
+    if existing is not None:
+        return _existing_job_response(db, existing, background=False)
+    return _persist_upload(db, upload_job, received.findings(), received.archive)
+
+
+async def _accept_background_upload(
+    request: Request,
+    db: Session,
+    current_user: CurrentUser,
+    idempotency_key: str | None,
+    delta: bool,
+) -> JSONResponse:
+    """Spool the report, create a pending job, queue it for the worker pool, return 202."""
+    report_path, encoding, content_hash = await _spool_request_report(request)
+    try:
+        existing = find_job_by_content_hash(db, current_user.id, content_hash, delta)
+        if existing is None:
+            upload_job = UploadJob(
+                user_id=current_user.id,
+                status="pending",
+                source=_upload_source_from_content_type(request),
+                content_hash=content_hash,
+                idempotency_key=idempotency_key,
+                delta=delta,
+            )
+            existing = _create_job(db, upload_job, commit=True)
+    except BaseException:
+        report_path.unlink(missing_ok=True)
+        raise
+    if existing is not None:
+        report_path.unlink(missing_ok=True)
+        return _existing_job_response(db, existing, background=True)
+    submit_ingest_job(upload_job.id, str(report_path), encoding, delta)
+    return _accepted_response(upload_job)
+
 
+_UPLOAD_RESPONSES: dict = {
+    200: {
+        "model": UploadResponse,
+        "description": "Identical report or repeated Idempotency-Key: the existing job is returned.",
+    },
+    202: {"model": UploadAcceptedResponse, "description": "Queued for background ingest."},
+}
 
-@router.post("", response_model=UploadResponse, status_code=201)
+
+@router.post(
+    "",
+    response_model=UploadResponse,
+    status_code=201,
+    responses=_UPLOAD_RESPONSES,
+)
 async def upload_findings(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-) -> UploadResponse:
+    background: bool = False,
+    delta: bool = False,
+) -> UploadResponse | JSONResponse:
     """
     Accept SAST/SCA findings as JSON and persist them. Requires authentication.
 
     - **JSON body**: Send `Content-Type: application/json` with either a single
-      finding object or an array of finding objects.
+      finding object or an array of finding objects. Bodies may be compressed
+      with `Content-Encoding: gzip` (or `zstd`).
     - **File upload**: Send `Content-Type: multipart/form-data` with a field
-      named `file` containing a `.json` file with the same structure.
+      named `file` containing a `.json` or `.sarif` file with the same structure
+      (or a SARIF, OSV-Scanner, Trivy or Semgrep report). `.json.gz`, `.sarif.gz` and
+      `.zst` files are decompressed on the fly. Files are parsed incrementally and
+      persisted in chunks, so memory use does not grow with report size.
 
     Findings are validated with the raw finding schema, normalized, and stored
     in the database. Each upload creates an upload job; response includes
-    upload_job_id for job-scoped clusters, reasoning, and export.
+    upload_job_id for job-scoped clusters, reasoning, and export. A validation
+    error anywhere in the report rolls back the whole upload.
+
+    Uploads are idempotent: the report bytes are hashed as they are received, and a
+    report identical to one of the user's pending, processing or completed jobs returns
+    that job (`duplicate: true`, **200** with its findings, or its status while it is
+    still running) without ingesting again. With an `Idempotency-Key` header, a repeated
+    key returns the job created with it before the body is read.
+
+    With `?delta=true` (for repeated scans of the same repos) only findings that are new
+    since the previous completed job covering each repo are stored; unchanged ones are
+    referenced from that job and ones no longer reported are marked resolved. The job
+    still returns all of its findings for clusters, reasoning and export; `ids` includes
+    the referenced findings.
+
+    With `?background=true` the raw report is stored and the endpoint returns
+    **202** immediately with `upload_job_id` and a `status_url`; a worker pool
+    runs the pipeline and GET /upload-jobs/{id} reports status and progress.
     """
-    raw_list = await _get_findings_from_request(request)
-    source = _upload_source_from_content_type(request)
+    idempotency_key = _idempotency_key(request)
+    if idempotency_key is not None:
+        existing = find_job_by_idempotency_key(db, current_user.id, idempotency_key)
+        if existing is not None:
+            return _existing_job_response(db, existing, background=background)
+    if background:
+        return await _accept_background_upload(request, db, current_user, idempotency_key, delta)
 
+    received = await _receive_report(request)
     upload_job = UploadJob(
         user_id=current_user.id,
         status="processing",
-        source=source,
+        source=_upload_source_from_content_type(request),
+        content_hash=received.content_hash,
+        idempotency_key=idempotency_key,
+        delta=delta,
     )
-    db.add(upload_job)
-    db.flush()
+    try:
+        return await run_in_threadpool(_ingest_received_report, db, upload_job, received)
+    finally:
+        received.close()
 
-    if not raw_list:
-        upload_job.status = "completed"
-        db.commit()
-        return UploadResponse(accepted=0, ids=[], upload_job_id=upload_job.id)
 
-    pairs = [(raw, normalize_finding(raw)) for raw in raw_list]
-    deduped = deduplicate_finding_pairs(pairs)
+def _spool_report_file(
+    src: BinaryIO,
+    name: str,
+    reports: list[ReportFile],
+    content_hashes: list[str],
+) -> None:
+    """
+    Copy one report to the spool directory, appending it to reports and its SHA-256 to
+    content_hashes (bounded by UPLOAD_BATCH_MAX_FILES).
+    """
+    max_files = get_settings().UPLOAD_BATCH_MAX_FILES
+    if len(reports) >= max_files:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {max_files} report files per batch upload.",
+        )
+    path = new_spool_path()
+    # Register before copying so a failed copy is cleaned up with the rest of the batch.
+    reports.append(ReportFile(name=name, path=str(path), encoding=_filename_encoding(name)))
+    hasher = hashlib.sha256()
+    with open(path, "wb") as out:
+        _copy_file(src, out, hasher)
+    content_hashes.append(hasher.hexdigest())
+
+
+def _spool_archive(file: Any, reports: list[ReportFile], content_hashes: list[str]) -> None:
+    """Spool the report members (.json, .sarif, compressed variants) of a zip or tar archive."""
+    filename = (getattr(file, "filename", None) or "").lower()
+    try:
+        if filename.endswith(".zip"):
+            with zipfile.ZipFile(file.file) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and _is_report_filename(info.filename):
+                        with archive.open(info) as member:
+                            _spool_report_file(member, info.filename, reports, content_hashes)
+        else:
+            with tarfile.open(fileobj=file.file, mode="r:*") as archive:
+                for info in archive:
+                    if info.isfile() and _is_report_filename(info.name):
+                        member = archive.extractfile(info)
+                        if member is not None:
+                            with member:
+                                _spool_report_file(member, info.name, reports, content_hashes)
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid archive {file.filename}: {e!s}") from e
+
+
+async def _spool_batch_reports(request: Request) -> tuple[list[ReportFile], str]:
+    """
+    Spool every report of a multipart batch upload: all file parts (any field name) with a
+    report extension, plus the report members of .zip/.tar/.tar.gz/.tgz archives.
+    Returns the reports and the batch content hash (independent of report order).
+    """
+    if _request_content_type(request) != "multipart/form-data":
+        raise HTTPException(status_code=415, detail="Content-Type must be multipart/form-data.")
+    form = await request.form()
+    files = [value for _, value in form.multi_items() if _is_upload_file(value)]
+    return await run_in_threadpool(_spool_batch_files, files)
+
+
+def _spool_batch_files(files: list[Any]) -> tuple[list[ReportFile], str]:
+    """Blocking part of _spool_batch_reports: copy the parts and archive members to the spool."""
+    reports: list[ReportFile] = []
+    content_hashes: list[str] = []
+    try:
+        for file in files:
+            filename = getattr(file, "filename", None) or ""
+            if filename.lower().endswith(ARCHIVE_EXTENSIONS):
+                _spool_archive(file, reports, content_hashes)
+            elif _is_report_filename(filename):
+                _spool_report_file(file.file, filename, reports, content_hashes)
+            else:
+                raise HTTPException(
+                    status_code=422,
+                    detail=(
+                        f"{filename}: batch files must be .json, .sarif, .json.gz, .sarif.gz, .zst "
+                        "or a .zip/.tar/.tar.gz/.tgz archive of them."
+                    ),
+                )
+        if not reports:
+            raise HTTPException(
+                status_code=422,
+                detail="Batch upload must include at least one report file.",
+            )
+    except BaseException:
+        _remove_spooled(reports)
+        raise
+    return reports, combine_content_hashes(content_hashes)
+
+
+def _remove_spooled(reports: list[ReportFile]) -> None:
+    for report in reports:
+        Path(report.path).unlink(missing_ok=True)
+
+
+@router.post(
+    "/batch",
+    response_model=UploadResponse,
+    status_code=201,
+    responses=_UPLOAD_RESPONSES,
+)
+async def upload_findings_batch(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    background: bool = False,
+    delta: bool = False,
+) -> UploadResponse | JSONResponse:
+    """
+    Accept several scanner reports in one request and persist them under one upload job,
+    so findings from different scanners are clustered together. Requires authentication.
+
+    Send `Content-Type: multipart/form-data` with any number of file parts (`.json`,
+    `.sarif`, `.json.gz`, `.sarif.gz`, `.zst`) and/or `.zip`, `.tar`, `.tar.gz` or `.tgz`
+    archives of such files; other archive members are ignored. Each report's format
+    (SARIF, OSV-Scanner, Trivy, Semgrep, finding array) is detected separately, and reports
+    are parsed and normalized in parallel. At most `UPLOAD_BATCH_MAX_FILES` reports per
+    request; a validation error in any report (named in the error) rolls back the batch.
+
+    Idempotent like POST /upload: the same set of reports (in any order) or a repeated
+    `Idempotency-Key` returns the existing job. `?delta=true` and `?background=true` work
+    as for POST /upload.
+    """
+    idempotency_key = _idempotency_key(request)
+    if idempotency_key is not None:
+        existing = find_job_by_idempotency_key(db, current_user.id, idempotency_key)
+        if existing is not None:
+            return _existing_job_response(db, existing, background=background)
 
-    ids: list[int] = []
-    for raw, normalized in deduped:
-        row = Finding(
-            upload_job_id=upload_job.id,
+    reports, content_hash = await _spool_batch_reports(request)
+    try:
+        existing = find_job_by_content_hash(db, current_user.id, content_hash, delta)
+        if existing is not None:
+            return _existing_job_response(db, existing, background=background)
+        upload_job = UploadJob(
             user_id=current_user.id,
-            vulnerability_id=normalized.vulnerability_id,
-            severity=normalized.severity,
-            repo=normalized.repo,
-            file_path=normalized.file_path,
-            dependency=normalized.dependency,
-            cvss_score=normalized.cvss_score,
-            description=normalized.description,
-            scanner_source=raw.scanner_source,
-            raw_payload=raw.raw_payload,
+            status="pending" if background else "processing",
+            source="batch",
+            content_hash=content_hash,
+            idempotency_key=idempotency_key,
+            delta=delta,
         )
-        db.add(row)
-        db.flush()
-        ids.append(row.id)
-    upload_job.status = "completed"
-    db.commit()
-    return UploadResponse(accepted=len(ids), ids=ids, upload_job_id=upload_job.id)
+        if background:
+            existing = _create_job(db, upload_job, commit=True)
+            if existing is not None:
+                return _existing_job_response(db, existing, background=True)
+            submit_batch_ingest_job(upload_job.id, reports, delta)
+            # The worker owns (and removes) the spooled files from here on.
+            reports = []
+            return _accepted_response(upload_job)
+
+        return await run_in_threadpool(
+            _persist_upload,
+            db,
+            upload_job,
+            iter_batch_findings(reports),
+            lambda: archive_report_files(reports),
+        )
+    finally:
+        _remove_spooled(reports)
+
+
+def _session_response(session: UploadSession) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        session_id=session.id,
+        filename=session.filename,
+        total_size=session.total_size,
+        chunk_size=session.chunk_size,
+        chunk_count=session.chunk_count,
+        missing_chunks=session.missing_chunks(),
+        expires_at=datetime.fromtimestamp(session.expires_at, tz=timezone.utc),
+    )
+
+
+def _load_user_session(session_id: str, current_user: CurrentUser) -> UploadSession:
+    try:
+        return load_session(session_id, current_user.id)
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Upload session not found.") from e
+
+
+@router.post("/sessions", response_model=UploadSessionResponse, status_code=201)
+def create_upload_session(
+    body: UploadSessionCreateRequest,
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> UploadSessionResponse:
+    """
+    Start a resumable upload for a large report. Requires authentication.
+
+    Declare the file name, total size and chunk size; then PUT each chunk to
+    `/upload/sessions/{session_id}/chunks/{index}` (in any order, retrying failed ones) and
+    POST `/upload/sessions/{session_id}/finalize`. Sessions expire after
+    `UPLOAD_SESSION_TTL_HOURS`.
+    """
+    if not _is_report_filename(body.filename):
+        raise HTTPException(
+            status_code=422,
+            detail="filename must have a .json, .sarif, .json.gz, .sarif.gz or .zst extension.",
+        )
+    try:
+        session = create_session(current_user.id, body.filename, body.total_size, body.chunk_size)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=422, detail=e.detail) from e
+    return _session_response(session)
+
+
+@router.get("/sessions/{session_id}", response_model=UploadSessionResponse)
+def get_upload_session(
+    session_id: str,
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> UploadSessionResponse:
+    """Return session state; `missing_chunks` lists the chunks still to (re)send."""
+    return _session_response(_load_user_session(session_id, current_user))
+
+
+@router.put("/sessions/{session_id}/chunks/{index}", response_model=UploadChunkResponse)
+async def put_upload_chunk(
+    session_id: str,
+    index: int,
+    request: Request,
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> UploadChunkResponse:
+    """
+    Store chunk `index` (raw bytes as the request body). The `X-Content-SHA256` header
+    (hex SHA-256 of the chunk) is required; a chunk with the wrong size or checksum is
+    rejected with 422 and stays missing, so only that chunk needs to be resent.
+    """
+    session = _load_user_session(session_id, current_user)
+    expected_sha256 = request.headers.get("x-content-sha256")
+    if not expected_sha256:
+        raise HTTPException(status_code=422, detail="X-Content-SHA256 header is required.")
+    try:
+        expected_size = session.expected_chunk_size(index)
+        data = bytearray()
+        async for part in request.stream():
+            data += part
+            if len(data) > expected_size:
+                raise UploadSessionError(
+                    f"Chunk {index} must be {expected_size} bytes; received more."
+                )
+        info = write_chunk(session, index, bytes(data), expected_sha256)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=422, detail=e.detail) from e
+    return UploadChunkResponse(index=index, size=info["size"], sha256=info["sha256"])
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+def delete_upload_session(
+    session_id: str,
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> None:
+    """Abort a session and discard its chunks."""
+    delete_session(_load_user_session(session_id, current_user))
+
+
+@router.post(
+    "/sessions/{session_id}/finalize",
+    response_model=UploadResponse,
+    status_code=201,
+    responses=_UPLOAD_RESPONSES,
+)
+def finalize_upload_session(
+    session_id: str,
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    body: UploadSessionFinalizeRequest | None = None,
+    background: bool = False,
+    delta: bool = False,
+) -> UploadResponse | JSONResponse:
+    """
+    Ingest the assembled report once every chunk is received (422 lists missing chunks).
+    The report goes through the same streaming pipeline as POST /upload, including
+    idempotency (content hash and `Idempotency-Key`), `?delta=true` and
+    `?background=true`. An optional `sha256` in the body is checked against the whole report.
+    The session is removed once the report is ingested or rejected as invalid.
+    """
+    idempotency_key = _idempotency_key(request)
+    if idempotency_key is not None:
+        existing = find_job_by_idempotency_key(db, current_user.id, idempotency_key)
+        if existing is not None:
+            return _existing_job_response(db, existing, background=background)
+    session = _load_user_session(session_id, current_user)
+    try:
+        content_hash = assemble_report(session, body.sha256 if body is not None else None)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=422, detail=e.detail) from e
+
+    existing = find_job_by_content_hash(db, current_user.id, content_hash, delta)
+    if existing is not None:
+        delete_session(session)
+        return _existing_job_response(db, existing, background=background)
+    encoding = _filename_encoding(session.filename)
+    upload_job = UploadJob(
+        user_id=current_user.id,
+        status="pending" if background else "processing",
+        source="file",
+        content_hash=content_hash,
+        idempotency_key=idempotency_key,
+        delta=delta,
+    )
+    if background:
+        existing = _create_job(db, upload_job, commit=True)
+        if existing is not None:
+            delete_session(session)
+            return _existing_job_response(db, existing, background=True)
+        # Sessions live under the spool directory, so this is a rename, not a copy.
+        report_path = new_spool_path()
+        session.report_path.replace(report_path)
+        delete_session(session)
+        submit_ingest_job(upload_job.id, str(report_path), encoding, delta)
+        return _accepted_response(upload_job)
+
+    report = ReportFile(session.filename, str(session.report_path), encoding)
+    try:
+        with open(session.report_path, "rb") as fp:
+            response = _persist_upload(
+                db,
+                upload_job,
+                iter_report_findings(fp, encoding=encoding),
+                lambda: archive_report_files([report]),
+            )
+    except HTTPException:
+        delete_session(session)
+        raise
+    delete_session(session)
+    return response
@@ -1,16 +1,24 @@
-"""Upload jobs list endpoint: list jobs for the current user."""
+"""Upload jobs endpoints: list jobs for the current user, report per-job ingest status, re-process archived jobs."""
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.api.v1.auth import get_current_user
+from app.api.v1.auth import get_current_user, require_admin
 from app.core.database import get_db
 from app.models import Finding, UploadJob
 from app.schemas.auth import CurrentUser
-from app.schemas.upload_job import UploadJobListItem, UploadJobsListResponse
+from app.schemas.upload_job import (
+    UploadJobListItem,
+    UploadJobReprocessRequest,
+    UploadJobReprocessResponse,
+    UploadJobsListResponse,
+    UploadJobStatusResponse,
+)
+from app.services.ingest_worker import submit_reprocess_job
+from app.services.reprocess import find_reprocess_jobs
 
 router = APIRouter()
 
@@ -44,8 +52,63 @@ def list_upload_jobs(
             created_at=j.created_at,
             status=j.status,
             source=j.source,
-            finding_count=count_map.get(j.id, 0),
+            # Delta jobs also include the unchanged findings they reference.
+            finding_count=count_map.get(j.id, 0) + (j.unchanged_count or 0),
         )
         for j in upload_jobs
     ]
     return UploadJobsListResponse(jobs=items)
+
+
+@router.get("/{job_id}", response_model=UploadJobStatusResponse)
+def get_upload_job_status(
+    job_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> UploadJobStatusResponse:
+    """
+    Return status and ingest progress for one of the current user's upload jobs.
+
+    Poll this after POST /upload?background=true: processed_count and accepted_count
+    grow as chunks are persisted; error is set when status is failed.
+    """
+    job = (
+        db.query(UploadJob)
+        .filter(UploadJob.id == job_id, UploadJob.user_id == current_user.id)
+        .first()
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found.")
+    return UploadJobStatusResponse(
+        id=job.id,
+        created_at=job.created_at,
+        status=job.status,
+        source=job.source,
+        processed_count=job.processed_count or 0,
+        accepted_count=job.accepted_count or 0,
+        unchanged_count=job.unchanged_count or 0,
+        resolved_count=job.resolved_count or 0,
+        error=job.error_detail,
+    )
+
+
+@router.post("/reprocess", response_model=UploadJobReprocessResponse, status_code=202)
+def reprocess_upload_jobs(
+    body: UploadJobReprocessRequest,
+    db: Annotated[Session, Depends(get_db)],
+    _admin: Annotated[CurrentUser, Depends(require_admin)],
+) -> UploadJobReprocessResponse:
+    """
+    Re-run the current ingest and clustering pipeline on archived reports (admin only).
+
+    Selects completed or failed jobs with a stored report (RAW_BLOB_DIR) by `job_ids` and/or
+    creation time (`since` inclusive, `until` exclusive) and queues them on the ingest worker
+    pool. Each job's findings and clusters are replaced atomically when its run finishes;
+    unchanged findings keep their ids. Also available as `python -m app.reprocess`.
+    """
+    if body.job_ids is None and body.since is None and body.until is None:
+        raise HTTPException(status_code=422, detail="Specify job_ids, since or until.")
+    job_ids = find_reprocess_jobs(db, job_ids=body.job_ids, since=body.since, until=body.until)
+    for job_id in job_ids:
+        submit_reprocess_job(job_id)
+    return UploadJobReprocessResponse(job_ids=job_ids)
@@ -0,0 +1,60 @@
+"""
+CLI entrypoint for backfilling findings.signature after the add_finding_signature migration:
+
+  python -m app.backfill_signatures
+  python -m app.backfill_signatures --batch-size 5000
+
+Until a job's findings all have a signature, its Layer A clusters are built in Python.
+"""
+
+import argparse
+import logging
+import sys
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.services.signature_backfill import backfill_signatures
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    datefmt="%Y-%m-%dT%H:%M:%SZ",
+)
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.backfill_signatures",
+        description="Store the Layer A signature of findings that have none.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=get_settings().UPLOAD_INGEST_CHUNK_SIZE,
+        help="Findings updated per transaction (default: UPLOAD_INGEST_CHUNK_SIZE).",
+    )
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Backfill signatures; returns 1 on failure (batches already committed are kept)."""
+    args = _parse_args(argv)
+    db = SessionLocal()
+    try:
+        updated = backfill_signatures(db, args.batch_size)
+        logger.info("Signature backfill completed: findings_updated=%s", updated)
+        return 0
+    except Exception as e:
+        db.rollback()
+        logger.exception("Signature backfill failed: %s", e)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -81,12 +81,47 @@ class Settings(BaseSettings):
     # When AUTH_ENABLED is False, get_current_user resolves this username from the database.
     DEV_USERNAME: str = "dev"
 
-    # Layer B clustering: optional semantic merge via embeddings + Qdrant
+    # Layer B clustering: optional semantic merge via embeddings, searched in-process ("local")
+    # or in Qdrant ("qdrant", needs QDRANT_URL).
     CLUSTER_USE_SEMANTIC: bool = False
+    CLUSTER_SIMILARITY_BACKEND: Literal["local", "qdrant"] = "local"
+    # Local backend: jobs with at least this many findings use an HNSW index (needs hnswlib);
+    # about where it overtakes exact search for 384-dim embeddings (see README).
+    CLUSTER_ANN_MIN_FINDINGS: int = 25000  # 0 disables the index
     QDRANT_URL: str | None = None
     QDRANT_COLLECTION_PREFIX: str = "helion_findings"
     CLUSTER_SIMILARITY_THRESHOLD: float = 0.85
     CLUSTER_TOP_K: int = 10
+    # Embedding model (loaded once per process), texts per encode batch, and an optional
+    # persistent cache of embeddings by text hash shared across jobs (unset disables it).
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_CACHE_DIR: str | None = None
+
+    # Upload ingest: report files are parsed incrementally and persisted in bounded chunks.
+    UPLOAD_MAX_FILE_BYTES: int = 1024 * 1024 * 1024  # 1 GiB; 0 disables the size limit
+    # Compressed uploads (.json.gz, .sarif.gz, .zst, Content-Encoding): limit on decompressed bytes.
+    UPLOAD_MAX_DECOMPRESSED_BYTES: int = 4 * 1024 * 1024 * 1024  # 4 GiB; 0 disables the limit
+    UPLOAD_INGEST_CHUNK_SIZE: int = 1000  # findings normalized and persisted per chunk
+    UPLOAD_BATCH_MAX_FILES: int = 64  # reports per POST /upload/batch (files or archive members)
+    # Resumable upload sessions (POST /upload/sessions): max chunk size, idle session lifetime.
+    UPLOAD_SESSION_MAX_CHUNK_BYTES: int = 32 * 1024 * 1024  # 32 MiB
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    # Stored raw_payload: keep only the fields read after ingest, per scanner, with size caps.
+    RAW_PAYLOAD_PROJECTION: bool = True  # False stores scanner items unchanged
+    RAW_PAYLOAD_MAX_STRING_LEN: int = 2048  # chars per string value; 0 disables the cap
+    RAW_PAYLOAD_MAX_LIST_ITEMS: int = 20  # items per list (references, paths); 0 disables the cap
+    # Background ingest (POST /upload?background=true): spooled reports, worker pool size.
+    INGEST_SPOOL_DIR: str | None = None  # defaults to <system temp dir>/helion-ingest
+    INGEST_WORKER_CONCURRENCY: int = 4
+    # Pending/processing jobs not heartbeated for this long (owner crashed or shut down) are
+    # re-queued or failed, and are no longer reused by identical uploads.
+    INGEST_JOB_STALE_SECONDS: int = 300
+    # Original reports kept for re-processing (UploadJob.raw_blob_ref); unset disables archival.
+    RAW_BLOB_DIR: str | None = None
+    # Parallel normalization: reports with at least this many items are sharded across processes.
+    INGEST_PARALLEL_MIN_ITEMS: int = 5000  # 0 disables the process pool
+    INGEST_PARALLEL_WORKERS: int = 0  # 0 uses one process per CPU
 
     @field_validator("DATABASE_URL")
     @classmethod
@@ -265,6 +300,113 @@ class Settings(BaseSettings):
             raise ValueError("CLUSTER_TOP_K must be between 1 and 100")
         return v
 
+    @field_validator("CLUSTER_ANN_MIN_FINDINGS")
+    @classmethod
+    def validate_cluster_ann_min_findings(cls, v: int) -> int:
+        if v < 0:
+            raise ValueError("CLUSTER_ANN_MIN_FINDINGS must be 0 (exact search only) or a positive count")
+        return v
+
+    @field_validator("EMBEDDING_MODEL")
+    @classmethod
+    def validate_embedding_model(cls, v: str) -> str:
+        if not v or not v.strip():
+            raise ValueError("EMBEDDING_MODEL must be a sentence-transformers model name or path")
+        return v.strip()
+
+    @field_validator("EMBEDDING_BATCH_SIZE")
+    @classmethod
+    def validate_embedding_batch_size(cls, v: int) -> int:
+        if v < 1 or v > 4096:
+            raise ValueError("EMBEDDING_BATCH_SIZE must be between 1 and 4096")
+        return v
+
+    @field_validator("UPLOAD_MAX_FILE_BYTES")
+    @classmethod
+    def validate_upload_max_file_bytes(cls, v: int) -> int:
+        if v < 0:
+            raise ValueError("UPLOAD_MAX_FILE_BYTES must be 0 (no limit) or a positive byte count")
+        return v
+
+    @field_validator("UPLOAD_MAX_DECOMPRESSED_BYTES")
+    @classmethod
+    def validate_upload_max_decompressed_bytes(cls, v: int) -> int:
+        if v < 0:
+            raise ValueError(
+                "UPLOAD_MAX_DECOMPRESSED_BYTES must be 0 (no limit) or a positive byte count"
+            )
+        return v
+
+    @field_validator("UPLOAD_INGEST_CHUNK_SIZE")
+    @classmethod
+    def validate_upload_ingest_chunk_size(cls, v: int) -> int:
+        if v < 1 or v > 100_000:
+            raise ValueError("UPLOAD_INGEST_CHUNK_SIZE must be between 1 and 100000")
+        return v
+
+    @field_validator("UPLOAD_BATCH_MAX_FILES")
+    @classmethod
+    def validate_upload_batch_max_files(cls, v: int) -> int:
+        if v < 1 or v > 1000:
+            raise ValueError("UPLOAD_BATCH_MAX_FILES must be between 1 and 1000")
+        return v
+
+    @field_validator("UPLOAD_SESSION_MAX_CHUNK_BYTES")
+    @classmethod
+    def validate_upload_session_max_chunk_bytes(cls, v: int) -> int:
+        if v < 64 * 1024 or v > 1024 * 1024 * 1024:
+            raise ValueError("UPLOAD_SESSION_MAX_CHUNK_BYTES must be between 64 KiB and 1 GiB")
+        return v
+
+    @field_validator("UPLOAD_SESSION_TTL_HOURS")
+    @classmethod
+    def validate_upload_session_ttl_hours(cls, v: int) -> int:
+        if v < 1 or v > 720:
+            raise ValueError("UPLOAD_SESSION_TTL_HOURS must be between 1 and 720")
+        return v
+
+    @field_validator("RAW_PAYLOAD_MAX_STRING_LEN")
+    @classmethod
+    def validate_raw_payload_max_string_len(cls, v: int) -> int:
+        if v < 0 or v > 1_000_000:
+            raise ValueError("RAW_PAYLOAD_MAX_STRING_LEN must be between 0 (no cap) and 1000000")
+        return v
+
+    @field_validator("RAW_PAYLOAD_MAX_LIST_ITEMS")
+    @classmethod
+    def validate_raw_payload_max_list_items(cls, v: int) -> int:
+        if v < 0 or v > 100_000:
+            raise ValueError("RAW_PAYLOAD_MAX_LIST_ITEMS must be between 0 (no cap) and 100000")
+        return v
+
+    @field_validator("INGEST_WORKER_CONCURRENCY")
+    @classmethod
+    def validate_ingest_worker_concurrency(cls, v: int) -> int:
+        if v < 1 or v > 64:
+            raise ValueError("INGEST_WORKER_CONCURRENCY must be between 1 and 64")
+        return v
+
+    @field_validator("INGEST_JOB_STALE_SECONDS")
+    @classmethod
+    def validate_ingest_job_stale_seconds(cls, v: int) -> int:
+        if v < 10 or v > 86400:
+            raise ValueError("INGEST_JOB_STALE_SECONDS must be between 10 and 86400")
+        return v
+
+    @field_validator("INGEST_PARALLEL_MIN_ITEMS")
+    @classmethod
+    def validate_ingest_parallel_min_items(cls, v: int) -> int:
+        if v < 0:
+            raise ValueError("INGEST_PARALLEL_MIN_ITEMS must be 0 (disabled) or a positive item count")
+        return v
+
+    @field_validator("INGEST_PARALLEL_WORKERS")
+    @classmethod
+    def validate_ingest_parallel_workers(cls, v: int) -> int:
+        if v < 0 or v > 256:
+            raise ValueError("INGEST_PARALLEL_WORKERS must be between 0 (CPU count) and 256")
+        return v
+
 
 @lru_cache
 def get_settings() -> Settings:
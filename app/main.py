@@ -4,17 +4,41 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import router as v1_router
 from app.core.config import settings
+from app.services.embeddings import warm_embedding_model
+from app.services.ingest import shutdown_normalize_pool
+from app.services.ingest_worker import shutdown_ingest_workers, start_ingest_maintenance
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """
+    On startup, start background ingest maintenance (recovery of interrupted jobs, heartbeats)
+    and load the embedding model when semantic clustering is on. On shutdown, drain the
+    background ingest worker pool, then stop normalization processes.
+    """
+    start_ingest_maintenance()
+    if settings.CLUSTER_USE_SEMANTIC:
+        await asyncio.to_thread(warm_embedding_model)
+    yield
+    shutdown_ingest_workers(wait=True)
+    shutdown_normalize_pool(wait=True)
+
 
 app = FastAPI(
     title="Helion API",
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
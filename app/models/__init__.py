@@ -3,7 +3,10 @@
 from app.models.base import Base
 from app.models.cluster import Cluster
 from app.models.cluster_enrichment import ClusterEnrichment
+from app.models.cluster_member import ClusterMember
 from app.models.finding import Finding
+from app.models.finding_rule import FindingRule
+from app.models.job_finding_ref import JobFindingRef
 from app.models.upload_job import UploadJob
 from app.models.user import User
 
@@ -11,7 +14,10 @@ __all__ = [
     "Base",
     "Cluster",
     "ClusterEnrichment",
+    "ClusterMember",
     "Finding",
+    "FindingRule",
+    "JobFindingRef",
     "UploadJob",
     "User",
 ]
@@ -1,7 +1,17 @@
 """ORM model for materialized cluster output per upload job."""
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    func,
+)
 
 from app.models.base import Base
 
@@ -9,7 +19,11 @@ from app.models.base import Base
 class Cluster(Base):
     """
     Materialized cluster row per upload_job. Populated after clustering runs.
-    Enables GET clusters by job without recomputing.
+    Enables GET clusters by job without recomputing. Member findings are in cluster_members.
+
+    severity_rank orders severity (0 = info .. 4 = critical) for SQL sorting. The composite
+    indexes back the clusters API's keyset pagination per sort order (see cluster_query) and
+    its repo, dependency and vulnerability_id prefix filters.
     """
 
     __tablename__ = "clusters"
@@ -28,11 +42,30 @@ class Cluster(Base):
     dependency = Column(String(1024), nullable=False, default="")
     cvss_score = Column(Float, nullable=False)
     description = Column(Text, nullable=False)
-    finding_ids = Column(JSONB, nullable=False)  # list of finding id strings
     affected_services_count = Column(Integer, nullable=False)
     finding_count = Column(Integer, nullable=False)
+    severity_rank = Column(SmallInteger, nullable=False, default=0, server_default="0")
     computed_at = Column(
         DateTime(timezone=True),
         nullable=False,
         server_default=func.now(),
     )
+
+
+Index("ix_clusters_job_id", Cluster.upload_job_id, Cluster.id)
+Index(
+    "ix_clusters_job_severity",
+    Cluster.upload_job_id,
+    Cluster.severity_rank.desc(),
+    Cluster.cvss_score.desc(),
+    Cluster.id,
+)
+Index("ix_clusters_job_cvss", Cluster.upload_job_id, Cluster.cvss_score.desc(), Cluster.id)
+Index(
+    "ix_clusters_job_vulnerability_id",
+    Cluster.upload_job_id,
+    Cluster.vulnerability_id,
+    postgresql_ops={"vulnerability_id": "varchar_pattern_ops"},
+)
+Index("ix_clusters_job_repo", Cluster.upload_job_id, Cluster.repo)
+Index("ix_clusters_job_dependency", Cluster.upload_job_id, Cluster.dependency)
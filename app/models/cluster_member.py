@@ -0,0 +1,30 @@
+"""ORM model for cluster membership: which findings belong to which materialized cluster."""
+
+from sqlalchemy import Column, ForeignKey, Index, Integer
+
+from app.models.base import Base
+
+
+class ClusterMember(Base):
+    """
+    One finding of a materialized cluster (replaces the former clusters.finding_ids array).
+
+    The primary key serves cluster -> findings lookups and ix_cluster_members_finding the
+    reverse (which cluster a finding is in). Rows go away with their cluster or finding.
+    """
+
+    __tablename__ = "cluster_members"
+    __table_args__ = (
+        Index("ix_cluster_members_finding", "finding_id", "cluster_id"),
+    )
+
+    cluster_id = Column(
+        Integer,
+        ForeignKey("clusters.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    finding_id = Column(
+        Integer,
+        ForeignKey("findings.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
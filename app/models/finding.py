@@ -1,6 +1,18 @@
 """ORM model for persisted vulnerability findings."""
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 
 from app.models.base import Base
@@ -12,9 +24,29 @@ class Finding(Base):
 
     Stores one row per normalized finding from SAST/SCA uploads.
     Each finding belongs to one upload_job and one user.
+    dedupe_key is the SHA-256 of the canonical key; unique per job so bulk inserts
+    dedupe in the database (ON CONFLICT DO NOTHING).
+    For SARIF/Semgrep findings raw_payload holds only per-result data and rule_key points at
+    the job's shared FindingRule; use finding_rules.expand_raw_payload for the full payload.
+    signature is the SHA-256 of the finding's Layer A cluster key, set on ingest (NULL for
+    rows stored before it existed until app.backfill_signatures runs); Layer A clustering
+    groups by it in SQL.
     """
 
     __tablename__ = "findings"
+    __table_args__ = (
+        UniqueConstraint(
+            "upload_job_id",
+            "dedupe_key",
+            name="uq_findings_job_dedupe_key",
+        ),
+        ForeignKeyConstraint(
+            ["upload_job_id", "rule_key"],
+            ["finding_rules.upload_job_id", "finding_rules.rule_key"],
+            name="fk_findings_job_rule_key",
+        ),
+        Index("ix_findings_job_signature", "upload_job_id", "signature"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     upload_job_id = Column(
@@ -43,3 +75,6 @@ class Finding(Base):
     )
     scanner_source = Column(String(255), nullable=True)
     raw_payload = Column(JSONB, nullable=True)
+    dedupe_key = Column(String(64), nullable=True)
+    rule_key = Column(String(64), nullable=True)
+    signature = Column(String(64), nullable=True)
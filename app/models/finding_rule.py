@@ -0,0 +1,36 @@
+"""ORM model for per-job shared rule/advisory metadata referenced by findings."""
+
+from sqlalchemy import Column, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models.base import Base
+
+
+class FindingRule(Base):
+    """
+    Rule-level metadata shared by many findings of one upload job (SARIF rule descriptors
+    and properties, Semgrep extra.metadata), stored once instead of in every raw_payload.
+
+    rule_key is the SHA-256 of the canonical JSON of rule_payload; findings reference it via
+    (upload_job_id, rule_key). rule_payload has the same nesting as the original raw_payload,
+    so merging it with a finding's lean raw_payload restores the full payload.
+    """
+
+    __tablename__ = "finding_rules"
+    __table_args__ = (
+        UniqueConstraint(
+            "upload_job_id",
+            "rule_key",
+            name="uq_finding_rules_job_rule_key",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    upload_job_id = Column(
+        Integer,
+        ForeignKey("upload_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    rule_key = Column(String(64), nullable=False)
+    rule_payload = Column(JSONB, nullable=False)
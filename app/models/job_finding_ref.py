@@ -0,0 +1,30 @@
+"""ORM model for delta-ingest references from an upload job to findings stored by earlier jobs."""
+
+from sqlalchemy import Column, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+
+class JobFindingRef(Base):
+    """
+    A finding of an earlier job as seen by a delta upload job (POST /upload?delta=true).
+
+    state is 'unchanged' when the rescan reported the same finding again (the job includes
+    it without storing a copy) or 'resolved' when the repo was rescanned and the finding
+    is gone. A job's findings are its own rows plus its 'unchanged' references.
+    """
+
+    __tablename__ = "job_finding_refs"
+
+    upload_job_id = Column(
+        Integer,
+        ForeignKey("upload_jobs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    finding_id = Column(
+        Integer,
+        ForeignKey("findings.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    state = Column(String(16), nullable=False)  # unchanged | resolved
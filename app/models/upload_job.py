@@ -1,6 +1,18 @@
 """ORM model for upload jobs (one per upload batch)."""
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    false,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from app.models.base import Base
 
@@ -9,9 +21,36 @@ class UploadJob(Base):
     """
     One discrete processing run per upload. Findings are tied to an upload_job_id.
     Enables per-job clustering, reasoning, and export.
+
+    content_hash (SHA-256 of the report bytes as received) and idempotency_key (client
+    Idempotency-Key header) let repeated uploads return the existing job instead of
+    ingesting again; both are matched per user.
+
+    repos lists the distinct repos of the job's findings; delta uploads use it to find the
+    previous job that scanned each repo.
+
+    findings_version is bumped whenever the job's finding set changes (ingest, re-processing,
+    retention). clusters_version is the cache key (see cluster_persistence.clusters_version)
+    the job's persisted clusters were built for; GET /clusters serves them while it matches.
+
+    updated_at is refreshed by the worker owning a pending/processing background job (status
+    and progress writes, plus a periodic heartbeat); a job not refreshed for
+    INGEST_JOB_STALE_SECONDS was interrupted and is recovered (see ingest_worker). spool_ref
+    lists a queued job's spooled reports and delta its ingest mode, for re-queueing.
     """
 
     __tablename__ = "upload_jobs"
+    __table_args__ = (
+        Index("ix_upload_jobs_user_content_hash", "user_id", "content_hash"),
+        Index(
+            "uq_upload_jobs_user_idempotency_key",
+            "user_id",
+            "idempotency_key",
+            unique=True,
+        ),
+        Index("ix_upload_jobs_repos", "repos", postgresql_using="gin"),
+        Index("ix_upload_jobs_status_updated_at", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(
@@ -25,6 +64,26 @@ class UploadJob(Base):
         nullable=False,
         server_default=func.now(),
     )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
     status = Column(String(32), nullable=False, default="pending")  # pending | processing | completed | failed
-    source = Column(String(32), nullable=False, default="file")  # file | api
+    source = Column(String(32), nullable=False, default="file")  # file | api | batch
     raw_blob_ref = Column(Text, nullable=True)  # optional S3/key or path for re-run
+    delta = Column(Boolean, nullable=False, default=False, server_default=false())
+    spool_ref = Column(Text, nullable=True)  # JSON list of spooled reports while queued
+    # Progress for background ingest: report items parsed and findings persisted so far.
+    processed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    accepted_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Delta uploads: findings carried over from the previous scan / gone since it.
+    unchanged_count = Column(Integer, nullable=False, default=0, server_default="0")
+    resolved_count = Column(Integer, nullable=False, default=0, server_default="0")
+    error_detail = Column(Text, nullable=True)  # set when status is failed
+    content_hash = Column(String(64), nullable=True)
+    idempotency_key = Column(String(255), nullable=True)
+    repos = Column(ARRAY(String(1024)), nullable=True)
+    findings_version = Column(Integer, nullable=False, default=0, server_default="0")
+    clusters_version = Column(String(64), nullable=True)
@@ -0,0 +1,63 @@
+"""
+CLI entrypoint for re-processing archived uploads with the current pipeline. Examples:
+
+  python -m app.reprocess --job-id 12 --job-id 13
+  python -m app.reprocess --since 2025-03-01 --until 2025-04-01 --workers 8
+
+Jobs need an archived report (RAW_BLOB_DIR set when they were uploaded).
+"""
+
+import argparse
+import logging
+import sys
+from datetime import datetime
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.services.reprocess import find_reprocess_jobs, reprocess_jobs
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    datefmt="%Y-%m-%dT%H:%M:%SZ",
+)
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.reprocess",
+        description="Rebuild findings and clusters of archived upload jobs.",
+    )
+    parser.add_argument("--job-id", type=int, action="append", dest="job_ids", help="Job id (repeatable).")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Jobs created at or after (ISO 8601).")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Jobs created before (ISO 8601).")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=get_settings().INGEST_WORKER_CONCURRENCY,
+        help="Jobs re-processed in parallel (default: INGEST_WORKER_CONCURRENCY).",
+    )
+    args = parser.parse_args(argv)
+    if args.job_ids is None and args.since is None and args.until is None:
+        parser.error("specify --job-id, --since or --until")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Re-process the selected jobs; returns 1 if any job failed."""
+    args = _parse_args(argv)
+    db = SessionLocal()
+    try:
+        job_ids = find_reprocess_jobs(db, job_ids=args.job_ids, since=args.since, until=args.until)
+    finally:
+        db.close()
+    logger.info("Re-processing %s upload jobs with %s workers", len(job_ids), args.workers)
+    results = reprocess_jobs(job_ids, args.workers)
+    failed = [job_id for job_id, _, error in results if error is not None]
+    logger.info("Re-processing completed: jobs=%s, failed=%s", len(results), len(failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
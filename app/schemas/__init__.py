@@ -12,7 +12,7 @@ from app.schemas.reasoning import (
     ReasoningRequest,
     ReasoningResponse,
 )
-from app.schemas.upload import UploadResponse
+from app.schemas.upload import UploadAcceptedResponse, UploadResponse
 from app.schemas.exploitability import (
     AdjustedRiskTier,
     ExploitabilityOutput,
@@ -42,6 +42,7 @@ __all__ = [
     "SeverityLevel",
     "TicketsRequest",
     "TicketsResponse",
+    "UploadAcceptedResponse",
     "UploadResponse",
     "VulnerabilityCluster",
 ]
@@ -133,8 +133,8 @@ class NormalizedFinding(BaseModel):
     )
 
 
-class VulnerabilityCluster(BaseModel):
-    """One logical vulnerability (e.g. one CVE) that may appear in multiple repos/files, with canonical fields and references to normalized findings."""
+class VulnerabilityClusterSummary(BaseModel):
+    """A cluster's canonical fields without its finding references (clusters API projection)."""
 
     vulnerability_id: str = Field(
         ...,
@@ -169,11 +169,6 @@ class VulnerabilityCluster(BaseModel):
         min_length=1,
         description="Canonical description of the vulnerability.",
     )
-    finding_ids: list[str] = Field(
-        ...,
-        min_length=1,
-        description="IDs of normalized findings that belong to this cluster.",
-    )
     affected_services_count: int = Field(
         ...,
         ge=1,
@@ -186,6 +181,16 @@ class VulnerabilityCluster(BaseModel):
     )
 
 
+class VulnerabilityCluster(VulnerabilityClusterSummary):
+    """One logical vulnerability (e.g. one CVE) that may appear in multiple repos/files, with canonical fields and references to normalized findings."""
+
+    finding_ids: list[str] = Field(
+        ...,
+        min_length=1,
+        description="IDs of normalized findings that belong to this cluster.",
+    )
+
+
 class CompressionMetrics(BaseModel):
     """Metrics for clustering compression: raw finding count vs cluster count."""
 
@@ -260,15 +265,19 @@ class RuleSummary(BaseModel):
 class ClustersResponse(BaseModel):
     """Response for GET /api/v1/clusters: clusters plus compression metrics."""
 
-    clusters: list[VulnerabilityCluster] = Field(
+    clusters: list[VulnerabilityCluster | VulnerabilityClusterSummary] = Field(
         ...,
-        description="Distinct vulnerability clusters (SCA by CVE+dependency, SAST by rule+path).",
+        description="Distinct vulnerability clusters (SCA by CVE+dependency, SAST by rule+path); one page when limit is set, without finding_ids when include_finding_ids=false.",
     )
     metrics: CompressionMetrics = Field(
         ...,
-        description="Compression metrics: raw_finding_count, cluster_count, compression_ratio.",
+        description="Compression metrics: raw_finding_count, cluster_count, compression_ratio (whole job, before filters).",
     )
     rule_summary: RuleSummary | None = Field(
         default=None,
         description="Rule-level analytics for Semgrep findings (top noisy rules, severity disagreement); None when no Semgrep data.",
     )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Pass as cursor to fetch the next page; None on the last page or without limit.",
+    )
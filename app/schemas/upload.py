@@ -1,5 +1,7 @@
 """Request/response schemas for the upload endpoint."""
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -19,3 +21,77 @@ class UploadResponse(BaseModel):
         ...,
         description="ID of the upload job this batch belongs to.",
     )
+    duplicate: bool = Field(
+        default=False,
+        description="True when an earlier job with identical content or Idempotency-Key was returned.",
+    )
+
+
+class UploadAcceptedResponse(BaseModel):
+    """Response (202) when an upload is queued for background processing."""
+
+    upload_job_id: int = Field(
+        ...,
+        description="ID of the upload job; poll its status URL for progress.",
+    )
+    status: str = Field(
+        default="pending",
+        description="Job status at acceptance (pending), or of the existing job for a duplicate.",
+    )
+    status_url: str = Field(
+        ...,
+        description="URL of GET /upload-jobs/{id} for status and progress counts.",
+    )
+    duplicate: bool = Field(
+        default=False,
+        description="True when an earlier job with identical content or Idempotency-Key was returned.",
+    )
+
+
+class UploadSessionCreateRequest(BaseModel):
+    """Request body for POST /upload/sessions."""
+
+    filename: str = Field(
+        ...,
+        min_length=1,
+        max_length=255,
+        description="Report file name; its extension selects decompression (.json, .sarif, .json.gz, .sarif.gz, .zst).",
+    )
+    total_size: int = Field(..., ge=1, description="Size of the whole report in bytes.")
+    chunk_size: int = Field(
+        ...,
+        ge=1,
+        description="Size of every chunk except the last, in bytes: 64 KiB to UPLOAD_SESSION_MAX_CHUNK_BYTES, or total_size for a single chunk.",
+    )
+
+
+class UploadSessionResponse(BaseModel):
+    """State of a resumable upload session."""
+
+    session_id: str = Field(..., description="Session ID used in the chunk and finalize URLs.")
+    filename: str = Field(..., description="Report file name.")
+    total_size: int = Field(..., ge=1, description="Size of the whole report in bytes.")
+    chunk_size: int = Field(..., ge=1, description="Size of every chunk except the last.")
+    chunk_count: int = Field(..., ge=1, description="Number of chunks (indexes 0..chunk_count-1).")
+    missing_chunks: list[int] = Field(
+        default_factory=list,
+        description="Chunk indexes not yet received with a matching checksum; resend these.",
+    )
+    expires_at: datetime = Field(..., description="When the session and its chunks are discarded.")
+
+
+class UploadChunkResponse(BaseModel):
+    """Response after a chunk was stored and its checksum verified."""
+
+    index: int = Field(..., ge=0, description="Chunk index.")
+    size: int = Field(..., ge=0, description="Chunk size in bytes.")
+    sha256: str = Field(..., description="Verified SHA-256 of the chunk (hex).")
+
+
+class UploadSessionFinalizeRequest(BaseModel):
+    """Optional body for POST /upload/sessions/{id}/finalize."""
+
+    sha256: str | None = Field(
+        default=None,
+        description="SHA-256 (hex) of the whole report; verified before ingest when given.",
+    )
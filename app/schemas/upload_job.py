@@ -22,3 +22,46 @@ class UploadJobsListResponse(BaseModel):
         ...,
         description="Upload jobs for the current user, newest first.",
     )
+
+
+class UploadJobStatusResponse(BaseModel):
+    """Response for GET /api/v1/upload-jobs/{job_id}: status and ingest progress."""
+
+    id: int = Field(..., description="Upload job ID.")
+    created_at: datetime = Field(..., description="When the job was created.")
+    status: str = Field(..., description="Job status: pending, processing, completed, failed.")
+    source: str = Field(..., description="Source: file or api.")
+    processed_count: int = Field(..., ge=0, description="Report items parsed and validated so far.")
+    accepted_count: int = Field(..., ge=0, description="Findings persisted so far (after dedupe).")
+    unchanged_count: int = Field(
+        default=0,
+        ge=0,
+        description="Delta uploads: findings referenced from the previous scan (included in accepted_count).",
+    )
+    resolved_count: int = Field(
+        default=0,
+        ge=0,
+        description="Delta uploads: findings of the previous scan no longer reported.",
+    )
+    error: str | None = Field(default=None, description="Failure detail when status is failed.")
+
+
+class UploadJobReprocessRequest(BaseModel):
+    """Body for POST /api/v1/upload-jobs/reprocess: jobs by id and/or creation date range."""
+
+    job_ids: list[int] | None = Field(
+        default=None,
+        max_length=10_000,
+        description="Upload job ids to re-process.",
+    )
+    since: datetime | None = Field(default=None, description="Jobs created at or after this time.")
+    until: datetime | None = Field(default=None, description="Jobs created before this time.")
+
+
+class UploadJobReprocessResponse(BaseModel):
+    """Response for POST /api/v1/upload-jobs/reprocess (202)."""
+
+    job_ids: list[int] = Field(
+        ...,
+        description="Archived jobs queued for re-processing (completed or failed jobs with a stored report).",
+    )
@@ -0,0 +1,191 @@
+"""Content-addressed, compressed local store for original upload reports (UploadJob.raw_blob_ref).
+
+Reports are stored under RAW_BLOB_DIR as <hh>/<sha256><suffix>, where sha256 is the digest of
+the bytes as received. Uncompressed reports are compressed on the way in (zstd when the
+zstandard package is installed, else gzip); reports uploaded compressed are stored as they
+are. The suffix (.gz / .zst) records the content coding, so a blob can be fed back to the
+ingest pipeline without decompressing it first. A batch upload stores each report plus a
+manifest listing them by name; the job's raw_blob_ref then points at the manifest.
+Identical reports are stored once.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import BinaryIO
+
+from app.core.config import get_settings
+from app.services.ingest import ReportFile
+
+logger = logging.getLogger(__name__)
+
+_MANIFEST_SUFFIX = ".manifest.json"
+# Blob suffix -> content coding of the stored bytes.
+_SUFFIX_ENCODINGS: dict[str, str] = {".gz": "gzip", ".zst": "zstd"}
+_ENCODING_SUFFIXES: dict[str, str] = {v: k for k, v in _SUFFIX_ENCODINGS.items()}
+_REF_RE = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{64}(\.gz|\.zst|\.manifest\.json)$")
+_COPY_BYTES = 1024 * 1024
+# Name of a single-report blob when handed back to the pipeline (used in error messages).
+_SINGLE_REPORT_NAME = "report"
+
+
+class BlobNotFoundError(Exception):
+    """Raised when a raw_blob_ref is malformed, the store is not configured, or the blob is gone."""
+
+    def __init__(self, detail: str) -> None:
+        self.detail = detail
+        super().__init__(detail)
+
+
+def blob_store_dir() -> Path | None:
+    """RAW_BLOB_DIR (created if missing), or None when report archival is disabled."""
+    base = get_settings().RAW_BLOB_DIR
+    if not base:
+        return None
+    path = Path(base)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _blob_path(root: Path, digest: str, suffix: str) -> Path:
+    return root / digest[:2] / f"{digest}{suffix}"
+
+
+def _ref(digest: str, suffix: str) -> str:
+    return f"{digest[:2]}/{digest}{suffix}"
+
+
+def _compressor(out: BinaryIO) -> tuple[BinaryIO, str]:
+    """Writer compressing into out, and the blob suffix for its coding."""
+    try:
+        import zstandard  # type: ignore[import-untyped]
+    except ImportError:
+        return gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6, mtime=0), ".gz"
+    return zstandard.ZstdCompressor(level=3).stream_writer(out, closefd=False), ".zst"
+
+
+def _commit_blob(root: Path, tmp: Path, digest: str, suffix: str) -> str:
+    """Move a finished temp file to its content address (dropping it if already stored)."""
+    path = _blob_path(root, digest, suffix)
+    if path.exists():
+        tmp.unlink(missing_ok=True)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, path)
+    return _ref(digest, suffix)
+
+
+def store_report(root: Path, src: BinaryIO, encoding: str | None) -> str:
+    """
+    Store a report from src (read to the end, bytes as received; encoding is their content
+    coding or None) and return its ref. Uncompressed reports are compressed while copying.
+    """
+    tmp = root / f".{uuid.uuid4().hex}.tmp"
+    hasher = hashlib.sha256()
+    try:
+        with open(tmp, "wb") as out:
+            if encoding is not None:
+                suffix = _ENCODING_SUFFIXES[encoding]
+                sink: BinaryIO = out
+            else:
+                sink, suffix = _compressor(out)
+            while chunk := src.read(_COPY_BYTES):
+                hasher.update(chunk)
+                sink.write(chunk)
+            if sink is not out:
+                sink.close()
+        digest = hasher.hexdigest()
+        if encoding is None:
+            # Same report stored earlier with the other compressor.
+            for other in _SUFFIX_ENCODINGS:
+                if other != suffix and _blob_path(root, digest, other).exists():
+                    tmp.unlink(missing_ok=True)
+                    return _ref(digest, other)
+        return _commit_blob(root, tmp, digest, suffix)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def store_manifest(root: Path, entries: list[tuple[str, str]]) -> str:
+    """Store a batch manifest of (report name, blob ref) and return its ref."""
+    data = json.dumps(
+        {"reports": [{"name": name, "ref": ref} for name, ref in entries]},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    tmp = root / f".{uuid.uuid4().hex}.tmp"
+    tmp.write_bytes(data)
+    return _commit_blob(root, tmp, digest, _MANIFEST_SUFFIX)
+
+
+def archive_report_files(reports: list[ReportFile]) -> str | None:
+    """
+    Archive spooled reports (one report, or a batch via a manifest) and return the ref for
+    UploadJob.raw_blob_ref. Returns None when archival is disabled or fails; ingest
+    does not depend on the archive, so failures are only logged.
+    """
+    try:
+        root = blob_store_dir()
+        if root is None:
+            return None
+        refs: list[tuple[str, str]] = []
+        for report in reports:
+            with open(report.path, "rb") as src:
+                refs.append((report.name, store_report(root, src, report.encoding)))
+        if len(refs) == 1:
+            return refs[0][1]
+        return store_manifest(root, refs)
+    except OSError:
+        logger.exception("Could not archive uploaded report")
+        return None
+
+
+def archive_report_stream(src: BinaryIO, encoding: str | None) -> str | None:
+    """Like archive_report_files for a report held in a file object (read from its current position)."""
+    try:
+        root = blob_store_dir()
+        if root is None:
+            return None
+        return store_report(root, src, encoding)
+    except OSError:
+        logger.exception("Could not archive uploaded report")
+        return None
+
+
+def _resolve(root: Path, ref: str) -> Path:
+    if not _REF_RE.match(ref):
+        raise BlobNotFoundError(f"Invalid raw blob reference: {ref[:100]}")
+    path = root / ref
+    if not path.is_file():
+        raise BlobNotFoundError(f"Archived report {ref} is missing from RAW_BLOB_DIR.")
+    return path
+
+
+def open_archived_reports(ref: str) -> list[ReportFile]:
+    """
+    Reports archived under ref, as ReportFile entries pointing into the store (read them
+    in place; do not delete them). Raises BlobNotFoundError.
+    """
+    root = blob_store_dir()
+    if root is None:
+        raise BlobNotFoundError("RAW_BLOB_DIR is not configured.")
+    path = _resolve(root, ref)
+    if not ref.endswith(_MANIFEST_SUFFIX):
+        return [ReportFile(_SINGLE_REPORT_NAME, str(path), _SUFFIX_ENCODINGS.get(path.suffix))]
+    try:
+        entries = json.loads(path.read_bytes())["reports"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise BlobNotFoundError(f"Invalid manifest {ref}: {e!s}") from e
+    reports = []
+    for entry in entries:
+        report_path = _resolve(root, entry["ref"])
+        reports.append(
+            ReportFile(entry["name"], str(report_path), _SUFFIX_ENCODINGS.get(report_path.suffix))
+        )
+    return reports
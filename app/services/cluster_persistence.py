@@ -1,41 +1,119 @@
-"""Persist and load cluster results per upload job so reasoning and Jira export use stable artifacts."""
+"""
+Persist and load cluster results per upload job so reasoning and Jira export use stable artifacts.
 
+Clusters are materialized once per job version: the clusters table holds the result built for
+UploadJob.clusters_version, a key over the job's findings_version and the clustering config.
+While it matches, GET /clusters serves the stored rows (and its ETag) without reclustering.
+"""
+
+import hashlib
+import json
+import logging
+import time
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
 from sqlalchemy.orm import Session
 
-from app.models import Cluster, UploadJob
+from app.core.config import get_settings
+from app.models import Cluster, ClusterMember, Finding, UploadJob
 from app.schemas.findings import VulnerabilityCluster
-from app.services.clustering import build_clusters_v2
-from app.services.job_findings import get_findings_for_user_job
+from app.services.clustering import (
+    _SEVERITY_ORDER,
+    _severity_rank,
+    build_clusters_v2,
+)
+from app.services.job_findings import (
+    get_findings_for_user_job,
+    job_findings_filter,
+    resolve_user_job_id,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when Layer A/B grouping changes so clusters cached under the old logic are rebuilt.
+_CLUSTERING_VERSION = 1
+
+
+def clusters_version(upload_job: UploadJob, use_semantic: bool) -> str:
+    """
+    Cache key of a job's clusters: the job, its findings_version and the clustering config
+    (semantic merge, its model, search backend and thresholds). Also used as the GET /clusters ETag.
+    """
+    config: list = [_CLUSTERING_VERSION, use_semantic]
+    if use_semantic:
+        settings = get_settings()
+        config += [
+            settings.EMBEDDING_MODEL,
+            settings.CLUSTER_SIMILARITY_BACKEND,
+            settings.CLUSTER_ANN_MIN_FINDINGS,
+            settings.CLUSTER_SIMILARITY_THRESHOLD,
+            settings.CLUSTER_TOP_K,
+        ]
+    key = json.dumps([upload_job.id, upload_job.findings_version or 0, config])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _cacheable(upload_job: UploadJob) -> bool:
+    """Only completed jobs have a stable finding set; others are clustered on every request."""
+    return upload_job.status == "completed"
+
+
+def _allocate_cluster_ids(db: Session, count: int) -> list[int]:
+    """Reserve count ids from the clusters id sequence in one round trip, ascending."""
+    sequence = func.pg_get_serial_sequence(Cluster.__tablename__, "id")
+    rows = db.execute(
+        select(func.nextval(sequence)).select_from(func.generate_series(1, count))
+    ).all()
+    return sorted(row[0] for row in rows)
 
 
 def save_clusters_for_job(
     db: Session,
     upload_job_id: int,
     clusters: list[VulnerabilityCluster],
+    version: str | None = None,
 ) -> None:
     """
-    Replace all cluster rows for the given upload job with the provided clusters.
-    Deletes existing rows for upload_job_id, then bulk-inserts the new ones.
-    """
-    db.query(Cluster).filter(Cluster.upload_job_id == upload_job_id).delete()
-    if not clusters:
-        db.commit()
-        return
-    for c in clusters:
-        row = Cluster(
-            upload_job_id=upload_job_id,
-            vulnerability_id=c.vulnerability_id,
-            severity=c.severity,
-            repo=c.repo,
-            file_path=c.file_path or "",
-            dependency=c.dependency or "",
-            cvss_score=c.cvss_score,
-            description=c.description,
-            finding_ids=c.finding_ids,
-            affected_services_count=c.affected_services_count,
-            finding_count=c.finding_count,
-        )
-        db.add(row)
+    Replace all cluster rows for the given upload job with the provided clusters and record
+    version (None: not reusable) as the job's clusters_version, in one transaction.
+
+    Row and membership values are prepared first, with cluster ids reserved from the
+    sequence, so the write itself is one delete and two bulk multi-row inserts. Concurrent
+    rebuilds of a job are serialized on its upload_jobs row. Readers keep seeing the previous
+    clusters until the commit; there is no moment where the job has none.
+    """
+    ids = _allocate_cluster_ids(db, len(clusters)) if clusters else []
+    rows = [
+        {
+            "id": cluster_id,
+            "upload_job_id": upload_job_id,
+            "vulnerability_id": c.vulnerability_id,
+            "severity": c.severity,
+            "repo": c.repo,
+            "file_path": c.file_path or "",
+            "dependency": c.dependency or "",
+            "cvss_score": c.cvss_score,
+            "description": c.description,
+            "affected_services_count": c.affected_services_count,
+            "finding_count": c.finding_count,
+            "severity_rank": _severity_rank(c.severity),
+        }
+        for cluster_id, c in zip(ids, clusters)
+    ]
+    members = [
+        {"cluster_id": cluster_id, "finding_id": int(fid)}
+        for cluster_id, c in zip(ids, clusters)
+        for fid in dict.fromkeys(c.finding_ids)
+    ]
+    db.execute(select(UploadJob.id).where(UploadJob.id == upload_job_id).with_for_update())
+    db.execute(delete(Cluster).where(Cluster.upload_job_id == upload_job_id))
+    if rows:
+        db.execute(insert(Cluster), rows)
+        db.execute(insert(ClusterMember), members)
+    db.execute(
+        update(UploadJob).where(UploadJob.id == upload_job_id).values(clusters_version=version)
+    )
     db.commit()
 
 
@@ -73,27 +151,205 @@ def load_clusters_for_job(
             return [], None
         upload_job_id = latest.id
 
+    return _load_cluster_rows(db, upload_job_id), upload_job_id
+
+
+def _load_cluster_rows(db: Session, upload_job_id: int) -> list[VulnerabilityCluster]:
+    """The job's persisted clusters that still have members, in the order they were built."""
     rows = (
         db.query(Cluster)
         .filter(Cluster.upload_job_id == upload_job_id)
+        .order_by(Cluster.id)
+        .all()
+    )
+    members = cluster_finding_ids(db, [r.id for r in rows])
+    # A cluster whose findings were all deleted (retention) is stale until the job is reclustered.
+    return [cluster_from_row(r, members[r.id]) for r in rows if r.id in members]
+
+
+def cluster_from_row(row: Cluster, finding_ids: list[str]) -> VulnerabilityCluster:
+    """VulnerabilityCluster for a persisted cluster row and its members' finding ids."""
+    return VulnerabilityCluster(
+        vulnerability_id=row.vulnerability_id,
+        severity=row.severity,
+        repo=row.repo,
+        file_path=row.file_path or "",
+        dependency=row.dependency or "",
+        cvss_score=row.cvss_score,
+        description=row.description,
+        finding_ids=finding_ids,
+        affected_services_count=row.affected_services_count,
+        finding_count=row.finding_count,
+    )
+
+
+def cluster_finding_ids(db: Session, cluster_ids: list[int]) -> dict[int, list[str]]:
+    """Member finding ids (as strings, ascending) per cluster id, in one query."""
+    if not cluster_ids:
+        return {}
+    rows = (
+        db.query(ClusterMember.cluster_id, ClusterMember.finding_id)
+        .filter(ClusterMember.cluster_id.in_(cluster_ids))
+        .order_by(ClusterMember.cluster_id, ClusterMember.finding_id)
+        .all()
+    )
+    members: dict[int, list[str]] = {}
+    for cluster_id, finding_id in rows:
+        members.setdefault(cluster_id, []).append(str(finding_id))
+    return members
+
+
+def find_clusters_for_findings(
+    db: Session,
+    upload_job_id: int,
+    finding_ids: list[int],
+) -> dict[int, int]:
+    """Cluster id per finding id for the job's persisted clusters (findings in none are left out)."""
+    if not finding_ids:
+        return {}
+    rows = (
+        db.query(ClusterMember.finding_id, ClusterMember.cluster_id)
+        .join(Cluster, Cluster.id == ClusterMember.cluster_id)
+        .filter(ClusterMember.finding_id.in_(finding_ids), Cluster.upload_job_id == upload_job_id)
+        .all()
+    )
+    return {finding_id: cluster_id for finding_id, cluster_id in rows}
+
+
+def cluster_totals(db: Session, upload_job_id: int) -> tuple[int, int]:
+    """(cluster count, raw finding count) of the job's persisted clusters."""
+    count, findings = (
+        db.query(func.count(Cluster.id), func.coalesce(func.sum(Cluster.finding_count), 0))
+        .filter(Cluster.upload_job_id == upload_job_id)
+        .one()
+    )
+    return int(count), int(findings)
+
+
+def build_clusters_sql(
+    db: Session,
+    user_id: int,
+    upload_job_id: int,
+) -> tuple[list[VulnerabilityCluster], int] | None:
+    """
+    Layer A clusters of a job computed in Postgres: one GROUP BY findings.signature returning
+    each group's finding ids, worst severity and distinct repo count, joined to the group's
+    first finding (lowest id) for the representative fields. No raw_payload is read.
+    Returns (clusters, raw finding count), or None when some of the job's findings have no
+    stored signature yet (run app.backfill_signatures); callers then cluster in Python.
+    """
+    start = time.perf_counter()
+    severity_rank = case(
+        {severity: rank for rank, severity in enumerate(_SEVERITY_ORDER)},
+        value=func.lower(func.btrim(Finding.severity)),
+        else_=0,
+    )
+    groups = (
+        db.query(
+            Finding.signature.label("signature"),
+            func.min(Finding.id).label("first_id"),
+            array_agg(aggregate_order_by(Finding.id, Finding.id)).label("finding_ids"),
+            func.max(severity_rank).label("severity_rank"),
+            func.count(func.btrim(Finding.repo).distinct()).label("repo_count"),
+        )
+        .filter(job_findings_filter(upload_job_id), Finding.user_id == user_id)
+        .group_by(Finding.signature)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            groups.c.signature,
+            groups.c.finding_ids,
+            groups.c.severity_rank,
+            groups.c.repo_count,
+            Finding.vulnerability_id,
+            Finding.repo,
+            Finding.file_path,
+            Finding.dependency,
+            Finding.cvss_score,
+            Finding.description,
+        )
+        .join(Finding, Finding.id == groups.c.first_id)
+        .order_by(groups.c.first_id)
         .all()
     )
+    if any(row.signature is None for row in rows):
+        return None
     clusters = [
         VulnerabilityCluster(
-            vulnerability_id=r.vulnerability_id,
-            severity=r.severity,
-            repo=r.repo,
-            file_path=r.file_path or "",
-            dependency=r.dependency or "",
-            cvss_score=r.cvss_score,
-            description=r.description,
-            finding_ids=list(r.finding_ids) if r.finding_ids else [],
-            affected_services_count=r.affected_services_count,
-            finding_count=r.finding_count,
+            vulnerability_id=row.vulnerability_id or "unknown",
+            severity=_SEVERITY_ORDER[row.severity_rank],
+            repo="multiple" if row.repo_count > 1 else (row.repo or "unknown"),
+            file_path=row.file_path or "",
+            dependency=row.dependency or "",
+            cvss_score=row.cvss_score,
+            description=row.description or "No description",
+            finding_ids=[str(fid) for fid in row.finding_ids],
+            affected_services_count=max(1, row.repo_count),
+            finding_count=len(row.finding_ids),
         )
-        for r in rows
+        for row in rows
     ]
-    return clusters, upload_job_id
+    raw_finding_count = sum(c.finding_count for c in clusters)
+    logger.info(
+        "Cluster generation completed (SQL)",
+        extra={
+            "cluster_generation_seconds": time.perf_counter() - start,
+            "finding_count": raw_finding_count,
+            "cluster_count": len(clusters),
+        },
+    )
+    return clusters, raw_finding_count
+
+
+def _user_job(db: Session, user_id: int, job_id: int | None) -> UploadJob | None:
+    """The user's job job_id, or their latest job when job_id is None."""
+    upload_job_id = resolve_user_job_id(db, user_id, job_id)
+    if upload_job_id is None:
+        return None
+    return (
+        db.query(UploadJob)
+        .filter(UploadJob.id == upload_job_id, UploadJob.user_id == user_id)
+        .first()
+    )
+
+
+def get_clusters_etag(
+    db: Session,
+    user_id: int,
+    job_id: int | None,
+    *,
+    use_semantic: bool = False,
+) -> str | None:
+    """
+    ETag of GET /clusters for the job: its quoted clusters_version, known without clustering.
+    None for missing or unfinished jobs, whose clusters may still change.
+    """
+    upload_job = _user_job(db, user_id, job_id)
+    if upload_job is None or not _cacheable(upload_job):
+        return None
+    return f'"{clusters_version(upload_job, use_semantic)}"'
+
+
+def materialize_clusters_for_job(
+    db: Session,
+    user_id: int,
+    job_id: int | None,
+    *,
+    use_semantic: bool = False,
+) -> int | None:
+    """
+    Make the job's persisted clusters current, clustering only when they were built for another
+    clusters_version (unfinished jobs: on every call), and return the job's id; None when the
+    user has no such job. Callers then read the clusters table (see cluster_query).
+    """
+    upload_job = _user_job(db, user_id, job_id)
+    if upload_job is None:
+        return None
+    version = clusters_version(upload_job, use_semantic) if _cacheable(upload_job) else None
+    if version is None or upload_job.clusters_version != version:
+        _build_and_save_clusters(db, user_id, upload_job.id, use_semantic, version)
+    return upload_job.id
 
 
 def get_or_build_clusters_for_job(
@@ -104,14 +360,49 @@ def get_or_build_clusters_for_job(
     use_semantic: bool = False,
 ) -> tuple[list[VulnerabilityCluster], int, list]:
     """
-    Load findings for the job, run clustering (Layer A + optional Layer B), persist to clusters
-    table, and return (clusters, raw_finding_count, findings). Used by GET /clusters so results
-    are stored for tickets/reasoning/Jira. Callers may use the findings list for rule summary etc.
+    Return (clusters, raw_finding_count, findings) for the job. Used by reasoning, tickets and
+    Jira export so results are stored for later requests. Callers may use the findings list for
+    rule summary etc.
+
+    When the persisted clusters were built for the job's current clusters_version they are
+    returned as stored (findings is then empty). Otherwise clustering runs (Layer A + optional
+    Layer B) and the result replaces the persisted clusters.
+    """
+    # Not findings[0].upload_job_id: delta jobs include findings stored by earlier jobs.
+    upload_job = _user_job(db, user_id, job_id)
+    if upload_job is None:
+        return [], 0, []
+    version = clusters_version(upload_job, use_semantic) if _cacheable(upload_job) else None
+    if version is not None and upload_job.clusters_version == version:
+        clusters = _load_cluster_rows(db, upload_job.id)
+        return clusters, sum(c.finding_count for c in clusters), []
+    return _build_and_save_clusters(db, user_id, upload_job.id, use_semantic, version)
+
+
+def _build_and_save_clusters(
+    db: Session,
+    user_id: int,
+    upload_job_id: int,
+    use_semantic: bool,
+    version: str | None,
+) -> tuple[list[VulnerabilityCluster], int, list]:
+    """
+    Cluster the job (Layer A + optional Layer B), persist the result under version and return
+    (clusters, raw_finding_count, findings).
+
+    Layer A only runs in SQL over stored signatures (build_clusters_sql) without loading
+    findings; findings is then empty. Before signatures are backfilled it runs from scratch.
     """
-    findings = get_findings_for_user_job(db, user_id, job_id)
+    if not use_semantic:
+        built = build_clusters_sql(db, user_id, upload_job_id)
+        if built is not None:
+            clusters, raw_finding_count = built
+            save_clusters_for_job(db, upload_job_id, clusters, version)
+            return clusters, raw_finding_count, []
+    findings = get_findings_for_user_job(db, user_id, upload_job_id)
     if not findings:
+        save_clusters_for_job(db, upload_job_id, [], version)
         return [], 0, []
     clusters = build_clusters_v2(findings, use_semantic=use_semantic)
-    upload_job_id = findings[0].upload_job_id
-    save_clusters_for_job(db, upload_job_id, clusters)
+    save_clusters_for_job(db, upload_job_id, clusters, version)
     return clusters, len(findings), findings
@@ -0,0 +1,193 @@
+"""
+Filtered, sorted and keyset-paginated reads of a job's persisted clusters (the clusters table).
+
+Pages are ordered by the sort's key columns plus the cluster id as tie-breaker; the cursor is
+the last row's key, so fetching the next page is an index range scan (see the Cluster model's
+indexes) whatever the page number. Cursors are only meaningful for the clusters_version they
+were issued under; clients holding the ETag can tell when the job was reclustered.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Iterator
+from itertools import islice
+from dataclasses import dataclass
+from typing import Literal
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+from app.core.database import SessionLocal
+from app.models import Cluster
+from app.schemas.findings import SeverityLevel, VulnerabilityCluster, VulnerabilityClusterSummary
+from app.services.cluster_persistence import cluster_finding_ids, cluster_from_row
+
+ClusterSort = Literal["default", "severity", "cvss"]
+
+# Key columns per sort: (column, descending). "default" is build order; "severity" is the
+# sort_clusters_by_severity_cvss order (severity, then CVSS, worst first).
+_SORT_KEYS = {
+    "default": ((Cluster.id, False),),
+    "severity": ((Cluster.severity_rank, True), (Cluster.cvss_score, True), (Cluster.id, False)),
+    "cvss": ((Cluster.cvss_score, True), (Cluster.id, False)),
+}
+
+# Rows fetched per round trip when streaming.
+_STREAM_BATCH_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor that is malformed or was issued for another sort order."""
+
+
+@dataclass(frozen=True)
+class ClusterFilter:
+    """Conditions on a job's clusters; unset fields do not filter."""
+
+    severities: tuple[SeverityLevel, ...] = ()
+    repo: str | None = None
+    dependency: str | None = None
+    vulnerability_id_prefix: str | None = None
+    min_cvss: float | None = None
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so value matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filtered(db: Session, upload_job_id: int, filters: ClusterFilter) -> Query:
+    """Query of the job's clusters matching filters."""
+    query = db.query(Cluster).filter(Cluster.upload_job_id == upload_job_id)
+    if filters.severities:
+        query = query.filter(Cluster.severity.in_(filters.severities))
+    if filters.repo is not None:
+        query = query.filter(Cluster.repo == filters.repo)
+    if filters.dependency is not None:
+        query = query.filter(Cluster.dependency == filters.dependency)
+    if filters.vulnerability_id_prefix:
+        pattern = _escape_like(filters.vulnerability_id_prefix) + "%"
+        query = query.filter(Cluster.vulnerability_id.like(pattern, escape="\\"))
+    if filters.min_cvss is not None:
+        query = query.filter(Cluster.cvss_score >= filters.min_cvss)
+    return query
+
+
+def _ordered(query: Query, sort: ClusterSort) -> Query:
+    """query ordered by the sort's key columns."""
+    return query.order_by(*(col.desc() if desc else col.asc() for col, desc in _SORT_KEYS[sort]))
+
+
+def _encode_cursor(sort: ClusterSort, row: Cluster) -> str:
+    """Opaque cursor pointing after row in sort order."""
+    values = [getattr(row, col.key) for col, _ in _SORT_KEYS[sort]]
+    raw = json.dumps([sort, values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(sort: ClusterSort, cursor: str) -> list:
+    """Key values of a cursor issued for sort; raises InvalidCursorError otherwise."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError("Malformed cursor.") from e
+    if cursor_sort != sort:
+        raise InvalidCursorError(f"Cursor was issued for sort={cursor_sort!r}, not {sort!r}.")
+    keys = _SORT_KEYS[sort]
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursorError("Malformed cursor.")
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        raise InvalidCursorError("Malformed cursor.")
+    return values
+
+
+def _after(sort: ClusterSort, values: list):
+    """Condition selecting rows after the key values in sort order (row-value comparison)."""
+    keys = _SORT_KEYS[sort]
+    terms = []
+    for i, (col, desc) in enumerate(keys):
+        equal_prefix = [c == v for (c, _), v in zip(keys[:i], values[:i])]
+        terms.append(and_(*equal_prefix, col < values[i] if desc else col > values[i]))
+    return or_(*terms)
+
+
+def query_clusters(
+    db: Session,
+    upload_job_id: int,
+    filters: ClusterFilter,
+    *,
+    sort: ClusterSort = "default",
+    limit: int | None = None,
+    cursor: str | None = None,
+    include_finding_ids: bool = True,
+) -> tuple[list[VulnerabilityCluster | VulnerabilityClusterSummary], str | None]:
+    """
+    One page of the job's clusters matching filters, in sort order, starting after cursor.
+    Returns (clusters, next_cursor); next_cursor is None on the last page or when limit is None
+    (all matching clusters). Without include_finding_ids cluster_members is not read and
+    clusters are returned as VulnerabilityClusterSummary. Raises InvalidCursorError.
+    """
+    query = _filtered(db, upload_job_id, filters)
+    if cursor:
+        query = query.filter(_after(sort, _decode_cursor(sort, cursor)))
+    query = _ordered(query, sort)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(sort, rows[-1])
+    return _project(db, rows, include_finding_ids), next_cursor
+
+
+def iter_clusters(
+    upload_job_id: int,
+    filters: ClusterFilter,
+    *,
+    sort: ClusterSort = "default",
+    include_finding_ids: bool = True,
+) -> Iterator[VulnerabilityCluster | VulnerabilityClusterSummary]:
+    """
+    Yield all of the job's clusters matching filters in sort order, fetched in batches from a
+    session of its own, so a streaming response can outlive the request's session.
+    """
+    db = SessionLocal()
+    try:
+        query = _ordered(_filtered(db, upload_job_id, filters), sort)
+        rows = iter(query.yield_per(_STREAM_BATCH_SIZE))
+        while batch := list(islice(rows, _STREAM_BATCH_SIZE)):
+            yield from _project(db, batch, include_finding_ids)
+    finally:
+        db.close()
+
+
+def _project(
+    db: Session,
+    rows: list[Cluster],
+    include_finding_ids: bool,
+) -> list[VulnerabilityCluster | VulnerabilityClusterSummary]:
+    """
+    API models for cluster rows, with finding ids (loaded for all rows in one query) or
+    without. With finding ids, clusters whose findings were all deleted (retention) are
+    left out.
+    """
+    if include_finding_ids:
+        members = cluster_finding_ids(db, [r.id for r in rows])
+        return [cluster_from_row(r, members[r.id]) for r in rows if r.id in members]
+    return [
+        VulnerabilityClusterSummary(
+            vulnerability_id=row.vulnerability_id,
+            severity=row.severity,
+            repo=row.repo,
+            file_path=row.file_path or "",
+            dependency=row.dependency or "",
+            cvss_score=row.cvss_score,
+            description=row.description,
+            affected_services_count=row.affected_services_count,
+            finding_count=row.finding_count,
+        )
+        for row in rows
+    ]
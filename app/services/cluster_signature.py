@@ -4,6 +4,7 @@ import hashlib
 import re
 from typing import TYPE_CHECKING
 
+from app.services.finding_rules import expand_raw_payload
 from app.services.normalize import _is_cve_or_ghsa_like
 
 if TYPE_CHECKING:
@@ -172,22 +173,73 @@ def _sast_deterministic_key(
     return f"{rule_id}\0{pattern}"
 
 
+def deterministic_signature(
+    vulnerability_id: str,
+    dependency: str,
+    repo: str,
+    file_path: str,
+    description: str,
+    raw_payload: dict | None,
+) -> str:
+    """Layer A cluster key from finding fields and the full (expanded) raw_payload."""
+    raw = raw_payload if raw_payload else None
+    if _is_cve_or_ghsa_like((vulnerability_id or "").strip()):
+        return _sca_deterministic_key(vulnerability_id or "", dependency or "", raw)
+    return _sast_deterministic_key(
+        vulnerability_id or "",
+        repo or "",
+        file_path or "",
+        description or "",
+        raw,
+    )
+
+
+def signature_payload_fields(
+    raw_payload: dict | None,
+) -> tuple[str, str | None, str | None, str | None]:
+    """
+    The raw_payload fields deterministic_signature reads, in the form cluster_engine's
+    compute_signatures takes them: (ecosystem, package name, message, CWE).
+    ecosystem is normalized ("" when absent). Package name (Trivy PkgName, else OSV package.name)
+    and extra.message are stripped, None when absent. CWE is the first metadata.cwe entry,
+    stripped; "" when the list is non-empty but its first entry is not a usable string, None
+    without a list.
+    """
+    if not raw_payload or not isinstance(raw_payload, dict):
+        return "", None, None, None
+    package_name = None
+    pkg_name = raw_payload.get("PkgName")
+    package = raw_payload.get("package")
+    if isinstance(pkg_name, str) and pkg_name.strip():
+        package_name = pkg_name.strip()
+    elif isinstance(package, dict):
+        pn = package.get("name")
+        if isinstance(pn, str) and pn.strip():
+            package_name = pn.strip()
+    message = None
+    extra = raw_payload.get("extra")
+    if isinstance(extra, dict):
+        msg = extra.get("message")
+        if isinstance(msg, str) and msg.strip():
+            message = msg.strip()[: _MAX_COMPONENT_LEN]
+    cwe = None
+    meta = raw_payload.get("metadata")
+    if isinstance(meta, dict) and isinstance(meta.get("cwe"), list) and meta["cwe"]:
+        first = meta["cwe"][0]
+        cwe = first.strip()[:256] if isinstance(first, str) else ""
+    return _ecosystem_from_raw_payload(raw_payload), package_name, message, cwe
+
+
 def compute_deterministic_signature(finding: "Finding") -> str:
     """
     Produce a stable cluster key for the finding (Layer A).
     SCA: (vuln_id, ecosystem, package_name); SAST: (rule_id, normalized_signature).
     Returns a string suitable for grouping; same string → same cluster.
     """
-    vid = (finding.vulnerability_id or "").strip()
-    raw = finding.raw_payload if getattr(finding, "raw_payload", None) else None
-    if _is_cve_or_ghsa_like(vid):
-        return _sca_deterministic_key(
-            finding.vulnerability_id or "",
-            finding.dependency or "",
-            raw,
-        )
-    return _sast_deterministic_key(
+    raw = expand_raw_payload(finding) if getattr(finding, "raw_payload", None) else None
+    return deterministic_signature(
         finding.vulnerability_id or "",
+        finding.dependency or "",
         finding.repo or "",
         finding.file_path or "",
         finding.description or "",
@@ -195,6 +247,11 @@ def compute_deterministic_signature(finding: "Finding") -> str:
     )
 
 
+def signature_digest(signature: str) -> str:
+    """SHA-256 hex of a Layer A signature, as stored in findings.signature (fixed length, indexable)."""
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()
+
+
 def compute_semantic_signature_id(finding: "Finding") -> str | None:
     """
     Placeholder for Layer B: return embedding/Qdrant point id when available.
@@ -1,13 +1,16 @@
 """Cluster findings by CVE (SCA) or Rule ID + file path pattern (SAST), with affected services count."""
 
-import json
 import logging
 import time
 from collections import defaultdict
 from typing import TYPE_CHECKING
 
 from app.schemas.findings import SeverityLevel, VulnerabilityCluster
-from app.services.cluster_signature import compute_deterministic_signature
+from app.services.cluster_signature import (
+    compute_deterministic_signature,
+    signature_payload_fields,
+)
+from app.services.finding_rules import expand_raw_payload
 from app.services.normalize import _is_cve_or_ghsa_like
 
 if TYPE_CHECKING:
@@ -20,17 +23,18 @@ _CLUSTER_ENGINE = None
 
 
 def _get_cluster_engine():
-    """Return the cluster_engine module if installed, else None."""
+    """Return the cluster_engine module if installed (with the columnar API), else None."""
     global _CLUSTER_ENGINE
     if _CLUSTER_ENGINE is not None:
-        return _CLUSTER_ENGINE
+        return _CLUSTER_ENGINE or None
     try:
         import cluster_engine as ce  # noqa: PLC0415
-        _CLUSTER_ENGINE = ce
-        return ce
     except ImportError:
-        _CLUSTER_ENGINE = False
-        return None
+        ce = None
+    # The crate's source directory imports as an empty namespace package; treat it as missing.
+    has_api = hasattr(ce, "cluster_columns") and hasattr(ce, "compute_signatures")
+    _CLUSTER_ENGINE = ce if has_api else False
+    return _CLUSTER_ENGINE or None
 
 # Severity order for choosing "worst" in a cluster (higher index = more severe).
 _SEVERITY_ORDER: tuple[SeverityLevel, ...] = (
@@ -116,58 +120,103 @@ def sort_clusters_by_severity_cvss(
     )
 
 
-def _findings_to_rust_input(
-    findings: list["Finding"],
-    deterministic_signatures: list[str] | None = None,
-) -> list[dict]:
-    """Convert ORM Finding list to JSON-serializable list for the Rust engine.
-    When deterministic_signatures is provided (same length as findings), each item gets that key.
+def _signature_columns(findings: list["Finding"]) -> tuple[list, ...]:
+    """
+    Columns for cluster_engine.compute_signatures: vulnerability ids, dependencies, repos,
+    file paths, descriptions, then the ecosystem, package name, message and CWE read from each
+    finding's expanded raw_payload (see signature_payload_fields).
+    """
+    ecosystems: list[str] = []
+    package_names: list[str | None] = []
+    messages: list[str | None] = []
+    cwes: list[str | None] = []
+    for f in findings:
+        raw = expand_raw_payload(f) if getattr(f, "raw_payload", None) else None
+        ecosystem, package_name, message, cwe = signature_payload_fields(raw)
+        ecosystems.append(ecosystem)
+        package_names.append(package_name)
+        messages.append(message)
+        cwes.append(cwe)
+    return (
+        [f.vulnerability_id or "" for f in findings],
+        [f.dependency or "" for f in findings],
+        [f.repo or "" for f in findings],
+        [f.file_path or "" for f in findings],
+        [f.description or "" for f in findings],
+        ecosystems,
+        package_names,
+        messages,
+        cwes,
+    )
+
+
+def compute_deterministic_signatures(findings: list["Finding"]) -> list[str]:
+    """
+    Layer A signatures for findings, in order. Computed (hashing in parallel, without the GIL)
+    by the Rust engine when installed; compute_deterministic_signature per finding otherwise
+    or if the engine fails. Both give identical strings.
     """
-    out: list[dict] = []
-    for i, f in enumerate(findings):
-        item: dict = {
-            "id": str(f.id),
-            "vulnerability_id": f.vulnerability_id or "",
-            "severity": f.severity or "info",
-            "repo": f.repo or "",
-            "file_path": f.file_path or "",
-            "dependency": f.dependency or "",
-            "cvss_score": float(f.cvss_score),
-            "description": f.description or "No description",
-        }
-        if deterministic_signatures is not None and i < len(deterministic_signatures):
-            item["deterministic_signature"] = deterministic_signatures[i]
-        out.append(item)
-    return out
+    engine = _get_cluster_engine()
+    if engine and findings:
+        try:
+            return list(engine.compute_signatures(*_signature_columns(findings)))
+        except Exception as e:
+            logger.debug(
+                "Rust signature computation failed, using Python",
+                extra={"reason": str(e)},
+            )
+    return [compute_deterministic_signature(f) for f in findings]
+
+
+def _findings_to_rust_columns(
+    findings: list["Finding"],
+    deterministic_signatures: list[str],
+) -> tuple[list[str], list[str], list[str]]:
+    """Columns for cluster_engine.cluster_columns: signatures, severities, repos (same order as findings)."""
+    severities = [f.severity or "info" for f in findings]
+    repos = [f.repo or "" for f in findings]
+    return list(deterministic_signatures), severities, repos
+
+
+def _cluster_from_group(
+    group: list["Finding"],
+    canonical_severity: SeverityLevel,
+    distinct_repos: int,
+) -> VulnerabilityCluster:
+    """One VulnerabilityCluster for a group of findings; display fields come from the first member."""
+    first = group[0]
+    finding_ids = [str(f.id) for f in group]
+    canonical_repo = "multiple" if distinct_repos > 1 else (first.repo or "unknown")
+    return VulnerabilityCluster(
+        vulnerability_id=first.vulnerability_id or "unknown",
+        severity=canonical_severity,
+        repo=canonical_repo,
+        file_path=first.file_path or "",
+        dependency=first.dependency or "",
+        cvss_score=first.cvss_score,
+        description=first.description or "No description",
+        finding_ids=finding_ids,
+        affected_services_count=max(1, distinct_repos),
+        finding_count=len(finding_ids),
+    )
 
 
 def _build_clusters_rust(
     findings: list["Finding"],
-    deterministic_signatures: list[str] | None = None,
+    deterministic_signatures: list[str],
 ) -> list[VulnerabilityCluster]:
-    """Run clustering in the Rust engine; raises on error or invalid output."""
+    """
+    Group findings in the Rust engine (columnar API, computed without the GIL) and build
+    clusters from the returned member indices; raises on error or invalid output.
+    """
     engine = _get_cluster_engine()
     if not engine:
         raise ImportError("cluster_engine not installed")
-    payload = _findings_to_rust_input(findings, deterministic_signatures)
-    json_input = json.dumps(payload)
-    json_output = engine.cluster_findings(json_input)
-    data = json.loads(json_output)
-    clusters_data = data.get("clusters") or []
+    signatures, severities, repos = _findings_to_rust_columns(findings, deterministic_signatures)
+    groups = engine.cluster_columns(signatures, severities, repos)
     return [
-        VulnerabilityCluster(
-            vulnerability_id=c["vulnerability_id"],
-            severity=c["severity"],
-            repo=c["repo"],
-            file_path=c.get("file_path") or "",
-            dependency=c.get("dependency") or "",
-            cvss_score=float(c["cvss_score"]),
-            description=c.get("description") or "No description",
-            finding_ids=[str(x) for x in c["finding_ids"]],
-            affected_services_count=int(c["affected_services_count"]),
-            finding_count=int(c["finding_count"]),
-        )
-        for c in clusters_data
+        _cluster_from_group([findings[i] for i in members], severity, int(distinct_repos))
+        for members, severity, distinct_repos in groups
     ]
 
 
@@ -194,7 +243,7 @@ def build_clusters_v2(
         )
         return []
 
-    signatures = [compute_deterministic_signature(f) for f in findings]
+    signatures = compute_deterministic_signatures(findings)
     if use_semantic:
         try:
             from app.services.semantic_merge import apply_semantic_merge
@@ -227,29 +276,14 @@ def build_clusters_v2(
     for f, sig in zip(findings, signatures):
         groups[sig].append(f)
 
-    clusters = []
-    for group in groups.values():
-        first = group[0]
-        finding_ids = [str(f.id) for f in group]
-        distinct_repos = len({(f.repo or "").strip() for f in group})
-        severities = [f.severity or "info" for f in group]
-        canonical_severity = _worst_severity(severities)
-        canonical_repo = "multiple" if distinct_repos > 1 else (first.repo or "unknown")
-
-        clusters.append(
-            VulnerabilityCluster(
-                vulnerability_id=first.vulnerability_id or "unknown",
-                severity=canonical_severity,
-                repo=canonical_repo,
-                file_path=first.file_path or "",
-                dependency=first.dependency or "",
-                cvss_score=first.cvss_score,
-                description=first.description or "No description",
-                finding_ids=finding_ids,
-                affected_services_count=max(1, distinct_repos),
-                finding_count=len(finding_ids),
-            )
+    clusters = [
+        _cluster_from_group(
+            group,
+            _worst_severity([f.severity or "info" for f in group]),
+            len({(f.repo or "").strip() for f in group}),
         )
+        for group in groups.values()
+    ]
 
     elapsed = time.perf_counter() - start
     logger.info(
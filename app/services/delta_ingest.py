@@ -0,0 +1,137 @@
+"""Delta ingestion: store only findings that are new since the previous scan of each repo.
+
+A delta upload (POST /upload?delta=true) compares every finding's canonical key
+(findings.dedupe_key) with the findings of the previous completed job that scanned the same
+repo (upload_jobs.repos). New findings are inserted as usual; findings seen before are
+referenced from job_finding_refs as 'unchanged' instead of copied; findings of the previous
+scan that are gone are recorded as 'resolved'. get_findings_for_user_job returns own rows
+plus unchanged references, so the job reads as a complete scan.
+"""
+
+from sqlalchemy import literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import Finding, JobFindingRef, UploadJob
+from app.schemas.findings import NormalizedFinding, RawFinding
+from app.services.finding_persistence import insert_findings_bulk
+from app.services.job_findings import job_findings_filter
+from app.services.normalize import canonical_key_digest
+
+
+class DeltaIngest:
+    """Per-job delta state: previous job per repo and counts. Use one instance per upload job."""
+
+    def __init__(self, db: Session, upload_job: UploadJob) -> None:
+        self._db = db
+        self._job = upload_job
+        self._base_by_repo: dict[str, int | None] = {}
+        self.unchanged_count = 0
+
+    def _base_job_id(self, repo: str) -> int | None:
+        """Latest completed job of the user (other than this one) whose findings covered repo."""
+        if repo not in self._base_by_repo:
+            self._base_by_repo[repo] = (
+                self._db.query(UploadJob.id)
+                .filter(
+                    UploadJob.user_id == self._job.user_id,
+                    UploadJob.status == "completed",
+                    UploadJob.id != self._job.id,
+                    UploadJob.repos.contains([repo]),
+                )
+                .order_by(UploadJob.created_at.desc(), UploadJob.id.desc())
+                .limit(1)
+                .scalar()
+            )
+        return self._base_by_repo[repo]
+
+    def _base_ids_by_key(self, base_job_id: int, keys: list[str]) -> dict[str, int]:
+        """dedupe_key -> finding id among the base job's findings (own rows and references)."""
+        rows = (
+            self._db.query(Finding.dedupe_key, Finding.id)
+            .filter(job_findings_filter(base_job_id), Finding.dedupe_key.in_(keys))
+            .all()
+        )
+        return {key: finding_id for key, finding_id in rows}
+
+    def insert_chunk(
+        self,
+        pairs: list[tuple[RawFinding, NormalizedFinding]],
+        *,
+        known_rule_keys: set[str] | None = None,
+    ) -> list[int]:
+        """
+        Persist one chunk: reference findings the previous scan of their repo already has,
+        insert the rest. Returns ids of the job's new rows followed by newly referenced ids.
+        """
+        if not pairs:
+            return []
+        keyed: list[tuple[str, RawFinding, NormalizedFinding]] = []
+        keys_by_base: dict[int, list[str]] = {}
+        seen: set[str] = set()
+        for raw, normalized in pairs:
+            key = canonical_key_digest(normalized)
+            if key in seen:
+                continue
+            seen.add(key)
+            keyed.append((key, raw, normalized))
+            base_job_id = self._base_job_id(normalized.repo)
+            if base_job_id is not None:
+                keys_by_base.setdefault(base_job_id, []).append(key)
+
+        unchanged: dict[str, int] = {}
+        for base_job_id, keys in keys_by_base.items():
+            unchanged.update(self._base_ids_by_key(base_job_id, keys))
+
+        new_pairs = [(raw, normalized) for key, raw, normalized in keyed if key not in unchanged]
+        ids = insert_findings_bulk(
+            self._db,
+            self._job.id,
+            self._job.user_id,
+            new_pairs,
+            known_rule_keys=known_rule_keys,
+        )
+        if unchanged:
+            stmt = (
+                insert(JobFindingRef)
+                .values(
+                    [
+                        {"upload_job_id": self._job.id, "finding_id": finding_id, "state": "unchanged"}
+                        for finding_id in unchanged.values()
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=["upload_job_id", "finding_id"])
+                .returning(JobFindingRef.finding_id)
+            )
+            referenced = [row[0] for row in self._db.execute(stmt).all()]
+            self.unchanged_count += len(referenced)
+            ids.extend(referenced)
+        return ids
+
+    def mark_resolved(self) -> int:
+        """
+        Record findings of the previous scans that this scan no longer reports, limited to the
+        repos this scan covered. Call once after the last chunk; returns the number marked.
+        """
+        repos_by_base: dict[int, list[str]] = {}
+        for repo, base_job_id in self._base_by_repo.items():
+            if base_job_id is not None:
+                repos_by_base.setdefault(base_job_id, []).append(repo)
+        still_present = select(JobFindingRef.finding_id).where(
+            JobFindingRef.upload_job_id == self._job.id,
+            JobFindingRef.state == "unchanged",
+        )
+        resolved = 0
+        for base_job_id, repos in repos_by_base.items():
+            gone = select(literal(self._job.id), Finding.id, literal("resolved")).where(
+                job_findings_filter(base_job_id),
+                Finding.repo.in_(repos),
+                Finding.id.not_in(still_present),
+            )
+            stmt = (
+                insert(JobFindingRef)
+                .from_select(["upload_job_id", "finding_id", "state"], gone)
+                .on_conflict_do_nothing(index_elements=["upload_job_id", "finding_id"])
+            )
+            resolved += self._db.execute(stmt).rowcount
+        return resolved
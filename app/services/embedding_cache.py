@@ -0,0 +1,153 @@
+"""
+Layer B: persistent on-disk cache of text embeddings, shared by all jobs and processes.
+
+One directory per embedding model holds an append-only float32 matrix (vectors.f32, read through
+a memory map) and an append-only list of 32-byte content keys (keys.bin); row i of the matrix is
+the embedding of key i. Appends take an exclusive file lock and write vectors before keys, so a
+reader that sees a key always finds its row. numpy is imported lazily (it ships with
+sentence-transformers, the only producer of vectors).
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_KEY_LEN = 32
+_VECTOR_ITEM_SIZE = 4  # float32
+
+
+def content_key(model_name: str, text: str) -> bytes:
+    """Cache key of text embedded with model_name (SHA-256 of both)."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Embeddings of one model under root/<model>; safe to share between threads and processes."""
+
+    def __init__(self, root: str | Path, model_name: str) -> None:
+        self.model_name = model_name
+        self.path = Path(root) / re.sub(r"[^A-Za-z0-9._-]", "_", model_name)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._keys_path = self.path / "keys.bin"
+        self._vectors_path = self.path / "vectors.f32"
+        self._meta_path = self.path / "meta.json"
+        self._lock_path = self.path / "lock"
+        self._index: dict[bytes, int] = {}
+        self._dim: int | None = None
+        self._vectors: "np.memmap | None" = None
+        self._mutex = threading.Lock()
+
+    def get(self, keys: list[bytes]) -> dict[bytes, "np.ndarray"]:
+        """Cached vectors (float32 copies) of the keys that are present."""
+        with self._mutex:
+            if any(k not in self._index for k in keys):
+                self._refresh()
+            rows = {k: self._index[k] for k in keys if k in self._index}
+            if not rows:
+                return {}
+            matrix = self._matrix()
+            return {k: matrix[row].copy() for k, row in rows.items()}
+
+    def put(self, keys: list[bytes], vectors: "np.ndarray") -> None:
+        """Append vectors (one row per key) for keys not cached yet."""
+        import numpy as np
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(keys) != vectors.shape[0]:
+            raise ValueError("put() needs one vector row per key")
+        with self._mutex, self._file_lock():
+            self._refresh()
+            dim = self._ensure_dim(vectors.shape[1])
+            if dim != vectors.shape[1]:
+                logger.warning(
+                    "Embedding cache %s holds %s-dim vectors, got %s; not caching",
+                    self.path, dim, vectors.shape[1],
+                )
+                return
+            new_rows: dict[bytes, int] = {}
+            for i, key in enumerate(keys):
+                if key not in self._index and key not in new_rows:
+                    new_rows[key] = i
+            if not new_rows:
+                return
+            count = len(self._index)
+            # Drop a tail left by an interrupted append before writing after the last full row.
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(count * dim * _VECTOR_ITEM_SIZE)
+                f.write(vectors[list(new_rows.values())].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._keys_path, "ab") as f:
+                f.truncate(count * _KEY_LEN)
+                f.write(b"".join(new_rows))
+            for offset, key in enumerate(new_rows):
+                self._index[key] = count + offset
+
+    def __len__(self) -> int:
+        with self._mutex:
+            self._refresh()
+            return len(self._index)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive lock across processes for appends."""
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Index keys appended (by any process) since the last refresh; complete keys only."""
+        try:
+            size = self._keys_path.stat().st_size
+        except FileNotFoundError:
+            return
+        start = len(self._index) * _KEY_LEN
+        end = size - size % _KEY_LEN
+        if end <= start:
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        row = len(self._index)
+        for i in range(0, len(data), _KEY_LEN):
+            self._index.setdefault(data[i : i + _KEY_LEN], row)
+            row += 1
+
+    def _ensure_dim(self, dim: int) -> int:
+        """Vector dimension of the cache; the first put() records it. Called under the file lock."""
+        if self._read_dim() is None:
+            self._meta_path.write_text(json.dumps({"model": self.model_name, "dim": dim}))
+            self._dim = dim
+        return self._dim
+
+    def _read_dim(self) -> int | None:
+        """Vector dimension from meta.json (written before the first key), or None if empty."""
+        if self._dim is None and self._meta_path.exists():
+            self._dim = int(json.loads(self._meta_path.read_text())["dim"])
+        return self._dim
+
+    def _matrix(self) -> "np.memmap":
+        """Memory map of the vector rows, remapped when rows were appended since the last call."""
+        import numpy as np
+
+        rows = len(self._index)
+        if self._vectors is None or self._vectors.shape[0] < rows:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._read_dim())
+            )
+        return self._vectors
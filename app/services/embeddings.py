@@ -1,13 +1,27 @@
 """Layer B: embed finding text (description, rule message, CWE) for semantic similarity. Optional dependency."""
 
-from typing import TYPE_CHECKING
+import logging
+import threading
+from typing import TYPE_CHECKING, Any
+
+from app.core.config import get_settings
+from app.services.embedding_cache import EmbeddingCache, content_key
+from app.services.finding_rules import expand_raw_payload
 
 if TYPE_CHECKING:
     from app.models.finding import Finding
 
+logger = logging.getLogger(__name__)
+
 # Max chars to embed per finding to avoid unbounded input.
 _MAX_EMBED_TEXT_LEN = 4000
 
+# Loaded models and open caches, per model name (and cache dir), shared by all requests.
+_MODELS: dict[str, Any] = {}
+_MODEL_LOCK = threading.Lock()
+_CACHES: dict[tuple[str, str], EmbeddingCache] = {}
+_CACHE_LOCK = threading.Lock()
+
 
 def build_embedding_text(finding: "Finding") -> str:
     """
@@ -18,7 +32,7 @@ def build_embedding_text(finding: "Finding") -> str:
     desc = (finding.description or "").strip()
     if desc:
         parts.append(desc[: _MAX_EMBED_TEXT_LEN])
-    raw = getattr(finding, "raw_payload", None)
+    raw = expand_raw_payload(finding)
     if raw and isinstance(raw, dict):
         extra = raw.get("extra")
         if isinstance(extra, dict) and extra.get("message"):
@@ -38,11 +52,48 @@ def build_embedding_text(finding: "Finding") -> str:
     return text[: _MAX_EMBED_TEXT_LEN]
 
 
+def get_embedding_model(model_name: str) -> Any:
+    """
+    The process-wide SentenceTransformer for model_name, loaded on first use.
+    Raises ImportError when sentence-transformers is not installed.
+    """
+    with _MODEL_LOCK:
+        model = _MODELS.get(model_name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer  # type: ignore[import-untyped]
+            model = SentenceTransformer(model_name)
+            _MODELS[model_name] = model
+        return model
+
+
+def warm_embedding_model() -> None:
+    """Load EMBEDDING_MODEL now rather than on the first clustering request; no-op if unavailable."""
+    try:
+        get_embedding_model(get_settings().EMBEDDING_MODEL)
+    except Exception:
+        logger.warning("Embedding model could not be loaded; semantic merge is disabled", exc_info=True)
+
+
+def _get_cache(cache_dir: str | None, model_name: str) -> EmbeddingCache | None:
+    """The shared EmbeddingCache for model_name under cache_dir, or None when caching is off."""
+    if not cache_dir or not cache_dir.strip():
+        return None
+    key = (cache_dir.strip(), model_name)
+    with _CACHE_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = EmbeddingCache(key[0], model_name)
+            _CACHES[key] = cache
+        return cache
+
+
 def embed_texts(texts: list[str]) -> list[list[float]]:
     """
     Embed a list of strings. Returns list of vectors (same length as input).
     When sentence-transformers (or configured backend) is not available, returns empty list.
-    Validate input: type, length; truncate per item.
+    Validate input: type, length; truncate per item. Each distinct text is encoded once, in
+    batches of EMBEDDING_BATCH_SIZE; with EMBEDDING_CACHE_DIR set, texts embedded by any
+    earlier call (in any process) are read from the cache instead.
     """
     if not texts or not isinstance(texts, list):
         return []
@@ -52,11 +103,33 @@ def embed_texts(texts: list[str]) -> list[list[float]]:
             validated.append("")
         else:
             validated.append((t or "").strip()[: _MAX_EMBED_TEXT_LEN])
+    settings = get_settings()
+    model_name = settings.EMBEDDING_MODEL
     try:
-        from sentence_transformers import SentenceTransformer  # type: ignore[import-untyped]
-        model = SentenceTransformer("all-MiniLM-L6-v2")
-        vectors = model.encode(validated, convert_to_numpy=True)
-        return [v.tolist() for v in vectors]
+        import numpy as np
+
+        keys = [content_key(model_name, t) for t in validated]
+        unique: dict[bytes, str] = dict(zip(keys, validated))
+        cache = _get_cache(settings.EMBEDDING_CACHE_DIR, model_name)
+        found = cache.get(list(unique)) if cache is not None else {}
+        missing = [k for k in unique if k not in found]
+        if missing:
+            model = get_embedding_model(model_name)
+            encoded = np.asarray(
+                model.encode(
+                    [unique[k] for k in missing],
+                    batch_size=settings.EMBEDDING_BATCH_SIZE,
+                    convert_to_numpy=True,
+                ),
+                dtype=np.float32,
+            )
+            if cache is not None:
+                try:
+                    cache.put(missing, encoded)
+                except OSError:
+                    logger.warning("Could not write embedding cache %s", cache.path, exc_info=True)
+            found.update(zip(missing, encoded))
+        return [found[k].tolist() for k in keys]
     except ImportError:
         return []
     except Exception:
@@ -0,0 +1,134 @@
+"""Bulk persistence of normalized findings with database-side dedupe on the hashed canonical key."""
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import Finding
+from app.schemas.findings import NormalizedFinding, RawFinding
+from app.services.cluster_signature import deterministic_signature, signature_digest
+from app.services.finding_rules import insert_finding_rules, rule_payload_key, split_rule_payload
+from app.services.normalize import canonical_key_digest
+from app.services.payload_projection import project_raw_payload
+
+# Columns refreshed from the new row when re-processing a job (replace=True).
+_REPLACED_COLUMNS = (
+    "vulnerability_id", "severity", "repo", "file_path", "dependency", "cvss_score",
+    "description", "scanner_source", "raw_payload", "rule_key", "signature",
+)
+
+
+def finding_row_values(
+    upload_job_id: int,
+    user_id: int,
+    raw: RawFinding,
+    normalized: NormalizedFinding,
+    dedupe_key: str,
+    raw_payload: dict | None = None,
+    rule_key: str | None = None,
+    signature: str | None = None,
+) -> dict:
+    """
+    Column values for one findings row (used by multi-row INSERT).
+    raw_payload overrides raw.raw_payload when given: the stored (projected) payload, without
+    the shared rule part when rule_key is set. signature is the stored Layer A digest.
+    """
+    return {
+        "upload_job_id": upload_job_id,
+        "user_id": user_id,
+        "vulnerability_id": normalized.vulnerability_id,
+        "severity": normalized.severity,
+        "repo": normalized.repo,
+        "file_path": normalized.file_path,
+        "dependency": normalized.dependency,
+        "cvss_score": normalized.cvss_score,
+        "description": normalized.description,
+        "scanner_source": raw.scanner_source,
+        "raw_payload": raw.raw_payload if raw_payload is None else raw_payload,
+        "rule_key": rule_key,
+        "dedupe_key": dedupe_key,
+        "signature": signature,
+    }
+
+
+def insert_findings_bulk(
+    db: Session,
+    upload_job_id: int,
+    user_id: int,
+    pairs: list[tuple[RawFinding, NormalizedFinding]],
+    *,
+    known_rule_keys: set[str] | None = None,
+    replace: bool = False,
+) -> list[int]:
+    """
+    Insert one chunk of (raw, normalized) pairs with a single multi-row
+    INSERT ... ON CONFLICT (upload_job_id, dedupe_key) DO NOTHING RETURNING id, dedupe_key.
+
+    Dedupe happens in the database, so chunks need no shared in-memory seen set; rows whose
+    key already exists in the job (earlier chunk or concurrent writer) are skipped. Within the
+    chunk the first occurrence of a key wins. Returns new finding ids in input order.
+
+    Shared rule metadata (SARIF rule descriptors, Semgrep extra.metadata) is split off and
+    upserted into finding_rules first; findings store the lean payload and rule_key. Pass the
+    same known_rule_keys set for every chunk of a job to skip rules already written.
+
+    With RAW_PAYLOAD_PROJECTION, payloads are first reduced to the fields read after ingest
+    (see payload_projection); normalization has already seen the full item. Each row's Layer A
+    signature is computed from the stored payload, so it matches what reading the row back gives.
+
+    With replace=True (re-processing a job) conflicting rows are updated in place instead of
+    skipped, keeping their ids, and their ids are returned too.
+    """
+    if not pairs:
+        return []
+    settings = get_settings()
+    rows: list[dict] = []
+    order: dict[str, int] = {}
+    new_rules: dict[str, dict] = {}
+    seen_rules = known_rule_keys if known_rule_keys is not None else set()
+    for raw, normalized in pairs:
+        key = canonical_key_digest(normalized)
+        if key in order:
+            continue
+        order[key] = len(rows)
+        payload = raw.raw_payload
+        if settings.RAW_PAYLOAD_PROJECTION:
+            payload = project_raw_payload(
+                payload,
+                max_string_len=settings.RAW_PAYLOAD_MAX_STRING_LEN,
+                max_list_items=settings.RAW_PAYLOAD_MAX_LIST_ITEMS,
+            )
+        signature = signature_digest(
+            deterministic_signature(
+                normalized.vulnerability_id,
+                normalized.dependency,
+                normalized.repo,
+                normalized.file_path,
+                normalized.description,
+                payload,
+            )
+        )
+        lean, rule_payload = split_rule_payload(payload)
+        rule_key = None
+        if rule_payload is not None:
+            rule_key = rule_payload_key(rule_payload)
+            if rule_key not in seen_rules:
+                seen_rules.add(rule_key)
+                new_rules[rule_key] = rule_payload
+        rows.append(
+            finding_row_values(upload_job_id, user_id, raw, normalized, key, lean, rule_key, signature)
+        )
+    # Rules before findings: findings.rule_key references finding_rules.
+    insert_finding_rules(db, upload_job_id, new_rules)
+    stmt = insert(Finding).values(rows)
+    if replace:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["upload_job_id", "dedupe_key"],
+            set_={column: stmt.excluded[column] for column in _REPLACED_COLUMNS},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["upload_job_id", "dedupe_key"])
+    returned = db.execute(stmt.returning(Finding.id, Finding.dedupe_key)).all()
+    # RETURNING order is not guaranteed by Postgres; map back through the dedupe key.
+    returned.sort(key=lambda r: order[r[1]])
+    return [r[0] for r in returned]
@@ -0,0 +1,143 @@
+"""Per-job shared rule metadata: split it out of raw_payload on ingest, rebuild the full payload on read.
+
+SARIF results embed their rule's descriptor and properties, and Semgrep results embed
+extra.metadata. Both are identical for every finding of a rule. On ingest that part is stored
+once per job in finding_rules and findings keep a lean raw_payload plus rule_key. Readers that
+need the original payload (signatures, embedding text) call expand_raw_payload, which merges
+the two lazily and caches the result on the finding.
+"""
+
+import hashlib
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, object_session
+
+from app.models import FindingRule
+
+# Non-column attributes set on loaded Finding instances.
+_RULE_PAYLOAD_ATTR = "_rule_payload"
+_EXPANDED_PAYLOAD_ATTR = "_expanded_raw_payload"
+# Session.info key for rule payloads fetched lazily: {(upload_job_id, rule_key): payload}.
+_SESSION_CACHE_KEY = "finding_rule_payloads"
+
+
+def split_rule_payload(raw_payload: dict | None) -> tuple[dict | None, dict | None]:
+    """
+    Split raw_payload into (per-result payload, shared rule payload).
+
+    - SARIF (has _sarif_result): rule descriptor/properties at the root are shared.
+    - Semgrep (extra.metadata): the metadata object is shared.
+    Other payloads are returned unchanged with no rule payload.
+    """
+    if not isinstance(raw_payload, dict):
+        return raw_payload, None
+    if "_sarif_result" in raw_payload:
+        rule = {k: v for k, v in raw_payload.items() if k != "_sarif_result"}
+        if not rule:
+            return raw_payload, None
+        return {"_sarif_result": raw_payload["_sarif_result"]}, rule
+    extra = raw_payload.get("extra")
+    if isinstance(extra, dict) and isinstance(extra.get("metadata"), dict) and extra["metadata"]:
+        lean = dict(raw_payload)
+        lean["extra"] = {k: v for k, v in extra.items() if k != "metadata"}
+        return lean, {"extra": {"metadata": extra["metadata"]}}
+    return raw_payload, None
+
+
+def rule_payload_key(rule_payload: dict) -> str:
+    """SHA-256 hex digest of the canonical JSON of a rule payload (finding_rules.rule_key)."""
+    canonical = json.dumps(rule_payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def merge_rule_payload(lean: dict | None, rule_payload: dict | None) -> dict | None:
+    """Inverse of split_rule_payload: rule payload overlaid by the per-result payload."""
+    if not rule_payload:
+        return lean
+    if not isinstance(lean, dict):
+        return dict(rule_payload)
+    merged = dict(rule_payload)
+    for key, value in lean.items():
+        base = merged.get(key)
+        if isinstance(base, dict) and isinstance(value, dict):
+            merged[key] = merge_rule_payload(value, base)
+        else:
+            merged[key] = value
+    return merged
+
+
+def insert_finding_rules(db: Session, upload_job_id: int, rules: dict[str, dict]) -> None:
+    """Insert rule payloads by key for a job; keys already stored are left as they are."""
+    if not rules:
+        return
+    stmt = (
+        insert(FindingRule)
+        .values(
+            [
+                {"upload_job_id": upload_job_id, "rule_key": key, "rule_payload": payload}
+                for key, payload in rules.items()
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["upload_job_id", "rule_key"])
+    )
+    db.execute(stmt)
+
+
+def attach_rule_payloads(db: Session, findings: Iterable[Any]) -> None:
+    """
+    Prefetch the shared rule payloads of findings' jobs in one query and attach them, so
+    expand_raw_payload needs no further queries. Findings without rule_key are skipped.
+    """
+    pending = [f for f in findings if isinstance(getattr(f, "rule_key", None), str)]
+    if not pending:
+        return
+    job_ids = {f.upload_job_id for f in pending}
+    rows = (
+        db.query(FindingRule.upload_job_id, FindingRule.rule_key, FindingRule.rule_payload)
+        .filter(FindingRule.upload_job_id.in_(job_ids))
+        .all()
+    )
+    payloads = {(job_id, key): payload for job_id, key, payload in rows}
+    for f in pending:
+        setattr(f, _RULE_PAYLOAD_ATTR, payloads.get((f.upload_job_id, f.rule_key)))
+
+
+def _lookup_rule_payload(finding: Any) -> dict | None:
+    """Rule payload for a finding not covered by attach_rule_payloads (one query per rule, cached per session)."""
+    session = object_session(finding)
+    if session is None:
+        return None
+    cache: dict = session.info.setdefault(_SESSION_CACHE_KEY, {})
+    key = (finding.upload_job_id, finding.rule_key)
+    if key not in cache:
+        cache[key] = (
+            session.query(FindingRule.rule_payload)
+            .filter(
+                FindingRule.upload_job_id == finding.upload_job_id,
+                FindingRule.rule_key == finding.rule_key,
+            )
+            .scalar()
+        )
+    return cache[key]
+
+
+def expand_raw_payload(finding: Any) -> dict | None:
+    """
+    Full raw_payload of a finding: its lean payload merged with the job's shared rule payload.
+    Rebuilt on first use and cached on the instance; findings without rule_key return raw_payload.
+    """
+    raw = getattr(finding, "raw_payload", None)
+    if not isinstance(getattr(finding, "rule_key", None), str):
+        return raw
+    expanded = finding.__dict__.get(_EXPANDED_PAYLOAD_ATTR)
+    if expanded is None:
+        if _RULE_PAYLOAD_ATTR in finding.__dict__:
+            rule_payload = finding.__dict__[_RULE_PAYLOAD_ATTR]
+        else:
+            rule_payload = _lookup_rule_payload(finding)
+        expanded = merge_rule_payload(raw, rule_payload)
+        setattr(finding, _EXPANDED_PAYLOAD_ATTR, expanded)
+    return expanded
@@ -0,0 +1,388 @@
+"""Ingest pipeline: validate report items as RawFinding, normalize, and bulk-persist per upload job."""
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import Any, BinaryIO
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import UploadJob
+from app.schemas.findings import NormalizedFinding, RawFinding
+from app.services.delta_ingest import DeltaIngest
+from app.services.finding_persistence import insert_findings_bulk
+from app.services.normalize import RuleIdsMemo, canonical_key_digest, normalize_finding
+from app.services.report_stream import (
+    ReportEncodingError,
+    ReportFormatError,
+    ReportTooLargeError,
+    iter_report_items,
+)
+from app.services.scanner_mappers import (
+    DETECTION_SAMPLE_SIZE,
+    ItemMapper,
+    normalize_shape_to_rawfinding,
+    select_report_mapper,
+)
+
+# Called after each persisted chunk with (items processed so far, findings persisted so far).
+ProgressCallback = Callable[[int, int], None]
+
+FindingPair = tuple[RawFinding, NormalizedFinding]
+
+# Shards in flight per worker process; bounds memory while keeping workers busy.
+_SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+_NORMALIZE_POOL: ProcessPoolExecutor | None = None
+_NORMALIZE_POOL_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ReportFile:
+    """One report of a batch upload, spooled to disk as received (possibly compressed)."""
+
+    name: str
+    path: str
+    encoding: str | None = None
+
+
+class IngestValidationError(Exception):
+    """Raised when a report or one of its items cannot be ingested. detail is API-ready (str or list)."""
+
+    def __init__(self, detail: Any) -> None:
+        self.detail = detail
+        super().__init__(detail if isinstance(detail, str) else "Finding validation failed")
+
+    def __reduce__(self) -> tuple:
+        # Keep detail intact when raised in a normalization worker process.
+        return (type(self), (self.detail,))
+
+
+def _validate_item(
+    index: int,
+    raw_item: Any,
+    mapper: ItemMapper = normalize_shape_to_rawfinding,
+) -> RawFinding:
+    """Map one report item to RawFinding shape and validate; errors carry the item index."""
+    if not isinstance(raw_item, dict):
+        raise IngestValidationError(f"Finding at index {index} must be an object.")
+    try:
+        return RawFinding.model_validate(mapper(raw_item))
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        raise IngestValidationError(
+            [{**err, "loc": (index, *err["loc"])} for err in errors]
+        ) from e
+
+
+def iter_validated_findings(items: Iterable[Any]) -> Iterator[RawFinding]:
+    """Map each item to RawFinding shape and validate; IngestValidationError carries the item index."""
+    for i, raw_item in enumerate(items):
+        yield _validate_item(i, raw_item)
+
+
+def _normalize_shard(start: int, items: list[Any], mapper: ItemMapper) -> list[FindingPair]:
+    """Validate and normalize one shard; start is the index of items[0] in the report."""
+    pairs: list[FindingPair] = []
+    rule_ids_memo: RuleIdsMemo = {}
+    for offset, raw_item in enumerate(items):
+        raw = _validate_item(start + offset, raw_item, mapper)
+        pairs.append((raw, normalize_finding(raw, rule_ids_memo)))
+    return pairs
+
+
+def _normalize_worker_count() -> int:
+    """INGEST_PARALLEL_WORKERS, or the CPU count when unset (0)."""
+    return get_settings().INGEST_PARALLEL_WORKERS or os.cpu_count() or 1
+
+
+def _get_normalize_pool() -> ProcessPoolExecutor:
+    """Return the process-wide normalization pool, creating it on first use."""
+    global _NORMALIZE_POOL
+    with _NORMALIZE_POOL_LOCK:
+        if _NORMALIZE_POOL is None:
+            # spawn: the API process runs threads (ingest workers), which fork does not survive.
+            _NORMALIZE_POOL = ProcessPoolExecutor(
+                max_workers=_normalize_worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _NORMALIZE_POOL
+
+
+def shutdown_normalize_pool(wait: bool = True) -> None:
+    """Stop the normalization worker processes. Called on app shutdown."""
+    global _NORMALIZE_POOL
+    with _NORMALIZE_POOL_LOCK:
+        pool, _NORMALIZE_POOL = _NORMALIZE_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _iter_normalized_parallel(
+    items: Iterator[Any],
+    shard_size: int,
+    mapper: ItemMapper,
+) -> Iterator[FindingPair]:
+    """
+    Shard items across the process pool and yield pairs in report order.
+    At most a few shards per worker are in flight, so large streams stay bounded in memory.
+    """
+    pool = _get_normalize_pool()
+    max_in_flight = _normalize_worker_count() * _SHARDS_IN_FLIGHT_PER_WORKER
+    pending: deque[Future[list[FindingPair]]] = deque()
+    start = 0
+    try:
+        while True:
+            while len(pending) < max_in_flight and (shard := list(islice(items, shard_size))):
+                pending.append(pool.submit(_normalize_shard, start, shard, mapper))
+                start += len(shard)
+            if not pending:
+                return
+            # Results are consumed in submission order, so the first failing index is reported.
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def iter_normalized_findings(items: Iterable[Any], *, parallel: bool = True) -> Iterator[FindingPair]:
+    """
+    Validate and normalize report items to (RawFinding, NormalizedFinding) pairs, in order.
+
+    The scanner format is detected once from the leading items and the matching mapper is
+    applied to every item still of that format (others are detected individually). Reports with at least INGEST_PARALLEL_MIN_ITEMS items are sharded
+    across a process pool (INGEST_PARALLEL_WORKERS); smaller ones run inline, where process
+    overhead would dominate (or always when parallel is False). Validation errors report the
+    item's index in the original report either way.
+    """
+    settings = get_settings()
+    threshold = settings.INGEST_PARALLEL_MIN_ITEMS if parallel else 0
+    it = iter(items)
+    head = list(islice(it, max(threshold, DETECTION_SAMPLE_SIZE)))
+    mapper = select_report_mapper(head[:DETECTION_SAMPLE_SIZE])
+    if threshold and len(head) >= threshold:
+        yield from _iter_normalized_parallel(
+            chain(head, it), settings.UPLOAD_INGEST_CHUNK_SIZE, mapper
+        )
+        return
+    rule_ids_memo: RuleIdsMemo = {}
+    for i, raw_item in enumerate(chain(head, it)):
+        raw = _validate_item(i, raw_item, mapper)
+        yield raw, normalize_finding(raw, rule_ids_memo)
+
+
+def iter_report_findings(
+    fp: BinaryIO,
+    *,
+    encoding: str | None = None,
+    parallel: bool = True,
+) -> Iterator[FindingPair]:
+    """
+    Stream validated, normalized findings from a report file without loading it whole.
+    Enforces UPLOAD_MAX_FILE_BYTES while reading (UPLOAD_MAX_DECOMPRESSED_BYTES on the
+    decompressed bytes when encoding is 'gzip' or 'zstd'); no findings cap.
+    """
+    yield from iter_normalized_findings(_iter_report_file_items(fp, encoding), parallel=parallel)
+
+
+def _iter_report_file_items(fp: BinaryIO, encoding: str | None) -> Iterator[Any]:
+    """Raw items of a report file within the size limits; read errors become IngestValidationError."""
+    settings = get_settings()
+    if encoding is None:
+        max_bytes = settings.UPLOAD_MAX_FILE_BYTES or None
+        too_large = "File size must not exceed {} MB."
+    else:
+        max_bytes = settings.UPLOAD_MAX_DECOMPRESSED_BYTES or None
+        too_large = "Decompressed report size must not exceed {} MB."
+    try:
+        yield from iter_report_items(fp, encoding=encoding, max_bytes=max_bytes)
+    except ReportTooLargeError as e:
+        raise IngestValidationError(too_large.format(e.max_bytes // (1024*1024))) from e
+    except ReportEncodingError as e:
+        raise IngestValidationError(f"Invalid compressed file: {e!s}") from e
+    except ReportFormatError as e:
+        raise IngestValidationError(f"Invalid JSON in file: {e!s}") from e
+
+
+def _iter_report_file(report: ReportFile, *, parallel: bool = True) -> Iterator[FindingPair]:
+    """Stream findings from one spooled report file."""
+    with open(report.path, "rb") as fp:
+        yield from iter_report_findings(fp, encoding=report.encoding, parallel=parallel)
+
+
+def _report_error(report: ReportFile, error: IngestValidationError) -> IngestValidationError:
+    """Re-raise a report's validation error with the report name in the message or loc."""
+    detail = error.detail
+    if isinstance(detail, str):
+        return IngestValidationError(f"{report.name}: {detail}")
+    return IngestValidationError([{**err, "loc": (report.name, *err["loc"])} for err in detail])
+
+
+ReportShard = tuple[ReportFile, int, list[Any], ItemMapper]
+
+
+def _iter_report_shards(reports: list[ReportFile], shard_size: int) -> Iterator[ReportShard]:
+    """
+    Stream each report's items in shards of at most shard_size (report, index of the
+    first item, items, the report's mapper); shards never span reports. Read errors name
+    the report.
+    """
+    for report in reports:
+        try:
+            with open(report.path, "rb") as fp:
+                items = _iter_report_file_items(fp, report.encoding)
+                head = list(islice(items, DETECTION_SAMPLE_SIZE))
+                mapper = select_report_mapper(head)
+                it = chain(head, items)
+                start = 0
+                while shard := list(islice(it, shard_size)):
+                    yield report, start, shard, mapper
+                    start += len(shard)
+        except IngestValidationError as e:
+            raise _report_error(report, e) from e
+
+
+def _iter_reports_parallel(reports: list[ReportFile]) -> Iterator[FindingPair]:
+    """
+    Normalize reports on the process pool in shards of UPLOAD_INGEST_CHUNK_SIZE items and
+    yield their pairs in report order. Reports are read here one after another; at most a
+    few shards per worker are in flight across all reports, so memory stays bounded by
+    shards, not report sizes, and small reports are still processed concurrently. Errors
+    are raised in report order: a read error is held until earlier shards are consumed.
+    """
+    pool = _get_normalize_pool()
+    max_in_flight = _normalize_worker_count() * _SHARDS_IN_FLIGHT_PER_WORKER
+    shards = _iter_report_shards(reports, get_settings().UPLOAD_INGEST_CHUNK_SIZE)
+    pending: deque[tuple[ReportFile, Future[list[FindingPair]]]] = deque()
+    read_error: IngestValidationError | None = None
+    try:
+        while True:
+            while read_error is None and len(pending) < max_in_flight:
+                try:
+                    shard = next(shards, None)
+                except IngestValidationError as e:
+                    read_error = e
+                    break
+                if shard is None:
+                    break
+                report, start, items, mapper = shard
+                pending.append((report, pool.submit(_normalize_shard, start, items, mapper)))
+            if not pending:
+                if read_error is not None:
+                    raise read_error
+                return
+            report, future = pending.popleft()
+            try:
+                pairs = future.result()
+            except IngestValidationError as e:
+                raise _report_error(report, e) from e
+            yield from pairs
+    finally:
+        for _, future in pending:
+            future.cancel()
+        shards.close()
+
+
+def iter_batch_findings(reports: list[ReportFile]) -> Iterator[FindingPair]:
+    """
+    Validate and normalize several spooled reports into one stream of pairs, report by
+    report in the given order. Each report's format (SARIF, OSV-Scanner, Trivy, Semgrep,
+    flat array) is detected on its own. With more than one report and INGEST_PARALLEL_MIN_ITEMS
+    set, reports are sharded across the normalization process pool (see _iter_reports_parallel). Validation
+    errors name the report: "<name>: ..." or loc (name, index, ...).
+    """
+    if len(reports) > 1 and get_settings().INGEST_PARALLEL_MIN_ITEMS:
+        yield from _iter_reports_parallel(reports)
+        return
+    for report in reports:
+        try:
+            yield from _iter_report_file(report)
+        except IngestValidationError as e:
+            raise _report_error(report, e) from e
+
+
+def _chunked(iterable: Iterable[FindingPair], size: int) -> Iterator[list[FindingPair]]:
+    """Yield successive lists of at most size items."""
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _first_occurrences(chunk: list[FindingPair], seen_keys: set[str]) -> list[FindingPair]:
+    """Pairs of chunk whose canonical key is not in seen_keys (which is updated)."""
+    out: list[FindingPair] = []
+    for raw, normalized in chunk:
+        key = canonical_key_digest(normalized)
+        if key not in seen_keys:
+            seen_keys.add(key)
+            out.append((raw, normalized))
+    return out
+
+
+def persist_findings(
+    db: Session,
+    upload_job: UploadJob,
+    pairs: Iterable[FindingPair],
+    *,
+    on_progress: ProgressCallback | None = None,
+    delta: bool = False,
+    replace: bool = False,
+) -> list[int]:
+    """
+    Bulk-insert (raw, normalized) pairs in chunks of UPLOAD_INGEST_CHUNK_SIZE.
+
+    Each chunk is one multi-row INSERT; duplicates (by canonical key) are dropped by the
+    database via findings.dedupe_key. Does not commit. Returns finding ids in insertion order.
+    Records the job's distinct repos on upload_job.repos and bumps upload_job.findings_version
+    so clusters cached for the job are rebuilt.
+
+    With delta=True, findings already present in the previous scan of their repo are
+    referenced instead of inserted and findings gone since are marked resolved (see
+    delta_ingest); returned ids then include the referenced findings.
+
+    With replace=True (re-processing; not combined with delta) the job's existing findings
+    with the same canonical key are updated in place and keep their ids; the first
+    occurrence of a key in the report wins, as on a first ingest.
+    """
+    chunk_size = get_settings().UPLOAD_INGEST_CHUNK_SIZE
+    delta_ingest = DeltaIngest(db, upload_job) if delta else None
+    ids: list[int] = []
+    processed = 0
+    rule_keys: set[str] = set()
+    repos: set[str] = set()
+    seen_keys: set[str] = set()
+    for chunk in _chunked(pairs, chunk_size):
+        processed += len(chunk)
+        repos.update(normalized.repo for _, normalized in chunk)
+        if delta_ingest is not None:
+            ids.extend(delta_ingest.insert_chunk(chunk, known_rule_keys=rule_keys))
+        else:
+            if replace:
+                chunk = _first_occurrences(chunk, seen_keys)
+            ids.extend(
+                insert_findings_bulk(
+                    db,
+                    upload_job.id,
+                    upload_job.user_id,
+                    chunk,
+                    known_rule_keys=rule_keys,
+                    replace=replace,
+                )
+            )
+        if on_progress is not None:
+            on_progress(processed, len(ids))
+    if delta_ingest is not None:
+        upload_job.unchanged_count = delta_ingest.unchanged_count
+        upload_job.resolved_count = delta_ingest.mark_resolved()
+    upload_job.repos = sorted(repos)
+    upload_job.processed_count = processed
+    upload_job.accepted_count = len(ids)
+    upload_job.findings_version = (upload_job.findings_version or 0) + 1
+    return ids
@@ -0,0 +1,430 @@
+"""Background ingest: spool uploaded reports to disk and process them on an in-process worker pool.
+
+POST /upload?background=true (and /upload/batch?background=true) stores the raw reports under
+INGEST_SPOOL_DIR, creates a pending UploadJob and submits it here. Workers run the same streaming pipeline as synchronous uploads
+and move the job through pending -> processing -> completed | failed, publishing progress
+counts as each chunk is persisted. Re-processing of archived jobs (POST /upload-jobs/reprocess)
+runs on the same pool.
+
+Each process heartbeats the jobs it owns (queued or running) by refreshing updated_at. Jobs
+left pending/processing without a heartbeat for INGEST_JOB_STALE_SECONDS (the process crashed,
+or shut down with the job still queued) are recovered by a maintenance thread in any process:
+re-queued from their spooled reports, or from the archived report (RAW_BLOB_DIR) once the
+spool is gone, else marked failed. Spool files no job refers to are removed.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.models import UploadJob
+from app.services.blob_store import BlobNotFoundError, archive_report_files, open_archived_reports
+from app.services.ingest import (
+    IngestValidationError,
+    ProgressCallback,
+    ReportFile,
+    iter_batch_findings,
+    iter_report_findings,
+    persist_findings,
+)
+from app.services.reprocess import run_reprocess_job
+
+logger = logging.getLogger(__name__)
+
+# Max length of the failure detail stored on the job.
+_MAX_ERROR_DETAIL_LEN = 4000
+
+# Statuses of background jobs owned by a worker (heartbeated, recovered when stale).
+_LIVE_STATUSES = ("pending", "processing")
+
+_INTERRUPTED_DETAIL = (
+    "Ingest was interrupted and the report is no longer available; upload it again."
+)
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+# Background jobs this process has queued or is running; heartbeated by the maintenance thread.
+_ACTIVE_JOBS: set[int] = set()
+_MAINTENANCE: threading.Thread | None = None
+_MAINTENANCE_STOP = threading.Event()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide worker pool, creating it on first use."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=get_settings().INGEST_WORKER_CONCURRENCY,
+                thread_name_prefix="helion-ingest",
+            )
+        return _EXECUTOR
+
+
+def shutdown_ingest_workers(wait: bool = True) -> None:
+    """
+    Stop accepting work and (optionally) wait for running jobs. Called on app shutdown.
+    Jobs that were still queued are released for immediate recovery on the next start.
+    """
+    global _EXECUTOR, _MAINTENANCE
+    with _EXECUTOR_LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+        maintenance, _MAINTENANCE = _MAINTENANCE, None
+    _MAINTENANCE_STOP.set()
+    if maintenance is not None:
+        maintenance.join()
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+    if wait:
+        with _EXECUTOR_LOCK:
+            cancelled = sorted(_ACTIVE_JOBS)
+            _ACTIVE_JOBS.clear()
+        if cancelled:
+            _release_jobs(cancelled)
+
+
+def start_ingest_maintenance() -> None:
+    """
+    Start the maintenance thread: recover interrupted jobs now, then every fifth of
+    INGEST_JOB_STALE_SECONDS heartbeat this process's jobs, recover stale ones and remove
+    orphaned spool files. Called on app startup.
+    """
+    global _MAINTENANCE
+    with _EXECUTOR_LOCK:
+        if _MAINTENANCE is not None:
+            return
+        _MAINTENANCE_STOP.clear()
+        _MAINTENANCE = threading.Thread(
+            target=_maintenance_loop, name="helion-ingest-maintenance", daemon=True
+        )
+        _MAINTENANCE.start()
+
+
+def _maintenance_loop() -> None:
+    interval = max(1, get_settings().INGEST_JOB_STALE_SECONDS // 5)
+    while True:
+        try:
+            _heartbeat()
+            recover_interrupted_jobs()
+            sweep_orphaned_spool_files()
+        except Exception:
+            logger.exception("Ingest maintenance failed")
+        if _MAINTENANCE_STOP.wait(interval):
+            return
+
+
+def spool_dir() -> Path:
+    """INGEST_SPOOL_DIR (system temp dir by default), created if missing."""
+    base = get_settings().INGEST_SPOOL_DIR or str(Path(tempfile.gettempdir()) / "helion-ingest")
+    path = Path(base)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def new_spool_path() -> Path:
+    """Return a fresh path under INGEST_SPOOL_DIR (system temp dir by default) for a raw report."""
+    return spool_dir() / f"{uuid.uuid4().hex}.report"
+
+
+def _update_job(upload_job_id: int, **values: object) -> None:
+    """Write job status/progress in its own short transaction so pollers see it immediately."""
+    db = SessionLocal()
+    try:
+        db.query(UploadJob).filter(UploadJob.id == upload_job_id).update(
+            {**values, "updated_at": func.now()}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _error_detail(detail: object) -> str:
+    """Serialize an ingest error detail (str or validation error list) for storage."""
+    text = detail if isinstance(detail, str) else json.dumps(detail, default=str)
+    return text[:_MAX_ERROR_DETAIL_LEN]
+
+
+def _run_job(
+    upload_job_id: int,
+    reports: list[ReportFile],
+    ingest: Callable[[Session, UploadJob, ProgressCallback], None],
+    from_archive: bool = False,
+) -> None:
+    """
+    Archive the spooled reports (RAW_BLOB_DIR), run ingest(db, job, on_progress) for a job
+    and finalize its status. Findings are written in one transaction, so a failed job leaves
+    no partial findings; its archived report is kept for re-processing. The spooled files
+    are removed when done; with from_archive the reports are the job's archived ones and
+    are neither archived again nor removed.
+    """
+    db = SessionLocal()
+    try:
+        upload_job = db.get(UploadJob, upload_job_id)
+        if upload_job is None:
+            logger.warning("Ingest job %s no longer exists; skipping", upload_job_id)
+            return
+        if from_archive:
+            _update_job(upload_job_id, status="processing")
+        else:
+            _update_job(
+                upload_job_id, status="processing", raw_blob_ref=archive_report_files(reports)
+            )
+
+        def on_progress(processed: int, accepted: int) -> None:
+            _update_job(upload_job_id, processed_count=processed, accepted_count=accepted)
+
+        ingest(db, upload_job, on_progress)
+        upload_job.status = "completed"
+        upload_job.spool_ref = None
+        db.commit()
+    except IngestValidationError as e:
+        db.rollback()
+        _update_job(
+            upload_job_id,
+            status="failed",
+            error_detail=_error_detail(e.detail),
+            spool_ref=None,
+        )
+    except Exception as e:
+        db.rollback()
+        logger.exception("Ingest job %s failed", upload_job_id)
+        _update_job(
+            upload_job_id,
+            status="failed",
+            error_detail=_error_detail(f"Internal error: {e!s}"),
+            spool_ref=None,
+        )
+    finally:
+        db.close()
+        with _EXECUTOR_LOCK:
+            _ACTIVE_JOBS.discard(upload_job_id)
+        if not from_archive:
+            for report in reports:
+                Path(report.path).unlink(missing_ok=True)
+
+
+def run_ingest_job(
+    upload_job_id: int,
+    report_path: str,
+    encoding: str | None = None,
+    delta: bool = False,
+) -> None:
+    """
+    Worker body: parse the spooled report (decompressing it if encoding is set), persist
+    findings (as a delta against the previous scan if delta is set), and finalize the job status.
+    """
+
+    def ingest(db: Session, upload_job: UploadJob, on_progress: ProgressCallback) -> None:
+        with open(report_path, "rb") as fp:
+            pairs = iter_report_findings(fp, encoding=encoding)
+            persist_findings(db, upload_job, pairs, on_progress=on_progress, delta=delta)
+
+    _run_job(upload_job_id, [ReportFile("report", report_path, encoding)], ingest)
+
+
+def run_batch_ingest_job(
+    upload_job_id: int,
+    reports: list[ReportFile],
+    delta: bool = False,
+    from_archive: bool = False,
+) -> None:
+    """Worker body for batch uploads: ingest every spooled (or archived) report into the one job."""
+
+    def ingest(db: Session, upload_job: UploadJob, on_progress: ProgressCallback) -> None:
+        pairs = iter_batch_findings(reports)
+        persist_findings(db, upload_job, pairs, on_progress=on_progress, delta=delta)
+
+    _run_job(upload_job_id, reports, ingest, from_archive)
+
+
+def _queue_job(
+    upload_job_id: int,
+    reports: list[ReportFile],
+    delta: bool,
+    fn: Callable[..., None],
+    *args: object,
+) -> None:
+    """Record the job's spooled reports and mode (for recovery), then queue fn(*args)."""
+    with _EXECUTOR_LOCK:
+        _ACTIVE_JOBS.add(upload_job_id)
+    _update_job(upload_job_id, spool_ref=_spool_ref(reports), delta=delta)
+    _get_executor().submit(fn, *args)
+
+
+def submit_ingest_job(
+    upload_job_id: int,
+    report_path: str,
+    encoding: str | None = None,
+    delta: bool = False,
+) -> None:
+    """Queue a spooled report (stored as uploaded, possibly compressed) for background ingest."""
+    reports = [ReportFile("report", report_path, encoding)]
+    _queue_job(
+        upload_job_id, reports, delta, run_ingest_job, upload_job_id, report_path, encoding, delta
+    )
+
+
+def submit_batch_ingest_job(upload_job_id: int, reports: list[ReportFile], delta: bool = False) -> None:
+    """Queue spooled batch reports for background ingest into one job."""
+    _queue_job(upload_job_id, reports, delta, run_batch_ingest_job, upload_job_id, reports, delta)
+
+
+def submit_reprocess_job(upload_job_id: int) -> None:
+    """Queue re-processing of an archived job (see reprocess.run_reprocess_job)."""
+    _get_executor().submit(run_reprocess_job, upload_job_id)
+
+
+def _spool_ref(reports: list[ReportFile]) -> str:
+    """UploadJob.spool_ref for spooled reports."""
+    return json.dumps([[r.name, r.path, r.encoding] for r in reports])
+
+
+def _spooled_reports(spool_ref: str | None) -> list[ReportFile] | None:
+    """Reports listed in spool_ref, or None when there are none or any file is gone."""
+    if not spool_ref:
+        return None
+    try:
+        reports = [ReportFile(name, path, encoding) for name, path, encoding in json.loads(spool_ref)]
+    except (ValueError, TypeError):
+        return None
+    if not reports or not all(os.path.isfile(r.path) for r in reports):
+        return None
+    return reports
+
+
+def _heartbeat() -> None:
+    """Refresh updated_at of the jobs this process has queued or is running."""
+    with _EXECUTOR_LOCK:
+        ids = sorted(_ACTIVE_JOBS)
+    if not ids:
+        return
+    db = SessionLocal()
+    try:
+        db.query(UploadJob).filter(
+            UploadJob.id.in_(ids), UploadJob.status.in_(_LIVE_STATUSES)
+        ).update({"updated_at": func.now()}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _release_jobs(upload_job_ids: list[int]) -> None:
+    """Mark queued jobs this process will not run as stale, so recovery picks them up at once."""
+    db = SessionLocal()
+    try:
+        db.query(UploadJob).filter(
+            UploadJob.id.in_(upload_job_ids), UploadJob.status.in_(_LIVE_STATUSES)
+        ).update(
+            {"updated_at": datetime(1970, 1, 1, tzinfo=timezone.utc)}, synchronize_session=False
+        )
+        db.commit()
+    except Exception:
+        logger.exception("Could not release queued ingest jobs %s", upload_job_ids)
+    finally:
+        db.close()
+
+
+def recover_interrupted_jobs() -> int:
+    """
+    Claim pending/processing jobs without a heartbeat for INGEST_JOB_STALE_SECONDS and
+    re-queue them from their spooled reports (or their archived report), resetting progress;
+    jobs with neither are marked failed. The claim is one UPDATE, so when several processes
+    recover at once each job goes to one of them. Returns the number of jobs recovered.
+    """
+    stale = timedelta(seconds=get_settings().INGEST_JOB_STALE_SECONDS)
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            update(UploadJob)
+            .where(
+                UploadJob.status.in_(_LIVE_STATUSES),
+                UploadJob.updated_at < datetime.now(timezone.utc) - stale,
+            )
+            .values(status="pending", processed_count=0, accepted_count=0, updated_at=func.now())
+            .returning(UploadJob.id, UploadJob.spool_ref, UploadJob.raw_blob_ref, UploadJob.delta)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+    finally:
+        db.close()
+    for upload_job_id, spool_ref, raw_blob_ref, delta in claimed:
+        _resume_job(upload_job_id, spool_ref, raw_blob_ref, delta)
+    return len(claimed)
+
+
+def _resume_job(
+    upload_job_id: int,
+    spool_ref: str | None,
+    raw_blob_ref: str | None,
+    delta: bool,
+) -> None:
+    """Re-queue a claimed job from its spool, else from the archive, else fail it."""
+    reports = _spooled_reports(spool_ref)
+    from_archive = False
+    if reports is None and raw_blob_ref:
+        try:
+            reports = open_archived_reports(raw_blob_ref)
+            from_archive = True
+        except BlobNotFoundError:
+            reports = None
+    if reports is None:
+        logger.warning("Interrupted ingest job %s has no report left; marking it failed", upload_job_id)
+        _update_job(upload_job_id, status="failed", error_detail=_INTERRUPTED_DETAIL, spool_ref=None)
+        return
+    logger.info("Re-queueing interrupted ingest job %s", upload_job_id)
+    with _EXECUTOR_LOCK:
+        _ACTIVE_JOBS.add(upload_job_id)
+    _get_executor().submit(run_batch_ingest_job, upload_job_id, reports, delta, from_archive)
+
+
+def sweep_orphaned_spool_files() -> int:
+    """
+    Remove spooled reports (top level of the spool directory) that no pending/processing
+    job refers to and that were not written or renamed within INGEST_JOB_STALE_SECONDS, so
+    reports of requests still being accepted are kept. Returns the number of files removed.
+    """
+    db = SessionLocal()
+    try:
+        refs = [
+            row[0]
+            for row in db.query(UploadJob.spool_ref)
+            .filter(UploadJob.status.in_(_LIVE_STATUSES), UploadJob.spool_ref.isnot(None))
+            .all()
+        ]
+    finally:
+        db.close()
+    referenced: set[str] = set()
+    for ref in refs:
+        try:
+            referenced.update(str(Path(path)) for _, path, _ in json.loads(ref))
+        except (ValueError, TypeError):
+            continue
+    cutoff = time.time() - get_settings().INGEST_JOB_STALE_SECONDS
+    removed = 0
+    for path in spool_dir().glob("*.report"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        # ctime covers reports renamed into the spool (finalized upload sessions).
+        if str(path) in referenced or max(st.st_mtime, st.st_ctime) >= cutoff:
+            continue
+        path.unlink(missing_ok=True)
+        removed += 1
+    if removed:
+        logger.info("Removed %s orphaned spool files", removed)
+    return removed
@@ -3,9 +3,10 @@
 from collections import defaultdict
 from typing import Any
 
+from sqlalchemy import ColumnElement, func, or_, select
 from sqlalchemy.orm import Session
 
-from app.models import Finding, UploadJob
+from app.models import Finding, JobFindingRef, UploadJob
 from app.schemas.findings import (
     RULES_DISAGREEMENT_LIMIT,
     TOP_NOISY_RULES_LIMIT,
@@ -13,6 +14,7 @@ from app.schemas.findings import (
     RuleSeverityDisagreement,
     RuleSummary,
 )
+from app.services.finding_rules import attach_rule_payloads
 
 
 def get_user_upload_job_count(db: Session, user_id: int) -> int:
@@ -24,6 +26,42 @@ def get_user_upload_job_count(db: Session, user_id: int) -> int:
     )
 
 
+def job_findings_filter(job_id: int) -> ColumnElement[bool]:
+    """
+    SQL condition on Finding selecting a job's findings: its own rows plus findings of earlier
+    jobs it references as unchanged (delta uploads).
+    """
+    referenced = select(JobFindingRef.finding_id).where(
+        JobFindingRef.upload_job_id == job_id,
+        JobFindingRef.state == "unchanged",
+    )
+    return or_(Finding.upload_job_id == job_id, Finding.id.in_(referenced))
+
+
+def mark_findings_changed(db: Session, job_ids: Any) -> None:
+    """
+    Bump findings_version of the given jobs (a list of ids or a select of ids) after their
+    findings changed outside persist_findings, so clusters cached for them are rebuilt.
+    """
+    db.query(UploadJob).filter(UploadJob.id.in_(job_ids)).update(
+        {UploadJob.findings_version: UploadJob.findings_version + 1},
+        synchronize_session=False,
+    )
+
+
+def resolve_user_job_id(db: Session, user_id: int, job_id: int | None) -> int | None:
+    """job_id when set, else the id of the user's latest upload job (None if there is none)."""
+    if job_id is not None:
+        return job_id
+    return (
+        db.query(UploadJob.id)
+        .filter(UploadJob.user_id == user_id)
+        .order_by(UploadJob.created_at.desc())
+        .limit(1)
+        .scalar()
+    )
+
+
 def get_findings_for_user_job(
     db: Session,
     user_id: int,
@@ -35,13 +73,18 @@ def get_findings_for_user_job(
     - If job_id is set: return findings for that job (and enforce user_id).
     - If job_id is None: return findings for the user's latest job (by created_at).
     - If the user has no jobs or the specified job is not theirs, return empty list.
+
+    Delta jobs include the unchanged findings they reference from earlier jobs (those keep
+    their original upload_job_id). The job's shared rule payloads are attached so expand_raw_payload needs no extra queries.
     """
     if job_id is not None:
-        return (
+        findings = (
             db.query(Finding)
-            .filter(Finding.upload_job_id == job_id, Finding.user_id == user_id)
+            .filter(job_findings_filter(job_id), Finding.user_id == user_id)
             .all()
         )
+        attach_rule_payloads(db, findings)
+        return findings
     # Latest job for user
     latest = (
         db.query(UploadJob)
@@ -52,11 +95,13 @@ def get_findings_for_user_job(
     )
     if latest is None:
         return []
-    return (
+    findings = (
         db.query(Finding)
-        .filter(Finding.upload_job_id == latest.id, Finding.user_id == user_id)
+        .filter(job_findings_filter(latest.id), Finding.user_id == user_id)
         .all()
     )
+    attach_rule_payloads(db, findings)
+    return findings
 
 
 def _is_semgrep_finding(finding: Any) -> bool:
@@ -90,18 +135,7 @@ def summarize_rules(findings: list[Finding]) -> RuleSummary:
     if not semgrep_findings:
         return RuleSummary(top_noisy_rules=[], rules_with_severity_disagreement=[])
 
-    # Top noisy rules: group by rule_id (vulnerability_id), count, sort desc, cap
-    rule_counts: dict[str, int] = defaultdict(int)
-    for f in semgrep_findings:
-        rule_id = (getattr(f, "vulnerability_id", "") or "").strip()
-        if rule_id:
-            rule_counts[rule_id] += 1
-    top_noisy = sorted(
-        [RuleCount(rule_id=rid, count=c) for rid, c in rule_counts.items()],
-        key=lambda x: (-x.count, x.rule_id),
-    )[:TOP_NOISY_RULES_LIMIT]
-
-    # Severity disagreement: (rule_id, severity) -> count; then rule_id -> {severity: count}
+    # (rule_id, severity) -> count; then rule_id -> {severity: count}
     rule_severities: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
     for f in semgrep_findings:
         rule_id = (getattr(f, "vulnerability_id", "") or "").strip()
@@ -110,6 +144,41 @@ def summarize_rules(findings: list[Finding]) -> RuleSummary:
             continue
         sev_str = (str(sev).strip().lower()) if sev is not None else "unknown"
         rule_severities[rule_id][sev_str] += 1
+    return _rule_summary_from_counts(rule_severities)
+
+
+def summarize_job_rules(db: Session, user_id: int, job_id: int) -> RuleSummary:
+    """
+    summarize_rules for a job's findings, counted in SQL (GROUP BY rule id and severity)
+    instead of over loaded Finding rows.
+    """
+    rule_id = func.btrim(Finding.vulnerability_id)
+    severity = func.lower(func.btrim(Finding.severity))
+    rows = (
+        db.query(rule_id, severity, func.count())
+        .filter(
+            job_findings_filter(job_id),
+            Finding.user_id == user_id,
+            func.lower(func.btrim(Finding.scanner_source)) == "semgrep",
+            rule_id != "",
+        )
+        .group_by(rule_id, severity)
+        .all()
+    )
+    rule_severities: dict[str, dict[str, int]] = defaultdict(dict)
+    for rid, sev, count in rows:
+        rule_severities[rid][sev] = count
+    return _rule_summary_from_counts(rule_severities)
+
+
+def _rule_summary_from_counts(rule_severities: dict[str, dict[str, int]]) -> RuleSummary:
+    """Top noisy rules and severity disagreements from rule_id -> {severity: count}."""
+    # Top noisy rules: count per rule_id, sort desc, cap
+    top_noisy = sorted(
+        [RuleCount(rule_id=rid, count=sum(counts.values())) for rid, counts in rule_severities.items()],
+        key=lambda x: (-x.count, x.rule_id),
+    )[:TOP_NOISY_RULES_LIMIT]
+
     disagreement = [
         RuleSeverityDisagreement(rule_id=rid, severity_counts=dict(sev_counts))
         for rid, sev_counts in rule_severities.items()
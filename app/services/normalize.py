@@ -1,8 +1,10 @@
 """Normalize raw scanner findings to the unified internal representation."""
 
-import json
+import hashlib
 import re
-from typing import Literal
+from collections.abc import Iterable, Iterator
+from itertools import chain
+from typing import Any, Literal
 
 from app.schemas.findings import (
     NormalizedFinding,
@@ -54,9 +56,29 @@ _CVSS_TO_SEVERITY: list[tuple[tuple[float, float], SeverityLevel]] = [
 _CVE_PATTERN = re.compile(r"CVE-\d{4}-\d{4,}", re.IGNORECASE)
 # GHSA: GHSA-xxxx-xxxx-xxxx (4 alphanumeric groups).
 _GHSA_PATTERN = re.compile(r"GHSA-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{4}", re.IGNORECASE)
+# Either id in one pass; used for extraction from payload text.
+_VULN_ID_PATTERN = re.compile(
+    rf"{_CVE_PATTERN.pattern}|{_GHSA_PATTERN.pattern}", re.IGNORECASE
+)
 
 MAX_VULN_ID_LENGTH = 255
 
+# raw_payload fields that carry advisory ids or links (OSV aliases, Snyk identifiers,
+# Trivy References/VendorIDs, generic references). Only these are searched, never the whole payload.
+_PAYLOAD_ID_FIELDS = (
+    "aliases", "cve", "cves", "cve_id", "ghsa_id", "identifiers", "references", "related",
+    "PrimaryURL", "References", "VendorIDs",
+)
+# Rule-level metadata fields (Semgrep extra.metadata, SARIF rule + properties) searched per rule.
+_RULE_ID_FIELDS = _PAYLOAD_ID_FIELDS + (
+    "tags", "helpUri", "shortDescription", "fullDescription", "source-rule-url",
+)
+# Nesting depth walked inside one field (e.g. references[].url, identifiers.CVE[]).
+_MAX_ID_FIELD_DEPTH = 4
+# Per-report memo of rule-level ids by (scanner_source, rule id); cleared when full.
+RuleIdsMemo = dict[tuple[str, str], tuple[str | None, str | None]]
+_RULE_IDS_MEMO_MAX = 4096
+
 
 def normalize_severity(raw_severity: str | None, raw_cvss: float | None) -> SeverityLevel:
     """
@@ -117,23 +139,121 @@ def _is_cve_or_ghsa_like(value: str | None) -> bool:
     """True if value looks like a CVE or GHSA id (so we don't overwrite it)."""
     if not value or not value.strip():
         return False
-    return _CVE_PATTERN.fullmatch(value.strip()) is not None or _GHSA_PATTERN.fullmatch(value.strip()) is not None
+    return _VULN_ID_PATTERN.fullmatch(value.strip()) is not None
+
+
+def _iter_strings(value: Any, depth: int = 0) -> Iterator[str]:
+    """Yield string leaves of a JSON-like value (dict values, list items) up to a bounded depth."""
+    if isinstance(value, str):
+        yield value
+    elif depth < _MAX_ID_FIELD_DEPTH:
+        if isinstance(value, dict):
+            value = value.values()
+        elif not isinstance(value, list):
+            return
+        for item in value:
+            yield from _iter_strings(item, depth + 1)
+
+
+def _iter_field_strings(container: dict, fields: tuple[str, ...]) -> Iterator[str]:
+    """Yield string leaves of the given fields of container."""
+    for field in fields:
+        value = container.get(field)
+        if value is not None:
+            yield from _iter_strings(value)
+
+
+def _first_vuln_ids(texts: Iterable[str]) -> tuple[str | None, str | None]:
+    """
+    Scan texts in order with the combined pattern; return (first CVE, first GHSA).
+    Stops at the first CVE, since a CVE is preferred over any GHSA.
+    """
+    ghsa: str | None = None
+    for text in texts:
+        for match in _VULN_ID_PATTERN.finditer(text):
+            value = match.group(0)
+            if len(value) > MAX_VULN_ID_LENGTH:
+                continue
+            if value[:3].upper() == "CVE":
+                return value, ghsa
+            if ghsa is None:
+                ghsa = value
+    return None, ghsa
+
+
+def _rule_metadata_containers(payload: dict) -> list[dict]:
+    """Rule-level parts of raw_payload: identical for every finding of the same rule."""
+    if "_sarif_result" in payload:
+        # sarif_parser flattens rule metadata and properties into the payload root.
+        return [payload]
+    containers = []
+    extra = payload.get("extra")
+    if isinstance(extra, dict) and isinstance(extra.get("metadata"), dict):
+        containers.append(extra["metadata"])
+    if isinstance(payload.get("metadata"), dict):
+        containers.append(payload["metadata"])
+    return containers
 
 
-def _resolve_vulnerability_id(raw: RawFinding) -> str:
-    """Resolve vulnerability_id: use raw if CVE/GHSA-like, else extract from text, else default."""
+def _is_rule_keyed(payload: dict) -> bool:
+    """SARIF results and Semgrep matches: all findings of a rule id carry the same rule metadata."""
+    return "_sarif_result" in payload or (
+        "check_id" in payload and isinstance(payload.get("extra"), dict)
+    )
+
+
+def _rule_vuln_ids(
+    raw: RawFinding,
+    rule_id: str,
+    payload: dict,
+    memo: RuleIdsMemo | None,
+) -> tuple[str | None, str | None]:
+    """
+    (CVE, GHSA) from rule-level metadata. For SARIF and Semgrep findings the result is
+    memoized in memo (one report's) by (scanner_source, rule id), so each rule's metadata is
+    searched once per report; rule ids are only unique within a report.
+    """
+    containers = _rule_metadata_containers(payload)
+    if not containers:
+        return None, None
+    memoize = memo is not None and _is_rule_keyed(payload)
+    key = (raw.scanner_source or "", rule_id)
+    if memoize and (cached := memo.get(key)) is not None:
+        return cached
+    ids = _first_vuln_ids(
+        text for c in containers for text in _iter_field_strings(c, _RULE_ID_FIELDS)
+    )
+    if not memoize:
+        return ids
+    if len(memo) >= _RULE_IDS_MEMO_MAX:
+        memo.clear()
+    memo[key] = ids
+    return ids
+
+
+def _resolve_vulnerability_id(raw: RawFinding, rule_ids_memo: RuleIdsMemo | None = None) -> str:
+    """
+    Resolve vulnerability_id: use raw if CVE/GHSA-like, else extract from the id, description
+    and known id-bearing payload fields (a CVE anywhere wins over a GHSA), else default.
+    """
     raw_id = (raw.vulnerability_id or "").strip()
     if raw_id and _is_cve_or_ghsa_like(raw_id):
         return raw_id[:MAX_VULN_ID_LENGTH]
-    # Concatenate candidate text for extraction.
-    parts = [raw_id, raw.description or "",]
-    if raw.raw_payload:
-        try:
-            parts.append(json.dumps(raw.raw_payload))
-        except (TypeError, ValueError):
-            parts.append(str(raw.raw_payload))
-    text = " ".join(p for p in parts if p)
-    extracted = extract_cve(text) or extract_ghsa(text)
+    payload = raw.raw_payload if isinstance(raw.raw_payload, dict) else {}
+    texts = [raw_id, raw.description or ""]
+    if "_sarif_result" not in payload:
+        texts = chain(texts, _iter_field_strings(payload, _PAYLOAD_ID_FIELDS))
+    cve, ghsa = _first_vuln_ids(texts)
+    if cve:
+        return cve
+    if raw_id:
+        rule_cve, rule_ghsa = _rule_vuln_ids(raw, raw_id, payload, rule_ids_memo)
+    else:
+        rule_cve, rule_ghsa = _first_vuln_ids(
+            text for c in _rule_metadata_containers(payload)
+            for text in _iter_field_strings(c, _RULE_ID_FIELDS)
+        )
+    extracted = rule_cve or ghsa or rule_ghsa
     if extracted:
         return extracted
     return raw_id if raw_id else _DEFAULT_VULN_ID
@@ -153,6 +273,17 @@ def _canonical_key(
     return (vid, r, fp, dep)
 
 
+def canonical_key_digest(normalized: NormalizedFinding) -> str:
+    """SHA-256 hex digest of the canonical key; stored as findings.dedupe_key for DB-side dedupe."""
+    key = _canonical_key(
+        normalized.vulnerability_id,
+        normalized.repo,
+        normalized.file_path,
+        normalized.dependency,
+    )
+    return hashlib.sha256("\0".join(key).encode("utf-8")).hexdigest()
+
+
 def deduplicate_finding_pairs(
     pairs: list[tuple[RawFinding, NormalizedFinding]],
 ) -> list[tuple[RawFinding, NormalizedFinding]]:
@@ -176,14 +307,16 @@ def deduplicate_finding_pairs(
     return result
 
 
-def normalize_finding(raw: RawFinding) -> NormalizedFinding:
+def normalize_finding(raw: RawFinding, rule_ids_memo: RuleIdsMemo | None = None) -> NormalizedFinding:
     """
     Convert a validated RawFinding to NormalizedFinding using sensible defaults.
 
     Standardizes severity (aliases, numeric, CVSS fallback), extracts CVE/GHSA
     when vulnerability_id is not already in that form, and fills missing fields.
+    rule_ids_memo (a dict shared by the findings of one report, never across reports)
+    caches the ids found in SARIF/Semgrep rule metadata.
     """
-    vulnerability_id = _resolve_vulnerability_id(raw)
+    vulnerability_id = _resolve_vulnerability_id(raw, rule_ids_memo)
     severity = normalize_severity(raw.severity, raw.cvss_score)
     _validate_severity(severity)  # ensure type matches SeverityLevel
     repo = raw.repo if raw.repo and raw.repo.strip() else _DEFAULT_REPO
@@ -0,0 +1,97 @@
+"""Per-scanner projection of raw_payload before findings are stored.
+
+Normalization reads the full scanner item, but after that only a few raw_payload fields are
+read again (ecosystem and package for SCA signatures, extra.message and metadata.cwe for SAST
+signatures and embedding text, rule metadata). Bulky fields such as Semgrep extra.lines and
+dataflow traces, OSV affected ranges, or long Trivy/Snyk descriptions are dropped. Everything
+kept has its strings and lists capped, so findings rows and every query that loads them stay small.
+"""
+
+from typing import Any
+
+from app.services.scanner_mappers import ScannerFormat, detect_item_format
+
+# Kept keys per scanner format. None keeps the value (capped); a nested dict projects a sub-object.
+ProjectionPolicy = dict[str, Any]
+
+_TRIVY_VULNERABILITY: ProjectionPolicy = {
+    "VulnerabilityID": None, "Severity": None, "Title": None, "CVSS": None, "CweIDs": None,
+}
+
+SCANNER_PROJECTIONS: dict[ScannerFormat, ProjectionPolicy] = {
+    "trivy": {
+        "VulnerabilityID": None, "PkgName": None, "PkgID": None, "PkgIdentifier": None,
+        "InstalledVersion": None, "FixedVersion": None, "Severity": None, "Title": None,
+        "PrimaryURL": None, "References": None, "VendorIDs": None, "CweIDs": None, "CVSS": None,
+        "DataSource": None, "Target": None, "Class": None, "Type": None, "packageManager": None,
+        "Vulnerability": _TRIVY_VULNERABILITY,
+    },
+    "snyk": {
+        "issue_id": None, "id": None, "severity": None, "package": None, "packageName": None,
+        "packageManager": None, "version": None, "title": None, "cvss_score": None,
+        "CVSSv3": None, "identifiers": None, "references": None, "from": None,
+        "fixedIn": None, "language": None,
+    },
+    "semgrep": {
+        "check_id": None, "path": None, "start": None, "end": None, "metadata": None,
+        "extra": {
+            "message": None, "severity": None, "metadata": None, "fingerprint": None, "fix": None,
+        },
+    },
+    "osv-scanner": {
+        "id": None, "vulnerability_id": None, "aliases": None, "related": None,
+        "package": None, "package_ecosystem": None, "source": None, "severity": None,
+        "database_specific": None, "summary": None, "references": None,
+        "published": None, "modified": None,
+    },
+}
+
+# Nesting below this depth is dropped (reports are untrusted input).
+_MAX_DEPTH = 12
+
+
+def _cap(value: Any, max_string_len: int, max_list_items: int, depth: int = 0) -> Any:
+    """Truncate strings and lists throughout value; 0 disables a cap."""
+    if isinstance(value, str):
+        return value[:max_string_len] if max_string_len else value
+    if depth >= _MAX_DEPTH:
+        return None
+    if isinstance(value, dict):
+        return {k: _cap(v, max_string_len, max_list_items, depth + 1) for k, v in value.items()}
+    if isinstance(value, list):
+        items = value[:max_list_items] if max_list_items else value
+        return [_cap(v, max_string_len, max_list_items, depth + 1) for v in items]
+    return value
+
+
+def _project(payload: dict, policy: ProjectionPolicy, max_string_len: int, max_list_items: int) -> dict:
+    out: dict = {}
+    for key, sub_policy in policy.items():
+        if key not in payload:
+            continue
+        value = payload[key]
+        if isinstance(sub_policy, dict) and isinstance(value, dict):
+            out[key] = _project(value, sub_policy, max_string_len, max_list_items)
+        else:
+            out[key] = _cap(value, max_string_len, max_list_items, 1)
+    return out
+
+
+def project_raw_payload(
+    payload: dict | None,
+    *,
+    max_string_len: int,
+    max_list_items: int,
+) -> dict | None:
+    """
+    Stored form of a finding's raw_payload: the kept fields for the payload's scanner format
+    (SCANNER_PROJECTIONS, detected like the mappers do) with strings and lists capped. Other
+    payloads (SARIF, generic) keep every field and are only capped. Returns a new dict;
+    payload is not modified.
+    """
+    if not isinstance(payload, dict):
+        return payload
+    policy = SCANNER_PROJECTIONS.get(detect_item_format(payload))
+    if policy is None:
+        return _cap(payload, max_string_len, max_list_items)
+    return _project(payload, policy, max_string_len, max_list_items)
@@ -86,3 +86,17 @@ def search_similar_pairs(
         return []
     except Exception:
         return []
+
+
+def delete_collection(collection_name: str) -> None:
+    """Drop a collection once its search is done; errors are ignored (best effort)."""
+    settings = get_settings()
+    if not settings.QDRANT_URL or not settings.QDRANT_URL.strip():
+        return
+    try:
+        from qdrant_client import QdrantClient
+        QdrantClient(url=settings.QDRANT_URL).delete_collection(collection_name)
+    except ImportError:
+        return
+    except Exception:
+        return
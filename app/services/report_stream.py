@@ -0,0 +1,443 @@
+"""Incremental (streaming) parsing of scanner reports: yield one finding item at a time.
+
+Reports are read from a binary file-like object in fixed-size blocks. Only the containers
+that hold findings (flat arrays, SARIF runs[].results[], OSV-Scanner
+results[].packages[].vulnerabilities[], Trivy Results[].Vulnerabilities[], Semgrep
+results[]) are walked incrementally; every other value is
+decoded as a whole with the stdlib JSON decoder. Peak memory is bounded by the largest
+single finding (plus per-run SARIF context), not by the size of the report. gzip and zstd
+compressed reports are decompressed block by block on the way in.
+"""
+
+import codecs
+import gzip
+import json
+import zlib
+from collections.abc import Generator, Iterator
+from itertools import chain
+from typing import Any, BinaryIO
+
+from app.services.sarif_parser import (
+    SarifRunIndex,
+    build_run_index,
+    sarif_result_to_rawfinding,
+)
+
+DEFAULT_READ_SIZE = 256 * 1024  # 256 KiB per read from the underlying file
+
+_WHITESPACE = " \t\n\r"
+
+
+class ReportFormatError(ValueError):
+    """Raised when the report is not valid JSON or not a supported report shape."""
+
+
+class ReportEncodingError(ReportFormatError):
+    """Raised when a compressed report cannot be decompressed (corrupt, truncated, unsupported)."""
+
+
+class ReportTooLargeError(ValueError):
+    """Raised when the report exceeds the configured maximum size while streaming."""
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Report exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+# Content codings accepted for compressed reports.
+REPORT_ENCODINGS = frozenset({"gzip", "zstd"})
+
+
+class _DecompressedReader:
+    """Read-only file wrapper that reports decompression failures as ReportEncodingError."""
+
+    def __init__(self, fp: BinaryIO, errors: tuple[type[BaseException], ...]) -> None:
+        self._fp = fp
+        self._errors = errors
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            return self._fp.read(size)
+        except self._errors as e:
+            raise ReportEncodingError(str(e) or type(e).__name__) from e
+
+
+def open_decompressed(fp: BinaryIO, encoding: str) -> BinaryIO:
+    """
+    Wrap fp so reads return decompressed bytes, one block at a time (nothing is buffered whole).
+    encoding is 'gzip' or 'zstd'; zstd needs the zstandard package (in requirements.txt).
+    """
+    if encoding == "gzip":
+        return _DecompressedReader(
+            gzip.GzipFile(fileobj=fp, mode="rb"),
+            (gzip.BadGzipFile, EOFError, zlib.error),
+        )
+    if encoding == "zstd":
+        try:
+            import zstandard  # type: ignore[import-untyped]
+        except ImportError as e:
+            raise ReportEncodingError("zstd-compressed reports are not supported on this server") from e
+        reader = zstandard.ZstdDecompressor().stream_reader(fp, read_across_frames=True)
+        return _DecompressedReader(reader, (zstandard.ZstdError,))
+    raise ReportEncodingError(f"Unsupported report encoding: {encoding}")
+
+
+class _JsonStream:
+    """Minimal pull parser over a byte stream: structural tokens plus whole-value decoding."""
+
+    def __init__(self, fp: BinaryIO, read_size: int, max_bytes: int | None) -> None:
+        self._fp = fp
+        self._read_size = read_size
+        self._max_bytes = max_bytes
+        self._bytes_read = 0
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._started = False
+
+    def _fill(self, min_chars: int = 0) -> bool:
+        """Append at least one block (or min_chars) to the buffer. Returns False at EOF."""
+        if self._eof:
+            return False
+        # Drop consumed text so the buffer only holds the unread tail.
+        if self._pos:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        target = len(self._buf) + max(min_chars, 1)
+        while len(self._buf) < target:
+            chunk = self._fp.read(self._read_size)
+            if chunk:
+                self._bytes_read += len(chunk)
+                if self._max_bytes is not None and self._bytes_read > self._max_bytes:
+                    raise ReportTooLargeError(self._max_bytes)
+            try:
+                text = self._text_decoder.decode(chunk or b"", final=not chunk)
+            except UnicodeDecodeError as e:
+                raise ReportFormatError(str(e)) from e
+            if not self._started:
+                self._started = True
+                text = text.lstrip("\ufeff")
+            self._buf += text
+            if not chunk:
+                self._eof = True
+                break
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it ('' at EOF)."""
+        while True:
+            buf = self._buf
+            n = len(buf)
+            pos = self._pos
+            while pos < n and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def consume(self, expected: str) -> None:
+        """Consume the next non-whitespace character, which must equal expected."""
+        c = self.peek()
+        if c != expected:
+            found = repr(c) if c else "end of input"
+            raise ReportFormatError(f"Expected {expected!r}, found {found}")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decode one complete JSON value at the current position."""
+        if not self.peek():
+            raise ReportFormatError("Unexpected end of input")
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise ReportFormatError(str(e)) from e
+                # Value spans past the buffer: grow geometrically so re-decoding stays linear.
+                self._fill(len(self._buf) - self._pos)
+                continue
+            if end >= len(self._buf) and not self._eof:
+                # A number at the buffer edge may continue in the next block.
+                self._fill(len(self._buf) - self._pos)
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self) -> Iterator[int]:
+        """Iterate an array, yielding each element index; caller must consume the element."""
+        self.consume("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            c = self.peek()
+            if c == ",":
+                self._pos += 1
+                continue
+            self.consume("]")
+            return
+
+    def iter_object(self) -> Iterator[str]:
+        """Iterate an object, yielding each key; caller must consume the value."""
+        self.consume("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ReportFormatError("Expected object key")
+            key = self.read_value()
+            self.consume(":")
+            yield key
+            c = self.peek()
+            if c == ",":
+                self._pos += 1
+                continue
+            self.consume("}")
+            return
+
+
+def flatten_osv_package(source: Any, pkg: Any) -> Iterator[dict]:
+    """
+    Flatten one OSV-Scanner { package, vulnerabilities[] } entry to one dict per vulnerability,
+    carrying the parent result's source, for mapper consumption.
+    """
+    if not isinstance(pkg, dict):
+        return
+    source = source or {}
+    package = pkg.get("package") or {}
+    for vuln in pkg.get("vulnerabilities") or []:
+        if not isinstance(vuln, dict):
+            continue
+        flat: dict = {
+            "id": vuln.get("id"),
+            "aliases": vuln.get("aliases", []),
+            "package": package,
+            "source": source,
+        }
+        if vuln.get("summary") is not None:
+            flat["summary"] = vuln.get("summary")
+        if vuln.get("details") is not None:
+            flat["details"] = vuln.get("details")
+        if vuln.get("severity") is not None:
+            flat["severity"] = vuln.get("severity")
+        if vuln.get("database_specific") is not None:
+            flat["database_specific"] = vuln.get("database_specific")
+        yield flat
+
+
+def flatten_trivy_result(result: Any) -> Iterator[dict]:
+    """
+    Yield each vulnerability of one Trivy Results[] entry, tagged with the entry's Target
+    (the scanned manifest or image layer) for the Trivy mapper's file_path.
+    """
+    if not isinstance(result, dict):
+        return
+    target = result.get("Target")
+    for vuln in result.get("Vulnerabilities") or []:
+        if not isinstance(vuln, dict):
+            continue
+        if target is not None:
+            vuln.setdefault("Target", target)
+        yield vuln
+
+
+def _iter_trivy_result(s: _JsonStream) -> Iterator[dict]:
+    """Stream one Trivy Results[] entry, decoding one vulnerability at a time."""
+    head: dict = {}
+    pending: list[Any] = []
+    for key in s.iter_object():
+        if key == "Vulnerabilities" and s.peek() == "[":
+            for _ in s.iter_array():
+                vuln = s.read_value()
+                # Trivy writes Target first; buffer only if it has not been seen yet.
+                if "Target" in head:
+                    yield from flatten_trivy_result({**head, "Vulnerabilities": [vuln]})
+                else:
+                    pending.append(vuln)
+        elif key == "Target":
+            head[key] = s.read_value()
+        else:
+            s.read_value()
+    yield from flatten_trivy_result({**head, "Vulnerabilities": pending})
+
+
+def _iter_sarif_run(s: _JsonStream) -> Iterator[dict]:
+    """Stream one SARIF run: decode tool/artifacts, convert each result as it is read."""
+    run: dict = {}
+    index: SarifRunIndex | None = None
+    pending: list[dict] = []
+    for key in s.iter_object():
+        if key == "results" and s.peek() == "[":
+            for _ in s.iter_array():
+                result = s.read_value()
+                if not isinstance(result, dict):
+                    continue
+                # Results need tool.driver.rules; buffer only if the run lists them later.
+                if "tool" in run:
+                    if index is None:
+                        index = build_run_index(run)
+                    item = sarif_result_to_rawfinding(result, index)
+                    if item is not None:
+                        yield item
+                else:
+                    pending.append(result)
+        elif key in ("tool", "artifacts"):
+            run[key] = s.read_value()
+            index = None
+        else:
+            s.read_value()
+    if pending:
+        index = build_run_index(run)
+    for result in pending:
+        item = sarif_result_to_rawfinding(result, index)
+        if item is not None:
+            yield item
+
+
+def _iter_osv_result(s: _JsonStream, keys: Iterator[str], head: dict) -> Iterator[dict]:
+    """
+    Stream the rest of one OSV-Scanner result object from its key iterator, decoding one
+    package at a time. head holds members already decoded (e.g. 'source').
+    """
+    source: Any = head.get("source")
+    source_seen = "source" in head
+    pending: list[Any] = []
+    for key in keys:
+        if key == "packages" and s.peek() == "[":
+            for _ in s.iter_array():
+                pkg = s.read_value()
+                if source_seen:
+                    yield from flatten_osv_package(source, pkg)
+                else:
+                    pending.append(pkg)
+        elif key == "source":
+            source = s.read_value()
+            source_seen = True
+        else:
+            s.read_value()
+    for pkg in pending:
+        yield from flatten_osv_package(source, pkg)
+
+
+def _iter_results_array(s: _JsonStream, root: dict) -> Generator[dict, None, bool]:
+    """
+    Stream a root-level results array when it is OSV-Scanner native output (first element
+    carries 'packages') or Semgrep output (first element carries 'check_id'); returns True in
+    that case. Otherwise the array is decoded whole into root['results'], nothing is yielded
+    and False is returned.
+    """
+    osv = False
+    semgrep = False
+    buffered: list[Any] = []
+    for _ in s.iter_array():
+        if osv:
+            if s.peek() == "{":
+                yield from _iter_osv_result(s, s.iter_object(), {})
+            else:
+                s.read_value()
+        elif semgrep:
+            item = s.read_value()
+            if isinstance(item, dict):
+                yield item
+        elif buffered or s.peek() != "{":
+            buffered.append(s.read_value())
+        else:
+            # First element: decode members until 'packages' shows this is OSV-Scanner output.
+            keys = s.iter_object()
+            head: dict = {}
+            for key in keys:
+                if key == "packages" and s.peek() == "[":
+                    osv = True
+                    yield from _iter_osv_result(s, chain((key,), keys), head)
+                    break
+                head[key] = s.read_value()
+            else:
+                if "check_id" in head:
+                    semgrep = True
+                    yield head
+                else:
+                    buffered.append(head)
+    if osv or semgrep:
+        return True
+    root["results"] = buffered
+    return False
+
+
+def _iter_root_object(s: _JsonStream) -> Iterator[dict]:
+    """
+    Stream a root object: SARIF (runs[]), OSV-Scanner (results[].packages[]), Semgrep
+    (results[]), Trivy (Results[].Vulnerabilities[]) or a single finding.
+    """
+    root: dict = {}
+    streamed = False
+    for key in s.iter_object():
+        if key == "runs" and s.peek() == "[":
+            streamed = True
+            for _ in s.iter_array():
+                if s.peek() == "{":
+                    yield from _iter_sarif_run(s)
+                else:
+                    s.read_value()
+        elif key == "results" and s.peek() == "[" and not streamed:
+            streamed = yield from _iter_results_array(s, root)
+        elif key == "Results" and s.peek() == "[" and not streamed:
+            streamed = True
+            for _ in s.iter_array():
+                if s.peek() == "{":
+                    yield from _iter_trivy_result(s)
+                else:
+                    s.read_value()
+        else:
+            root[key] = s.read_value()
+    if not streamed:
+        yield root
+
+
+def iter_report_items(
+    fp: BinaryIO,
+    *,
+    encoding: str | None = None,
+    max_bytes: int | None = None,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> Iterator[Any]:
+    """
+    Yield finding items from a JSON report without materializing the whole document.
+
+    - Root array: each element is yielded as-is (non-objects too; callers report the index).
+    - SARIF root (runs[]): each result is yielded already converted by sarif_result_to_rawfinding.
+    - OSV-Scanner root (results[].packages[]): one flattened dict per (source, package, vulnerability).
+    - Semgrep root (results[] of check_id objects): each result is yielded as-is.
+    - Trivy root (Results[].Vulnerabilities[]): each vulnerability, tagged with its result's Target.
+    - Any other root object: yielded once as a single finding.
+
+    With encoding ('gzip' or 'zstd') fp is decompressed on the fly and max_bytes bounds the
+    decompressed size, so compression bombs stop at the limit.
+
+    Raises ReportFormatError on invalid JSON (ReportEncodingError on bad compressed data) and
+    ReportTooLargeError once more than max_bytes have been read.
+    """
+    if encoding is not None:
+        fp = open_decompressed(fp, encoding)
+    s = _JsonStream(fp, read_size, max_bytes)
+    c = s.peek()
+    if c == "[":
+        for _ in s.iter_array():
+            yield s.read_value()
+    elif c == "{":
+        yield from _iter_root_object(s)
+    elif not c:
+        raise ReportFormatError("Empty report")
+    else:
+        raise ReportFormatError(
+            "JSON body must be an array of findings or a single finding object."
+        )
+    if s.peek():
+        raise ReportFormatError("Extra data after JSON document")
@@ -0,0 +1,167 @@
+"""Server-side re-run of the ingest pipeline for archived uploads.
+
+When mapping, normalization or clustering logic changes, jobs whose original report was
+archived (UploadJob.raw_blob_ref, see blob_store) are rebuilt from the stored blob instead of
+being uploaded again: the report goes through the current pipeline, findings are upserted by
+canonical key (so unchanged findings keep their ids and any delta references to them), findings
+the pipeline no longer produces are deleted, and the job's clusters are rebuilt. Each job is
+rebuilt in one transaction, so readers see either the old or the new result.
+
+Delta jobs are rebuilt as full scans: the archived report is complete, so the job's own
+references to earlier jobs are dropped and its findings are stored directly.
+"""
+
+import json
+import logging
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import and_, exists, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.models import Finding, FindingRule, JobFindingRef, UploadJob
+from app.services.blob_store import BlobNotFoundError, open_archived_reports
+from app.services.cluster_persistence import get_or_build_clusters_for_job
+from app.services.ingest import IngestValidationError, iter_batch_findings, persist_findings
+from app.services.job_findings import mark_findings_changed
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states can be rebuilt; pending/processing jobs are still owned by a worker.
+REPROCESSABLE_STATUSES = ("completed", "failed")
+
+
+class ReprocessError(Exception):
+    """Raised when a job cannot be re-processed. detail is API-ready."""
+
+    def __init__(self, detail: str) -> None:
+        self.detail = detail
+        super().__init__(detail)
+
+
+def find_reprocess_jobs(
+    db: Session,
+    *,
+    job_ids: Iterable[int] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[int]:
+    """Ids of archived, finished jobs matching job_ids and/or created_at in [since, until), oldest first."""
+    query = db.query(UploadJob.id).filter(
+        UploadJob.raw_blob_ref.isnot(None),
+        UploadJob.status.in_(REPROCESSABLE_STATUSES),
+    )
+    if job_ids is not None:
+        query = query.filter(UploadJob.id.in_(list(job_ids)))
+    if since is not None:
+        query = query.filter(UploadJob.created_at >= since)
+    if until is not None:
+        query = query.filter(UploadJob.created_at < until)
+    return [row[0] for row in query.order_by(UploadJob.created_at, UploadJob.id).all()]
+
+
+def _delete_stale_findings(db: Session, upload_job_id: int, stale_ids: set[int]) -> None:
+    """Delete the job's findings the new run no longer produced, in bounded batches."""
+    batch_size = get_settings().UPLOAD_INGEST_CHUNK_SIZE
+    it = iter(sorted(stale_ids))
+    while batch := list(islice(it, batch_size)):
+        db.query(Finding).filter(
+            Finding.upload_job_id == upload_job_id,
+            Finding.id.in_(batch),
+        ).delete(synchronize_session=False)
+    referenced = exists().where(
+        and_(
+            Finding.upload_job_id == FindingRule.upload_job_id,
+            Finding.rule_key == FindingRule.rule_key,
+        )
+    )
+    db.query(FindingRule).filter(
+        FindingRule.upload_job_id == upload_job_id,
+        ~referenced,
+    ).delete(synchronize_session=False)
+
+
+def reprocess_job(db: Session, upload_job_id: int) -> int:
+    """
+    Rebuild one job's findings and clusters from its archived report and commit.
+    Returns the job's finding count. Raises ReprocessError or IngestValidationError
+    (the transaction is then left for the caller to roll back).
+    """
+    upload_job = db.get(UploadJob, upload_job_id)
+    if upload_job is None:
+        raise ReprocessError(f"Upload job {upload_job_id} not found.")
+    if upload_job.status not in REPROCESSABLE_STATUSES:
+        raise ReprocessError(f"Upload job {upload_job_id} is {upload_job.status}.")
+    if not upload_job.raw_blob_ref:
+        raise ReprocessError(f"Upload job {upload_job_id} has no archived report.")
+    try:
+        reports = open_archived_reports(upload_job.raw_blob_ref)
+    except BlobNotFoundError as e:
+        raise ReprocessError(e.detail) from e
+
+    old_ids = {
+        row[0]
+        for row in db.query(Finding.id).filter(Finding.upload_job_id == upload_job_id).all()
+    }
+    db.query(JobFindingRef).filter(JobFindingRef.upload_job_id == upload_job_id).delete(
+        synchronize_session=False
+    )
+    ids = persist_findings(db, upload_job, iter_batch_findings(reports), replace=True)
+    # Later delta jobs referencing this job's findings see them change too.
+    mark_findings_changed(
+        db,
+        select(JobFindingRef.upload_job_id)
+        .join(Finding, Finding.id == JobFindingRef.finding_id)
+        .where(Finding.upload_job_id == upload_job_id),
+    )
+    _delete_stale_findings(db, upload_job_id, old_ids - set(ids))
+    upload_job.unchanged_count = 0
+    upload_job.resolved_count = 0
+    upload_job.delta = False
+    upload_job.status = "completed"
+    upload_job.error_detail = None
+    db.flush()
+    get_or_build_clusters_for_job(
+        db,
+        upload_job.user_id,
+        upload_job_id,
+        use_semantic=get_settings().CLUSTER_USE_SEMANTIC,
+    )
+    db.commit()
+    return len(ids)
+
+
+def run_reprocess_job(upload_job_id: int) -> tuple[int, int | None, str | None]:
+    """
+    Re-process one job in its own session. Returns (job id, finding count, None) on
+    success or (job id, None, error detail); failures leave the job as it was.
+    """
+    db = SessionLocal()
+    try:
+        count = reprocess_job(db, upload_job_id)
+        logger.info("Re-processed upload job %s: %s findings", upload_job_id, count)
+        return upload_job_id, count, None
+    except (ReprocessError, IngestValidationError) as e:
+        db.rollback()
+        detail = e.detail if isinstance(e.detail, str) else json.dumps(e.detail, default=str)
+        logger.warning("Re-processing upload job %s failed: %s", upload_job_id, detail)
+        return upload_job_id, None, detail
+    except Exception as e:
+        db.rollback()
+        logger.exception("Re-processing upload job %s failed", upload_job_id)
+        return upload_job_id, None, f"Internal error: {e!s}"
+    finally:
+        db.close()
+
+
+def reprocess_jobs(
+    job_ids: list[int],
+    workers: int,
+) -> list[tuple[int, int | None, str | None]]:
+    """Re-process jobs on a pool of worker threads; results in job_ids order (see run_reprocess_job)."""
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="helion-reprocess") as pool:
+        return list(pool.map(run_reprocess_job, job_ids))
@@ -4,9 +4,11 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import TYPE_CHECKING
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, exists, select
+from sqlalchemy.orm import Session, aliased
 
-from app.models import Finding
+from app.models import Finding, FindingRule, JobFindingRef, UploadJob
+from app.services.job_findings import mark_findings_changed
 
 if TYPE_CHECKING:
     from app.core.config import Settings
@@ -16,7 +18,11 @@ logger = logging.getLogger(__name__)
 
 def run_retention(session: Session, settings: "Settings") -> tuple[int, int]:
     """
-    Delete findings older than RETENTION_HOURS. No cluster summary persistence.
+    Delete findings older than RETENTION_HOURS, then the shared finding_rules rows no
+    remaining finding references. Findings a newer delta job still references as unchanged
+    are kept. Jobs that lose findings have their findings_version bumped so their cached
+    clusters are rebuilt, and their content_hash cleared so identical uploads are not
+    matched to them.
 
     Returns (0, findings_deleted) for compatibility. Idempotent: safe to run repeatedly.
     """
@@ -25,17 +31,56 @@ def run_retention(session: Session, settings: "Settings") -> tuple[int, int]:
         return (0, 0)
 
     cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.RETENTION_HOURS)
+    referenced_by_recent_job = exists().where(
+        JobFindingRef.finding_id == Finding.id,
+        JobFindingRef.state == "unchanged",
+        JobFindingRef.upload_job_id == UploadJob.id,
+        UploadJob.created_at >= cutoff,
+    )
+    expired = (Finding.created_at < cutoff, ~referenced_by_recent_job)
+    # Jobs owning or (as delta jobs) referencing expired findings get their clusters rebuilt.
+    ref = aliased(JobFindingRef)
+    affected_job_ids = {
+        row[0] for row in session.query(Finding.upload_job_id).filter(*expired).distinct().all()
+    }
+    affected_job_ids.update(
+        row[0]
+        for row in session.query(ref.upload_job_id)
+        .filter(ref.finding_id.in_(select(Finding.id).where(*expired)))
+        .distinct()
+        .all()
+    )
+    if affected_job_ids:
+        mark_findings_changed(session, sorted(affected_job_ids))
+        # Re-uploading the same report must ingest it again, not return the emptied job.
+        session.query(UploadJob).filter(UploadJob.id.in_(sorted(affected_job_ids))).update(
+            {"content_hash": None}, synchronize_session=False
+        )
     deleted_count = (
         session.query(Finding)
-        .filter(Finding.created_at < cutoff)
+        .filter(*expired)
         .delete(synchronize_session=False)
     )
+    rules_deleted = 0
+    if deleted_count > 0:
+        referenced = exists().where(
+            and_(
+                Finding.upload_job_id == FindingRule.upload_job_id,
+                Finding.rule_key == FindingRule.rule_key,
+            )
+        )
+        rules_deleted = (
+            session.query(FindingRule)
+            .filter(~referenced)
+            .delete(synchronize_session=False)
+        )
     session.commit()
 
     if deleted_count > 0:
         logger.info(
-            "Retention run: cutoff=%s, findings_deleted=%s",
+            "Retention run: cutoff=%s, findings_deleted=%s, rules_deleted=%s",
             cutoff.isoformat(),
             deleted_count,
+            rules_deleted,
         )
     return (0, deleted_count)
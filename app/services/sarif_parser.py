@@ -1,5 +1,7 @@
 """Parse SARIF (e.g. CodeQL) reports into RawFinding-shaped dicts for ingestion."""
 
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from urllib.parse import unquote
 
 # SARIF result.level -> Helion canonical severity (case-insensitive).
@@ -50,7 +52,7 @@ def _get_artifact_uri(artifact_location: dict | None, artifacts: list | None) ->
     return None
 
 
-def _get_result_file_path(result: dict, run: dict) -> str | None:
+def _get_result_file_path(result: dict, artifacts: list | None) -> str | None:
     """Extract file path from first location of result, using run.artifacts if needed."""
     locations = result.get("locations")
     if not isinstance(locations, list) or not locations:
@@ -62,7 +64,6 @@ def _get_result_file_path(result: dict, run: dict) -> str | None:
     if not isinstance(phys, dict):
         return None
     art_loc = phys.get("artifactLocation")
-    artifacts = run.get("artifacts")
     uri = _get_artifact_uri(art_loc, artifacts)
     return _uri_to_file_path(uri) if uri else None
 
@@ -79,26 +80,9 @@ def _get_result_message(result: dict) -> str:
     return "No description"
 
 
-def _get_rule_metadata(rule_id: str | None, run: dict) -> dict:
-    """Build rule metadata dict from run.tool.driver.rules for raw_payload."""
+def _build_rule_metadata(rule: dict) -> dict:
+    """Build rule metadata dict (descriptor fields + properties) for raw_payload."""
     meta: dict = {}
-    driver = None
-    tool = run.get("tool")
-    if isinstance(tool, dict):
-        driver = tool.get("driver")
-    if not isinstance(driver, dict):
-        return meta
-    rules = driver.get("rules")
-    if not isinstance(rules, list):
-        return meta
-    rule = None
-    if rule_id:
-        for r in rules:
-            if isinstance(r, dict) and r.get("id") == rule_id:
-                rule = r
-                break
-    if not isinstance(rule, dict):
-        return meta
     for key in ("id", "name", "shortDescription", "fullDescription", "helpUri", "precision"):
         val = rule.get(key)
         if val is not None:
@@ -114,8 +98,62 @@ def _get_rule_metadata(rule_id: str | None, run: dict) -> dict:
     return meta
 
 
-def _get_vulnerability_id(result: dict, run: dict) -> str | None:
-    """Result ruleId or rule.id from run.tool.driver.rules."""
+@dataclass
+class SarifRunIndex:
+    """
+    Per-run lookup tables, built once per run instead of scanning tool.driver.rules per result.
+    Rule metadata is built on first use and shared by every result of that rule (do not mutate).
+    """
+
+    rules: list = field(default_factory=list)
+    rules_by_id: dict[str, dict] = field(default_factory=dict)
+    artifacts: list | None = None
+    _meta_by_id: dict[str, dict] = field(default_factory=dict)
+
+    def rule_id_at(self, index: int) -> str | None:
+        """Stripped id of the rule at rules[index], or None."""
+        if 0 <= index < len(self.rules):
+            r = self.rules[index]
+            if isinstance(r, dict):
+                rid = r.get("id")
+                if isinstance(rid, str) and rid.strip():
+                    return rid.strip()
+        return None
+
+    def rule_metadata(self, rule_id: str) -> dict:
+        """Metadata of the first rule with this id ({} when unknown)."""
+        meta = self._meta_by_id.get(rule_id)
+        if meta is None:
+            rule = self.rules_by_id.get(rule_id)
+            meta = _build_rule_metadata(rule) if rule is not None else {}
+            self._meta_by_id[rule_id] = meta
+        return meta
+
+
+def build_run_index(run: dict) -> SarifRunIndex:
+    """Index run.tool.driver.rules by id and position, and capture run.artifacts."""
+    rules: list = []
+    tool = run.get("tool")
+    if isinstance(tool, dict):
+        driver = tool.get("driver")
+        if isinstance(driver, dict) and isinstance(driver.get("rules"), list):
+            rules = driver["rules"]
+    rules_by_id: dict[str, dict] = {}
+    for r in rules:
+        if isinstance(r, dict):
+            rid = r.get("id")
+            if isinstance(rid, str):
+                rules_by_id.setdefault(rid, r)
+    artifacts = run.get("artifacts")
+    return SarifRunIndex(
+        rules=rules,
+        rules_by_id=rules_by_id,
+        artifacts=artifacts if isinstance(artifacts, list) else None,
+    )
+
+
+def _get_vulnerability_id(result: dict, index: SarifRunIndex) -> str | None:
+    """Result ruleId or rule.id, else the id of the rule at rule.index."""
     rule_id = result.get("ruleId")
     if isinstance(rule_id, str) and rule_id.strip():
         return rule_id.strip()
@@ -126,69 +164,75 @@ def _get_vulnerability_id(result: dict, run: dict) -> str | None:
             return rid.strip()
         idx = rule_ref.get("index")
         if isinstance(idx, int):
-            tool = run.get("tool")
-            if isinstance(tool, dict):
-                driver = tool.get("driver")
-                if isinstance(driver, dict):
-                    rules = driver.get("rules")
-                    if isinstance(rules, list) and 0 <= idx < len(rules):
-                        r = rules[idx]
-                        if isinstance(r, dict):
-                            rid = r.get("id")
-                            if isinstance(rid, str) and rid.strip():
-                                return rid.strip()
+            return index.rule_id_at(idx)
     return None
 
 
-def sarif_to_rawfindings(payload: dict) -> list[dict]:
+def sarif_result_to_rawfinding(result: dict, index: SarifRunIndex) -> dict | None:
+    """
+    Convert one SARIF result (with its parent run's index for rules/artifacts) to a
+    RawFinding-shaped dict.
+
+    Returns None when the result has no resolvable rule id.
+    """
+    vulnerability_id = _get_vulnerability_id(result, index)
+    if not vulnerability_id:
+        return None
+
+    file_path = _get_result_file_path(result, index.artifacts)
+    description = _get_result_message(result)
+    level = result.get("level")
+    severity = _sarif_level_to_severity(level)
+
+    rule_meta = index.rule_metadata(vulnerability_id)
+    raw_payload: dict = dict(rule_meta)
+    raw_payload["rule_helpUri"] = rule_meta.get("helpUri")
+    raw_payload["_sarif_result"] = {
+        "ruleId": vulnerability_id,
+        "kind": result.get("kind"),
+        "message": result.get("message"),
+        "level": level,
+        "locations": result.get("locations", [])[:1],
+    }
+
+    return {
+        "vulnerability_id": vulnerability_id,
+        "file_path": file_path,
+        "description": description,
+        "severity": severity,
+        "scanner_source": "codeql",
+        "raw_payload": raw_payload,
+    }
+
+
+def _iter_run_rawfindings(run: dict) -> Iterator[dict]:
+    """Convert the results of one run, building its rule index once."""
+    index = build_run_index(run)
+    for result in run.get("results") or []:
+        if not isinstance(result, dict):
+            continue
+        item = sarif_result_to_rawfinding(result, index)
+        if item is not None:
+            yield item
+
+
+def sarif_to_rawfindings(payload: dict) -> Iterator[dict]:
     """
-    Convert a SARIF root object to a list of RawFinding-shaped dicts.
+    Yield RawFinding-shaped dicts for every result of a SARIF root object.
 
     Extracts from each result: vulnerability_id (ruleId), file_path (artifact location),
     description (message text), severity (SARIF level mapped to Helion), raw_payload
     (rule metadata + result snippet), scanner_source="codeql".
 
-    Returns empty list if payload is not a dict or has no runs list.
+    Each run's rules are indexed once, so conversion is linear in results + rules.
+
+    Yields nothing if payload is not a dict or has no runs list.
     """
     if not isinstance(payload, dict):
-        return []
+        return
     runs = payload.get("runs")
     if not isinstance(runs, list):
-        return []
-
-    out: list[dict] = []
+        return
     for run in runs:
-        if not isinstance(run, dict):
-            continue
-        for result in run.get("results") or []:
-            if not isinstance(result, dict):
-                continue
-            vulnerability_id = _get_vulnerability_id(result, run)
-            if not vulnerability_id:
-                continue
-
-            file_path = _get_result_file_path(result, run)
-            description = _get_result_message(result)
-            level = result.get("level")
-            severity = _sarif_level_to_severity(level)
-
-            rule_meta = _get_rule_metadata(vulnerability_id, run)
-            raw_payload: dict = dict(rule_meta)
-            raw_payload["rule_helpUri"] = rule_meta.get("helpUri")
-            raw_payload["_sarif_result"] = {
-                "ruleId": vulnerability_id,
-                "kind": result.get("kind"),
-                "message": result.get("message"),
-                "level": level,
-                "locations": result.get("locations", [])[:1],
-            }
-
-            out.append({
-                "vulnerability_id": vulnerability_id,
-                "file_path": file_path,
-                "description": description,
-                "severity": severity,
-                "scanner_source": "codeql",
-                "raw_payload": raw_payload,
-            })
-    return out
+        if isinstance(run, dict):
+            yield from _iter_run_rawfindings(run)
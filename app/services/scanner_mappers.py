@@ -1,6 +1,15 @@
 """Map scanner-specific payload shapes to RawFinding field names for ingestion."""
 
-from typing import Any
+from collections.abc import Callable, Iterable
+from functools import partial
+from typing import Any, Literal
+
+# Item format with a dedicated mapper; "generic" maps known aliases only.
+ScannerFormat = Literal["trivy", "snyk", "semgrep", "osv-scanner", "generic"]
+ItemMapper = Callable[[dict[str, Any]], dict[str, Any]]
+
+# Leading report items inspected to pick one mapper for the whole report.
+DETECTION_SAMPLE_SIZE = 16
 
 # RawFinding field names we map into.
 RAWFINDING_KEYS = frozenset({
@@ -36,8 +45,13 @@ GENERIC_ALIASES: dict[str, str] = {
 
 
 def _is_trivy_like(obj: dict[str, Any]) -> bool:
-    """Heuristic: Trivy often uses VulnerabilityID, Severity."""
-    return "VulnerabilityID" in obj or ("Vulnerability" in obj and "ID" in str(obj.get("Vulnerability")))
+    """Heuristic: Trivy often uses VulnerabilityID, Severity (or a nested Vulnerability object)."""
+    if "VulnerabilityID" in obj:
+        return True
+    v = obj.get("Vulnerability")
+    if isinstance(v, dict):
+        return any("ID" in k for k in v)
+    return isinstance(v, str) and "ID" in v
 
 
 def _is_snyk_like(obj: dict[str, Any]) -> bool:
@@ -59,10 +73,27 @@ def _is_osv_scanner_like(obj: dict[str, Any]) -> bool:
     return isinstance(vid, str) and bool(vid.strip())
 
 
+def _extract_trivy_cvss(cvss: Any) -> float | None:
+    """First positive V3/V2 score from a Trivy CVSS map (nvd, then redhat, then ghsa)."""
+    if not cvss or not isinstance(cvss, dict):
+        return None
+    for k in ("nvd", "redhat", "ghsa"):
+        if k in cvss and isinstance(cvss[k], dict):
+            score = cvss[k].get("V3Score") or cvss[k].get("V2Score")
+            if score is not None:
+                try:
+                    s = float(score)
+                    if s > 0:
+                        return s
+                except (TypeError, ValueError):
+                    pass
+                return None
+    return None
+
+
 def map_trivy_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
     """Map Trivy-style dict to RawFinding-shaped dict. Preserve original in raw_payload."""
     out: dict[str, Any] = {}
-    raw = dict(obj)
     # Trivy vuln format: VulnerabilityID, PkgName, Severity, Title, etc.
     if "VulnerabilityID" in obj:
         out["vulnerability_id"] = _str_or_none(obj.get("VulnerabilityID"))
@@ -71,18 +102,14 @@ def map_trivy_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
         out.setdefault("vulnerability_id", _str_or_none(v.get("VulnerabilityID")))
         out.setdefault("severity", _str_or_none(v.get("Severity")))
         out.setdefault("description", _str_or_none(v.get("Description")) or _str_or_none(v.get("Title")))
-        if v.get("CVSS") and isinstance(v["CVSS"], dict):
-            for k in ("nvd", "redhat", "ghsa"):
-                if k in v["CVSS"] and isinstance(v["CVSS"][k], dict):
-                    score = v["CVSS"][k].get("V3Score") or v["CVSS"][k].get("V2Score")
-                    if score is not None:
-                        try:
-                            s = float(score)
-                            if s > 0:
-                                out["cvss_score"] = s
-                        except (TypeError, ValueError):
-                            pass
-                        break
+        cvss = _extract_trivy_cvss(v.get("CVSS"))
+        if cvss is not None:
+            out["cvss_score"] = cvss
+    if "cvss_score" not in out:
+        # Native Trivy reports carry CVSS on the vulnerability itself.
+        cvss = _extract_trivy_cvss(obj.get("CVSS"))
+        if cvss is not None:
+            out["cvss_score"] = cvss
     if "Severity" in obj:
         out.setdefault("severity", _str_or_none(obj.get("Severity")))
     if "PkgName" in obj:
@@ -91,15 +118,17 @@ def map_trivy_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
         out.setdefault("description", _str_or_none(obj.get("Title")))
     if "PrimaryURL" in obj and "vulnerability_id" not in out:
         out.setdefault("vulnerability_id", _str_or_none(obj.get("PrimaryURL")))
+    # Set on items flattened from a native report's Results[] (see flatten_trivy_result).
+    if "Target" in obj:
+        out.setdefault("file_path", _str_or_none(obj.get("Target")))
     out["scanner_source"] = out.get("scanner_source") or "trivy"
-    out["raw_payload"] = raw
+    out["raw_payload"] = obj
     return _merge_rawfinding_shape(out, obj)
 
 
 def map_snyk_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
     """Map Snyk-style dict to RawFinding-shaped dict. Preserve original in raw_payload."""
     out: dict[str, Any] = {}
-    raw = dict(obj)
     if "issue_id" in obj:
         out["vulnerability_id"] = _str_or_none(obj.get("issue_id"))
     if "severity" in obj:
@@ -116,14 +145,13 @@ def map_snyk_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
         except (TypeError, ValueError):
             pass
     out["scanner_source"] = out.get("scanner_source") or "snyk"
-    out["raw_payload"] = raw
+    out["raw_payload"] = obj
     return _merge_rawfinding_shape(out, obj)
 
 
 def map_semgrep_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
     """Map Semgrep-style dict to RawFinding-shaped dict. Preserve original in raw_payload."""
     out: dict[str, Any] = {}
-    raw = dict(obj)
     if "check_id" in obj:
         out["vulnerability_id"] = _str_or_none(obj.get("check_id"))
     if "path" in obj:
@@ -137,7 +165,7 @@ def map_semgrep_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
         out.setdefault("severity", _str_or_none(meta.get("severity")))
         out.setdefault("description", out.get("description") or _str_or_none(meta.get("description")))
     out["scanner_source"] = out.get("scanner_source") or "semgrep"
-    out["raw_payload"] = raw
+    out["raw_payload"] = obj
     return _merge_rawfinding_shape(out, obj)
 
 
@@ -175,9 +203,11 @@ def _extract_osv_severity_and_cvss(obj: dict[str, Any]) -> tuple[str | None, flo
 
 
 def map_osv_scanner_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
-    """Map OSV-Scanner flattened dict to RawFinding-shaped dict. Preserve original in raw_payload."""
+    """
+    Map OSV-Scanner flattened dict to RawFinding-shaped dict. Preserve original in raw_payload.
+    Adds package_ecosystem to obj itself, which becomes raw_payload.
+    """
     out: dict[str, Any] = {}
-    raw = dict(obj)
     pkg = obj.get("package") or {}
     src = obj.get("source") or {}
 
@@ -185,7 +215,7 @@ def map_osv_scanner_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
     if isinstance(pkg, dict) and pkg.get("ecosystem") is not None:
         eco = pkg.get("ecosystem")
         if isinstance(eco, str) and eco.strip():
-            raw["package_ecosystem"] = eco.strip().lower()[:64]
+            obj["package_ecosystem"] = eco.strip().lower()[:64]
 
     out["vulnerability_id"] = _str_or_none(obj.get("id")) or _str_or_none(obj.get("vulnerability_id"))
     if not out["vulnerability_id"] and isinstance(obj.get("aliases"), list):
@@ -207,7 +237,7 @@ def map_osv_scanner_to_raw(obj: dict[str, Any]) -> dict[str, Any]:
 
     out["description"] = _str_or_none(obj.get("summary")) or _str_or_none(obj.get("details"))
     out["scanner_source"] = "osv-scanner"
-    out["raw_payload"] = raw
+    out["raw_payload"] = obj
     return _merge_rawfinding_shape(out, obj)
 
 
@@ -263,10 +293,32 @@ def apply_generic_aliases(obj: dict[str, Any]) -> dict[str, Any]:
             else:
                 result[target] = value
     if "raw_payload" not in result:
-        result["raw_payload"] = dict(obj)
+        result["raw_payload"] = obj
     return result
 
 
+def detect_item_format(obj: dict[str, Any]) -> ScannerFormat:
+    """Classify one payload by scanner heuristics (first match wins)."""
+    if _is_trivy_like(obj):
+        return "trivy"
+    if _is_snyk_like(obj):
+        return "snyk"
+    if _is_semgrep_like(obj):
+        return "semgrep"
+    if _is_osv_scanner_like(obj):
+        return "osv-scanner"
+    return "generic"
+
+
+_FORMAT_MAPPERS: dict[ScannerFormat, ItemMapper] = {
+    "trivy": map_trivy_to_raw,
+    "snyk": map_snyk_to_raw,
+    "semgrep": map_semgrep_to_raw,
+    "osv-scanner": map_osv_scanner_to_raw,
+    "generic": apply_generic_aliases,
+}
+
+
 def normalize_shape_to_rawfinding(obj: dict[str, Any]) -> dict[str, Any]:
     """
     Convert a scanner payload (any dict) to a dict suitable for RawFinding.model_validate.
@@ -274,12 +326,58 @@ def normalize_shape_to_rawfinding(obj: dict[str, Any]) -> dict[str, Any]:
     """
     if not isinstance(obj, dict):
         return obj
-    if _is_trivy_like(obj):
-        return map_trivy_to_raw(obj)
-    if _is_snyk_like(obj):
-        return map_snyk_to_raw(obj)
-    if _is_semgrep_like(obj):
-        return map_semgrep_to_raw(obj)
-    if _is_osv_scanner_like(obj):
-        return map_osv_scanner_to_raw(obj)
-    return apply_generic_aliases(obj)
+    return _FORMAT_MAPPERS[detect_item_format(obj)](obj)
+
+
+_FORMAT_DETECTORS: dict[ScannerFormat, Callable[[dict[str, Any]], bool]] = {
+    "trivy": _is_trivy_like,
+    "snyk": _is_snyk_like,
+    "semgrep": _is_semgrep_like,
+    "osv-scanner": _is_osv_scanner_like,
+    "generic": lambda obj: True,
+}
+
+# Keys each format's heuristic requires: an item holding none of another format's keys cannot
+# be detected as that format.
+_FORMAT_MARKER_KEYS: dict[ScannerFormat, tuple[str, ...]] = {
+    "trivy": ("VulnerabilityID", "Vulnerability"),
+    "snyk": ("issue_id",),
+    "semgrep": ("check_id",),
+    "osv-scanner": ("package",),
+    "generic": (),
+}
+# Per format: the keys of all other formats (an item with none of them is not of another format).
+_OTHER_FORMAT_KEYS: dict[ScannerFormat, tuple[str, ...]] = {
+    fmt: tuple(key for other, keys in _FORMAT_MARKER_KEYS.items() if other != fmt for key in keys)
+    for fmt in _FORMAT_MARKER_KEYS
+}
+
+
+def map_report_item(report_format: ScannerFormat, obj: Any) -> Any:
+    """
+    Map obj with report_format's mapper when obj is still of that format, else detect its
+    format (normalize_shape_to_rawfinding). The check costs a few key lookups and gives the
+    same result as per-item detection.
+    """
+    if (
+        isinstance(obj, dict)
+        and not any(key in obj for key in _OTHER_FORMAT_KEYS[report_format])
+        and _FORMAT_DETECTORS[report_format](obj)
+    ):
+        return _FORMAT_MAPPERS[report_format](obj)
+    return normalize_shape_to_rawfinding(obj)
+
+
+def select_report_mapper(sample: Iterable[Any]) -> ItemMapper:
+    """
+    Pick the item mapper for a whole report from its leading items (DETECTION_SAMPLE_SIZE).
+
+    When every object in the sample has the same format, map_report_item bound to that format
+    is returned: later items skip full detection but still fall back to it when they are of
+    another format (e.g. concatenated reports). Mixed or empty samples use per-item detection
+    (normalize_shape_to_rawfinding). The mapper is picklable, for process pools.
+    """
+    formats = {detect_item_format(obj) for obj in sample if isinstance(obj, dict)}
+    if len(formats) == 1:
+        return partial(map_report_item, formats.pop())
+    return normalize_shape_to_rawfinding
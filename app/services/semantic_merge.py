@@ -1,11 +1,19 @@
-"""Layer B semantic merge: embeddings + Qdrant. When CLUSTER_USE_SEMANTIC and Qdrant are enabled, returns merge pairs."""
+"""
+Layer B semantic merge: embeddings + similarity search, in-process (CLUSTER_SIMILARITY_BACKEND
+"local") or in Qdrant ("qdrant"). When CLUSTER_USE_SEMANTIC is enabled, returns merge pairs.
+"""
 
 import uuid
 from typing import TYPE_CHECKING
 
 from app.core.config import get_settings
 from app.services.embeddings import build_embedding_text, embed_texts
-from app.services.qdrant_client import search_similar_pairs, upsert_finding_vectors
+from app.services.qdrant_client import (
+    delete_collection,
+    search_similar_pairs,
+    upsert_finding_vectors,
+)
+from app.services.similarity_search import similar_pairs
 
 if TYPE_CHECKING:
     from app.models.finding import Finding
@@ -16,12 +24,16 @@ def apply_semantic_merge(
     signatures: list[str],
 ) -> list[tuple[str, str]]:
     """
-    When CLUSTER_USE_SEMANTIC and QDRANT_URL are set: build text per finding, embed,
-    upsert to Qdrant, search top-k similar; return (finding_id_a, finding_id_b) pairs above threshold.
+    When CLUSTER_USE_SEMANTIC is set: build text per finding, embed, search top-k similar;
+    return (finding_id_a, finding_id_b) pairs above threshold. The qdrant backend also needs
+    QDRANT_URL and searches a collection created for this call and dropped afterwards.
     When disabled or unavailable, returns [].
     """
     settings = get_settings()
-    if not settings.CLUSTER_USE_SEMANTIC or not settings.QDRANT_URL or not settings.QDRANT_URL.strip():
+    if not settings.CLUSTER_USE_SEMANTIC:
+        return []
+    use_qdrant = settings.CLUSTER_SIMILARITY_BACKEND == "qdrant"
+    if use_qdrant and (not settings.QDRANT_URL or not settings.QDRANT_URL.strip()):
         return []
     if not findings or len(findings) != len(signatures):
         return []
@@ -30,15 +42,25 @@ def apply_semantic_merge(
     if not vectors or len(vectors) != len(findings):
         return []
     finding_ids = [str(f.id) for f in findings]
+    if not use_qdrant:
+        return similar_pairs(
+            finding_ids,
+            vectors,
+            top_k=settings.CLUSTER_TOP_K,
+            score_threshold=settings.CLUSTER_SIMILARITY_THRESHOLD,
+            ann_min_items=settings.CLUSTER_ANN_MIN_FINDINGS,
+        )
     collection_name = f"{settings.QDRANT_COLLECTION_PREFIX}_{uuid.uuid4().hex[:12]}"
     payloads = [{"deterministic_signature": sig} for sig in signatures]
-    if not upsert_finding_vectors(collection_name, finding_ids, vectors, payloads):
-        return []
-    pairs = search_similar_pairs(
-        collection_name,
-        finding_ids,
-        vectors,
-        top_k=settings.CLUSTER_TOP_K,
-        score_threshold=settings.CLUSTER_SIMILARITY_THRESHOLD,
-    )
-    return pairs
+    try:
+        if not upsert_finding_vectors(collection_name, finding_ids, vectors, payloads):
+            return []
+        return search_similar_pairs(
+            collection_name,
+            finding_ids,
+            vectors,
+            top_k=settings.CLUSTER_TOP_K,
+            score_threshold=settings.CLUSTER_SIMILARITY_THRESHOLD,
+        )
+    finally:
+        delete_collection(collection_name)
@@ -0,0 +1,47 @@
+"""Backfill findings.signature for rows stored before Layer A signatures were persisted at ingest."""
+
+import logging
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import Finding
+from app.services.cluster_signature import signature_digest
+from app.services.clustering import compute_deterministic_signatures
+from app.services.finding_rules import attach_rule_payloads
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_signatures(db: Session, batch_size: int) -> int:
+    """
+    Compute and store the Layer A signature of every finding that has none, batch_size rows
+    at a time in id order, committing after each batch so the job can be interrupted and
+    re-run. Returns the number of findings updated. Idempotent: rows with a signature are skipped.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        findings = (
+            db.query(Finding)
+            .filter(Finding.signature.is_(None), Finding.id > last_id)
+            .order_by(Finding.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not findings:
+            break
+        attach_rule_payloads(db, findings)
+        signatures = compute_deterministic_signatures(findings)
+        db.execute(
+            update(Finding),
+            [
+                {"id": f.id, "signature": signature_digest(sig)}
+                for f, sig in zip(findings, signatures)
+            ],
+        )
+        last_id = findings[-1].id
+        updated += len(findings)
+        db.commit()
+        logger.info("Backfilled signatures: %s findings (last id %s)", updated, last_id)
+    return updated
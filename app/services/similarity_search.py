@@ -0,0 +1,132 @@
+"""
+Layer B: in-process nearest-neighbour search over finding embeddings (alternative to Qdrant).
+
+Returns the same pairs as the Qdrant path: for each finding, its top_k + 1 nearest vectors by
+cosine similarity (itself included) scoring at least score_threshold, as unordered id pairs.
+Small jobs are searched exactly with blocked matrix products of L2-normalized vectors; jobs of
+at least CLUSTER_ANN_MIN_FINDINGS use an HNSW graph index when the optional hnswlib is
+installed (approximate, sub-quadratic; see requirements-semantic.txt), and fall back to the
+exact, O(n^2) search otherwise. numpy is imported lazily (it ships with sentence-transformers,
+which produces the vectors).
+"""
+
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Similarity matrix cells computed per block of query rows (float32: 64 MiB).
+_EXACT_BLOCK_CELLS = 16 * 1024 * 1024
+
+# HNSW graph parameters: links per node, and candidate list sizes when building and searching.
+_HNSW_M = 16
+_HNSW_EF_CONSTRUCTION = 100
+_HNSW_EF_SEARCH = 64
+_HNSW_SEED = 100
+
+
+def similar_pairs(
+    finding_ids: list[str],
+    vectors: list[list[float]],
+    top_k: int,
+    score_threshold: float,
+    ann_min_items: int = 0,
+) -> list[tuple[str, str]]:
+    """
+    Sorted (finding_id_a, finding_id_b) pairs, a < b, where b is among a's top_k most similar
+    findings (or a among b's) with cosine similarity >= score_threshold. ann_min_items > 0 uses
+    the HNSW index for at least that many vectors. Returns [] when numpy is not installed.
+    """
+    if not finding_ids or not vectors or len(finding_ids) != len(vectors) or top_k < 1:
+        return []
+    try:
+        import numpy as np
+    except ImportError:
+        return []
+    matrix = _normalized(np.asarray(vectors, dtype=np.float32))
+    k = min(top_k + 1, len(finding_ids))
+    if ann_min_items and len(finding_ids) >= ann_min_items:
+        try:
+            neighbours, scores = _hnsw_neighbours(matrix, k)
+            return sorted(_pairs(finding_ids, neighbours, scores, score_threshold))
+        except ImportError:
+            logger.warning(
+                "hnswlib not installed; exact O(n^2) similarity search over %s findings",
+                len(finding_ids),
+            )
+    return _exact_pairs(finding_ids, matrix, k, score_threshold)
+
+
+def _normalized(matrix: "np.ndarray") -> "np.ndarray":
+    """Rows scaled to unit length (zero rows left as they are), so dot product is cosine."""
+    import numpy as np
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def _exact_pairs(
+    finding_ids: list[str],
+    matrix: "np.ndarray",
+    k: int,
+    score_threshold: float,
+) -> list[tuple[str, str]]:
+    """Pairs from exact top-k search, one block of query rows against all rows at a time."""
+    import numpy as np
+
+    n = matrix.shape[0]
+    block = max(1, _EXACT_BLOCK_CELLS // n)
+    pairs: set[tuple[str, str]] = set()
+    for start in range(0, n, block):
+        sims = matrix[start : start + block] @ matrix.T
+        if k < n:
+            neighbours = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        else:
+            neighbours = np.broadcast_to(np.arange(n), sims.shape)
+        scores = np.take_along_axis(sims, neighbours, axis=1)
+        pairs.update(_pairs(finding_ids, neighbours, scores, score_threshold, start))
+    return sorted(pairs)
+
+
+def _hnsw_neighbours(matrix: "np.ndarray", k: int) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    (neighbour indexes, cosine similarities), k per row, from an HNSW index over matrix.
+    Built single-threaded with a fixed seed so a job's pairs do not vary between runs.
+    Raises ImportError when hnswlib is not installed.
+    """
+    import hnswlib  # type: ignore[import-untyped]
+    import numpy as np
+
+    n, dim = matrix.shape
+    index = hnswlib.Index(space="ip", dim=dim)
+    index.init_index(
+        max_elements=n, ef_construction=_HNSW_EF_CONSTRUCTION, M=_HNSW_M, random_seed=_HNSW_SEED
+    )
+    index.add_items(matrix, np.arange(n), num_threads=1)
+    index.set_ef(max(_HNSW_EF_SEARCH, k))
+    labels, distances = index.knn_query(matrix, k=k)
+    # Inner-product distance is 1 - dot product.
+    return labels.astype(np.int64), 1.0 - distances
+
+
+def _pairs(
+    finding_ids: list[str],
+    neighbours: "np.ndarray",
+    scores: "np.ndarray",
+    score_threshold: float,
+    row_offset: int = 0,
+) -> set[tuple[str, str]]:
+    """Id pairs (ordered a < b) for neighbour hits at or above the threshold, self-hits excluded."""
+    import numpy as np
+
+    rows, cols = np.nonzero(scores >= score_threshold)
+    pairs: set[tuple[str, str]] = set()
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        a = finding_ids[row + row_offset]
+        b = finding_ids[int(neighbours[row, col])]
+        if a != b:
+            pairs.add((a, b) if a < b else (b, a))
+    return pairs
@@ -438,6 +438,55 @@ def resolve_affected_services(session: Session, finding_ids: list[str]) -> list[
     return sorted(set(repos)) if repos else []
 
 
+def resolve_job_affected_services(
+    session: Session,
+    upload_job_id: int,
+    clusters: list[VulnerabilityCluster],
+) -> dict[str, list[str]]:
+    """
+    resolve_affected_services for the job's persisted clusters with repo == "multiple", keyed
+    by vulnerability_id, as indexed joins: each cluster is found from its first finding id in
+    cluster_members, then the repos of all members in one query. Clusters not found there
+    (e.g. pasted or outdated) fall back to resolve_affected_services.
+    """
+    from app.models import ClusterMember, Finding
+    from app.services.cluster_persistence import find_clusters_for_findings
+
+    first_ids: dict[int, int] = {}
+    for i, cluster in enumerate(clusters):
+        if cluster.repo != "multiple" or not cluster.finding_ids:
+            continue
+        try:
+            first_ids[i] = int(str(cluster.finding_ids[0]).strip())
+        except ValueError:
+            continue
+    cluster_ids = find_clusters_for_findings(session, upload_job_id, list(set(first_ids.values())))
+    repos_by_cluster: dict[int, set[str]] = {}
+    if cluster_ids:
+        rows = (
+            session.query(ClusterMember.cluster_id, Finding.repo)
+            .join(Finding, Finding.id == ClusterMember.finding_id)
+            .filter(ClusterMember.cluster_id.in_(set(cluster_ids.values())))
+            .distinct()
+            .all()
+        )
+        for cluster_id, repo in rows:
+            if repo and str(repo).strip():
+                repos_by_cluster.setdefault(cluster_id, set()).add(repo.strip())
+    affected: dict[str, list[str]] = {}
+    for i, cluster in enumerate(clusters):
+        if cluster.repo != "multiple":
+            continue
+        cluster_id = cluster_ids.get(first_ids.get(i, -1))
+        if cluster_id is not None:
+            repos = sorted(repos_by_cluster.get(cluster_id, ()))
+        else:
+            repos = resolve_affected_services(session, cluster.finding_ids)
+        if repos:
+            affected[cluster.vulnerability_id] = repos
+    return affected
+
+
 def clusters_to_ticket_payloads(
     clusters: list[VulnerabilityCluster],
     *,
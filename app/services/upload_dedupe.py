@@ -0,0 +1,62 @@
+"""Idempotent uploads: find an existing upload job by report content hash or Idempotency-Key."""
+
+import hashlib
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import UploadJob
+
+# Max length of a client Idempotency-Key (upload_jobs.idempotency_key).
+MAX_IDEMPOTENCY_KEY_LEN = 255
+
+# Jobs still owned by a worker; reused only while their heartbeat (updated_at) is fresh.
+# Failed jobs are re-run when the same report is uploaded.
+_LIVE_STATUSES = ("pending", "processing")
+
+
+def combine_content_hashes(digests: Iterable[str]) -> str:
+    """Content hash of a batch upload: independent of report order."""
+    return hashlib.sha256("\n".join(sorted(digests)).encode("ascii")).hexdigest()
+
+
+def find_job_by_idempotency_key(db: Session, user_id: int, key: str) -> UploadJob | None:
+    """The user's upload job created with this Idempotency-Key, whatever its status."""
+    return (
+        db.query(UploadJob)
+        .filter(UploadJob.user_id == user_id, UploadJob.idempotency_key == key)
+        .first()
+    )
+
+
+def find_job_by_content_hash(
+    db: Session,
+    user_id: int,
+    content_hash: str,
+    delta: bool,
+) -> UploadJob | None:
+    """
+    The user's latest upload job for identical report bytes ingested in the same mode
+    (delta or full): completed, or pending/processing with a worker heartbeat within
+    INGEST_JOB_STALE_SECONDS (an interrupted job is recovered, not reused). Jobs that lost
+    findings to retention have no content_hash and never match.
+    """
+    stale = timedelta(seconds=get_settings().INGEST_JOB_STALE_SECONDS)
+    live = and_(
+        UploadJob.status.in_(_LIVE_STATUSES),
+        UploadJob.updated_at >= datetime.now(timezone.utc) - stale,
+    )
+    return (
+        db.query(UploadJob)
+        .filter(
+            UploadJob.user_id == user_id,
+            UploadJob.content_hash == content_hash,
+            UploadJob.delta.is_(delta),
+            or_(UploadJob.status == "completed", live),
+        )
+        .order_by(UploadJob.created_at.desc())
+        .first()
+    )
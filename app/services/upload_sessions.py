@@ -0,0 +1,253 @@
+"""Resumable chunked uploads: session state and chunk storage on local disk.
+
+A session is a directory under <INGEST_SPOOL_DIR>/sessions holding session.json, the report
+file preallocated to its declared size, and one <index>.json record per verified chunk.
+Chunks have a fixed size (the last may be shorter) and are written in place at
+index * chunk_size, so chunks may arrive in any order, concurrently, or again after a
+failure, and the finalized report needs no concatenation. A chunk's record is only written
+after its SHA-256 matched, so GET on the session tells the client which chunks to resend.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.services.ingest_worker import spool_dir
+
+_SESSION_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+_META_FILE = "session.json"
+_REPORT_FILE = "report"
+_CHUNKS_DIR = "chunks"
+_HASH_READ_BYTES = 1024 * 1024
+
+# Smallest chunk_size accepted, unless one chunk holds the whole report (caps the chunk count).
+MIN_CHUNK_BYTES = 64 * 1024
+
+# Expired sessions are swept at most this often per process, on session creation and chunk upload.
+_SWEEP_INTERVAL_SECONDS = 600
+_sweep_lock = threading.Lock()
+_last_sweep: float | None = None
+
+
+class UploadSessionNotFoundError(Exception):
+    """Raised when a session does not exist, has expired, or belongs to another user."""
+
+
+class UploadSessionError(Exception):
+    """Raised for invalid session parameters, chunks, or an incomplete session. detail is API-ready."""
+
+    def __init__(self, detail: str) -> None:
+        self.detail = detail
+        super().__init__(detail)
+
+
+@dataclass
+class UploadSession:
+    """One resumable upload session (see module docstring for the on-disk layout)."""
+
+    id: str
+    user_id: int
+    filename: str
+    total_size: int
+    chunk_size: int
+    created_at: float
+    path: Path
+
+    @property
+    def chunk_count(self) -> int:
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + get_settings().UPLOAD_SESSION_TTL_HOURS * 3600
+
+    @property
+    def report_path(self) -> Path:
+        return self.path / _REPORT_FILE
+
+    def expected_chunk_size(self, index: int) -> int:
+        """Exact byte size chunk index must have."""
+        if index < 0 or index >= self.chunk_count:
+            raise UploadSessionError(
+                f"Chunk index must be between 0 and {self.chunk_count - 1}."
+            )
+        return min(self.chunk_size, self.total_size - index * self.chunk_size)
+
+    def received_chunks(self) -> dict[int, dict]:
+        """Verified chunks: index -> {"size", "sha256"}."""
+        chunks: dict[int, dict] = {}
+        for record in (self.path / _CHUNKS_DIR).glob("*.json"):
+            try:
+                chunks[int(record.stem)] = json.loads(record.read_text())
+            except (ValueError, OSError):
+                continue
+        return chunks
+
+    def missing_chunks(self) -> list[int]:
+        received = self.received_chunks()
+        return [i for i in range(self.chunk_count) if i not in received]
+
+
+def _sessions_dir() -> Path:
+    path = spool_dir() / "sessions"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _read_session(path: Path) -> UploadSession | None:
+    try:
+        meta = json.loads((path / _META_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    return UploadSession(
+        id=path.name,
+        user_id=meta["user_id"],
+        filename=meta["filename"],
+        total_size=meta["total_size"],
+        chunk_size=meta["chunk_size"],
+        created_at=meta["created_at"],
+        path=path,
+    )
+
+
+def sweep_expired_sessions() -> int:
+    """Remove sessions older than UPLOAD_SESSION_TTL_HOURS. Returns the number removed."""
+    now = time.time()
+    ttl_seconds = get_settings().UPLOAD_SESSION_TTL_HOURS * 3600
+    removed = 0
+    for path in _sessions_dir().iterdir():
+        session = _read_session(path)
+        if session is not None:
+            expired = session.expires_at < now
+        else:
+            # Unreadable or still being created: judge by directory age.
+            try:
+                expired = path.stat().st_mtime + ttl_seconds < now
+            except OSError:
+                continue
+        if expired:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def _maybe_sweep_expired_sessions() -> None:
+    """sweep_expired_sessions() unless this process swept within the last _SWEEP_INTERVAL_SECONDS."""
+    global _last_sweep
+    now = time.monotonic()
+    with _sweep_lock:
+        if _last_sweep is not None and now - _last_sweep < _SWEEP_INTERVAL_SECONDS:
+            return
+        _last_sweep = now
+    sweep_expired_sessions()
+
+
+def create_session(user_id: int, filename: str, total_size: int, chunk_size: int) -> UploadSession:
+    """Validate sizes, create the session directory and preallocate the report file."""
+    settings = get_settings()
+    max_bytes = settings.UPLOAD_MAX_FILE_BYTES
+    if total_size < 1:
+        raise UploadSessionError("total_size must be at least 1 byte.")
+    if max_bytes and total_size > max_bytes:
+        raise UploadSessionError(f"File size must not exceed {max_bytes // (1024*1024)} MB.")
+    max_chunk = settings.UPLOAD_SESSION_MAX_CHUNK_BYTES
+    if chunk_size < min(MIN_CHUNK_BYTES, total_size) or chunk_size > max_chunk:
+        raise UploadSessionError(
+            f"chunk_size must be between {MIN_CHUNK_BYTES} and {max_chunk} bytes "
+            "(or at least total_size for a single chunk)."
+        )
+    _maybe_sweep_expired_sessions()
+    path = _sessions_dir() / uuid.uuid4().hex
+    (path / _CHUNKS_DIR).mkdir(parents=True)
+    meta = {
+        "user_id": user_id,
+        "filename": filename,
+        "total_size": total_size,
+        "chunk_size": chunk_size,
+        "created_at": time.time(),
+    }
+    (path / _META_FILE).write_text(json.dumps(meta))
+    with open(path / _REPORT_FILE, "wb") as f:
+        f.truncate(total_size)
+    return _read_session(path)
+
+
+def load_session(session_id: str, user_id: int) -> UploadSession:
+    """The user's unexpired session, else UploadSessionNotFoundError."""
+    if not _SESSION_ID_RE.match(session_id):
+        raise UploadSessionNotFoundError(session_id)
+    session = _read_session(_sessions_dir() / session_id)
+    if session is None or session.user_id != user_id or session.expires_at < time.time():
+        raise UploadSessionNotFoundError(session_id)
+    return session
+
+
+def write_chunk(session: UploadSession, index: int, data: bytes, expected_sha256: str) -> dict:
+    """
+    Verify and store one chunk in place. The chunk's record is removed first, so a failed
+    or mismatching write leaves the chunk listed as missing. Returns {"size", "sha256"}.
+    """
+    _maybe_sweep_expired_sessions()
+    expected_size = session.expected_chunk_size(index)
+    expected_sha256 = expected_sha256.strip().lower()
+    if not _SHA256_RE.match(expected_sha256):
+        raise UploadSessionError("Chunk checksum must be a hex SHA-256 digest.")
+    record = session.path / _CHUNKS_DIR / f"{index}.json"
+    record.unlink(missing_ok=True)
+    if len(data) != expected_size:
+        raise UploadSessionError(
+            f"Chunk {index} must be {expected_size} bytes; received {len(data)}."
+        )
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != expected_sha256:
+        raise UploadSessionError(
+            f"Chunk {index} checksum mismatch: expected {expected_sha256}, received {digest}."
+        )
+    fd = os.open(session.report_path, os.O_WRONLY)
+    try:
+        written = 0
+        while written < len(data):
+            written += os.pwrite(fd, data[written:], index * session.chunk_size + written)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    info = {"size": expected_size, "sha256": digest}
+    tmp = record.with_suffix(".tmp")
+    tmp.write_text(json.dumps(info))
+    tmp.replace(record)
+    return info
+
+
+def assemble_report(session: UploadSession, expected_sha256: str | None = None) -> str:
+    """
+    Check that every chunk was received and return the SHA-256 of the whole report
+    (session.report_path), verifying it against expected_sha256 when given.
+    """
+    missing = session.missing_chunks()
+    if missing:
+        shown = ", ".join(str(i) for i in missing[:20])
+        more = f" and {len(missing) - 20} more" if len(missing) > 20 else ""
+        raise UploadSessionError(f"Missing chunks: {shown}{more}.")
+    hasher = hashlib.sha256()
+    with open(session.report_path, "rb") as f:
+        while block := f.read(_HASH_READ_BYTES):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+    if expected_sha256 is not None and digest != expected_sha256.strip().lower():
+        raise UploadSessionError(
+            f"Report checksum mismatch: expected {expected_sha256}, received {digest}."
+        )
+    return digest
+
+
+def delete_session(session: UploadSession) -> None:
+    shutil.rmtree(session.path, ignore_errors=True)
@@ -0,0 +1,306 @@
+//! Incremental cluster index: findings grouped by signature with per-cluster aggregates (worst
+//! severity, distinct repos, member ids, representative fields) kept up to date on add/remove,
+//! so updating a job costs time proportional to the change. A snapshot equals clustering the
+//! current members from scratch in insertion order (same grouping and canonical fields as the
+//! Python fallback). Serialized as the member list in insertion order.
+
+use std::collections::{BTreeMap, HashMap};
+
+use serde::{Deserialize, Serialize};
+
+use crate::signature::py_strip;
+use crate::{severity_rank, SEVERITY_ORDER};
+
+/// Bump when the serialized layout or the meaning of stored signatures changes.
+pub const INDEX_FORMAT_VERSION: u32 = 1;
+
+/// One finding as held by the index; signature is its Layer A cluster key.
+#[derive(Debug, Clone, PartialEq, Serialize, Deserialize)]
+pub struct IndexedFinding {
+    pub id: String,
+    pub signature: String,
+    pub severity: String,
+    pub repo: String,
+    pub vulnerability_id: String,
+    pub file_path: String,
+    pub dependency: String,
+    pub cvss_score: f64,
+    pub description: String,
+}
+
+/// Canonical fields of one cluster (VulnerabilityCluster).
+#[derive(Debug, Clone, PartialEq)]
+pub struct ClusterSnapshot {
+    pub vulnerability_id: String,
+    pub severity: String,
+    pub repo: String,
+    pub file_path: String,
+    pub dependency: String,
+    pub cvss_score: f64,
+    pub description: String,
+    pub finding_ids: Vec<String>,
+    pub affected_services_count: u32,
+    pub finding_count: u32,
+}
+
+#[derive(Debug, Default)]
+struct ClusterAggregate {
+    /// Members by insertion sequence; the first one supplies the representative fields.
+    members: BTreeMap<u64, IndexedFinding>,
+    severity_counts: [u32; SEVERITY_ORDER.len()],
+    /// Stripped repo -> member count.
+    repo_counts: HashMap<String, u32>,
+}
+
+impl ClusterAggregate {
+    fn insert(&mut self, seq: u64, finding: IndexedFinding) {
+        self.severity_counts[severity_rank(&finding.severity)] += 1;
+        *self
+            .repo_counts
+            .entry(py_strip(&finding.repo).to_string())
+            .or_insert(0) += 1;
+        self.members.insert(seq, finding);
+    }
+
+    fn remove(&mut self, seq: u64) {
+        let Some(finding) = self.members.remove(&seq) else {
+            return;
+        };
+        self.severity_counts[severity_rank(&finding.severity)] -= 1;
+        let repo = py_strip(&finding.repo);
+        if let Some(count) = self.repo_counts.get_mut(repo) {
+            *count -= 1;
+            if *count == 0 {
+                self.repo_counts.remove(repo);
+            }
+        }
+    }
+
+    fn first_seq(&self) -> Option<u64> {
+        self.members.keys().next().copied()
+    }
+
+    fn snapshot(&self) -> ClusterSnapshot {
+        let first = self.members.values().next().expect("empty clusters are dropped");
+        let worst = self
+            .severity_counts
+            .iter()
+            .rposition(|&count| count > 0)
+            .unwrap_or(0);
+        let distinct_repos = self.repo_counts.len() as u32;
+        let or_default = |value: &str, default: &str| {
+            if value.is_empty() {
+                default.to_string()
+            } else {
+                value.to_string()
+            }
+        };
+        let finding_ids: Vec<String> = self.members.values().map(|f| f.id.clone()).collect();
+        ClusterSnapshot {
+            vulnerability_id: or_default(&first.vulnerability_id, "unknown"),
+            severity: SEVERITY_ORDER[worst].to_string(),
+            repo: if distinct_repos > 1 {
+                "multiple".to_string()
+            } else {
+                or_default(&first.repo, "unknown")
+            },
+            file_path: first.file_path.clone(),
+            dependency: first.dependency.clone(),
+            cvss_score: first.cvss_score,
+            description: or_default(&first.description, "No description"),
+            finding_count: finding_ids.len() as u32,
+            finding_ids,
+            affected_services_count: distinct_repos.max(1),
+        }
+    }
+}
+
+#[derive(Serialize, Deserialize)]
+struct SerializedIndex {
+    version: u32,
+    findings: Vec<IndexedFinding>,
+}
+
+/// Findings grouped by signature; see the module docs.
+#[derive(Debug, Default)]
+pub struct ClusterIndexState {
+    next_seq: u64,
+    clusters: HashMap<String, ClusterAggregate>,
+    /// Finding id -> (signature, insertion sequence).
+    locations: HashMap<String, (String, u64)>,
+}
+
+impl ClusterIndexState {
+    /// Add findings in order; a finding whose id is already indexed is replaced (and moves last).
+    pub fn add(&mut self, findings: Vec<IndexedFinding>) {
+        for finding in findings {
+            self.remove_one(&finding.id);
+            let seq = self.next_seq;
+            self.next_seq += 1;
+            self.locations
+                .insert(finding.id.clone(), (finding.signature.clone(), seq));
+            self.clusters
+                .entry(finding.signature.clone())
+                .or_default()
+                .insert(seq, finding);
+        }
+    }
+
+    fn remove_one(&mut self, id: &str) -> bool {
+        let Some((signature, seq)) = self.locations.remove(id) else {
+            return false;
+        };
+        if let Some(cluster) = self.clusters.get_mut(&signature) {
+            cluster.remove(seq);
+            if cluster.members.is_empty() {
+                self.clusters.remove(&signature);
+            }
+        }
+        true
+    }
+
+    /// Remove findings by id; unknown ids are ignored. Returns how many were removed.
+    pub fn remove<S: AsRef<str>>(&mut self, ids: &[S]) -> usize {
+        ids.iter().filter(|id| self.remove_one(id.as_ref())).count()
+    }
+
+    pub fn contains(&self, id: &str) -> bool {
+        self.locations.contains_key(id)
+    }
+
+    /// Number of indexed findings.
+    pub fn len(&self) -> usize {
+        self.locations.len()
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.locations.is_empty()
+    }
+
+    pub fn cluster_count(&self) -> usize {
+        self.clusters.len()
+    }
+
+    /// Indexed finding ids in insertion order.
+    pub fn finding_ids(&self) -> Vec<String> {
+        let mut ids: Vec<(&u64, &String)> = self.locations.iter().map(|(id, (_, seq))| (seq, id)).collect();
+        ids.sort_unstable();
+        ids.into_iter().map(|(_, id)| id.clone()).collect()
+    }
+
+    /// All clusters, ordered by their first member's insertion.
+    pub fn snapshot(&self) -> Vec<ClusterSnapshot> {
+        let mut clusters: Vec<(u64, &ClusterAggregate)> = self
+            .clusters
+            .values()
+            .filter_map(|c| c.first_seq().map(|seq| (seq, c)))
+            .collect();
+        clusters.sort_unstable_by_key(|(seq, _)| *seq);
+        clusters.into_iter().map(|(_, c)| c.snapshot()).collect()
+    }
+
+    pub fn to_bytes(&self) -> Result<Vec<u8>, String> {
+        let mut members: Vec<(u64, &IndexedFinding)> = self
+            .clusters
+            .values()
+            .flat_map(|c| c.members.iter().map(|(seq, f)| (*seq, f)))
+            .collect();
+        members.sort_unstable_by_key(|(seq, _)| *seq);
+        let serialized = SerializedIndex {
+            version: INDEX_FORMAT_VERSION,
+            findings: members.into_iter().map(|(_, f)| f.clone()).collect(),
+        };
+        serde_json::to_vec(&serialized).map_err(|e| e.to_string())
+    }
+
+    pub fn from_bytes(data: &[u8]) -> Result<Self, String> {
+        let serialized: SerializedIndex = serde_json::from_slice(data).map_err(|e| e.to_string())?;
+        if serialized.version != INDEX_FORMAT_VERSION {
+            return Err(format!(
+                "unsupported cluster index version {} (expected {})",
+                serialized.version, INDEX_FORMAT_VERSION
+            ));
+        }
+        let mut state = Self::default();
+        state.add(serialized.findings);
+        Ok(state)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn finding(id: &str, signature: &str, severity: &str, repo: &str) -> IndexedFinding {
+        IndexedFinding {
+            id: id.to_string(),
+            signature: signature.to_string(),
+            severity: severity.to_string(),
+            repo: repo.to_string(),
+            vulnerability_id: format!("vuln-{}", id),
+            file_path: String::new(),
+            dependency: String::new(),
+            cvss_score: 5.0,
+            description: String::new(),
+        }
+    }
+
+    #[test]
+    fn test_aggregates_follow_add_and_remove() {
+        let mut index = ClusterIndexState::default();
+        index.add(vec![
+            finding("1", "a", "low", "r1"),
+            finding("2", "b", "high", "r1"),
+            finding("3", "a", "critical", "r2"),
+        ]);
+        let snap = index.snapshot();
+        assert_eq!(snap.len(), 2);
+        assert_eq!(snap[0].finding_ids, ["1", "3"]);
+        assert_eq!(snap[0].severity, "critical");
+        assert_eq!(snap[0].repo, "multiple");
+        assert_eq!(snap[0].affected_services_count, 2);
+        assert_eq!(snap[0].vulnerability_id, "vuln-1");
+        assert_eq!(snap[0].description, "No description");
+
+        assert_eq!(index.remove(&["1", "3", "missing"]), 2);
+        index.add(vec![finding("4", "a", "", "r1")]);
+        let snap = index.snapshot();
+        // Cluster "a" was emptied, so it now follows "b".
+        assert_eq!(snap[0].finding_ids, ["2"]);
+        assert_eq!(snap[1].finding_ids, ["4"]);
+        assert_eq!(snap[1].severity, "info");
+        assert_eq!(snap[1].repo, "r1");
+    }
+
+    #[test]
+    fn test_representative_moves_to_next_member() {
+        let mut index = ClusterIndexState::default();
+        index.add(vec![finding("1", "a", "high", "r1"), finding("2", "a", "low", "r1")]);
+        index.remove(&["1"]);
+        let snap = index.snapshot();
+        assert_eq!(snap[0].vulnerability_id, "vuln-2");
+        assert_eq!(snap[0].severity, "low");
+    }
+
+    #[test]
+    fn test_re_add_replaces_finding() {
+        let mut index = ClusterIndexState::default();
+        index.add(vec![finding("1", "a", "high", "r1")]);
+        index.add(vec![finding("1", "b", "low", "r1")]);
+        assert_eq!(index.len(), 1);
+        assert_eq!(index.cluster_count(), 1);
+        assert_eq!(index.snapshot()[0].severity, "low");
+    }
+
+    #[test]
+    fn test_bytes_roundtrip() {
+        let mut index = ClusterIndexState::default();
+        index.add(vec![finding("1", "a", "high", "r1"), finding("2", "b", "low", "r2")]);
+        index.remove(&["1"]);
+        index.add(vec![finding("3", "a", "medium", "r1")]);
+        let restored = ClusterIndexState::from_bytes(&index.to_bytes().unwrap()).unwrap();
+        assert_eq!(restored.snapshot(), index.snapshot());
+        assert_eq!(restored.finding_ids(), ["2", "3"]);
+        assert!(ClusterIndexState::from_bytes(br#"{"version":0,"findings":[]}"#).is_err());
+    }
+}
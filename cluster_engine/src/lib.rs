@@ -1,13 +1,28 @@
 //! Cluster engine: group normalized findings by SCA (CVE+dependency) or SAST (rule+path).
-//! Input: JSON array of normalized findings with `id`. Output: JSON with clusters and metrics.
+//! `cluster_findings_json` (Rust only) takes a JSON array of normalized findings with `id` and
+//! returns JSON with clusters and metrics.
+//! `cluster_columns` is the columnar entrypoint: parallel lists of signatures, severities and
+//! repos in, member index groups out, so the caller keeps its own finding objects.
+//! `compute_signatures` computes Layer A signatures (see `signature`). Key computation and
+//! per-cluster aggregation run on the rayon thread pool. `ClusterIndex` keeps clusters of a job
+//! up to date incrementally (see `index`).
 
-use std::collections::HashMap;
+use std::collections::{HashMap, HashSet};
 
 use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
-use regex::Regex;
+use pyo3::types::PyBytes;
+use rayon::prelude::*;
 use serde::{Deserialize, Serialize};
 
+mod index;
+mod signature;
+
+pub use index::{ClusterIndexState, ClusterSnapshot, IndexedFinding};
+
+pub use signature::{deterministic_signature, is_cve_or_ghsa_like, SignatureInput};
+use signature::py_strip;
+
 /// Input finding: same shape as NormalizedFinding plus required `id` for finding_ids.
 /// When `deterministic_signature` is present (Layer A from Python), it is used as the cluster key;
 /// otherwise the engine computes the key from vulnerability_id/dependency/file_path (legacy).
@@ -72,25 +87,13 @@ pub struct ClustersOutput {
     pub metrics: CompressionMetricsOutput,
 }
 
-fn is_cve_or_ghsa_like(vid: &str) -> bool {
-    let vid = vid.trim();
-    if vid.is_empty() {
-        return false;
-    }
-    // CVE-YEAR-NNNNN+ (4+ digits after second hyphen); case-insensitive
-    let cve = Regex::new(r"(?i)^CVE-\d{4}-\d{4,}$").unwrap();
-    // GHSA-xxxx-xxxx-xxxx (4 alphanumeric groups); case-insensitive
-    let ghsa = Regex::new(r"(?i)^GHSA-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{4}$").unwrap();
-    cve.is_match(vid) || ghsa.is_match(vid)
-}
-
-fn file_path_pattern(repo: &str, file_path: &str) -> String {
-    let path = file_path.trim().replace('\\', "/");
+pub(crate) fn file_path_pattern(repo: &str, file_path: &str) -> String {
+    let path = py_strip(file_path).replace('\\', "/");
     if path.is_empty() {
         return String::new();
     }
     let mut path = path;
-    let repo_norm = repo.trim().replace('\\', "/").trim_matches('/').to_string();
+    let repo_norm = py_strip(repo).replace('\\', "/").trim_matches('/').to_string();
     if !repo_norm.is_empty() && (path.starts_with(&format!("{}/", repo_norm)) || path == repo_norm) {
         if path == repo_norm {
             path = String::new();
@@ -114,17 +117,7 @@ fn cluster_key(f: &NormalizedFindingInput) -> String {
 const SEVERITY_ORDER: [&str; 5] = ["info", "low", "medium", "high", "critical"];
 
 fn severity_rank(s: &str) -> usize {
-    let normalized: String = s
-        .trim()
-        .chars()
-        .map(|c| {
-            if c >= 'A' && c <= 'Z' {
-                ((c as u8).wrapping_add(32)) as char
-            } else {
-                c
-            }
-        })
-        .collect();
+    let normalized = py_strip(s).to_lowercase();
     SEVERITY_ORDER
         .iter()
         .position(|&x| x == normalized)
@@ -155,25 +148,25 @@ pub fn cluster_findings(findings: &[NormalizedFindingInput]) -> ClustersOutput {
         };
     }
 
-    // Single-threaded grouping: use precomputed deterministic_signature when present, else legacy key.
-    let mut groups: HashMap<String, Vec<&NormalizedFindingInput>> = HashMap::new();
-    for f in findings {
-        let key: String = f
-            .deterministic_signature
-            .as_ref()
-            .filter(|s| !s.is_empty())
-            .cloned()
-            .unwrap_or_else(|| cluster_key(f));
-        groups.entry(key).or_default().push(f);
-    }
+    // Use precomputed deterministic_signature when present, else legacy key.
+    let keys: Vec<String> = findings
+        .par_iter()
+        .map(|f| {
+            f.deterministic_signature
+                .as_ref()
+                .filter(|s| !s.is_empty())
+                .cloned()
+                .unwrap_or_else(|| cluster_key(f))
+        })
+        .collect();
 
-    let clusters: Vec<VulnerabilityClusterOutput> = groups
-        .into_iter()
-        .map(|(_key, group)| {
+    let clusters: Vec<VulnerabilityClusterOutput> = group_indices(&keys)
+        .into_par_iter()
+        .map(|members| {
+            let group: Vec<&NormalizedFindingInput> = members.iter().map(|&i| &findings[i]).collect();
             let first = group[0];
             let finding_ids: Vec<String> = group.iter().map(|f| f.id.to_string()).collect();
-            let distinct_repos: std::collections::HashSet<_> =
-                group.iter().map(|f| f.repo.trim().to_string()).collect();
+            let distinct_repos: HashSet<&str> = group.iter().map(|f| f.repo.trim()).collect();
             let distinct_repos_count = distinct_repos.len() as u32;
             let severities: Vec<String> = group
                 .iter()
@@ -245,21 +238,262 @@ pub fn cluster_findings_json(json_input: &str) -> Result<String, String> {
     serde_json::to_string(&out).map_err(|e| e.to_string())
 }
 
-/// PyO3 entrypoint: called from Python with JSON string, returns JSON string.
+/// Indices of keys grouped by equal key; groups in order of first appearance, members in input order.
+fn group_indices(keys: &[String]) -> Vec<Vec<usize>> {
+    let mut slots: HashMap<&str, usize> = HashMap::with_capacity(keys.len());
+    let mut groups: Vec<Vec<usize>> = Vec::new();
+    for (i, key) in keys.iter().enumerate() {
+        let slot = *slots.entry(key.as_str()).or_insert_with(|| {
+            groups.push(Vec::new());
+            groups.len() - 1
+        });
+        groups[slot].push(i);
+    }
+    groups
+}
+
+/// One cluster of the columnar API: member indices (input order), worst severity, distinct repo count.
+pub type ColumnCluster = (Vec<usize>, String, u32);
+
+/// Group findings given as parallel columns by signature. Clusters come out in order of first
+/// appearance, members in input order, matching the Python fallback's grouping.
+pub fn cluster_column_groups(
+    signatures: &[String],
+    severities: &[String],
+    repos: &[String],
+) -> Vec<ColumnCluster> {
+    group_indices(signatures)
+        .into_par_iter()
+        .map(|members| {
+            let group_severities: Vec<String> = members
+                .iter()
+                .map(|&i| py_strip(&severities[i]).to_owned())
+                .filter(|s| !s.is_empty())
+                .collect();
+            let severity = if group_severities.is_empty() {
+                "info".to_string()
+            } else {
+                worst_severity(&group_severities)
+            };
+            let distinct_repos: HashSet<&str> = members.iter().map(|&i| py_strip(&repos[i])).collect();
+            let distinct_repos_count = distinct_repos.len() as u32;
+            (members, severity, distinct_repos_count)
+        })
+        .collect()
+}
+
+/// PyO3 columnar entrypoint: lists of signatures, severities and repos (same length) in, list of
+/// (member indices, worst severity, distinct repo count) out. Runs without the GIL.
 #[pyfunction]
-fn cluster_findings_py(json_input: &str) -> PyResult<String> {
-    cluster_findings_json(json_input).map_err(|e| PyValueError::new_err(e))
+fn cluster_columns(
+    py: Python<'_>,
+    signatures: Vec<String>,
+    severities: Vec<String>,
+    repos: Vec<String>,
+) -> PyResult<Vec<ColumnCluster>> {
+    if severities.len() != signatures.len() || repos.len() != signatures.len() {
+        return Err(PyValueError::new_err(
+            "signatures, severities and repos must have the same length",
+        ));
+    }
+    Ok(py.allow_threads(|| cluster_column_groups(&signatures, &severities, &repos)))
+}
+
+/// Layer A signatures for columns of finding fields (same length). ecosystems, package_names,
+/// messages and cwes are the raw_payload fields read in Python (see `SignatureInput`).
+/// Signatures are hashed in parallel.
+#[allow(clippy::too_many_arguments)]
+pub fn compute_signature_columns(
+    vulnerability_ids: &[String],
+    dependencies: &[String],
+    repos: &[String],
+    file_paths: &[String],
+    descriptions: &[String],
+    ecosystems: &[String],
+    package_names: &[Option<String>],
+    messages: &[Option<String>],
+    cwes: &[Option<String>],
+) -> Vec<String> {
+    (0..vulnerability_ids.len())
+        .into_par_iter()
+        .map(|i| {
+            deterministic_signature(&SignatureInput {
+                vulnerability_id: vulnerability_ids[i].clone(),
+                dependency: dependencies[i].clone(),
+                repo: repos[i].clone(),
+                file_path: file_paths[i].clone(),
+                description: descriptions[i].clone(),
+                ecosystem: ecosystems[i].clone(),
+                package_name: package_names[i].clone(),
+                message: messages[i].clone(),
+                cwe: cwes[i].clone(),
+            })
+        })
+        .collect()
+}
+
+/// PyO3 entrypoint for compute_signature_columns; runs without the GIL.
+#[pyfunction]
+#[allow(clippy::too_many_arguments)]
+fn compute_signatures(
+    py: Python<'_>,
+    vulnerability_ids: Vec<String>,
+    dependencies: Vec<String>,
+    repos: Vec<String>,
+    file_paths: Vec<String>,
+    descriptions: Vec<String>,
+    ecosystems: Vec<String>,
+    package_names: Vec<Option<String>>,
+    messages: Vec<Option<String>>,
+    cwes: Vec<Option<String>>,
+) -> PyResult<Vec<String>> {
+    let n = vulnerability_ids.len();
+    if [
+        dependencies.len(),
+        repos.len(),
+        file_paths.len(),
+        descriptions.len(),
+        ecosystems.len(),
+        package_names.len(),
+        messages.len(),
+        cwes.len(),
+    ]
+    .iter()
+    .any(|&len| len != n)
+    {
+        return Err(PyValueError::new_err("all signature columns must have the same length"));
+    }
+    Ok(py.allow_threads(|| {
+        compute_signature_columns(
+            &vulnerability_ids,
+            &dependencies,
+            &repos,
+            &file_paths,
+            &descriptions,
+            &ecosystems,
+            &package_names,
+            &messages,
+            &cwes,
+        )
+    }))
+}
+
+/// Finding as passed to ClusterIndex.add: (id, signature, severity, repo, vulnerability_id,
+/// file_path, dependency, cvss_score, description).
+type FindingTuple = (String, String, String, String, String, String, String, f64, String);
+/// Cluster as returned by ClusterIndex.snapshot: (vulnerability_id, severity, repo, file_path,
+/// dependency, cvss_score, description, finding_ids, affected_services_count, finding_count).
+type ClusterTuple = (String, String, String, String, String, f64, String, Vec<String>, u32, u32);
+
+/// Incremental cluster index for one job (ClusterIndexState). add/remove/snapshot run without the GIL.
+#[pyclass(module = "cluster_engine")]
+#[derive(Default)]
+struct ClusterIndex {
+    state: ClusterIndexState,
+}
+
+#[pymethods]
+impl ClusterIndex {
+    #[new]
+    fn new() -> Self {
+        Self::default()
+    }
+
+    /// Add findings (FindingTuple) in order; re-added ids replace the indexed finding.
+    fn add(&mut self, py: Python<'_>, findings: Vec<FindingTuple>) {
+        let findings: Vec<IndexedFinding> = findings
+            .into_iter()
+            .map(
+                |(id, signature, severity, repo, vulnerability_id, file_path, dependency, cvss_score, description)| {
+                    IndexedFinding {
+                        id,
+                        signature,
+                        severity,
+                        repo,
+                        vulnerability_id,
+                        file_path,
+                        dependency,
+                        cvss_score,
+                        description,
+                    }
+                },
+            )
+            .collect();
+        let state = &mut self.state;
+        py.allow_threads(|| state.add(findings));
+    }
+
+    /// Remove findings by id; returns how many were indexed.
+    fn remove(&mut self, py: Python<'_>, finding_ids: Vec<String>) -> usize {
+        let state = &mut self.state;
+        py.allow_threads(|| state.remove(&finding_ids))
+    }
+
+    /// Current clusters (ClusterTuple), ordered by first member.
+    fn snapshot(&self, py: Python<'_>) -> Vec<ClusterTuple> {
+        let state = &self.state;
+        py.allow_threads(|| state.snapshot())
+            .into_iter()
+            .map(|c| {
+                (
+                    c.vulnerability_id,
+                    c.severity,
+                    c.repo,
+                    c.file_path,
+                    c.dependency,
+                    c.cvss_score,
+                    c.description,
+                    c.finding_ids,
+                    c.affected_services_count,
+                    c.finding_count,
+                )
+            })
+            .collect()
+    }
+
+    /// Indexed finding ids in insertion order.
+    fn finding_ids(&self) -> Vec<String> {
+        self.state.finding_ids()
+    }
+
+    fn cluster_count(&self) -> usize {
+        self.state.cluster_count()
+    }
+
+    fn __len__(&self) -> usize {
+        self.state.len()
+    }
+
+    fn __contains__(&self, finding_id: &str) -> bool {
+        self.state.contains(finding_id)
+    }
+
+    /// Serialized index, for persisting with the job.
+    fn to_bytes<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        let data = self.state.to_bytes().map_err(PyValueError::new_err)?;
+        Ok(PyBytes::new_bound(py, &data))
+    }
+
+    /// Index restored from to_bytes output; raises ValueError if invalid or from another format version.
+    #[staticmethod]
+    fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        let state = ClusterIndexState::from_bytes(data).map_err(PyValueError::new_err)?;
+        Ok(Self { state })
+    }
 }
 
 #[pymodule]
 fn cluster_engine(m: &Bound<'_, PyModule>) -> PyResult<()> {
-    m.add_function(wrap_pyfunction!(cluster_findings_py, m)?)?;
+    m.add_function(wrap_pyfunction!(cluster_columns, m)?)?;
+    m.add_function(wrap_pyfunction!(compute_signatures, m)?)?;
+    m.add_class::<ClusterIndex>()?;
     Ok(())
 }
 
 #[cfg(test)]
 mod tests {
     use super::*;
+    use sha2::{Digest, Sha256};
 
     fn finding(id: i64, vid: &str, dep: &str, repo: &str, file_path: &str, severity: &str) -> NormalizedFindingInput {
         NormalizedFindingInput {
@@ -334,4 +568,45 @@ mod tests {
         assert_eq!(out.metrics.cluster_count, 1);
         assert_eq!(out.clusters[0].finding_count, 2);
     }
+
+    fn strings(values: &[&str]) -> Vec<String> {
+        values.iter().map(|s| s.to_string()).collect()
+    }
+
+    #[test]
+    fn test_column_groups_first_seen_order() {
+        let out = cluster_column_groups(
+            &strings(&["b", "a", "b", "c"]),
+            &strings(&["low", "medium", "CRITICAL", ""]),
+            &strings(&["r1", "r1", "r2", ""]),
+        );
+        assert_eq!(out.len(), 3);
+        assert_eq!(out[0], (vec![0, 2], "critical".to_string(), 2));
+        assert_eq!(out[1], (vec![1], "medium".to_string(), 1));
+        assert_eq!(out[2], (vec![3], "info".to_string(), 1));
+    }
+
+    #[test]
+    fn test_signature_columns_use_payload_fields() {
+        let out = compute_signature_columns(
+            &strings(&["CVE-2024-1234", "rule-1", "rule-1"]),
+            &strings(&["dep", "", ""]),
+            &strings(&["r", "r", "r"]),
+            &strings(&["", "r/a.py", "r/b.py"]),
+            &strings(&["", "", ""]),
+            &strings(&["npm", "", ""]),
+            &[Some("Pkg".to_string()), None, None],
+            &[None, None, Some("Msg".to_string())],
+            &[None, None, None],
+        );
+        let sast = format!("{:x}", Sha256::digest("rule-1\0msg\0".as_bytes()));
+        assert_eq!(out[0], "CVE-2024-1234\0npm\0pkg");
+        assert_eq!(out[1], "rule-1\0a.py");
+        assert_eq!(out[2], format!("rule-1\0{}", sast));
+    }
+
+    #[test]
+    fn test_column_groups_empty() {
+        assert!(cluster_column_groups(&[], &[], &[]).is_empty());
+    }
 }
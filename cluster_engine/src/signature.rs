@@ -0,0 +1,186 @@
+//! Layer A deterministic signatures, ported from app/services/cluster_signature.py.
+//! SCA: vuln_id \0 ecosystem \0 package_name. SAST: rule_id \0 sha256(rule+message+CWE) when the
+//! payload carries a message or CWE, else rule_id \0 file path pattern. Output must stay
+//! byte-identical to the Python implementation (Python strip/lower/slicing semantics).
+//! The payload fields are read in Python (cluster_signature.signature_payload_fields), so
+//! payloads are never serialized for the engine.
+
+use std::sync::OnceLock;
+
+use regex::Regex;
+use sha2::{Digest, Sha256};
+
+/// Max length (chars) for signature components, as in Python.
+const MAX_COMPONENT_LEN: usize = 2048;
+
+/// Fields of one finding needed for its signature. The last four come from the expanded
+/// raw_payload as signature_payload_fields returns them: normalized ecosystem ("" if absent),
+/// stripped package name and message, and the first CWE (Some("") when metadata.cwe is a
+/// non-empty list without a usable first entry).
+#[derive(Debug, Clone, Default)]
+pub struct SignatureInput {
+    pub vulnerability_id: String,
+    pub dependency: String,
+    pub repo: String,
+    pub file_path: String,
+    pub description: String,
+    pub ecosystem: String,
+    pub package_name: Option<String>,
+    pub message: Option<String>,
+    pub cwe: Option<String>,
+}
+
+fn vuln_id_re() -> &'static Regex {
+    static RE: OnceLock<Regex> = OnceLock::new();
+    RE.get_or_init(|| {
+        Regex::new(r"(?i)^(?:CVE-\d{4}-\d{4,}|GHSA-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{4})$").unwrap()
+    })
+}
+
+fn location_suffix_re() -> &'static Regex {
+    static RE: OnceLock<Regex> = OnceLock::new();
+    // Python's \s also matches \x1c-\x1f.
+    RE.get_or_init(|| Regex::new(r"[\s\x1c-\x1f]*\([^)]*:\d+\)[\s\x1c-\x1f]*$").unwrap())
+}
+
+fn is_py_space(c: char) -> bool {
+    c.is_whitespace() || ('\x1c'..='\x1f').contains(&c)
+}
+
+/// Python str.strip().
+pub(crate) fn py_strip(s: &str) -> &str {
+    s.trim_matches(is_py_space)
+}
+
+/// Python s[:n] (n in chars).
+fn truncate_chars(s: &str, n: usize) -> &str {
+    match s.char_indices().nth(n) {
+        Some((i, _)) => &s[..i],
+        None => s,
+    }
+}
+
+/// True if value looks like a CVE or GHSA id (normalize._is_cve_or_ghsa_like).
+pub fn is_cve_or_ghsa_like(value: &str) -> bool {
+    let value = py_strip(value);
+    !value.is_empty() && vuln_id_re().is_match(value)
+}
+
+fn normalize_package_name(name: &str) -> String {
+    let s = py_strip(name).to_lowercase();
+    let s = match s.rfind('@') {
+        Some(at) if at > 0 => &s[..at],
+        _ => s.as_str(),
+    };
+    truncate_chars(s, MAX_COMPONENT_LEN).to_string()
+}
+
+fn component_or_unknown(value: &str) -> &str {
+    let v = truncate_chars(py_strip(value), MAX_COMPONENT_LEN);
+    if v.is_empty() {
+        "unknown"
+    } else {
+        v
+    }
+}
+
+fn sca_key(f: &SignatureInput) -> String {
+    let vid = component_or_unknown(&f.vulnerability_id);
+    let pkg = normalize_package_name(f.package_name.as_deref().unwrap_or(f.dependency.as_str()));
+    let pkg = if pkg.is_empty() { "unknown".to_string() } else { pkg };
+    format!("{}\0{}\0{}", vid, f.ecosystem, pkg)
+}
+
+fn sast_signature(rule_id: &str, f: &SignatureInput) -> String {
+    let message = match f.message.as_deref() {
+        Some(message) => message,
+        None => truncate_chars(py_strip(&f.description), MAX_COMPONENT_LEN),
+    };
+    let message = if message.is_empty() {
+        String::new()
+    } else {
+        py_strip(&location_suffix_re().replace_all(message, "")).to_lowercase()
+    };
+    let cwe = f.cwe.as_deref().unwrap_or("").to_lowercase();
+    let combined = format!("{}\0{}\0{}", rule_id, message, cwe);
+    format!("{:x}", Sha256::digest(combined.as_bytes()))
+}
+
+fn sast_key(f: &SignatureInput) -> String {
+    let rule_id = component_or_unknown(&f.vulnerability_id);
+    if f.message.is_some() || f.cwe.is_some() {
+        let sig = sast_signature(rule_id, f);
+        return format!("{}\0{}", rule_id, sig);
+    }
+    let pattern = crate::file_path_pattern(&f.repo, &f.file_path);
+    format!("{}\0{}", rule_id, truncate_chars(&pattern, MAX_COMPONENT_LEN))
+}
+
+/// Stable cluster key for one finding (cluster_signature.compute_deterministic_signature).
+pub fn deterministic_signature(f: &SignatureInput) -> String {
+    if is_cve_or_ghsa_like(&f.vulnerability_id) {
+        sca_key(f)
+    } else {
+        sast_key(f)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn input(vid: &str, dep: &str) -> SignatureInput {
+        SignatureInput {
+            vulnerability_id: vid.to_string(),
+            dependency: dep.to_string(),
+            repo: "my-repo".to_string(),
+            file_path: "my-repo/src/app.py".to_string(),
+            description: "Desc".to_string(),
+            ..Default::default()
+        }
+    }
+
+    #[test]
+    fn test_sca_key_from_package_fields() {
+        let mut f = input(" cve-2024-1234 ", "ignored");
+        f.ecosystem = "ghsa".to_string();
+        f.package_name = Some("Lodash".to_string());
+        assert_eq!(deterministic_signature(&f), "cve-2024-1234\0ghsa\0lodash");
+    }
+
+    #[test]
+    fn test_sca_key_strips_version_suffix_of_dependency() {
+        let mut f = input("GHSA-aaaa-bbbb-cccc", " express@4.0.0 ");
+        f.ecosystem = "npm".to_string();
+        assert_eq!(deterministic_signature(&f), "GHSA-aaaa-bbbb-cccc\0npm\0express");
+    }
+
+    #[test]
+    fn test_sast_key_without_payload_fields_uses_path_pattern() {
+        let f = input("rule-1", "");
+        assert_eq!(deterministic_signature(&f), "rule-1\0src/app.py");
+    }
+
+    #[test]
+    fn test_sast_key_hashes_message_and_cwe() {
+        let mut f = input("rule-1", "");
+        f.message = Some("SQL injection (app.py:12)".to_string());
+        f.cwe = Some("CWE-89".to_string());
+        let expected = format!("{:x}", Sha256::digest("rule-1\0sql injection\0cwe-89".as_bytes()));
+        assert_eq!(deterministic_signature(&f), format!("rule-1\0{}", expected));
+    }
+
+    #[test]
+    fn test_sast_key_with_unusable_cwe_hashes_description() {
+        let mut f = input("rule-1", "");
+        f.cwe = Some(String::new());
+        let expected = format!("{:x}", Sha256::digest("rule-1\0desc\0".as_bytes()));
+        assert_eq!(deterministic_signature(&f), format!("rule-1\0{}", expected));
+    }
+
+    #[test]
+    fn test_py_strip_matches_python_whitespace() {
+        assert_eq!(py_strip("\x1c a \u{3000}"), "a");
+        assert_eq!(truncate_chars("héllo", 2), "hé");
+    }
+}
@@ -0,0 +1,95 @@
+"""Unit tests for the raw report blob store and job re-processing guards."""
+
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services.blob_store import (
+    BlobNotFoundError,
+    archive_report_files,
+    archive_report_stream,
+    open_archived_reports,
+)
+from app.services.ingest import ReportFile, iter_batch_findings
+from app.services.reprocess import ReprocessError, reprocess_job
+
+_REPORT = json.dumps([{"id": "CVE-2024-00001"}, {"id": "CVE-2024-00002"}]).encode()
+
+
+class TestBlobStore(unittest.TestCase):
+    """Reports are stored compressed under their SHA-256 and read back by the pipeline."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        target = patch(
+            "app.services.blob_store.get_settings",
+            return_value=SimpleNamespace(RAW_BLOB_DIR=os.path.join(tmp.name, "blobs")),
+        )
+        target.start()
+        self.addCleanup(target.stop)
+
+    def _spool(self, name: str, data: bytes, encoding: str | None = None) -> ReportFile:
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return ReportFile(name=name, path=path, encoding=encoding)
+
+    def test_round_trip_and_dedupe(self) -> None:
+        ref = archive_report_stream(io.BytesIO(_REPORT), None)
+        self.assertRegex(ref, r"^[0-9a-f]{2}/[0-9a-f]{64}\.(gz|zst)$")
+        self.assertEqual(archive_report_files([self._spool("r.json", _REPORT)]), ref)
+        out = list(iter_batch_findings(open_archived_reports(ref)))
+        self.assertEqual([n.vulnerability_id for _, n in out], ["CVE-2024-00001", "CVE-2024-00002"])
+
+    def test_compressed_report_stored_as_received(self) -> None:
+        data = gzip.compress(_REPORT)
+        ref = archive_report_files([self._spool("r.json.gz", data, "gzip")])
+        self.assertTrue(ref.endswith(".gz"))
+        [report] = open_archived_reports(ref)
+        with open(report.path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(report.encoding, "gzip")
+
+    def test_batch_manifest_keeps_report_names(self) -> None:
+        reports = [
+            self._spool("a.json", _REPORT),
+            self._spool("b.json", json.dumps([{"id": "CVE-2024-00003"}]).encode()),
+        ]
+        ref = archive_report_files(reports)
+        self.assertTrue(ref.endswith(".manifest.json"))
+        self.assertEqual([r.name for r in open_archived_reports(ref)], ["a.json", "b.json"])
+
+    def test_invalid_or_missing_ref(self) -> None:
+        with self.assertRaises(BlobNotFoundError):
+            open_archived_reports("../../etc/passwd")
+        with self.assertRaises(BlobNotFoundError):
+            open_archived_reports("ab/" + "ab" * 32 + ".gz")
+
+    def test_disabled_without_blob_dir(self) -> None:
+        with patch(
+            "app.services.blob_store.get_settings",
+            return_value=SimpleNamespace(RAW_BLOB_DIR=None),
+        ):
+            self.assertIsNone(archive_report_stream(io.BytesIO(_REPORT), None))
+
+
+class TestReprocessJob(unittest.TestCase):
+    """reprocess_job refuses jobs it cannot rebuild."""
+
+    def test_requires_archived_finished_job(self) -> None:
+        db = MagicMock()
+        db.get.return_value = SimpleNamespace(id=1, status="completed", raw_blob_ref=None)
+        with self.assertRaises(ReprocessError) as ctx:
+            reprocess_job(db, 1)
+        self.assertEqual(ctx.exception.detail, "Upload job 1 has no archived report.")
+        db.get.return_value = SimpleNamespace(id=1, status="processing", raw_blob_ref="x")
+        with self.assertRaises(ReprocessError):
+            reprocess_job(db, 1)
+        db.execute.assert_not_called()
@@ -0,0 +1,136 @@
+"""Unit tests for cluster persistence: clusters_version caching and bulk cluster writes."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.clusters import _etag_matches
+from app.schemas.findings import VulnerabilityCluster
+from app.services import cluster_persistence
+from app.services.cluster_persistence import (
+    clusters_version,
+    get_or_build_clusters_for_job,
+    save_clusters_for_job,
+)
+
+
+def _job(**kwargs) -> SimpleNamespace:
+    values = {"id": 7, "findings_version": 3, "status": "completed", "clusters_version": None}
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+class TestClustersVersion(unittest.TestCase):
+    """clusters_version changes with the job's findings and the clustering config."""
+
+    def test_stable_for_same_job_state(self) -> None:
+        self.assertEqual(clusters_version(_job(), False), clusters_version(_job(), False))
+
+    def test_changes_with_findings_version(self) -> None:
+        self.assertNotEqual(
+            clusters_version(_job(), False),
+            clusters_version(_job(findings_version=4), False),
+        )
+
+    def test_changes_with_semantic_config(self) -> None:
+        self.assertNotEqual(clusters_version(_job(), False), clusters_version(_job(), True))
+
+    def test_differs_between_jobs(self) -> None:
+        self.assertNotEqual(clusters_version(_job(), False), clusters_version(_job(id=8), False))
+
+
+class TestGetOrBuildUsesCache(unittest.TestCase):
+    """Persisted clusters are returned without reclustering while clusters_version matches."""
+
+    def test_cached_clusters_returned_without_building(self) -> None:
+        job = _job()
+        job.clusters_version = clusters_version(job, False)
+        cached = [SimpleNamespace(finding_count=2), SimpleNamespace(finding_count=3)]
+        with (
+            patch.object(cluster_persistence, "_user_job", return_value=job),
+            patch.object(cluster_persistence, "_load_cluster_rows", return_value=cached),
+            patch.object(cluster_persistence, "build_clusters_sql") as build,
+        ):
+            clusters, count, findings = get_or_build_clusters_for_job(MagicMock(), 1, 7)
+        build.assert_not_called()
+        self.assertEqual((clusters, count, findings), (cached, 5, []))
+
+    def test_stale_version_rebuilds_and_saves_new_version(self) -> None:
+        job = _job(clusters_version="stale")
+        with (
+            patch.object(cluster_persistence, "_user_job", return_value=job),
+            patch.object(cluster_persistence, "build_clusters_sql", return_value=([], 0)),
+            patch.object(cluster_persistence, "save_clusters_for_job") as save,
+        ):
+            get_or_build_clusters_for_job(MagicMock(), 1, 7)
+        save.assert_called_once()
+        self.assertEqual(save.call_args[0][3], clusters_version(job, False))
+
+    def test_unfinished_job_not_cached(self) -> None:
+        job = _job(status="processing")
+        with (
+            patch.object(cluster_persistence, "_user_job", return_value=job),
+            patch.object(cluster_persistence, "build_clusters_sql", return_value=([], 0)),
+            patch.object(cluster_persistence, "save_clusters_for_job") as save,
+        ):
+            get_or_build_clusters_for_job(MagicMock(), 1, 7)
+        self.assertIsNone(save.call_args[0][3])
+
+
+class TestEtagMatches(unittest.TestCase):
+    """If-None-Match parsing for GET /clusters."""
+
+    def test_matches_exact_weak_list_and_star(self) -> None:
+        self.assertTrue(_etag_matches('"abc"', '"abc"'))
+        self.assertTrue(_etag_matches('W/"abc"', '"abc"'))
+        self.assertTrue(_etag_matches('"x", "abc"', '"abc"'))
+        self.assertTrue(_etag_matches("*", '"abc"'))
+
+    def test_no_match(self) -> None:
+        self.assertFalse(_etag_matches(None, '"abc"'))
+        self.assertFalse(_etag_matches('"other"', '"abc"'))
+
+
+class TestSaveClustersForJob(unittest.TestCase):
+    """save_clusters_for_job replaces a job's clusters with bulk statements in one transaction."""
+
+    def _cluster(self, vulnerability_id: str, finding_ids: list[str]) -> VulnerabilityCluster:
+        return VulnerabilityCluster(
+            vulnerability_id=vulnerability_id,
+            severity="high",
+            repo="r",
+            cvss_score=7.5,
+            description="d",
+            finding_ids=finding_ids,
+            affected_services_count=1,
+            finding_count=len(finding_ids),
+        )
+
+    def test_bulk_inserts_with_reserved_ids(self) -> None:
+        db = MagicMock()
+        clusters = [self._cluster("CVE-2024-00001", ["1", "2"]), self._cluster("CVE-2024-00002", ["3"])]
+        with patch.object(cluster_persistence, "_allocate_cluster_ids", return_value=[41, 42]):
+            save_clusters_for_job(db, 7, clusters, "v1")
+        statements = [c.args for c in db.execute.call_args_list]
+        sql = [str(args[0].compile(dialect=postgresql.dialect())) for args in statements]
+        self.assertIn("FOR UPDATE", sql[0])
+        self.assertTrue(sql[1].startswith("DELETE FROM clusters"))
+        self.assertEqual([r["id"] for r in statements[2][1]], [41, 42])
+        self.assertEqual(
+            statements[3][1],
+            [
+                {"cluster_id": 41, "finding_id": 1},
+                {"cluster_id": 41, "finding_id": 2},
+                {"cluster_id": 42, "finding_id": 3},
+            ],
+        )
+        self.assertTrue(sql[4].startswith("UPDATE upload_jobs"))
+        db.commit.assert_called_once()
+
+    def test_empty_clusters_only_delete(self) -> None:
+        db = MagicMock()
+        save_clusters_for_job(db, 7, [], None)
+        self.assertEqual(db.execute.call_count, 3)
+        db.commit.assert_called_once()
@@ -0,0 +1,121 @@
+"""Unit tests for cluster_query: keyset cursors, filters and projection."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.findings import VulnerabilityCluster, VulnerabilityClusterSummary
+from app.services.cluster_query import (
+    ClusterFilter,
+    InvalidCursorError,
+    _after,
+    _decode_cursor,
+    _encode_cursor,
+    _filtered,
+    query_clusters,
+)
+
+
+def _row(row_id: int, severity_rank: int = 3, cvss_score: float = 7.5) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=row_id,
+        vulnerability_id=f"CVE-2024-{row_id:05d}",
+        severity="high",
+        severity_rank=severity_rank,
+        repo="r",
+        file_path="",
+        dependency="pkg",
+        cvss_score=cvss_score,
+        description="d",
+        affected_services_count=1,
+        finding_count=1,
+    )
+
+
+def _sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class TestCursor(unittest.TestCase):
+    """Cursors round-trip the sort key and are bound to their sort order."""
+
+    def test_round_trip(self) -> None:
+        cursor = _encode_cursor("severity", _row(42, severity_rank=4, cvss_score=9.8))
+        self.assertEqual(_decode_cursor("severity", cursor), [4, 9.8, 42])
+
+    def test_other_sort_rejected(self) -> None:
+        cursor = _encode_cursor("cvss", _row(42))
+        with self.assertRaises(InvalidCursorError):
+            _decode_cursor("severity", cursor)
+
+    def test_garbage_rejected(self) -> None:
+        for cursor in ("not-base64!", "e30", _encode_cursor("default", _row(1))[:-3]):
+            with self.assertRaises(InvalidCursorError):
+                _decode_cursor("default", cursor)
+
+    def test_after_descending_keys_compare_below(self) -> None:
+        sql = _sql(_after("cvss", [7.5, 10]))
+        self.assertIn("clusters.cvss_score < 7.5", sql)
+        self.assertIn("clusters.cvss_score = 7.5 AND clusters.id > 10", sql)
+
+
+class TestFilters(unittest.TestCase):
+    """_filtered adds one condition per set filter."""
+
+    def test_prefix_escapes_like_wildcards(self) -> None:
+        db = MagicMock()
+        _filtered(db, 1, ClusterFilter(vulnerability_id_prefix="CVE_2024%"))
+        condition = db.query.return_value.filter.return_value.filter.call_args[0][0]
+        params = condition.compile(dialect=postgresql.dialect()).params
+        self.assertIn("CVE\\_2024\\%%", params.values())
+
+    def test_no_filters_only_scope_to_job(self) -> None:
+        db = MagicMock()
+        _filtered(db, 1, ClusterFilter())
+        db.query.return_value.filter.return_value.filter.assert_not_called()
+
+
+class TestQueryClusters(unittest.TestCase):
+    """query_clusters pages with limit + 1 rows, loads members per page, projects out finding_ids."""
+
+    def _db(self, rows: list) -> MagicMock:
+        db = MagicMock()
+        query = MagicMock()
+        for method in ("filter", "options", "order_by", "limit"):
+            getattr(query, method).return_value = query
+        query.all.return_value = rows
+        db.query.return_value = query
+        return db
+
+    @patch("app.services.cluster_query.cluster_finding_ids")
+    def test_next_cursor_when_more_rows(self, mock_members: MagicMock) -> None:
+        mock_members.return_value = {1: ["10"], 2: ["20", "21"]}
+        db = self._db([_row(1), _row(2), _row(3)])
+        clusters, next_cursor = query_clusters(db, 1, ClusterFilter(), limit=2)
+        mock_members.assert_called_once_with(db, [1, 2])
+        self.assertEqual([c.finding_ids for c in clusters], [["10"], ["20", "21"]])
+        self.assertEqual([c.vulnerability_id for c in clusters], ["CVE-2024-00001", "CVE-2024-00002"])
+        self.assertEqual(_decode_cursor("default", next_cursor), [2])
+
+    @patch("app.services.cluster_query.cluster_finding_ids", return_value={1: ["10"]})
+    def test_last_page_has_no_cursor(self, _members: MagicMock) -> None:
+        db = self._db([_row(1)])
+        _, next_cursor = query_clusters(db, 1, ClusterFilter(), limit=2)
+        self.assertIsNone(next_cursor)
+
+    @patch("app.services.cluster_query.cluster_finding_ids")
+    def test_projection_without_finding_ids(self, mock_members: MagicMock) -> None:
+        db = self._db([_row(1)])
+        clusters, _ = query_clusters(db, 1, ClusterFilter(), include_finding_ids=False)
+        mock_members.assert_not_called()
+        self.assertIsInstance(clusters[0], VulnerabilityClusterSummary)
+        self.assertNotIsInstance(clusters[0], VulnerabilityCluster)
+        self.assertNotIn("finding_ids", clusters[0].model_dump())
+
+    @patch("app.services.cluster_query.cluster_finding_ids", return_value={2: ["20"]})
+    def test_clusters_without_members_left_out(self, _members: MagicMock) -> None:
+        db = self._db([_row(1), _row(2)])
+        clusters, _ = query_clusters(db, 1, ClusterFilter())
+        self.assertEqual([c.finding_ids for c in clusters], [["20"]])
@@ -3,11 +3,24 @@
 import json
 import unittest
 from types import SimpleNamespace
+from unittest.mock import patch
 
 from app.schemas.findings import VulnerabilityCluster
+from app.services.cluster_signature import compute_deterministic_signature
+
+try:
+    import cluster_engine
+except ImportError:  # optional Rust extension (cluster_engine/)
+    cluster_engine = None
+# Without the built extension, the crate's source directory imports as an empty namespace package.
+_HAS_ENGINE = hasattr(cluster_engine, "cluster_columns")
 from app.services.clustering import (
-    _findings_to_rust_input,
+    _build_clusters_rust,
+    _get_cluster_engine,
+    _signature_columns,
     build_clusters,
+    build_clusters_v2,
+    compute_deterministic_signatures,
     sort_clusters_by_severity_cvss,
 )
 
@@ -37,25 +50,6 @@ def _mock_finding(
     )
 
 
-class TestFindingsToRustInput(unittest.TestCase):
-    """_findings_to_rust_input produces JSON-serializable list with required fields."""
-
-    def test_empty(self) -> None:
-        out = _findings_to_rust_input([])
-        self.assertEqual(out, [])
-
-    def test_single_finding(self) -> None:
-        f = _mock_finding(id=42, vulnerability_id="CVE-1", dependency="lodash")
-        out = _findings_to_rust_input([f])
-        self.assertEqual(len(out), 1)
-        self.assertEqual(out[0]["id"], "42")
-        self.assertEqual(out[0]["vulnerability_id"], "CVE-1")
-        self.assertEqual(out[0]["dependency"], "lodash")
-        # Must be JSON-serializable
-        json_str = json.dumps(out)
-        self.assertIn("CVE-1", json_str)
-
-
 class TestBuildClusters(unittest.TestCase):
     """build_clusters groups by SCA/SAST key and returns VulnerabilityClusters."""
 
@@ -127,3 +121,174 @@ class TestSortClustersBySeverityCvss(unittest.TestCase):
         sorted_clusters = sort_clusters_by_severity_cvss(clusters)
         self.assertEqual(sorted_clusters[0].severity, "critical")
         self.assertEqual(sorted_clusters[1].severity, "high")
+
+
+def _fake_cluster_columns(signatures, severities, repos):
+    """Python stand-in for cluster_engine.cluster_columns (same contract as the Rust function)."""
+    order = ("info", "low", "medium", "high", "critical")
+    groups: dict[str, list[int]] = {}
+    for i, sig in enumerate(signatures):
+        groups.setdefault(sig, []).append(i)
+    out = []
+    for members in groups.values():
+        ranks = [order.index(s) for i in members if (s := severities[i].strip().lower()) in order]
+        out.append((members, order[max(ranks, default=0)], len({repos[i].strip() for i in members})))
+    return out
+
+
+def _fake_compute_signatures(
+    vulnerability_ids, dependencies, repos, file_paths, descriptions, ecosystems, package_names, messages, cwes
+):
+    """Python stand-in for cluster_engine.compute_signatures (same contract as the Rust function)."""
+    out = []
+    for vid, dep, repo, path, desc, eco, pkg, msg, cwe in zip(
+        vulnerability_ids, dependencies, repos, file_paths, descriptions, ecosystems, package_names, messages, cwes
+    ):
+        # Smallest payload carrying exactly the extracted fields.
+        raw = {"package_ecosystem": eco, "PkgName": pkg, "extra": {"message": msg}}
+        if cwe is not None:
+            raw["metadata"] = {"cwe": [cwe]}
+        out.append(
+            compute_deterministic_signature(
+                SimpleNamespace(
+                    vulnerability_id=vid, dependency=dep, repo=repo, file_path=path, description=desc, raw_payload=raw
+                )
+            )
+        )
+    return out
+
+
+_FAKE_ENGINE = SimpleNamespace(
+    cluster_columns=_fake_cluster_columns,
+    compute_signatures=_fake_compute_signatures,
+)
+
+
+class TestRustColumnarBridge(unittest.TestCase):
+    """build_clusters_v2 via the engine's columnar API matches the Python fallback."""
+
+    def _findings(self) -> list:
+        return [
+            _mock_finding(id=1, dependency="lodash", severity="low", repo="repo-a"),
+            _mock_finding(id=2, dependency="express", severity="high"),
+            _mock_finding(id=3, dependency="lodash", severity="critical", repo="repo-b"),
+        ]
+
+    def test_engine_output_matches_fallback(self) -> None:
+        findings = self._findings()
+        with patch("app.services.clustering._CLUSTER_ENGINE", False):
+            expected = build_clusters_v2(findings)
+        with patch("app.services.clustering._CLUSTER_ENGINE", _FAKE_ENGINE):
+            got = build_clusters_v2(findings)
+        self.assertEqual(got, expected)
+        self.assertEqual(got[0].finding_ids, ["1", "3"])
+        self.assertEqual(got[0].repo, "multiple")
+        self.assertEqual(got[0].severity, "critical")
+
+    def test_engine_error_falls_back_to_python(self) -> None:
+        def broken(*_args):
+            raise ValueError("boom")
+
+        engine = SimpleNamespace(cluster_columns=broken, compute_signatures=broken)
+        with patch("app.services.clustering._CLUSTER_ENGINE", engine):
+            clusters = build_clusters_v2(self._findings())
+        self.assertEqual(len(clusters), 2)
+
+    def test_signatures_passed_as_columns(self) -> None:
+        findings = [
+            _mock_finding(id=1, raw_payload={"PkgName": "Lodash", "DataSource": {"ID": "ghsa"}}),
+            _mock_finding(id=2, vulnerability_id="rule-1", raw_payload={}),
+        ]
+        with patch("app.services.clustering._CLUSTER_ENGINE", _FAKE_ENGINE):
+            got = compute_deterministic_signatures(findings)
+        self.assertEqual(got, [compute_deterministic_signature(f) for f in findings])
+        self.assertEqual(got[0], "CVE-2024-1234\0ghsa\0lodash")
+
+    def test_payload_fields_extracted_in_python(self) -> None:
+        findings = [
+            _mock_finding(id=1, raw_payload={"package": {"name": " Express ", "ecosystem": "NPM"}}),
+            _mock_finding(id=2, vulnerability_id="rule-1", raw_payload={"extra": {"message": " m "}, "metadata": {"cwe": [89]}}),
+            _mock_finding(id=3, vulnerability_id="rule-1"),
+        ]
+        columns = _signature_columns(findings)
+        self.assertEqual(len(columns), 9)
+        self.assertEqual(
+            [list(c) for c in zip(*columns[5:])],
+            [["npm", "Express", None, None], ["", None, "m", ""], ["", None, None, None]],
+        )
+
+    def test_module_without_columnar_api_is_unavailable(self) -> None:
+        with (
+            patch("app.services.clustering._CLUSTER_ENGINE", None),
+            patch.dict("sys.modules", {"cluster_engine": SimpleNamespace(cluster_columns=None)}),
+        ):
+            self.assertIsNone(_get_cluster_engine())
+
+
+def _parity_findings() -> list:
+    """SCA and SAST findings covering every payload field the signature reads."""
+    return [
+        _mock_finding(id=1, raw_payload={"PkgName": " Lodash ", "DataSource": {"ID": "GHSA"}}),
+        _mock_finding(id=2, dependency="lodash@4.17.0", raw_payload={"PkgIdentifier": {"PURL": "pkg:NPM/lodash@4"}}),
+        _mock_finding(id=3, vulnerability_id="GHSA-aaaa-bbbb-cccc", raw_payload={"package": {"name": "Express", "ecosystem": "npm"}}),
+        _mock_finding(id=4, dependency="openssl", severity="critical", repo="svc-b", raw_payload={"packageManager": "Maven"}),
+        _mock_finding(id=5, vulnerability_id="cve-2024-1234", dependency=" Lodash ", severity="low", repo="svc-c",
+                      raw_payload={"package_ecosystem": " NPM "}),
+        _mock_finding(id=6, vulnerability_id="rule.sqli", file_path="my-repo/src/a.py", severity="medium",
+                      raw_payload={"extra": {"message": " SQL injection (a.py:12) "}, "metadata": {"cwe": ["CWE-89"]}}),
+        _mock_finding(id=7, vulnerability_id="rule.sqli", file_path="my-repo/src/b.py", repo="svc-b",
+                      raw_payload={"extra": {"message": "sql injection"}, "metadata": {"cwe": ["cwe-89 "]}}),
+        _mock_finding(id=8, vulnerability_id="rule.xss", file_path="my-repo\\src\\c.py",
+                      raw_payload={"metadata": {"cwe": [79]}}, description="XSS\u3000"),
+        _mock_finding(id=9, vulnerability_id="rule.xss", file_path="my-repo/src/c.py", raw_payload={}),
+        _mock_finding(id=10, vulnerability_id=" ", dependency="", severity="bogus", repo="", description=""),
+    ]
+
+
+@unittest.skipUnless(_HAS_ENGINE, "cluster_engine not installed")
+class TestRustEngineParity(unittest.TestCase):
+    """The built Rust engine gives exactly the Python fallback's signatures and clusters."""
+
+    def test_compute_signatures_matches_python(self) -> None:
+        findings = _parity_findings()
+        got = list(cluster_engine.compute_signatures(*_signature_columns(findings)))
+        self.assertEqual(got, [compute_deterministic_signature(f) for f in findings])
+
+    def test_cluster_columns_matches_fallback(self) -> None:
+        findings = _parity_findings()
+        signatures = [compute_deterministic_signature(f) for f in findings]
+        with patch("app.services.clustering._CLUSTER_ENGINE", cluster_engine):
+            got = _build_clusters_rust(findings, signatures)
+        with patch("app.services.clustering._CLUSTER_ENGINE", False):
+            expected = build_clusters_v2(findings)
+        self.assertEqual(got, expected)
+
+    def test_cluster_index_matches_fallback(self) -> None:
+        findings = _parity_findings()
+
+        def rows(subset: list) -> list[tuple]:
+            return [
+                (
+                    str(f.id), compute_deterministic_signature(f), f.severity, f.repo, f.vulnerability_id,
+                    f.file_path, f.dependency, float(f.cvss_score), f.description,
+                )
+                for f in subset
+            ]
+
+        index = cluster_engine.ClusterIndex()
+        index.add(rows(findings[:6]))
+        index = cluster_engine.ClusterIndex.from_bytes(index.to_bytes())
+        self.assertEqual(index.remove(["1", "2"]), 2)
+        index.add(rows(findings[6:]))
+        clusters = [
+            VulnerabilityCluster(
+                vulnerability_id=vid, severity=severity, repo=repo, file_path=file_path, dependency=dependency,
+                cvss_score=cvss_score, description=description, finding_ids=list(finding_ids),
+                affected_services_count=affected, finding_count=count,
+            )
+            for vid, severity, repo, file_path, dependency, cvss_score, description, finding_ids, affected, count
+            in index.snapshot()
+        ]
+        with patch("app.services.clustering._CLUSTER_ENGINE", False):
+            expected = build_clusters_v2(findings[2:])
+        self.assertEqual(clusters, expected)
@@ -0,0 +1,70 @@
+"""Unit tests for delta ingestion: unchanged findings are referenced, new ones inserted."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.findings import RawFinding
+from app.services.delta_ingest import DeltaIngest
+from app.services.normalize import canonical_key_digest, normalize_finding
+
+
+def _pair(vulnerability_id: str, repo: str = "svc-a") -> tuple:
+    raw = RawFinding(vulnerability_id=vulnerability_id, dependency="pkg", repo=repo)
+    return raw, normalize_finding(raw)
+
+
+def _db(base_job_id: int | None, base_rows: list[tuple[str, int]], referenced: list[int]) -> MagicMock:
+    db = MagicMock()
+    chain = db.query.return_value.filter.return_value
+    chain.order_by.return_value.limit.return_value.scalar.return_value = base_job_id
+    chain.all.return_value = base_rows
+    db.execute.return_value.all.return_value = [(i,) for i in referenced]
+    return db
+
+
+class TestDeltaIngest(unittest.TestCase):
+    """insert_chunk splits a chunk into references to the previous scan and new inserts."""
+
+    @patch("app.services.delta_ingest.insert_findings_bulk")
+    def test_unchanged_referenced_new_inserted(self, mock_insert: MagicMock) -> None:
+        old, new = _pair("CVE-2024-00001"), _pair("CVE-2024-00002")
+        db = _db(base_job_id=3, base_rows=[(canonical_key_digest(old[1]), 42)], referenced=[42])
+        mock_insert.return_value = [100]
+        delta = DeltaIngest(db, SimpleNamespace(id=9, user_id=1))
+
+        ids = delta.insert_chunk([old, new])
+
+        self.assertEqual(ids, [100, 42])
+        self.assertEqual(mock_insert.call_args[0][3], [new])
+        self.assertEqual(delta.unchanged_count, 1)
+        refs_sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        self.assertIn("INSERT INTO job_finding_refs", refs_sql)
+
+    @patch("app.services.delta_ingest.insert_findings_bulk")
+    def test_no_previous_scan_inserts_everything(self, mock_insert: MagicMock) -> None:
+        pairs = [_pair("CVE-2024-00001"), _pair("CVE-2024-00002")]
+        db = _db(base_job_id=None, base_rows=[], referenced=[])
+        mock_insert.return_value = [1, 2]
+        delta = DeltaIngest(db, SimpleNamespace(id=9, user_id=1))
+
+        self.assertEqual(delta.insert_chunk(pairs), [1, 2])
+        self.assertEqual(mock_insert.call_args[0][3], pairs)
+        db.execute.assert_not_called()
+        self.assertEqual(delta.mark_resolved(), 0)
+
+    @patch("app.services.delta_ingest.insert_findings_bulk")
+    def test_resolved_limited_to_scanned_repos(self, mock_insert: MagicMock) -> None:
+        db = _db(base_job_id=3, base_rows=[], referenced=[])
+        mock_insert.return_value = [1]
+        delta = DeltaIngest(db, SimpleNamespace(id=9, user_id=1))
+        delta.insert_chunk([_pair("CVE-2024-00001", repo="svc-a")])
+        db.execute.return_value.rowcount = 4
+
+        self.assertEqual(delta.mark_resolved(), 4)
+        stmt = db.execute.call_args[0][0]
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.assertIn("findings.repo IN", str(compiled))
+        self.assertIn(["svc-a"], compiled.params.values())
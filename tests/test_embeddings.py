@@ -0,0 +1,131 @@
+"""Unit tests for batched embedding with the process-wide model and the persistent cache."""
+
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+try:
+    import numpy as np
+except ImportError:  # numpy ships with the optional sentence-transformers dependency
+    np = None
+
+from app.services import embeddings
+from app.services.embedding_cache import EmbeddingCache, content_key
+
+
+def _fake_model() -> MagicMock:
+    """Model whose embedding of a text is [len(text), number of words]."""
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **_: np.array(
+        [[float(len(t)), float(len(t.split()))] for t in texts], dtype=np.float32
+    )
+    return model
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestEmbeddingCache(unittest.TestCase):
+    """Vectors are appended once per key and read back by any cache instance on the directory."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def test_put_then_get_from_another_instance(self) -> None:
+        keys = [content_key("m", "a"), content_key("m", "b")]
+        EmbeddingCache(self.root, "m").put(keys, np.array([[1, 2], [3, 4]]))
+        other = EmbeddingCache(self.root, "m")
+        got = other.get(keys + [content_key("m", "c")])
+        self.assertEqual(set(got), set(keys))
+        self.assertEqual(got[keys[1]].tolist(), [3.0, 4.0])
+
+    def test_existing_keys_are_not_appended_again(self) -> None:
+        cache = EmbeddingCache(self.root, "m")
+        key = content_key("m", "a")
+        cache.put([key], np.array([[1, 2]]))
+        cache.put([key, key], np.array([[9, 9], [9, 9]]))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get([key])[key].tolist(), [1.0, 2.0])
+
+    def test_torn_append_is_ignored_and_overwritten(self) -> None:
+        cache = EmbeddingCache(self.root, "m")
+        cache.put([content_key("m", "a")], np.array([[1, 2]]))
+        with open(cache.path / "keys.bin", "ab") as f:
+            f.write(b"\x01" * 10)  # interrupted key write
+        with open(cache.path / "vectors.f32", "ab") as f:
+            f.write(b"\x00" * 6)
+        other = EmbeddingCache(self.root, "m")
+        key = content_key("m", "b")
+        other.put([key], np.array([[5, 6]]))
+        self.assertEqual(len(EmbeddingCache(self.root, "m")), 2)
+        self.assertEqual(EmbeddingCache(self.root, "m").get([key])[key].tolist(), [5.0, 6.0])
+
+    def test_dimension_mismatch_is_not_cached(self) -> None:
+        cache = EmbeddingCache(self.root, "m")
+        cache.put([content_key("m", "a")], np.array([[1, 2]]))
+        cache.put([content_key("m", "b")], np.array([[1, 2, 3]]))
+        self.assertEqual(len(cache), 1)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestEmbedTexts(unittest.TestCase):
+    """embed_texts encodes each distinct uncached text once, with the configured batch size."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.settings = SimpleNamespace(
+            EMBEDDING_MODEL="fake", EMBEDDING_BATCH_SIZE=16, EMBEDDING_CACHE_DIR=tmp.name
+        )
+        self.model = _fake_model()
+        for target in (
+            patch("app.services.embeddings.get_settings", return_value=self.settings),
+            patch("app.services.embeddings.get_embedding_model", return_value=self.model),
+            patch.dict(embeddings._CACHES, clear=True),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_duplicates_encoded_once_in_order(self) -> None:
+        vectors = embeddings.embed_texts(["a b", "xyz", "a b"])
+        self.assertEqual(vectors, [[3.0, 2.0], [3.0, 1.0], [3.0, 2.0]])
+        self.model.encode.assert_called_once()
+        args, kwargs = self.model.encode.call_args
+        self.assertEqual(args[0], ["a b", "xyz"])
+        self.assertEqual(kwargs["batch_size"], 16)
+
+    def test_cached_texts_not_reencoded_across_calls(self) -> None:
+        embeddings.embed_texts(["a b", "xyz"])
+        embeddings._CACHES.clear()  # as in a new process
+        vectors = embeddings.embed_texts(["xyz", "new text here"])
+        self.assertEqual(vectors, [[3.0, 1.0], [13.0, 3.0]])
+        self.assertEqual(self.model.encode.call_args[0][0], ["new text here"])
+
+    def test_without_cache_dir_encodes_each_call(self) -> None:
+        self.settings.EMBEDDING_CACHE_DIR = None
+        embeddings.embed_texts(["a"])
+        embeddings.embed_texts(["a"])
+        self.assertEqual(self.model.encode.call_count, 2)
+
+    def test_model_unavailable_returns_empty(self) -> None:
+        with patch("app.services.embeddings.get_embedding_model", side_effect=ImportError):
+            self.assertEqual(embeddings.embed_texts(["never seen"]), [])
+
+
+class TestEmbeddingModel(unittest.TestCase):
+    """The model is loaded once per process and name."""
+
+    def test_model_loaded_once(self) -> None:
+        module = MagicMock()
+        with patch.dict("sys.modules", {"sentence_transformers": module}), patch.dict(
+            embeddings._MODELS, clear=True
+        ):
+            first = embeddings.get_embedding_model("m")
+            second = embeddings.get_embedding_model("m")
+        self.assertIs(first, second)
+        module.SentenceTransformer.assert_called_once_with("m")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Unit tests for bulk finding persistence: insert_findings_bulk ordering and dedupe."""
+
+import unittest
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.findings import RawFinding
+from app.services.cluster_signature import deterministic_signature, signature_digest
+from app.services.finding_persistence import insert_findings_bulk
+from app.services.normalize import canonical_key_digest, normalize_finding
+
+
+def _pair(vulnerability_id: str, dependency: str = "pkg") -> tuple:
+    raw = RawFinding(vulnerability_id=vulnerability_id, dependency=dependency, repo="r")
+    return raw, normalize_finding(raw)
+
+
+class TestInsertFindingsBulk(unittest.TestCase):
+    """insert_findings_bulk issues one ON CONFLICT DO NOTHING insert and returns ids in input order."""
+
+    def test_empty_pairs_no_query(self) -> None:
+        db = MagicMock()
+        self.assertEqual(insert_findings_bulk(db, 1, 2, []), [])
+        db.execute.assert_not_called()
+
+    def test_single_statement_with_on_conflict(self) -> None:
+        db = MagicMock()
+        db.execute.return_value.all.return_value = []
+        insert_findings_bulk(db, 1, 2, [_pair("CVE-2024-00001"), _pair("CVE-2024-00002")])
+        db.execute.assert_called_once()
+        stmt = db.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn("ON CONFLICT (upload_job_id, dedupe_key) DO NOTHING", sql)
+        self.assertIn("RETURNING findings.id, findings.dedupe_key", sql)
+
+    def test_replace_updates_conflicting_rows(self) -> None:
+        db = MagicMock()
+        db.execute.return_value.all.return_value = []
+        insert_findings_bulk(db, 1, 2, [_pair("CVE-2024-00001")], replace=True)
+        stmt = db.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn("ON CONFLICT (upload_job_id, dedupe_key) DO UPDATE SET", sql)
+        self.assertIn("raw_payload = excluded.raw_payload", sql)
+
+    def test_ids_returned_in_input_order_and_conflicts_skipped(self) -> None:
+        a, b, c = _pair("CVE-2024-00001"), _pair("CVE-2024-00002"), _pair("CVE-2024-00003")
+        key_a, key_c = canonical_key_digest(a[1]), canonical_key_digest(c[1])
+        db = MagicMock()
+        # b conflicted with an existing row; RETURNING came back out of order.
+        db.execute.return_value.all.return_value = [(11, key_c), (10, key_a)]
+        ids = insert_findings_bulk(db, 1, 2, [a, b, c])
+        self.assertEqual(ids, [10, 11])
+
+    def test_duplicates_within_chunk_inserted_once(self) -> None:
+        a, dup = _pair("CVE-2024-00001"), _pair("CVE-2024-00001")
+        db = MagicMock()
+        db.execute.return_value.all.return_value = []
+        insert_findings_bulk(db, 1, 2, [a, dup])
+        stmt = db.execute.call_args[0][0]
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        self.assertIn("dedupe_key_m0", params)
+        self.assertNotIn("dedupe_key_m1", params)
+
+    def test_rows_store_layer_a_signature_digest(self) -> None:
+        a, b = _pair("CVE-2024-00001", "lodash"), _pair("CVE-2024-00001", "openssl")
+        db = MagicMock()
+        db.execute.return_value.all.return_value = []
+        insert_findings_bulk(db, 1, 2, [a, b])
+        params = db.execute.call_args[0][0].compile(dialect=postgresql.dialect()).params
+        expected = signature_digest(
+            deterministic_signature("CVE-2024-00001", "lodash", "r", "", a[1].description, None)
+        )
+        self.assertEqual(params["signature_m0"], expected)
+        self.assertEqual(len(params["signature_m0"]), 64)
+        self.assertNotEqual(params["signature_m0"], params["signature_m1"])
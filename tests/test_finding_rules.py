@@ -0,0 +1,100 @@
+"""Unit tests for shared rule metadata: split on ingest, expand on read."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.findings import RawFinding
+from app.services.finding_persistence import insert_findings_bulk
+from app.services.finding_rules import (
+    attach_rule_payloads,
+    expand_raw_payload,
+    merge_rule_payload,
+    rule_payload_key,
+    split_rule_payload,
+)
+from app.services.normalize import normalize_finding
+
+_SARIF_PAYLOAD = {
+    "_sarif_result": {"ruleId": "R1", "message": {"text": "m"}},
+    "rule": {"id": "R1", "shortDescription": {"text": "d"}},
+    "rule_properties": {"cwe": ["CWE-79"]},
+}
+_SEMGREP_PAYLOAD = {
+    "check_id": "python.lang.eval",
+    "path": "a.py",
+    "extra": {"message": "avoid eval", "lines": "eval(x)", "metadata": {"cwe": ["CWE-95"]}},
+}
+
+
+class TestSplitRulePayload(unittest.TestCase):
+    """split_rule_payload separates rule-level metadata; merge_rule_payload restores the original."""
+
+    def test_sarif_round_trip(self) -> None:
+        lean, rule = split_rule_payload(_SARIF_PAYLOAD)
+        self.assertEqual(lean, {"_sarif_result": _SARIF_PAYLOAD["_sarif_result"]})
+        self.assertNotIn("_sarif_result", rule)
+        self.assertEqual(merge_rule_payload(lean, rule), _SARIF_PAYLOAD)
+
+    def test_semgrep_round_trip(self) -> None:
+        lean, rule = split_rule_payload(_SEMGREP_PAYLOAD)
+        self.assertNotIn("metadata", lean["extra"])
+        self.assertEqual(rule, {"extra": {"metadata": {"cwe": ["CWE-95"]}}})
+        self.assertEqual(merge_rule_payload(lean, rule), _SEMGREP_PAYLOAD)
+
+    def test_other_payload_unchanged(self) -> None:
+        payload = {"VulnerabilityID": "CVE-2024-00001"}
+        self.assertEqual(split_rule_payload(payload), (payload, None))
+        self.assertEqual(split_rule_payload(None), (None, None))
+
+    def test_key_independent_of_key_order(self) -> None:
+        self.assertEqual(rule_payload_key({"a": 1, "b": 2}), rule_payload_key({"b": 2, "a": 1}))
+
+
+class TestExpandRawPayload(unittest.TestCase):
+    """expand_raw_payload merges the attached rule payload and leaves other findings as-is."""
+
+    def test_no_rule_key_returns_raw_payload(self) -> None:
+        finding = SimpleNamespace(raw_payload={"x": 1}, rule_key=None)
+        self.assertIs(expand_raw_payload(finding), finding.raw_payload)
+
+    def test_attached_rule_payload_merged(self) -> None:
+        lean, rule = split_rule_payload(_SEMGREP_PAYLOAD)
+        key = rule_payload_key(rule)
+        finding = SimpleNamespace(upload_job_id=1, raw_payload=lean, rule_key=key)
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = [(1, key, rule)]
+        attach_rule_payloads(db, [finding])
+        self.assertEqual(expand_raw_payload(finding), _SEMGREP_PAYLOAD)
+
+
+class TestInsertWithRules(unittest.TestCase):
+    """insert_findings_bulk writes each rule once per job, before the findings that reference it."""
+
+    def _pair(self, path: str) -> tuple:
+        raw = RawFinding(
+            vulnerability_id="python.lang.eval",
+            file_path=path,
+            repo="r",
+            scanner_source="semgrep",
+            raw_payload={**_SEMGREP_PAYLOAD, "path": path},
+        )
+        return raw, normalize_finding(raw)
+
+    def test_rules_inserted_once_across_chunks(self) -> None:
+        db = MagicMock()
+        db.execute.return_value.all.return_value = []
+        known: set[str] = set()
+        insert_findings_bulk(db, 1, 2, [self._pair("a.py"), self._pair("b.py")], known_rule_keys=known)
+        self.assertEqual(db.execute.call_count, 2)
+        rules_sql = str(db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+        self.assertIn("INSERT INTO finding_rules", rules_sql)
+        findings_params = db.execute.call_args_list[1][0][0].compile(dialect=postgresql.dialect()).params
+        self.assertNotIn("metadata", findings_params["raw_payload_m0"]["extra"])
+        self.assertEqual(findings_params["rule_key_m0"], findings_params["rule_key_m1"])
+
+        db.reset_mock()
+        insert_findings_bulk(db, 1, 2, [self._pair("c.py")], known_rule_keys=known)
+        db.execute.assert_called_once()
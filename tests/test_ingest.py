@@ -0,0 +1,330 @@
+"""Unit tests for the ingest pipeline and background ingest worker."""
+
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services.ingest import (
+    IngestValidationError,
+    ReportFile,
+    iter_batch_findings,
+    iter_normalized_findings,
+    iter_report_findings,
+    iter_validated_findings,
+    persist_findings,
+    shutdown_normalize_pool,
+)
+from app.services.ingest_worker import (
+    _resume_job,
+    _spool_ref,
+    run_batch_ingest_job,
+    run_ingest_job,
+    sweep_orphaned_spool_files,
+)
+from app.services.scanner_mappers import DETECTION_SAMPLE_SIZE
+
+
+class TestIterValidatedFindings(unittest.TestCase):
+    """iter_validated_findings maps shapes and reports the failing item index."""
+
+    def test_maps_items(self) -> None:
+        out = list(iter_validated_findings([{"cve_id": "CVE-2024-12345", "cvss": 9.8}]))
+        self.assertEqual(out[0].vulnerability_id, "CVE-2024-12345")
+        self.assertEqual(out[0].cvss_score, 9.8)
+
+    def test_non_object_reports_index(self) -> None:
+        with self.assertRaises(IngestValidationError) as ctx:
+            list(iter_validated_findings([{"id": "a"}, "oops"]))
+        self.assertEqual(ctx.exception.detail, "Finding at index 1 must be an object.")
+
+    def test_invalid_json_file(self) -> None:
+        with self.assertRaises(IngestValidationError) as ctx:
+            list(iter_report_findings(io.BytesIO(b"[{")))
+        self.assertIn("Invalid JSON in file", ctx.exception.detail)
+
+
+def _parallel_settings(threshold: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        INGEST_PARALLEL_MIN_ITEMS=threshold,
+        INGEST_PARALLEL_WORKERS=2,
+        UPLOAD_INGEST_CHUNK_SIZE=3,
+        UPLOAD_MAX_FILE_BYTES=0,
+    )
+
+
+class TestIterNormalizedFindings(unittest.TestCase):
+    """iter_normalized_findings shards large reports across processes, preserving order and indexes."""
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutdown_normalize_pool(wait=True)
+
+    @patch("app.services.ingest._iter_normalized_parallel")
+    @patch("app.services.ingest.get_settings")
+    def test_below_threshold_runs_inline(self, mock_settings: MagicMock, mock_parallel: MagicMock) -> None:
+        mock_settings.return_value = _parallel_settings(threshold=10)
+        out = list(iter_normalized_findings([{"id": "CVE-2024-00001"}] * 9))
+        self.assertEqual(len(out), 9)
+        mock_parallel.assert_not_called()
+
+    @patch("app.services.ingest.get_settings")
+    def test_parallel_preserves_order(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = _parallel_settings(threshold=4)
+        items = [{"id": f"CVE-2024-{i:05d}", "severity": "high"} for i in range(20)]
+        with patch("app.services.ingest._normalize_worker_count", return_value=2):
+            out = list(iter_normalized_findings(iter(items)))
+        self.assertEqual([n.vulnerability_id for _, n in out], [it["id"] for it in items])
+        self.assertEqual(out[0][1].severity, "high")
+
+    @patch("app.services.ingest.get_settings")
+    def test_parallel_error_reports_original_index(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = _parallel_settings(threshold=4)
+        items = [{"id": f"CVE-2024-{i:05d}"} for i in range(12)]
+        items[7] = "oops"
+        with patch("app.services.ingest._normalize_worker_count", return_value=2):
+            with self.assertRaises(IngestValidationError) as ctx:
+                list(iter_normalized_findings(items))
+        self.assertEqual(ctx.exception.detail, "Finding at index 7 must be an object.")
+
+    @patch("app.services.ingest.get_settings")
+    def test_format_switch_after_detection_sample(self, mock_settings: MagicMock) -> None:
+        trivy = {
+            "VulnerabilityID": "CVE-2024-99999",
+            "PkgName": "lodash",
+            "Severity": "HIGH",
+            "CVSS": {"nvd": {"V3Score": 7.5}},
+        }
+        items = [{"id": f"CVE-2024-{i:05d}"} for i in range(DETECTION_SAMPLE_SIZE)] + [trivy]
+        for threshold in (0, 4):
+            mock_settings.return_value = _parallel_settings(threshold=threshold)
+            with patch("app.services.ingest._normalize_worker_count", return_value=2):
+                _, last = list(iter_normalized_findings(items))[-1]
+            self.assertEqual(
+                (last.severity, last.dependency, last.cvss_score), ("high", "lodash", 7.5)
+            )
+
+
+class TestIterBatchFindings(unittest.TestCase):
+    """iter_batch_findings detects each report's format and names the report in errors."""
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutdown_normalize_pool(wait=True)
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+
+    def _report(self, name: str, payload: object) -> ReportFile:
+        path = os.path.join(self._dir.name, name)
+        with open(path, "w") as f:
+            json.dump(payload, f)
+        return ReportFile(name=name, path=path)
+
+    def _reports(self) -> list[ReportFile]:
+        trivy = {"Results": [{"Target": "go.sum", "Vulnerabilities": [{"VulnerabilityID": "CVE-2024-00002", "PkgName": "x"}]}]}
+        return [
+            self._report("flat.json", [{"id": "CVE-2024-00001"}]),
+            self._report("trivy.json", trivy),
+        ]
+
+    @patch("app.services.ingest.get_settings")
+    def test_inline_in_report_order(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = _parallel_settings(threshold=0)
+        out = list(iter_batch_findings(self._reports()))
+        self.assertEqual([n.vulnerability_id for _, n in out], ["CVE-2024-00001", "CVE-2024-00002"])
+        self.assertEqual(out[1][0].scanner_source, "trivy")
+
+    @patch("app.services.ingest.get_settings")
+    def test_parallel_in_report_order(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = _parallel_settings(threshold=4)
+        with patch("app.services.ingest._normalize_worker_count", return_value=2):
+            out = list(iter_batch_findings(self._reports()))
+        self.assertEqual([n.vulnerability_id for _, n in out], ["CVE-2024-00001", "CVE-2024-00002"])
+
+    @patch("app.services.ingest.get_settings")
+    def test_error_names_report(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = _parallel_settings(threshold=4)
+        reports = [*self._reports(), self._report("bad.json", [{"id": "a"}, "oops"])]
+        with patch("app.services.ingest._normalize_worker_count", return_value=2):
+            with self.assertRaises(IngestValidationError) as ctx:
+                list(iter_batch_findings(reports))
+        self.assertEqual(ctx.exception.detail, "bad.json: Finding at index 1 must be an object.")
+
+    @patch("app.services.ingest.get_settings")
+    def test_parallel_shards_large_reports(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = _parallel_settings(threshold=4)
+        big = [{"id": f"CVE-2024-{i:05d}"} for i in range(8)]
+        reports = [self._report("big.json", big), *self._reports()]
+        with patch("app.services.ingest._normalize_worker_count", return_value=2):
+            out = list(iter_batch_findings(reports))
+        expected = [f"CVE-2024-{i:05d}" for i in range(8)] + ["CVE-2024-00001", "CVE-2024-00002"]
+        self.assertEqual([n.vulnerability_id for _, n in out], expected)
+
+    @patch("app.services.ingest.get_settings")
+    def test_errors_in_report_order(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = _parallel_settings(threshold=4)
+        invalid = self._report("invalid.json", [{"id": "a"}, "oops"])
+        unreadable = os.path.join(self._dir.name, "broken.json")
+        with open(unreadable, "w") as f:
+            f.write("[{")
+        reports = [invalid, ReportFile(name="broken.json", path=unreadable)]
+        with patch("app.services.ingest._normalize_worker_count", return_value=2):
+            with self.assertRaises(IngestValidationError) as ctx:
+                list(iter_batch_findings(reports))
+        self.assertEqual(ctx.exception.detail, "invalid.json: Finding at index 1 must be an object.")
+
+
+class TestPersistFindings(unittest.TestCase):
+    """persist_findings inserts per chunk and reports progress."""
+
+    @patch("app.services.ingest.insert_findings_bulk")
+    @patch("app.services.ingest.get_settings")
+    def test_chunks_and_progress(self, mock_settings: MagicMock, mock_insert: MagicMock) -> None:
+        mock_settings.return_value = SimpleNamespace(UPLOAD_INGEST_CHUNK_SIZE=2, INGEST_PARALLEL_MIN_ITEMS=0)
+        mock_insert.side_effect = lambda db, job_id, user_id, pairs, **kw: list(range(len(pairs)))
+        job = SimpleNamespace(id=1, user_id=2, processed_count=0, accepted_count=0, findings_version=0)
+        pairs = list(iter_normalized_findings([{"id": f"CVE-2024-{i:05d}"} for i in range(5)]))
+        progress: list[tuple[int, int]] = []
+        ids = persist_findings(MagicMock(), job, pairs, on_progress=lambda p, a: progress.append((p, a)))
+        self.assertEqual(mock_insert.call_count, 3)
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(progress, [(2, 2), (4, 4), (5, 5)])
+        self.assertEqual((job.processed_count, job.accepted_count), (5, 5))
+        self.assertEqual(job.findings_version, 1)
+
+
+class TestRunIngestJob(unittest.TestCase):
+    """run_ingest_job finalizes job status and always removes the spooled report."""
+
+    def _spool(self, content: bytes) -> str:
+        fd, path = tempfile.mkstemp(suffix=".report")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        return path
+
+    @patch("app.services.ingest_worker._update_job")
+    @patch("app.services.ingest_worker.SessionLocal")
+    def test_validation_failure_marks_job_failed(self, mock_session: MagicMock, mock_update: MagicMock) -> None:
+        db = mock_session.return_value
+        db.get.return_value = SimpleNamespace(id=7, user_id=1, status="pending")
+        path = self._spool(json.dumps([{"id": "CVE-2024-00001"}, 5]).encode())
+        run_ingest_job(7, path)
+        db.rollback.assert_called_once()
+        db.commit.assert_not_called()
+        mock_update.assert_called_with(
+            7, status="failed", error_detail="Finding at index 1 must be an object.", spool_ref=None
+        )
+        self.assertFalse(os.path.exists(path))
+
+    @patch("app.services.ingest_worker.persist_findings")
+    @patch("app.services.ingest_worker._update_job")
+    @patch("app.services.ingest_worker.SessionLocal")
+    def test_success_marks_job_completed(
+        self, mock_session: MagicMock, mock_update: MagicMock, mock_persist: MagicMock
+    ) -> None:
+        db = mock_session.return_value
+        job = SimpleNamespace(id=8, user_id=1, status="pending")
+        db.get.return_value = job
+        path = self._spool(b"[]")
+        run_ingest_job(8, path)
+        mock_update.assert_any_call(8, status="processing", raw_blob_ref=None)
+        self.assertEqual(job.status, "completed")
+        db.commit.assert_called_once()
+        self.assertFalse(os.path.exists(path))
+
+    @patch("app.services.ingest_worker.persist_findings")
+    @patch("app.services.ingest_worker._update_job")
+    @patch("app.services.ingest_worker.SessionLocal")
+    def test_batch_removes_all_reports(
+        self, mock_session: MagicMock, mock_update: MagicMock, mock_persist: MagicMock
+    ) -> None:
+        db = mock_session.return_value
+        job = SimpleNamespace(id=9, user_id=1, status="pending")
+        db.get.return_value = job
+        reports = [ReportFile(name=f"r{i}.json", path=self._spool(b"[]")) for i in range(2)]
+        run_batch_ingest_job(9, reports)
+        self.assertEqual(job.status, "completed")
+        self.assertFalse(any(os.path.exists(r.path) for r in reports))
+
+    @patch("app.services.ingest_worker.persist_findings")
+    @patch("app.services.ingest_worker.archive_report_files")
+    @patch("app.services.ingest_worker._update_job")
+    @patch("app.services.ingest_worker.SessionLocal")
+    def test_archived_reports_are_kept(
+        self,
+        mock_session: MagicMock,
+        mock_update: MagicMock,
+        mock_archive: MagicMock,
+        mock_persist: MagicMock,
+    ) -> None:
+        db = mock_session.return_value
+        db.get.return_value = SimpleNamespace(id=10, user_id=1, status="pending")
+        reports = [ReportFile(name="report", path=self._spool(b"[]"))]
+        run_batch_ingest_job(10, reports, from_archive=True)
+        mock_archive.assert_not_called()
+        mock_update.assert_any_call(10, status="processing")
+        self.assertTrue(os.path.exists(reports[0].path))
+        os.unlink(reports[0].path)
+
+
+class TestRecoverInterruptedJobs(unittest.TestCase):
+    """Interrupted jobs are re-queued from spool or archive, else failed; orphans are swept."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def _file(self, name: str) -> str:
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as f:
+            f.write(b"[]")
+        return path
+
+    @patch("app.services.ingest_worker._get_executor")
+    def test_requeued_from_spool(self, mock_executor: MagicMock) -> None:
+        reports = [ReportFile("a.json", self._file("a.report"), None)]
+        _resume_job(3, _spool_ref(reports), "blob-ref", True)
+        mock_executor.return_value.submit.assert_called_once_with(
+            run_batch_ingest_job, 3, reports, True, False
+        )
+
+    @patch("app.services.ingest_worker.open_archived_reports")
+    @patch("app.services.ingest_worker._get_executor")
+    def test_requeued_from_archive_when_spool_is_gone(
+        self, mock_executor: MagicMock, mock_open: MagicMock
+    ) -> None:
+        archived = [ReportFile("report", "/blobs/x.json.zst", "zstd")]
+        mock_open.return_value = archived
+        missing = [ReportFile("report", os.path.join(self.root, "gone.report"), None)]
+        _resume_job(4, _spool_ref(missing), "x.json.zst", False)
+        mock_executor.return_value.submit.assert_called_once_with(
+            run_batch_ingest_job, 4, archived, False, True
+        )
+
+    @patch("app.services.ingest_worker._update_job")
+    @patch("app.services.ingest_worker._get_executor")
+    def test_failed_without_report(self, mock_executor: MagicMock, mock_update: MagicMock) -> None:
+        _resume_job(5, None, None, False)
+        mock_executor.return_value.submit.assert_not_called()
+        self.assertEqual(mock_update.call_args.kwargs["status"], "failed")
+
+    @patch("app.services.ingest_worker.SessionLocal")
+    def test_sweep_removes_only_old_unreferenced_files(self, mock_session: MagicMock) -> None:
+        referenced = self._file("queued.report")
+        orphan = self._file("orphan.report")
+        query = mock_session.return_value.query.return_value.filter.return_value
+        query.all.return_value = [(_spool_ref([ReportFile("report", referenced, None)]),)]
+        settings = SimpleNamespace(INGEST_SPOOL_DIR=self.root, INGEST_JOB_STALE_SECONDS=300)
+        with patch("app.services.ingest_worker.get_settings", return_value=settings):
+            self.assertEqual(sweep_orphaned_spool_files(), 0)  # just written
+            with patch("app.services.ingest_worker.time.time", return_value=time.time() + 3600):
+                self.assertEqual(sweep_orphaned_spool_files(), 1)
+        self.assertTrue(os.path.exists(referenced))
+        self.assertFalse(os.path.exists(orphan))
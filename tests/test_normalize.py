@@ -0,0 +1,63 @@
+"""Unit tests for vulnerability id resolution in normalize_finding."""
+
+import unittest
+from unittest.mock import patch
+
+from app.schemas.findings import RawFinding
+from app.services import normalize
+from app.services.normalize import normalize_finding
+
+
+def _resolve(memo: normalize.RuleIdsMemo | None = None, **kwargs: object) -> str:
+    return normalize_finding(RawFinding(**kwargs), memo).vulnerability_id
+
+
+class TestResolveVulnerabilityId(unittest.TestCase):
+    """Ids come from the raw id, description and known payload fields; CVE beats GHSA."""
+
+    def test_cve_or_ghsa_raw_id_kept(self) -> None:
+        self.assertEqual(_resolve(vulnerability_id="GHSA-abcd-efgh-ijkl"), "GHSA-abcd-efgh-ijkl")
+
+    def test_osv_aliases(self) -> None:
+        payload = {"id": "PYSEC-2024-1", "aliases": ["GHSA-abcd-efgh-ijkl", "CVE-2024-12345"]}
+        self.assertEqual(_resolve(vulnerability_id="PYSEC-2024-1", raw_payload=payload), "CVE-2024-12345")
+
+    def test_ghsa_in_description_loses_to_cve_in_references(self) -> None:
+        payload = {"references": [{"url": "https://nvd.nist.gov/vuln/detail/CVE-2023-4567"}]}
+        out = _resolve(vulnerability_id="rule", description="see GHSA-abcd-efgh-ijkl", raw_payload=payload)
+        self.assertEqual(out, "CVE-2023-4567")
+
+    def test_unknown_fields_not_searched(self) -> None:
+        self.assertEqual(_resolve(vulnerability_id="rule", raw_payload={"notes": "CVE-2024-12345"}), "rule")
+
+    def test_semgrep_metadata_memoized_by_rule(self) -> None:
+        payload = {"check_id": "r1", "extra": {"metadata": {"cve": "CVE-2022-0001"}}}
+        kwargs = {"vulnerability_id": "r1", "scanner_source": "semgrep", "raw_payload": payload}
+        memo: normalize.RuleIdsMemo = {}
+        self.assertEqual(_resolve(memo, **kwargs), "CVE-2022-0001")
+        with patch.object(normalize, "_first_vuln_ids", wraps=normalize._first_vuln_ids) as scan:
+            self.assertEqual(_resolve(memo, **kwargs), "CVE-2022-0001")
+        self.assertEqual(scan.call_count, 1)  # item-level scan only; rule-level came from the memo
+
+    def test_rule_memo_not_shared_across_reports(self) -> None:
+        first = {"check_id": "my-rule", "extra": {"metadata": {"cve": "CVE-2022-0001"}}}
+        second = {"check_id": "my-rule", "extra": {"metadata": {}}}
+        kwargs = {"vulnerability_id": "my-rule", "scanner_source": "semgrep"}
+        self.assertEqual(_resolve({}, raw_payload=first, **kwargs), "CVE-2022-0001")
+        self.assertEqual(_resolve({}, raw_payload=second, **kwargs), "my-rule")
+
+    def test_generic_metadata_not_memoized(self) -> None:
+        memo: normalize.RuleIdsMemo = {}
+        first = {"metadata": {"cve": "CVE-2022-0001"}}
+        self.assertEqual(_resolve(memo, vulnerability_id="x", raw_payload=first), "CVE-2022-0001")
+        self.assertEqual(_resolve(memo, vulnerability_id="x", raw_payload={"metadata": {}}), "x")
+        self.assertEqual(memo, {})
+
+    def test_sarif_rule_properties(self) -> None:
+        payload = {
+            "id": "js/xss",
+            "tags": ["security", "external/cve/CVE-2021-23337"],
+            "_sarif_result": {"ruleId": "js/xss", "message": {"text": "XSS"}},
+        }
+        out = _resolve(vulnerability_id="js/xss", description="XSS", raw_payload=payload, scanner_source="codeql")
+        self.assertEqual(out, "CVE-2021-23337")
@@ -0,0 +1,63 @@
+"""Unit tests for per-scanner raw_payload projection and size caps."""
+
+import unittest
+
+from app.services.payload_projection import project_raw_payload
+
+
+def _project(payload: dict, max_string_len: int = 16, max_list_items: int = 2) -> dict:
+    return project_raw_payload(payload, max_string_len=max_string_len, max_list_items=max_list_items)
+
+
+class TestProjectRawPayload(unittest.TestCase):
+    """Kept fields survive per detected scanner format; bulky fields are dropped or capped."""
+
+    def test_semgrep_drops_lines_keeps_message_and_cwe(self) -> None:
+        payload = {
+            "check_id": "rule",
+            "path": "a.py",
+            "extra": {
+                "message": "m",
+                "lines": "x" * 1000,
+                "dataflow_trace": {"taint_source": []},
+                "metadata": {"cwe": ["CWE-89"]},
+            },
+        }
+        out = _project(payload)
+        self.assertEqual(out["extra"], {"message": "m", "metadata": {"cwe": ["CWE-89"]}})
+        self.assertIn("lines", payload["extra"])
+
+    def test_trivy_caps_references_and_drops_description(self) -> None:
+        payload = {
+            "VulnerabilityID": "CVE-2024-00001",
+            "PkgName": "openssl",
+            "Description": "long",
+            "References": [f"https://example.com/{i}" for i in range(5)],
+        }
+        out = _project(payload)
+        self.assertNotIn("Description", out)
+        self.assertEqual(out["PkgName"], "openssl")
+        self.assertEqual(len(out["References"]), 2)
+        self.assertEqual(len(out["References"][0]), 16)
+
+    def test_osv_keeps_package_and_ecosystem(self) -> None:
+        payload = {
+            "id": "GHSA-aaaa-bbbb-cccc",
+            "package": {"name": "lodash", "ecosystem": "npm"},
+            "package_ecosystem": "npm",
+            "affected": [{"ranges": []}],
+        }
+        out = _project(payload)
+        self.assertEqual(out["package"], {"name": "lodash", "ecosystem": "npm"})
+        self.assertNotIn("affected", out)
+
+    def test_generic_and_sarif_payloads_only_capped(self) -> None:
+        payload = {"_sarif_result": {"ruleId": "r"}, "fullDescription": "y" * 100, "tags": [1, 2, 3]}
+        out = _project(payload)
+        self.assertEqual(set(out), set(payload))
+        self.assertEqual(len(out["fullDescription"]), 16)
+        self.assertEqual(out["tags"], [1, 2])
+
+    def test_zero_disables_caps(self) -> None:
+        payload = {"note": "z" * 100, "items": list(range(50))}
+        self.assertEqual(_project(payload, max_string_len=0, max_list_items=0), payload)
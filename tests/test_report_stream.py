@@ -0,0 +1,163 @@
+"""Unit tests for streaming report parsing: iter_report_items over flat, SARIF and OSV-Scanner reports."""
+
+import gzip
+import io
+import json
+import unittest
+
+from app.services.report_stream import (
+    ReportEncodingError,
+    ReportFormatError,
+    ReportTooLargeError,
+    iter_report_items,
+)
+from app.services.sarif_parser import sarif_to_rawfindings
+
+
+def _stream(payload: object, read_size: int = 7) -> list:
+    """Serialize payload and parse it back with a tiny read size to exercise buffer refills."""
+    data = json.dumps(payload).encode("utf-8")
+    return list(iter_report_items(io.BytesIO(data), read_size=read_size))
+
+
+def _sarif_payload() -> dict:
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [
+            {
+                "tool": {"driver": {"name": "codeql", "rules": [{"id": "py/sql", "helpUri": "https://x/y"}]}},
+                "results": [
+                    {
+                        "ruleId": "py/sql",
+                        "level": "error",
+                        "message": {"text": "SQL injection."},
+                        "locations": [
+                            {"physicalLocation": {"artifactLocation": {"uri": "file:///app/db.py"}}}
+                        ],
+                    },
+                    {"message": {"text": "no rule id"}},
+                ],
+            }
+        ],
+    }
+
+
+class TestIterReportItems(unittest.TestCase):
+    """iter_report_items yields the same items as the whole-document parsers."""
+
+    def test_flat_array(self) -> None:
+        items = [{"cve_id": "CVE-2024-12345", "cvss": 9.8}, {"id": "GHSA-abcd-efgh-ijkl"}, 3]
+        self.assertEqual(_stream(items), items)
+
+    def test_single_object(self) -> None:
+        item = {"vulnerability_id": "CVE-2024-0001", "severity": "high", "score": 1234567}
+        self.assertEqual(_stream(item), [item])
+
+    def test_sarif_matches_sarif_to_rawfindings(self) -> None:
+        payload = _sarif_payload()
+        self.assertEqual(_stream(payload), list(sarif_to_rawfindings(payload)))
+
+    def test_sarif_results_before_tool_are_buffered(self) -> None:
+        payload = _sarif_payload()
+        run = payload["runs"][0]
+        payload["runs"][0] = {"results": run["results"], "tool": run["tool"]}
+        out = _stream(payload)
+        self.assertEqual(len(out), 1)
+        self.assertEqual(out[0]["raw_payload"]["rule_helpUri"], "https://x/y")
+
+    def test_osv_scanner_flattened(self) -> None:
+        payload = {
+            "results": [
+                {
+                    "source": {"path": "/src/package-lock.json", "type": "lockfile"},
+                    "packages": [
+                        {
+                            "package": {"name": "lodash", "version": "4.17.20", "ecosystem": "npm"},
+                            "vulnerabilities": [
+                                {"id": "GHSA-35jh-r3h4-6jhm", "aliases": ["CVE-2021-23337"], "summary": "Cmd inj"},
+                                {"id": "GHSA-p6mc-m468-83gw", "aliases": []},
+                            ],
+                        }
+                    ],
+                },
+                {"packages": [], "source": {"path": "/b"}},
+            ]
+        }
+        out = _stream(payload)
+        self.assertEqual([o["id"] for o in out], ["GHSA-35jh-r3h4-6jhm", "GHSA-p6mc-m468-83gw"])
+        self.assertEqual(out[0]["source"]["path"], "/src/package-lock.json")
+        self.assertEqual(out[0]["package"]["name"], "lodash")
+        self.assertEqual(out[0]["summary"], "Cmd inj")
+
+    def test_unknown_results_root_is_single_finding(self) -> None:
+        payload = {"results": [{"name": "x"}], "errors": []}
+        self.assertEqual(_stream(payload), [payload])
+
+    def test_semgrep_root_streams_results(self) -> None:
+        results = [{"check_id": "a", "path": "x.py"}, {"check_id": "b", "path": "y.py"}]
+        payload = {"version": "1.0", "results": results, "errors": []}
+        self.assertEqual(_stream(payload), results)
+
+    def test_trivy_root_streams_vulnerabilities_with_target(self) -> None:
+        payload = {
+            "SchemaVersion": 2,
+            "Results": [
+                {"Target": "package-lock.json", "Vulnerabilities": [{"VulnerabilityID": "CVE-2024-0001"}]},
+                {"Target": "secrets", "Class": "secret", "Secrets": [{"RuleID": "aws"}]},
+                {"Vulnerabilities": [{"VulnerabilityID": "CVE-2024-0002"}], "Target": "go.sum"},
+            ],
+        }
+        self.assertEqual(
+            _stream(payload),
+            [
+                {"VulnerabilityID": "CVE-2024-0001", "Target": "package-lock.json"},
+                {"VulnerabilityID": "CVE-2024-0002", "Target": "go.sum"},
+            ],
+        )
+
+    def test_invalid_json_raises(self) -> None:
+        with self.assertRaises(ReportFormatError):
+            list(iter_report_items(io.BytesIO(b'[{"a": 1}, {"b": ]'), read_size=4))
+
+    def test_trailing_data_raises(self) -> None:
+        with self.assertRaises(ReportFormatError):
+            list(iter_report_items(io.BytesIO(b"[] []")))
+
+    def test_max_bytes_enforced_while_streaming(self) -> None:
+        data = json.dumps([{"id": f"CVE-2024-{i:05d}"} for i in range(200)]).encode("utf-8")
+        with self.assertRaises(ReportTooLargeError):
+            list(iter_report_items(io.BytesIO(data), max_bytes=1024, read_size=256))
+
+
+class TestCompressedReports(unittest.TestCase):
+    """gzip and zstd reports are decompressed while streaming; the limit applies to decompressed bytes."""
+
+    _items = [{"id": f"CVE-2024-{i:05d}"} for i in range(200)]
+
+    def test_gzip_round_trip(self) -> None:
+        data = gzip.compress(json.dumps(self._items).encode("utf-8"))
+        out = list(iter_report_items(io.BytesIO(data), encoding="gzip", read_size=64))
+        self.assertEqual(out, self._items)
+
+    def test_zstd_round_trip(self) -> None:
+        try:
+            import zstandard
+        except ImportError:
+            self.skipTest("zstandard not installed")
+        data = zstandard.ZstdCompressor().compress(json.dumps(self._items).encode("utf-8"))
+        self.assertEqual(list(iter_report_items(io.BytesIO(data), encoding="zstd")), self._items)
+
+    def test_decompressed_size_limit(self) -> None:
+        # ~1 MB of whitespace compresses to about 1 KB.
+        data = gzip.compress(b"[" + b" " * 1_000_000 + b"]")
+        self.assertLess(len(data), 4096)
+        with self.assertRaises(ReportTooLargeError):
+            list(iter_report_items(io.BytesIO(data), encoding="gzip", max_bytes=64 * 1024))
+
+    def test_corrupt_gzip_raises_encoding_error(self) -> None:
+        data = gzip.compress(json.dumps(self._items).encode("utf-8"))
+        with self.assertRaises(ReportEncodingError):
+            list(iter_report_items(io.BytesIO(data[: len(data) // 2]), encoding="gzip"))
+        with self.assertRaises(ReportEncodingError):
+            list(iter_report_items(io.BytesIO(b"not gzip"), encoding="gzip"))
@@ -2,7 +2,7 @@
 
 import unittest
 from datetime import datetime, timezone, timedelta
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from app.models import Finding
 from app.services.retention import run_retention
@@ -53,6 +53,24 @@ class TestRetentionDeletesOldFindings(unittest.TestCase):
         session.commit.assert_called_once()
 
 
+class TestRetentionAffectedJobs(unittest.TestCase):
+    """Jobs that lose findings are marked changed and no longer match identical uploads."""
+
+    @patch("app.services.retention.mark_findings_changed")
+    def test_clears_content_hash(self, mock_mark: MagicMock) -> None:
+        settings = MagicMock()
+        settings.RETENTION_ENABLED = True
+        settings.RETENTION_HOURS = 48
+        session = MagicMock()
+        session.query.return_value.filter.return_value.distinct.return_value.all.return_value = [(5,)]
+        session.query.return_value.filter.return_value.delete.return_value = 1
+        run_retention(session, settings)
+        mock_mark.assert_called_once_with(session, [5])
+        session.query.return_value.filter.return_value.update.assert_called_once_with(
+            {"content_hash": None}, synchronize_session=False
+        )
+
+
 class TestRetentionIntegration(unittest.TestCase):
     """Integration test with real DB: insert old findings, run retention, assert deleted."""
 
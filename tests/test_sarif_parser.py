@@ -2,7 +2,7 @@
 
 import unittest
 
-from app.services.sarif_parser import sarif_to_rawfindings
+from app.services.sarif_parser import build_run_index, sarif_to_rawfindings
 
 
 def _minimal_sarif_run(
@@ -43,11 +43,11 @@ class TestSarifToRawfindings(unittest.TestCase):
     """sarif_to_rawfindings produces RawFinding-shaped dicts with explicit raw_payload."""
 
     def test_empty_payload(self) -> None:
-        out = sarif_to_rawfindings({})
+        out = list(sarif_to_rawfindings({}))
         self.assertEqual(out, [])
 
     def test_no_runs(self) -> None:
-        out = sarif_to_rawfindings({"version": "2.1.0", "runs": []})
+        out = list(sarif_to_rawfindings({"version": "2.1.0", "runs": []}))
         self.assertEqual(out, [])
 
     def test_result_kind_and_rule_help_uri_in_raw_payload(self) -> None:
@@ -57,7 +57,7 @@ class TestSarifToRawfindings(unittest.TestCase):
             "version": "2.1.0",
             "runs": [_minimal_sarif_run(result_kind="fail", rule_help_uri="https://codeql.com/rule")],
         }
-        out = sarif_to_rawfindings(payload)
+        out = list(sarif_to_rawfindings(payload))
         self.assertEqual(len(out), 1)
         raw = out[0]["raw_payload"]
         self.assertIn("_sarif_result", raw)
@@ -69,7 +69,7 @@ class TestSarifToRawfindings(unittest.TestCase):
         run = _minimal_sarif_run(result_kind=None, rule_help_uri="https://a.b/c")
         run["results"][0].pop("kind", None)
         payload = {"version": "2.1.0", "runs": [run]}
-        out = sarif_to_rawfindings(payload)
+        out = list(sarif_to_rawfindings(payload))
         self.assertEqual(len(out), 1)
         self.assertIsNone(out[0]["raw_payload"]["_sarif_result"]["kind"])
 
@@ -77,6 +77,33 @@ class TestSarifToRawfindings(unittest.TestCase):
         """When rule has no helpUri, rule_helpUri is None."""
         run = _minimal_sarif_run(rule_help_uri=None)
         payload = {"version": "2.1.0", "runs": [run]}
-        out = sarif_to_rawfindings(payload)
+        out = list(sarif_to_rawfindings(payload))
         self.assertEqual(len(out), 1)
         self.assertIsNone(out[0]["raw_payload"]["rule_helpUri"])
+
+
+class TestSarifRunIndex(unittest.TestCase):
+    """Rules are indexed once per run; metadata is shared by results of the same rule."""
+
+    def test_rule_index_reference_resolves_id_and_metadata(self) -> None:
+        run = _minimal_sarif_run(rule_id="py/sql")
+        run["tool"]["driver"]["rules"].insert(0, {"id": "py/other"})
+        result = run["results"][0]
+        del result["ruleId"]
+        result["rule"] = {"index": 1}
+        out = list(sarif_to_rawfindings({"version": "2.1.0", "runs": [run]}))
+        self.assertEqual(out[0]["vulnerability_id"], "py/sql")
+        self.assertEqual(out[0]["raw_payload"]["name"], "Test rule")
+
+    def test_metadata_built_once_per_rule(self) -> None:
+        run = _minimal_sarif_run()
+        run["tool"]["driver"]["rules"][0]["properties"] = {"tags": ["security"]}
+        index = build_run_index(run)
+        self.assertIs(index.rule_metadata("test-rule"), index.rule_metadata("test-rule"))
+        self.assertEqual(index.rule_metadata("test-rule")["tags"], ["security"])
+        self.assertEqual(index.rule_metadata("missing"), {})
+
+    def test_runs_in_order(self) -> None:
+        runs = [_minimal_sarif_run(rule_id=f"rule-{i}") for i in range(4)]
+        out = list(sarif_to_rawfindings({"version": "2.1.0", "runs": runs}))
+        self.assertEqual([o["vulnerability_id"] for o in out], [f"rule-{i}" for i in range(4)])
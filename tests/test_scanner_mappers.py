@@ -0,0 +1,84 @@
+"""Unit tests for scanner shape mapping: per-item detection and per-report mapper selection."""
+
+import pickle
+import unittest
+
+from app.services.scanner_mappers import (
+    DETECTION_SAMPLE_SIZE,
+    apply_generic_aliases,
+    detect_item_format,
+    map_osv_scanner_to_raw,
+    map_semgrep_to_raw,
+    map_trivy_to_raw,
+    normalize_shape_to_rawfinding,
+    select_report_mapper,
+)
+
+
+class TestDetectItemFormat(unittest.TestCase):
+    """detect_item_format classifies payloads by scanner heuristics."""
+
+    def test_formats(self) -> None:
+        self.assertEqual(detect_item_format({"VulnerabilityID": "CVE-2024-0001"}), "trivy")
+        self.assertEqual(detect_item_format({"Vulnerability": {"VulnerabilityID": "x"}}), "trivy")
+        self.assertEqual(detect_item_format({"issue_id": "SNYK-1", "severity": "high"}), "snyk")
+        self.assertEqual(detect_item_format({"check_id": "r", "path": "a.py"}), "semgrep")
+        osv = {"id": "GHSA-aaaa-bbbb-cccc", "package": {"name": "x", "ecosystem": "npm"}}
+        self.assertEqual(detect_item_format(osv), "osv-scanner")
+        self.assertEqual(detect_item_format({"cve_id": "CVE-2024-0001"}), "generic")
+
+
+class TestSelectReportMapper(unittest.TestCase):
+    """select_report_mapper picks one mapper when the leading items agree."""
+
+    def test_uniform_sample_gets_dedicated_mapper(self) -> None:
+        sample = [{"check_id": "a", "path": "x.py"}, {"check_id": "b", "path": "y.py"}, 3]
+        self.assertEqual(select_report_mapper(sample).args, ("semgrep",))
+        self.assertEqual(select_report_mapper([{"VulnerabilityID": "x"}]).args, ("trivy",))
+        self.assertEqual(select_report_mapper([{"cve": "x"}]).args, ("generic",))
+
+    def test_mixed_or_empty_sample_detects_per_item(self) -> None:
+        mixed = [{"check_id": "a", "path": "x.py"}, {"VulnerabilityID": "x"}]
+        self.assertIs(select_report_mapper(mixed), normalize_shape_to_rawfinding)
+        self.assertIs(select_report_mapper([]), normalize_shape_to_rawfinding)
+
+    def test_items_of_another_format_are_detected(self) -> None:
+        mapper = select_report_mapper([{"cve": "CVE-2024-0001"}] * DETECTION_SAMPLE_SIZE)
+        trivy = {"VulnerabilityID": "CVE-2024-0002", "PkgName": "lodash", "Severity": "HIGH"}
+        semgrep = {"check_id": "r", "path": "a.py"}
+        for obj in (trivy, semgrep, {"cve": "CVE-2024-0003"}, 5):
+            self.assertEqual(mapper(obj), normalize_shape_to_rawfinding(obj))
+        self.assertEqual(mapper(trivy)["dependency"], "lodash")
+        both = {"check_id": "r", "path": "a.py", "VulnerabilityID": "CVE-2024-0004"}
+        self.assertEqual(select_report_mapper([semgrep])(both), map_trivy_to_raw(both))
+
+    def test_mapper_is_picklable(self) -> None:
+        mapper = select_report_mapper([{"check_id": "a", "path": "x.py"}])
+        self.assertEqual(pickle.loads(pickle.dumps(mapper)).args, ("semgrep",))
+
+
+class TestMappersShareSource(unittest.TestCase):
+    """Mappers reference the source dict as raw_payload instead of copying it."""
+
+    def test_trivy_target_and_raw_payload(self) -> None:
+        obj = {
+            "VulnerabilityID": "CVE-2024-0001",
+            "PkgName": "ajv",
+            "Target": "package-lock.json",
+            "CVSS": {"ghsa": {"V3Score": 7.5}},
+        }
+        out = map_trivy_to_raw(obj)
+        self.assertIs(out["raw_payload"], obj)
+        self.assertEqual(out["cvss_score"], 7.5)
+        self.assertEqual(out["file_path"], "package-lock.json")
+        self.assertEqual(out["dependency"], "ajv")
+
+    def test_osv_adds_ecosystem_to_payload(self) -> None:
+        obj = {"id": "GHSA-aaaa-bbbb-cccc", "package": {"name": "x", "ecosystem": "PyPI"}}
+        out = map_osv_scanner_to_raw(obj)
+        self.assertIs(out["raw_payload"], obj)
+        self.assertEqual(obj["package_ecosystem"], "pypi")
+
+    def test_generic_raw_payload_is_source(self) -> None:
+        obj = {"cve_id": "CVE-2024-0001"}
+        self.assertIs(apply_generic_aliases(obj)["raw_payload"], obj)
@@ -0,0 +1,139 @@
+"""Unit tests for in-process similarity search and the semantic merge backends."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+try:
+    import numpy as np
+except ImportError:  # numpy ships with the optional sentence-transformers dependency
+    np = None
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+from app.services import similarity_search
+from app.services.semantic_merge import apply_semantic_merge
+from app.services.similarity_search import similar_pairs
+
+
+def _reference_pairs(ids, vectors, top_k, threshold):
+    """Brute-force version of the Qdrant search: top_k + 1 hits per vector, self included."""
+    matrix = np.asarray(vectors, dtype=np.float64)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    sims = matrix @ matrix.T
+    pairs = set()
+    for i, fid in enumerate(ids):
+        for j in np.argsort(-sims[i], kind="stable")[: top_k + 1]:
+            if sims[i, j] >= threshold and ids[j] != fid:
+                pairs.add(tuple(sorted((fid, ids[j]))))
+    return sorted(pairs)
+
+
+def _clustered_vectors(n: int, dim: int = 16, groups: int = 20, seed: int = 7):
+    """Vectors around a few random centres, so neighbours are well separated from the rest."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(groups, dim))
+    labels = rng.integers(0, groups, size=n)
+    return (centres[labels] + rng.normal(scale=0.05, size=(n, dim))).tolist()
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestSimilarPairs(unittest.TestCase):
+    """Local search returns the pairs the Qdrant search would."""
+
+    def test_threshold_and_self_exclusion(self) -> None:
+        ids = ["1", "2", "3"]
+        vectors = [[1.0, 0.0], [0.99, 0.1], [0.0, 1.0]]
+        self.assertEqual(similar_pairs(ids, vectors, top_k=5, score_threshold=0.9), [("1", "2")])
+
+    def test_top_k_limits_neighbours(self) -> None:
+        ids = ["a", "b", "c", "d"]
+        vectors = [[1.0, 0.0], [1.0, 0.01], [1.0, 0.02], [1.0, 0.5]]
+        self.assertEqual(
+            similar_pairs(ids, vectors, top_k=1, score_threshold=0.5),
+            _reference_pairs(ids, vectors, 1, 0.5),
+        )
+
+    def test_matches_reference_across_blocks(self) -> None:
+        ids = [str(i) for i in range(300)]
+        vectors = _clustered_vectors(300)
+        with patch.object(similarity_search, "_EXACT_BLOCK_CELLS", 300 * 7):
+            pairs = similar_pairs(ids, vectors, top_k=3, score_threshold=0.9)
+        self.assertEqual(pairs, _reference_pairs(ids, vectors, 3, 0.9))
+        self.assertTrue(pairs)
+
+    def test_ann_falls_back_to_exact_without_hnswlib(self) -> None:
+        ids = [str(i) for i in range(50)]
+        vectors = _clustered_vectors(50)
+        with patch.dict("sys.modules", {"hnswlib": None}):
+            pairs = similar_pairs(ids, vectors, top_k=3, score_threshold=0.9, ann_min_items=10)
+        self.assertEqual(pairs, _reference_pairs(ids, vectors, 3, 0.9))
+
+    @unittest.skipIf(hnswlib is None, "hnswlib not installed")
+    def test_ann_recall_on_clustered_vectors(self) -> None:
+        ids = [str(i) for i in range(2000)]
+        vectors = _clustered_vectors(2000, groups=200)
+        expected = set(_reference_pairs(ids, vectors, 5, 0.95))
+        pairs = similar_pairs(ids, vectors, top_k=5, score_threshold=0.95, ann_min_items=1000)
+        self.assertGreaterEqual(len(expected & set(pairs)) / len(expected), 0.95)
+        self.assertEqual(
+            pairs, similar_pairs(ids, vectors, top_k=5, score_threshold=0.95, ann_min_items=1000)
+        )
+
+
+class TestApplySemanticMerge(unittest.TestCase):
+    """apply_semantic_merge searches locally or in a per-call Qdrant collection it drops."""
+
+    def _settings(self, **overrides) -> SimpleNamespace:
+        values = dict(
+            CLUSTER_USE_SEMANTIC=True,
+            CLUSTER_SIMILARITY_BACKEND="local",
+            CLUSTER_ANN_MIN_FINDINGS=0,
+            CLUSTER_SIMILARITY_THRESHOLD=0.85,
+            CLUSTER_TOP_K=10,
+            QDRANT_URL=None,
+            QDRANT_COLLECTION_PREFIX="helion_findings",
+        )
+        values.update(overrides)
+        return SimpleNamespace(**values)
+
+    def setUp(self) -> None:
+        self.findings = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+        for target in (
+            patch("app.services.semantic_merge.build_embedding_text", return_value="t"),
+            patch("app.services.semantic_merge.embed_texts", return_value=[[1.0], [1.0]]),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_local_backend_needs_no_qdrant(self) -> None:
+        with patch("app.services.semantic_merge.get_settings", return_value=self._settings()), patch(
+            "app.services.semantic_merge.similar_pairs", return_value=[("1", "2")]
+        ) as search, patch("app.services.semantic_merge.upsert_finding_vectors") as upsert:
+            self.assertEqual(apply_semantic_merge(self.findings, ["s", "s"]), [("1", "2")])
+        search.assert_called_once_with(
+            ["1", "2"], [[1.0], [1.0]], top_k=10, score_threshold=0.85, ann_min_items=0
+        )
+        upsert.assert_not_called()
+
+    def test_qdrant_backend_drops_collection(self) -> None:
+        settings = self._settings(CLUSTER_SIMILARITY_BACKEND="qdrant", QDRANT_URL="http://q:6333")
+        with patch("app.services.semantic_merge.get_settings", return_value=settings), patch(
+            "app.services.semantic_merge.upsert_finding_vectors", return_value=True
+        ), patch(
+            "app.services.semantic_merge.search_similar_pairs", return_value=[("1", "2")]
+        ), patch("app.services.semantic_merge.delete_collection") as delete:
+            self.assertEqual(apply_semantic_merge(self.findings, ["s", "s"]), [("1", "2")])
+        self.assertTrue(delete.call_args[0][0].startswith("helion_findings_"))
+
+    def test_qdrant_backend_without_url_is_disabled(self) -> None:
+        settings = self._settings(CLUSTER_SIMILARITY_BACKEND="qdrant")
+        with patch("app.services.semantic_merge.get_settings", return_value=settings):
+            self.assertEqual(apply_semantic_merge(self.findings, ["s", "s"]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 """Unit tests for app.services.ticket_generator: cluster to Jira-ready ticket payload."""
 
 import unittest
+from unittest.mock import MagicMock, patch
 
 from app.schemas.findings import VulnerabilityCluster
 from app.schemas.reasoning import ClusterNote
@@ -10,6 +11,7 @@ from app.services.ticket_generator import (
     DEFAULT_ACCEPTANCE_CRITERIA,
     cluster_to_ticket_payload,
     clusters_to_ticket_payloads,
+    resolve_job_affected_services,
 )
 
 
@@ -506,3 +508,34 @@ class TestEdgeCases(unittest.TestCase):
         cluster = _cluster(repo="multiple")
         payload = cluster_to_ticket_payload(cluster, affected_services=[])
         self.assertEqual(payload.affected_services, ["multiple repositories"])
+
+
+class TestResolveJobAffectedServices(unittest.TestCase):
+    """resolve_job_affected_services reads repos through cluster_members for "multiple" clusters."""
+
+    @patch("app.services.ticket_generator.resolve_affected_services")
+    @patch("app.services.cluster_persistence.find_clusters_for_findings")
+    def test_members_repos_by_vulnerability_id(
+        self, mock_find: MagicMock, mock_fallback: MagicMock
+    ) -> None:
+        mock_find.return_value = {10: 100}
+        session = MagicMock()
+        chain = session.query.return_value.join.return_value.filter.return_value.distinct.return_value
+        chain.all.return_value = [(100, " svc-b "), (100, "svc-a"), (100, "")]
+        clusters = [
+            _cluster(vulnerability_id="CVE-2024-0001", repo="multiple", finding_ids=["10", "11"]),
+            _cluster(vulnerability_id="CVE-2024-0002", repo="single-svc"),
+        ]
+        affected = resolve_job_affected_services(session, 5, clusters)
+        self.assertEqual(affected, {"CVE-2024-0001": ["svc-a", "svc-b"]})
+        mock_find.assert_called_once_with(session, 5, [10])
+        mock_fallback.assert_not_called()
+
+    @patch("app.services.ticket_generator.resolve_affected_services", return_value=["svc-x"])
+    @patch("app.services.cluster_persistence.find_clusters_for_findings", return_value={})
+    def test_cluster_not_persisted_falls_back(self, _find: MagicMock, mock_fallback: MagicMock) -> None:
+        session = MagicMock()
+        cluster = _cluster(repo="multiple", finding_ids=["7"])
+        affected = resolve_job_affected_services(session, 5, [cluster])
+        self.assertEqual(affected, {"CVE-2024-0001": ["svc-x"]})
+        mock_fallback.assert_called_once_with(session, ["7"])
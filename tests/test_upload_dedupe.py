@@ -0,0 +1,62 @@
+"""Unit tests for idempotent upload lookups (content hash and Idempotency-Key)."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.upload_dedupe import (
+    combine_content_hashes,
+    find_job_by_content_hash,
+    find_job_by_idempotency_key,
+)
+
+
+def _compiled_filters(db: MagicMock) -> str:
+    criteria = db.query.return_value.filter.call_args[0]
+    return " AND ".join(
+        str(c.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        for c in criteria
+    )
+
+
+class TestCombineContentHashes(unittest.TestCase):
+    """Batch content hash does not depend on report order."""
+
+    def test_order_independent(self) -> None:
+        self.assertEqual(combine_content_hashes(["b" * 64, "a" * 64]), combine_content_hashes(["a" * 64, "b" * 64]))
+
+    def test_different_sets_differ(self) -> None:
+        self.assertNotEqual(combine_content_hashes(["a" * 64]), combine_content_hashes(["a" * 64, "b" * 64]))
+
+
+class TestFindJob(unittest.TestCase):
+    """Lookups are scoped to the user; content matches skip failed jobs."""
+
+    @patch("app.services.upload_dedupe.get_settings")
+    def test_content_hash_ignores_failed_and_stale_jobs(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = SimpleNamespace(INGEST_JOB_STALE_SECONDS=300)
+        db = MagicMock()
+        find_job_by_content_hash(db, 7, "abc", False)
+        sql = _compiled_filters(db)
+        self.assertIn("upload_jobs.user_id = 7", sql)
+        self.assertIn("upload_jobs.content_hash = 'abc'", sql)
+        self.assertIn("upload_jobs.delta IS false", sql)
+        self.assertIn("upload_jobs.status = 'completed' OR upload_jobs.status IN ('pending', 'processing')", sql)
+        self.assertIn("AND upload_jobs.updated_at >= ", sql)
+        self.assertNotIn("failed", sql)
+
+    @patch("app.services.upload_dedupe.get_settings")
+    def test_content_hash_matches_mode(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = SimpleNamespace(INGEST_JOB_STALE_SECONDS=300)
+        db = MagicMock()
+        find_job_by_content_hash(db, 7, "abc", True)
+        self.assertIn("upload_jobs.delta IS true", _compiled_filters(db))
+
+    def test_idempotency_key_any_status(self) -> None:
+        db = MagicMock()
+        find_job_by_idempotency_key(db, 7, "key-1")
+        sql = _compiled_filters(db)
+        self.assertIn("upload_jobs.idempotency_key = 'key-1'", sql)
+        self.assertNotIn("status", sql)
@@ -0,0 +1,47 @@
+"""Unit tests for synchronous upload ingest: persist and commit first, archive afterwards."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from fastapi import HTTPException
+
+from app.api.v1.upload import _persist_upload
+from app.services.ingest import IngestValidationError
+
+
+class TestPersistUpload(unittest.TestCase):
+    """The report is archived after the findings are committed, outside that transaction."""
+
+    def setUp(self) -> None:
+        self.db = MagicMock()
+        self.job = SimpleNamespace(id=5, delta=False, status="processing", raw_blob_ref=None)
+        self.events: list[str] = []
+        self.db.commit.side_effect = lambda: self.events.append("commit")
+
+    def _archive(self) -> str:
+        self.events.append("archive")
+        return "ab/" + "a" * 64 + ".zst"
+
+    @patch("app.api.v1.upload._create_job", return_value=None)
+    @patch("app.api.v1.upload.persist_findings", return_value=[1, 2])
+    def test_archive_after_commit(self, mock_persist: MagicMock, _create: MagicMock) -> None:
+        mock_persist.side_effect = lambda *a, **k: self.events.append("persist") or [1, 2]
+        response = _persist_upload(self.db, self.job, iter([]), self._archive)
+        self.assertEqual(self.events, ["persist", "commit", "archive", "commit"])
+        self.assertEqual((response.accepted, response.upload_job_id), (2, 5))
+        self.assertEqual(self.job.status, "completed")
+        self.assertTrue(self.job.raw_blob_ref.endswith(".zst"))
+
+    @patch("app.api.v1.upload._create_job", return_value=None)
+    @patch("app.api.v1.upload.persist_findings", side_effect=IngestValidationError("bad item"))
+    def test_invalid_report_is_not_archived(self, _persist: MagicMock, _create: MagicMock) -> None:
+        with self.assertRaises(HTTPException) as ctx:
+            _persist_upload(self.db, self.job, iter([]), self._archive)
+        self.assertEqual(ctx.exception.status_code, 422)
+        self.db.rollback.assert_called_once()
+        self.assertEqual(self.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
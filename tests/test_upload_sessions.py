@@ -0,0 +1,115 @@
+"""Unit tests for resumable upload sessions: in-place chunk writes, checksums, and assembly."""
+
+import hashlib
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services import upload_sessions
+from app.services.upload_sessions import (
+    UploadSessionError,
+    UploadSessionNotFoundError,
+    assemble_report,
+    create_session,
+    load_session,
+    write_chunk,
+)
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class TestUploadSessions(unittest.TestCase):
+    """Chunks land at index * chunk_size and only verified chunks count as received."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = SimpleNamespace(
+            UPLOAD_MAX_FILE_BYTES=1024,
+            UPLOAD_SESSION_MAX_CHUNK_BYTES=64,
+            UPLOAD_SESSION_TTL_HOURS=24,
+        )
+        for target in (
+            patch("app.services.upload_sessions.get_settings", return_value=settings),
+            patch("app.services.upload_sessions.spool_dir", return_value=Path(tmp.name)),
+            patch.object(upload_sessions, "MIN_CHUNK_BYTES", 16),
+            patch.object(upload_sessions, "_last_sweep", None),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+        self.report = b'[{"id": "CVE-2024-00001"}, {"id": "CVE-2024-00002"}]'
+
+    def test_out_of_order_chunks_assemble_report(self) -> None:
+        session = create_session(1, "r.json", len(self.report), 16)
+        chunks = [self.report[i:i + 16] for i in range(0, len(self.report), 16)]
+        self.assertEqual(session.missing_chunks(), list(range(len(chunks))))
+        for index in reversed(range(len(chunks))):
+            write_chunk(session, index, chunks[index], _sha(chunks[index]))
+        self.assertEqual(session.missing_chunks(), [])
+        self.assertEqual(assemble_report(session, _sha(self.report)), _sha(self.report))
+        self.assertEqual(session.report_path.read_bytes(), self.report)
+
+    def test_checksum_mismatch_leaves_chunk_missing(self) -> None:
+        session = create_session(1, "r.json", len(self.report), 16)
+        chunk = self.report[:16]
+        write_chunk(session, 0, chunk, _sha(chunk))
+        with self.assertRaises(UploadSessionError) as ctx:
+            write_chunk(session, 0, chunk, _sha(b"other"))
+        self.assertIn("checksum mismatch", ctx.exception.detail)
+        self.assertIn(0, session.missing_chunks())
+
+    def test_wrong_chunk_size_rejected(self) -> None:
+        session = create_session(1, "r.json", len(self.report), 16)
+        with self.assertRaises(UploadSessionError):
+            write_chunk(session, 0, b"short", _sha(b"short"))
+        with self.assertRaises(UploadSessionError):
+            session.expected_chunk_size(session.chunk_count)
+
+    def test_assemble_reports_missing_chunks(self) -> None:
+        session = create_session(1, "r.json", len(self.report), 16)
+        write_chunk(session, 1, self.report[16:32], _sha(self.report[16:32]))
+        with self.assertRaises(UploadSessionError) as ctx:
+            assemble_report(session)
+        self.assertTrue(ctx.exception.detail.startswith("Missing chunks: 0, 2"))
+
+    def test_limits_enforced_on_create(self) -> None:
+        with self.assertRaises(UploadSessionError):
+            create_session(1, "r.json", 2048, 16)
+        with self.assertRaises(UploadSessionError):
+            create_session(1, "r.json", 100, 128)
+
+    def test_chunk_size_minimum_unless_single_chunk(self) -> None:
+        with self.assertRaises(UploadSessionError) as ctx:
+            create_session(1, "r.json", 100, 8)
+        self.assertIn("between 16 and 64", ctx.exception.detail)
+        self.assertEqual(create_session(1, "r.json", 10, 10).chunk_count, 1)
+        with self.assertRaises(UploadSessionError):
+            create_session(1, "r.json", 10, 8)
+
+    def test_chunk_upload_sweeps_expired_sessions(self) -> None:
+        stale = create_session(1, "r.json", len(self.report), 16)
+        live = create_session(1, "r.json", len(self.report), 16)
+        chunk = self.report[:16]
+        later = time.time() + 25 * 3600
+        with patch.object(upload_sessions, "_last_sweep", None), patch(
+            "app.services.upload_sessions.time.time", return_value=later
+        ):
+            meta = json.loads((live.path / "session.json").read_text())
+            (live.path / "session.json").write_text(json.dumps({**meta, "created_at": later}))
+            write_chunk(live, 0, chunk, _sha(chunk))
+        self.assertFalse(stale.path.exists())
+        self.assertIn(0, live.received_chunks())
+
+    def test_other_user_cannot_load_session(self) -> None:
+        session = create_session(1, "r.json", len(self.report), 16)
+        self.assertEqual(load_session(session.id, 1).id, session.id)
+        with self.assertRaises(UploadSessionNotFoundError):
+            load_session(session.id, 2)
+        with self.assertRaises(UploadSessionNotFoundError):
+            load_session("../etc", 1)